@@ -2,33 +2,19 @@
 Neo4j 원가차이 자동 분석 리포트 생성
 """
 import os
-import ssl
+import sys
 from dotenv import load_dotenv
-from neo4j import GraphDatabase
 from datetime import datetime
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from neo4j_connection import create_driver
+
 # .env 파일 로드
 load_dotenv()
 
 class VarianceAnalyzer:
     def __init__(self):
-        uri = os.getenv('NEO4J_URI')
-        username = os.getenv('NEO4J_USERNAME')
-        password = os.getenv('NEO4J_PASSWORD')
-        
-        # URI 변경 및 SSL 설정
-        uri = uri.replace('neo4j+s://', 'bolt://')
-        uri = uri.replace('neo4j+ssc://', 'bolt://')
-        
-        ssl_context = ssl.create_default_context()
-        ssl_context.check_hostname = False
-        ssl_context.verify_mode = ssl.CERT_NONE
-        
-        self.driver = GraphDatabase.driver(
-            uri,
-            auth=(username, password),
-            ssl_context=ssl_context
-        )
+        self.driver = create_driver('run-analysis', ssl_rewrite=True)
     
     def close(self):
         self.driver.close()
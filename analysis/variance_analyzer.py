@@ -5,12 +5,15 @@ Neo4j 기반 원가차이 분석기
 """
 
 import os
+import sys
 import pandas as pd
-from neo4j import GraphDatabase
 from dotenv import load_dotenv
 from datetime import datetime
 import json
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from neo4j_connection import create_driver
+
 # 환경 변수 로드
 load_dotenv()
 
@@ -25,10 +28,7 @@ class VarianceAnalyzer:
     def connect(self):
         """Neo4j 연결"""
         try:
-            self.driver = GraphDatabase.driver(
-                self.uri,
-                auth=(self.username, self.password)
-            )
+            self.driver = create_driver('variance-analyzer', self.uri, self.username, self.password)
             self.driver.verify_connectivity()
             return True
         except Exception as e:
@@ -99,15 +99,15 @@ class VarianceAnalyzer:
         return self.run_query(query)
     
     def get_monthly_variance_trend(self):
-        """월별 차이 트렌드"""
+        """월별 차이 트렌드 (적재 시 저장한 order_month 'YYYY-MM' 기준)"""
         query = """
         MATCH (po:ProductionOrder)-[:HAS_VARIANCE]->(v:Variance)
-        WITH date.truncate('month', po.order_date) as month,
+        WITH po.order_month as month,
              v.cost_element as cost_element,
              SUM(v.variance_amount) as total_variance,
              COUNT(v) as variance_count
         RETURN 
-            toString(month) as month,
+            month,
             cost_element,
             total_variance,
             variance_count
@@ -230,14 +230,33 @@ class VarianceAnalyzer:
     # 4. 패턴 분석
     # ============================================================
     
-    def find_similar_variances(self, variance_threshold=500, limit=10):
-        """유사한 차이 패턴 발견"""
-        query = """
+    def has_same_product_chain(self):
+        """그래프가 chain 방식(NEXT_SAME_PRODUCT)으로 적재되었는지
+
+        환경 변수가 아니라 로더가 실제로 만든 관계로 판단한다 (관계 타입별 개수는 카운트 저장소에서 바로 조회).
+        """
+        result = self.run_query("MATCH ()-[r:NEXT_SAME_PRODUCT]->() RETURN count(r) > 0 AS chain")
+        return bool(len(result) and result['chain'].iloc[0])
+
+    def find_similar_variances(self, variance_threshold=500, limit=10, window=5):
+        """유사한 차이 패턴 발견
+
+        그래프에 NEXT_SAME_PRODUCT 관계가 있으면(chain 방식) 같은 제품에서 주문일 순으로
+        window개 이내인 오더끼리만 비교하고, 없으면(pairs/bucket) Product 노드를 거쳐
+        같은 제품의 모든 오더 쌍을 비교한다.
+        """
+        if self.has_same_product_chain():
+            pair_match = f"""
+        MATCH (po1:ProductionOrder)-[:NEXT_SAME_PRODUCT*1..{int(window)}]->(po2:ProductionOrder)
+        MATCH (po1)-[:PRODUCES]->(p:Product)"""
+        else:
+            pair_match = """
         MATCH (po1:ProductionOrder)-[:PRODUCES]->(p:Product)<-[:PRODUCES]-(po2:ProductionOrder)
+        WHERE po1.id < po2.id"""
+        query = pair_match + """
         MATCH (po1)-[:HAS_VARIANCE]->(v1:Variance)
         MATCH (po2)-[:HAS_VARIANCE]->(v2:Variance)
-        WHERE po1.id < po2.id
-          AND v1.variance_type = v2.variance_type
+        WHERE v1.variance_type = v2.variance_type
           AND v1.cost_element = v2.cost_element
           AND ABS(v1.variance_amount - v2.variance_amount) < $threshold
         RETURN 
@@ -0,0 +1,330 @@
+"""
+neo4j-admin 오프라인 임포트 파일 생성기
+
+generate_data_battery.py가 만든 Neo4j 임포트 CSV(data/neo4j_import)를
+`neo4j-admin database import full`이 읽는 헤더 타입 형식으로 변환합니다.
+- 노드: id:ID(Product), order_date:date, standard_cost:double ...
+- 관계: :START_ID(ProductionOrder), :END_ID(Product), 속성 타입
+- 변환 전에 ID 중복/누락, 관계 참조 무결성, 값 타입을 검사하고
+  문제가 있으면 파일을 내보내지 않습니다.
+
+사용법:
+  python data/export_neo4j_admin_import.py
+  python data/export_neo4j_admin_import.py --output data/neo4j_admin_import --database neo4j
+
+임포트는 정지된(또는 새) 데이터베이스에서만 가능하며, 임포트 후
+`python neo4j/data_loader.py --mode post-import`로 제약조건/인덱스와 추가 관계를 만듭니다.
+"""
+
+import os
+import sys
+import shutil
+import argparse
+import pandas as pd
+
+# 입력/출력 디렉토리
+SOURCE_DIR = 'data/neo4j_import'
+OUTPUT_DIR = 'data/neo4j_admin_import'
+# 한 번에 읽고 쓰는 행 수 (대용량 파일도 메모리 일정)
+CHUNK_SIZE = 100000
+# 오류당 출력할 예시 값 수
+MAX_EXAMPLES = 5
+
+# 노드 파일 정의
+#   id: ID 컬럼 (ID 공간은 라벨 이름), types: 문자열이 아닌 속성의 타입
+#   month_fields: 날짜 문자열에서 'YYYY-MM'을 잘라 추가할 속성 (data_loader.py와 동일)
+#   타입은 data_loader.py 배치 적재 결과와 같게 맞춤 (실수는 double, 정수는 long)
+NODE_FILES = [
+    {'file': 'products.csv', 'label': 'Product', 'id': 'id',
+     'types': {'capacity': 'double', 'standard_cost': 'double', 'active': 'boolean'}},
+    {'file': 'materials.csv', 'label': 'Material', 'id': 'id',
+     'types': {'standard_price': 'double', 'active': 'boolean'}},
+    {'file': 'work_centers.csv', 'label': 'WorkCenter', 'id': 'id',
+     'types': {'labor_rate_per_hour': 'double', 'overhead_rate_per_hour': 'double',
+               'capacity_per_hour': 'long', 'active': 'boolean'}},
+    {'file': 'production_orders.csv', 'label': 'ProductionOrder', 'id': 'id',
+     'types': {'planned_qty': 'long', 'actual_qty': 'long', 'good_qty': 'long',
+               'scrap_qty': 'long', 'order_date': 'date', 'start_date': 'date',
+               'finish_date': 'date', 'yield_rate': 'double'},
+     'month_fields': {'order_month': 'order_date', 'finish_month': 'finish_date'}},
+    {'file': 'variances.csv', 'label': 'Variance', 'id': 'id',
+     'types': {'variance_amount': 'double', 'variance_percent': 'double'}},
+    {'file': 'causes.csv', 'label': 'Cause', 'id': 'code', 'types': {}},
+    {'file': 'quality_defects.csv', 'label': 'QualityDefect', 'id': 'id', 'types': {}},
+    {'file': 'equipment_failures.csv', 'label': 'EquipmentFailure', 'id': 'id',
+     'types': {'downtime_hours': 'double'}},
+    {'file': 'material_markets.csv', 'label': 'MaterialMarket', 'id': 'id',
+     'types': {'market_price': 'long'}},
+]
+
+# 관계 파일 정의 (from/to 컬럼이 가리키는 ID 공간)
+REL_FILES = [
+    {'file': 'rel_uses_material.csv', 'type': 'USES_MATERIAL',
+     'from': 'Product', 'to': 'Material', 'types': {'quantity': 'double'}},
+    {'file': 'rel_produces.csv', 'type': 'PRODUCES',
+     'from': 'ProductionOrder', 'to': 'Product', 'types': {}},
+    {'file': 'rel_has_variance.csv', 'type': 'HAS_VARIANCE',
+     'from': 'ProductionOrder', 'to': 'Variance', 'types': {}},
+    {'file': 'rel_caused_by.csv', 'type': 'CAUSED_BY',
+     'from': 'Variance', 'to': 'Cause', 'types': {}},
+    {'file': 'rel_consumes.csv', 'type': 'CONSUMES',
+     'from': 'ProductionOrder', 'to': 'Material',
+     'types': {'planned_qty': 'double', 'actual_qty': 'double'}},
+    {'file': 'rel_works_at.csv', 'type': 'WORKS_AT',
+     'from': 'ProductionOrder', 'to': 'WorkCenter',
+     'types': {'standard_time_min': 'double', 'actual_time_min': 'double',
+               'efficiency_rate': 'double', 'worker_count': 'long'}},
+    {'file': 'rel_has_defect.csv', 'type': 'HAS_DEFECT',
+     'from': 'Cause', 'to': 'QualityDefect', 'types': {}},
+    {'file': 'rel_has_failure.csv', 'type': 'HAS_FAILURE',
+     'from': 'Cause', 'to': 'EquipmentFailure', 'types': {}},
+    {'file': 'rel_market_price.csv', 'type': 'MARKET_PRICE',
+     'from': 'Material', 'to': 'MaterialMarket', 'types': {}},
+]
+
+
+def _examples(values):
+    """오류 메시지용 예시 값 문자열"""
+    unique = pd.unique(values)[:MAX_EXAMPLES]
+    return ', '.join(repr(v) for v in unique)
+
+
+def convert_column(series, col_type):
+    """문자열 컬럼을 neo4j-admin 타입 표기로 변환
+
+    반환: (변환된 Series, 변환 실패 값 Series)
+    빈 값은 그대로 두어 임포트 시 속성이 생기지 않게 함
+    """
+    present = series.notna()
+    if col_type == 'long':
+        numbers = pd.to_numeric(series, errors='coerce')
+        bad = present & (numbers.isna() | (numbers % 1 != 0))
+        converted = numbers.where(~bad).astype('Int64')
+    elif col_type == 'double':
+        numbers = pd.to_numeric(series, errors='coerce')
+        bad = present & numbers.isna()
+        converted = numbers
+    elif col_type == 'boolean':
+        lowered = series.str.lower()
+        bad = present & ~lowered.isin(['true', 'false'])
+        converted = lowered
+    elif col_type == 'date':
+        parsed = pd.to_datetime(series, format='%Y-%m-%d', errors='coerce')
+        bad = present & parsed.isna()
+        converted = series
+    else:
+        raise ValueError(f"지원하지 않는 타입: {col_type}")
+    return converted, series[bad]
+
+
+class AdminImportExporter:
+    """neo4j-admin import용 파일 변환 및 무결성 검사"""
+
+    def __init__(self, source_dir=SOURCE_DIR, output_dir=OUTPUT_DIR, chunk_size=CHUNK_SIZE):
+        self.source_dir = source_dir
+        self.output_dir = output_dir
+        self.chunk_size = chunk_size
+        self.errors = []
+        # ID 공간(라벨) -> pd.Index
+        self.id_spaces = {}
+        # (라벨 또는 관계 타입, 출력 파일, 행 수)
+        self.node_outputs = []
+        self.rel_outputs = []
+
+    def ambiguous_sources(self):
+        """.csv와 .csv.gz가 함께 있는 입력 파일 (어느 쪽이 최신인지 알 수 없음)"""
+        names = [spec['file'] for spec in NODE_FILES + REL_FILES]
+        return [name for name in names
+                if os.path.exists(os.path.join(self.source_dir, name))
+                and os.path.exists(os.path.join(self.source_dir, name + '.gz'))]
+
+    def _read_chunks(self, file_name):
+        path = os.path.join(self.source_dir, file_name)
+        # 생성기 --gzip 출력(.csv.gz)도 그대로 읽음 (둘 다 있으면 export에서 먼저 거부)
+        if not os.path.exists(path) and os.path.exists(path + '.gz'):
+            path += '.gz'
+        return pd.read_csv(path, dtype=str, chunksize=self.chunk_size)
+
+    def _convert_types(self, chunk, file_name, types, header):
+        """타입 지정 컬럼 변환 + 헤더 이름 부여"""
+        for column, col_type in types.items():
+            if column not in chunk.columns:
+                continue
+            chunk[column], bad = convert_column(chunk[column], col_type)
+            if len(bad):
+                self.errors.append(
+                    f"{file_name}: {column} 값을 {col_type}(으)로 변환할 수 없음 "
+                    f"{len(bad)}건 (예: {_examples(bad)})"
+                )
+            header[column] = f'{column}:{col_type}'
+        return chunk
+
+    @staticmethod
+    def _write_chunk(chunk, path, first):
+        chunk.to_csv(path, mode='w' if first else 'a', header=first, index=False)
+
+    def export_nodes(self, work_dir):
+        """노드 파일 변환 (ID 중복/누락 검사, ID 공간 수집)"""
+        print("\n[1단계] 노드 파일 변환")
+        for spec in NODE_FILES:
+            file_name, label, id_col = spec['file'], spec['label'], spec['id']
+            out_path = os.path.join(work_dir, file_name)
+            ids = []
+            rows = 0
+
+            for i, chunk in enumerate(self._read_chunks(file_name)):
+                missing = chunk[id_col].isna().sum()
+                if missing:
+                    self.errors.append(f"{file_name}: {id_col} 값이 비어 있는 행 {missing}건")
+                ids.append(chunk[id_col].dropna())
+                for field, source in spec.get('month_fields', {}).items():
+                    chunk[field] = chunk[source].str[:7]
+
+                header = {id_col: f'{id_col}:ID({label})'}
+                chunk = self._convert_types(chunk, file_name, spec['types'], header)
+                self._write_chunk(chunk.rename(columns=header), out_path, i == 0)
+                rows += len(chunk)
+
+            all_ids = pd.concat(ids) if ids else pd.Series(dtype=str)
+            duplicated = all_ids[all_ids.duplicated()]
+            if len(duplicated):
+                self.errors.append(
+                    f"{file_name}: 중복 {id_col} {len(duplicated)}건 (예: {_examples(duplicated)})"
+                )
+            self.id_spaces[label] = pd.Index(all_ids.unique())
+            self.node_outputs.append((label, out_path, rows))
+            print(f"  [OK] {label}: {rows:,}개")
+
+    def _dangling(self, values, label):
+        """ID 공간에 없는 참조 값"""
+        index = self.id_spaces[label]
+        return values[index.get_indexer(values) == -1]
+
+    def export_relationships(self, work_dir):
+        """관계 파일 변환 (START/END ID가 노드 파일에 있는지 검사)"""
+        print("\n[2단계] 관계 파일 변환")
+        for spec in REL_FILES:
+            file_name = spec['file']
+            out_path = os.path.join(work_dir, file_name)
+            rows = 0
+
+            for i, chunk in enumerate(self._read_chunks(file_name)):
+                for side, label in (('from', spec['from']), ('to', spec['to'])):
+                    values = chunk[side]
+                    if values.isna().any():
+                        self.errors.append(
+                            f"{file_name}: {side} 값이 비어 있는 행 {values.isna().sum()}건"
+                        )
+                    dangling = self._dangling(values.dropna(), label)
+                    if len(dangling):
+                        self.errors.append(
+                            f"{file_name}: {side} -> {label}에 없는 ID {len(dangling)}건 "
+                            f"(예: {_examples(dangling)})"
+                        )
+
+                header = {
+                    'from': f":START_ID({spec['from']})",
+                    'to': f":END_ID({spec['to']})"
+                }
+                chunk = self._convert_types(chunk, file_name, spec['types'], header)
+                self._write_chunk(chunk.rename(columns=header), out_path, i == 0)
+                rows += len(chunk)
+
+            self.rel_outputs.append((spec['type'], out_path, rows))
+            print(f"  [OK] {spec['type']}: {rows:,}개")
+
+    def import_command(self, database):
+        """neo4j-admin 5.x 임포트 명령"""
+        parts = ['neo4j-admin database import full']
+        for label, path, _ in self.node_outputs:
+            parts.append(f'--nodes={label}={os.path.abspath(path)}')
+        for rel_type, path, _ in self.rel_outputs:
+            parts.append(f'--relationships={rel_type}={os.path.abspath(path)}')
+        parts.append('--overwrite-destination=true')
+        parts.append(database)
+        return ' \\\n  '.join(parts)
+
+    def export(self, database='neo4j'):
+        """검사를 통과한 경우에만 output_dir에 파일과 import.sh를 씀"""
+        print("=" * 70)
+        print("neo4j-admin 임포트 파일 생성")
+        print("=" * 70)
+
+        ambiguous = self.ambiguous_sources()
+        if ambiguous:
+            print(f"\n[X] {self.source_dir}에 .csv와 .csv.gz가 함께 있습니다 - 오래된 쪽을 지우고 다시 실행하세요.")
+            for file_name in ambiguous:
+                print(f"  - {file_name} / {file_name}.gz")
+            return False
+
+        # 임시 디렉토리에 쓰고, 검사 통과 시에만 교체
+        work_dir = self.output_dir.rstrip('/\\') + '.tmp'
+        shutil.rmtree(work_dir, ignore_errors=True)
+        os.makedirs(work_dir)
+
+        try:
+            self.export_nodes(work_dir)
+            self.export_relationships(work_dir)
+        except Exception:
+            shutil.rmtree(work_dir, ignore_errors=True)
+            raise
+
+        if self.errors:
+            shutil.rmtree(work_dir, ignore_errors=True)
+            print(f"\n[X] 무결성 검사 실패 ({len(self.errors)}건) - 파일을 내보내지 않았습니다.")
+            for error in self.errors:
+                print(f"  - {error}")
+            return False
+
+        shutil.rmtree(self.output_dir, ignore_errors=True)
+        os.replace(work_dir, self.output_dir)
+        # 교체 후 경로로 명령 생성
+        self.node_outputs = [(l, os.path.join(self.output_dir, os.path.basename(p)), n)
+                             for l, p, n in self.node_outputs]
+        self.rel_outputs = [(t, os.path.join(self.output_dir, os.path.basename(p)), n)
+                            for t, p, n in self.rel_outputs]
+
+        command = self.import_command(database)
+        script_path = os.path.join(self.output_dir, 'import.sh')
+        with open(script_path, 'w', encoding='utf-8') as f:
+            f.write('#!/bin/sh\n# neo4j 서버를 정지한 뒤 실행하세요.\n')
+            f.write(command + '\n')
+
+        total_nodes = sum(n for _, _, n in self.node_outputs)
+        total_rels = sum(n for _, _, n in self.rel_outputs)
+        print(f"\n[OK] 무결성 검사 통과: 노드 {total_nodes:,}개, 관계 {total_rels:,}개")
+        print(f"[OK] 임포트 파일 저장 완료: {self.output_dir}/")
+        print("\n" + "=" * 70)
+        print("임포트 명령 (neo4j 정지 후 실행, 대상 DB를 덮어씀)")
+        print("=" * 70)
+        print(command)
+        print(f"\n(같은 명령이 {script_path}에 저장되었습니다.)")
+        print("\n임포트 후 neo4j를 시작하고 제약조건/인덱스와 추가 관계를 생성하세요:")
+        print("  python neo4j/data_loader.py --mode post-import")
+        return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description='neo4j-admin 임포트 파일 생성')
+    parser.add_argument('--source', default=SOURCE_DIR,
+                        help=f'입력 CSV 디렉토리 (기본 {SOURCE_DIR})')
+    parser.add_argument('--output', default=OUTPUT_DIR,
+                        help=f'출력 디렉토리 (기본 {OUTPUT_DIR})')
+    parser.add_argument('--database', default=os.getenv('NEO4J_DATABASE', 'neo4j'),
+                        help='임포트 대상 데이터베이스 이름')
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE,
+                        help=f'청크당 행 수 (기본 {CHUNK_SIZE})')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.source):
+        print(f"[X] 데이터 디렉토리가 없습니다: {args.source}")
+        print("먼저 'python data/generate_data_battery.py'를 실행하세요.")
+        sys.exit(1)
+
+    exporter = AdminImportExporter(args.source, args.output, args.chunk_size)
+    if not exporter.export(args.database):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
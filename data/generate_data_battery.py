@@ -10,10 +10,18 @@ LG에너지솔루션 배터리 원가 데이터 생성기
 
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
+from datetime import datetime
 from faker import Faker
 import random
 import os
+import sys
+import gzip
+import argparse
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
 
 # 시드 설정 (재현성)
 random.seed(42)
@@ -28,12 +36,22 @@ NEO4J_DIR = 'data/neo4j_import'
 os.makedirs(RDB_DIR, exist_ok=True)
 os.makedirs(NEO4J_DIR, exist_ok=True)
 
+# 생산오더 시작일 (월 단위 오프셋의 기준)
+START_DATE = datetime(2024, 1, 1)
+# 한 번에 생성/저장하는 생산오더 수 (메모리 사용량의 상한)
+DEFAULT_CHUNK_SIZE = 100000
+# --gzip 압축 수준 (gzip 기본 9는 대용량에서 1보다 수십 배 느리고 크기 차이는 작음)
+DEFAULT_GZIP_LEVEL = 1
+
 # ============================================================
 # 1. 마스터 데이터 생성
 # ============================================================
 
-def generate_products():
-    """배터리 제품 마스터 생성"""
+def generate_products(n_products=None):
+    """배터리 제품 마스터 생성
+
+    n_products가 기본 제품 수(11개)보다 많으면 기본 제품의 변형(-V01, -V02 ...)을 추가한다.
+    """
     products = []
     
     # EV 배터리 (자동차용)
@@ -58,6 +76,16 @@ def generate_products():
     ]
     
     all_batteries = ev_batteries + ess_batteries
+    if n_products is not None:
+        catalog = all_batteries
+        all_batteries = []
+        for i in range(n_products):
+            product_cd, name, product_type, chemistry, capacity, std_cost = catalog[i % len(catalog)]
+            variant = i // len(catalog)
+            if variant:
+                product_cd = f'{product_cd}-V{variant:02d}'
+                name = f'{name} (V{variant:02d})'
+            all_batteries.append((product_cd, name, product_type, chemistry, capacity, std_cost))
     
     for product_cd, name, product_type, chemistry, capacity, std_cost in all_batteries:
         products.append({
@@ -72,11 +100,15 @@ def generate_products():
         })
     
     df = pd.DataFrame(products)
-    print(f"[OK] 제품 마스터 생성: {len(df)}개 (EV: {len(ev_batteries)}, ESS: {len(ess_batteries)})")
+    print(f"[OK] 제품 마스터 생성: {len(df)}개 (EV: {(df['product_type'] == 'EV').sum()}, "
+          f"ESS: {(df['product_type'] == 'ESS').sum()})")
     return df
 
-def generate_materials():
-    """배터리 원부재료 마스터 생성 (단순화 버전 - 5개)"""
+def generate_materials(n_materials=5):
+    """배터리 원부재료 마스터 생성 (기본 5개)
+
+    n_materials가 5보다 많으면 보조재(MAT-AUX-xxx)를 추가하고, 적으면 앞에서부터 사용한다.
+    """
     materials = []
     
     # 5가지 핵심 자재만 생성
@@ -97,6 +129,12 @@ def generate_materials():
         ('MAT-CASE', '배터리 케이스', 'CASE', 'EA', 40000, 'SUP-CAS-01', '한국'),
     ]
     
+    core_materials = core_materials[:n_materials]
+    for k in range(1, n_materials - len(core_materials) + 1):
+        # 보조재 (규모 테스트용, 단가는 1,000 ~ 9,999원)
+        core_materials.append((f'MAT-AUX-{k:03d}', f'보조재 {k}', 'AUXILIARY', 'EA',
+                               1000 + (k * 737) % 9000, 'SUP-AUX-01', '한국'))
+    
     for mat_cd, name, mat_type, unit, price, supplier, origin in core_materials:
         materials.append({
             'material_cd': mat_cd,
@@ -111,11 +149,20 @@ def generate_materials():
         })
     
     df = pd.DataFrame(materials)
-    print(f"[OK] 자재 마스터 생성: {len(df)}개 (단순화)")
+    print(f"[OK] 자재 마스터 생성: {len(df)}개")
     return df
 
+# BOM 소요량 (자재코드 -> (용량 1kWh당 소요량 또는 고정 수량, 용량 비례 여부))
+BOM_QUANTITY = {
+    'MAT-CATHODE': (1.5, True),       # 1. 양극재
+    'MAT-ANODE': (1.2, True),         # 2. 음극재
+    'MAT-ELECTROLYTE': (0.8, True),   # 3. 전해질
+    'MAT-SEPARATOR': (25.0, True),    # 4. 분리막
+    'MAT-CASE': (1, False),           # 5. 케이스
+}
+
 def generate_bom(products_df, materials_df):
-    """BOM (Bill of Materials) 생성 (단순화 버전 - 5개 자재)"""
+    """BOM (Bill of Materials) 생성 (제품마다 자재 마스터의 모든 자재 사용)"""
     boms = []
     bom_id = 1
     
@@ -123,77 +170,30 @@ def generate_bom(products_df, materials_df):
         product_cd = product['product_cd']
         capacity = product['capacity_kwh']
         
-        # 1. 양극재
-        boms.append({
-            'bom_id': bom_id,
-            'product_cd': product_cd,
-            'material_cd': 'MAT-CATHODE',
-            'quantity': round(1.5 * capacity, 2),
-            'unit': 'KG',
-            'valid_from': '2024-01-01',
-            'valid_to': None,
-            'bom_level': 1
-        })
-        bom_id += 1
-        
-        # 2. 음극재
-        boms.append({
-            'bom_id': bom_id,
-            'product_cd': product_cd,
-            'material_cd': 'MAT-ANODE',
-            'quantity': round(1.2 * capacity, 2),
-            'unit': 'KG',
-            'valid_from': '2024-01-01',
-            'valid_to': None,
-            'bom_level': 1
-        })
-        bom_id += 1
-        
-        # 3. 전해질
-        boms.append({
-            'bom_id': bom_id,
-            'product_cd': product_cd,
-            'material_cd': 'MAT-ELECTROLYTE',
-            'quantity': round(0.8 * capacity, 2),
-            'unit': 'L',
-            'valid_from': '2024-01-01',
-            'valid_to': None,
-            'bom_level': 1
-        })
-        bom_id += 1
-        
-        # 4. 분리막
-        boms.append({
-            'bom_id': bom_id,
-            'product_cd': product_cd,
-            'material_cd': 'MAT-SEPARATOR',
-            'quantity': round(25.0 * capacity, 2),
-            'unit': 'M2',
-            'valid_from': '2024-01-01',
-            'valid_to': None,
-            'bom_level': 1
-        })
-        bom_id += 1
-        
-        # 5. 케이스
-        boms.append({
-            'bom_id': bom_id,
-            'product_cd': product_cd,
-            'material_cd': 'MAT-CASE',
-            'quantity': 1,
-            'unit': 'EA',
-            'valid_from': '2024-01-01',
-            'valid_to': None,
-            'bom_level': 1
-        })
-        bom_id += 1
+        for _, material in materials_df.iterrows():
+            # 보조재는 제품당 1개
+            factor, per_capacity = BOM_QUANTITY.get(material['material_cd'], (1, False))
+            boms.append({
+                'bom_id': bom_id,
+                'product_cd': product_cd,
+                'material_cd': material['material_cd'],
+                'quantity': round(factor * capacity, 2) if per_capacity else factor,
+                'unit': material['unit'],
+                'valid_from': '2024-01-01',
+                'valid_to': None,
+                'bom_level': 1
+            })
+            bom_id += 1
     
     df = pd.DataFrame(boms)
-    print(f"[OK] BOM 생성: {len(df)}개 (제품당 5개 자재)")
+    print(f"[OK] BOM 생성: {len(df)}개 (제품당 {len(materials_df)}개 자재)")
     return df
 
-def generate_work_centers():
-    """작업장(워크센터) 마스터 생성 (3개로 단순화)"""
+def generate_work_centers(per_process=1):
+    """작업장(워크센터) 마스터 생성 (공정 3개 x 공정당 per_process개)
+
+    공정당 2번째 작업장부터는 WC-01-02처럼 호기 번호를 붙인다.
+    """
     work_centers = [
         # 1번: 전극 제조 (양극재, 음극재, 전해질 사용)
         ('WC-01', '전극 제조 라인 (양극재/음극재/전해질)', 'ELECTRODE', 45000, 85000, 300, 'A동'),
@@ -205,8 +205,17 @@ def generate_work_centers():
         ('WC-03', '케이스 조립 라인', 'CASE_ASSEMBLY', 48000, 90000, 150, 'C동'),
     ]
     
-    wc_list = []
+    lines = []
     for wc_cd, name, proc_type, labor, overhead, capacity, location in work_centers:
+        for unit_no in range(1, per_process + 1):
+            if unit_no == 1:
+                lines.append((wc_cd, name, proc_type, labor, overhead, capacity, location))
+            else:
+                lines.append((f'{wc_cd}-{unit_no:02d}', f'{name} {unit_no}호기', proc_type,
+                              labor, overhead, capacity, location))
+    
+    wc_list = []
+    for wc_cd, name, proc_type, labor, overhead, capacity, location in lines:
         wc_list.append({
             'workcenter_cd': wc_cd,
             'workcenter_name': name,
@@ -219,7 +228,7 @@ def generate_work_centers():
         })
     
     df = pd.DataFrame(wc_list)
-    print(f"[OK] 작업장 마스터 생성: {len(df)}개 (단순화)")
+    print(f"[OK] 작업장 마스터 생성: {len(df)}개 (공정당 {per_process}개)")
     return df
 
 def generate_routing(products_df, work_centers_df):
@@ -271,389 +280,293 @@ def generate_routing(products_df, work_centers_df):
 # 2. 트랜잭션 데이터 생성
 # ============================================================
 
-def generate_production_orders(products_df):
-    """생산오더 생성 (제품당 3개씩)"""
-    orders = []
-    start_date = datetime(2024, 1, 1)
-    order_id = 1
+def generate_production_orders(products_df, rng, orders_per_month=1, months=3, start=0, count=None):
+    """생산오더 생성 (제품마다 월 orders_per_month개씩 months개월)
+
+    전체 오더를 (월, 제품, 월내 순번) 순서로 번호를 매기고 start번째부터 count개만 만든다.
+    큰 데이터는 이 범위를 나눠 청크 단위로 생성한다.
+    """
+    per_month = len(products_df) * orders_per_month
+    total = per_month * months
+    count = total - start if count is None else min(count, total - start)
+    slots = np.arange(start, start + count)
     
-    # 각 제품당 3개의 오더 생성
-    for idx, product in products_df.iterrows():
-        product_cd = product['product_cd']
-        
-        for i in range(3):
-            # 날짜 생성 (1월~3월, 월별로 분산)
-            month_offset = i  # 0, 1, 2개월
-            days_offset = random.randint(0, 25)
-            order_date = start_date + timedelta(days=(month_offset * 30 + days_offset))
-            
-            # 계획 수량
-            if product['product_type'] == 'EV':
-                planned_qty = random.choice([50, 80, 100, 120, 150])
-            else:  # ESS
-                planned_qty = random.choice([10, 15, 20, 25, 30])
-            
-            # 실적 수량 (계획 대비 ±8%)
-            actual_qty = int(planned_qty * random.uniform(0.92, 1.08))
-            
-            # 수율 (92% ~ 98%)
-            yield_rate = random.uniform(0.92, 0.98)
-            
-            # 양품/불량 수량
-            good_qty = int(actual_qty * yield_rate)
-            scrap_qty = actual_qty - good_qty
-            
-            # 완료일 (오더일 + 3~7일)
-            finish_date = order_date + timedelta(days=random.randint(3, 7))
-            
-            orders.append({
-                'order_no': f'PO-2024-{order_id:04d}',
-                'product_cd': product_cd,
-                'order_type': 'NORMAL',
-                'planned_qty': planned_qty,
-                'actual_qty': actual_qty,
-                'good_qty': good_qty,
-                'scrap_qty': scrap_qty,
-                'order_date': order_date.strftime('%Y-%m-%d'),
-                'start_date': order_date.strftime('%Y-%m-%d'),
-                'finish_date': finish_date.strftime('%Y-%m-%d'),
-                'status': 'CLOSED'
-            })
-            order_id += 1
+    # 날짜 생성 (월별로 분산)
+    month_offset = slots // per_month
+    product_idx = (slots % per_month) // orders_per_month
+    products = products_df.iloc[product_idx]
+    days_offset = rng.integers(0, 26, count)
+    order_date = np.datetime64(START_DATE.date()) + (month_offset * 30 + days_offset).astype('timedelta64[D]')
     
-    df = pd.DataFrame(orders)
-    print(f"[OK] 생산오더 생성: {len(df)}개 (제품당 3개)")
-    return df
+    # 계획 수량 (EV: 50~150, ESS: 10~30)
+    is_ev = (products['product_type'] == 'EV').to_numpy()
+    planned_qty = np.where(is_ev,
+                           rng.choice([50, 80, 100, 120, 150], count),
+                           rng.choice([10, 15, 20, 25, 30], count))
+    
+    # 실적 수량 (계획 대비 ±8%)
+    actual_qty = (planned_qty * rng.uniform(0.92, 1.08, count)).astype(int)
+    
+    # 수율 (92% ~ 98%) -> 양품/불량 수량
+    good_qty = (actual_qty * rng.uniform(0.92, 0.98, count)).astype(int)
+    scrap_qty = actual_qty - good_qty
+    
+    # 완료일 (오더일 + 3~7일)
+    finish_date = order_date + rng.integers(3, 8, count).astype('timedelta64[D]')
+    order_date_str = np.datetime_as_string(order_date, unit='D')
+    
+    return pd.DataFrame({
+        'order_no': [f'PO-{START_DATE.year}-{n:04d}' for n in slots + 1],
+        'product_cd': products['product_cd'].to_numpy(),
+        'order_type': 'NORMAL',
+        'planned_qty': planned_qty,
+        'actual_qty': actual_qty,
+        'good_qty': good_qty,
+        'scrap_qty': scrap_qty,
+        'order_date': order_date_str,
+        'start_date': order_date_str,
+        'finish_date': np.datetime_as_string(finish_date, unit='D'),
+        'status': 'CLOSED'
+    })
 
-def generate_material_consumption(production_orders_df, bom_df, materials_df):
-    """자재 투입 실적 생성 (단순화 버전)"""
-    consumptions = []
-    consumption_id = 1
-    
-    for idx, order in production_orders_df.iterrows():
-        order_no = order['order_no']
-        product_cd = order['product_cd']
-        planned_qty = order['planned_qty']
-        actual_qty = order['actual_qty']
-        scrap_qty = order['scrap_qty']
-        
-        # 해당 제품의 BOM 조회
-        product_bom = bom_df[bom_df['product_cd'] == product_cd]
-        
-        for _, bom_item in product_bom.iterrows():
-            material_cd = bom_item['material_cd']
-            planned_qty_per_unit = bom_item['quantity']
-            unit = bom_item['unit']
-            
-            # 계획 소요량
-            planned_total = planned_qty_per_unit * planned_qty
-            
-            # 실제 투입량 계산
-            # 시나리오 1: 불량 발생시 추가 투입 필요
-            loss_factor = 1.0 + (scrap_qty / planned_qty) * 0.8
-            
-            # 시나리오 2: 재료 품질 문제로 과다 사용 (10% 확률)
-            if random.random() < 0.10:
-                quality_factor = random.uniform(1.05, 1.15)
-            else:
-                quality_factor = 1.0
-            
-            # 시나리오 3: 작업자 숙련도에 따른 차이 (±3%)
-            skill_factor = random.uniform(0.97, 1.03)
-            
-            actual_total = (planned_qty_per_unit * planned_qty * 
-                           loss_factor * quality_factor * skill_factor)
-            
-            consumptions.append({
-                'consumption_id': consumption_id,
-                'order_no': order_no,
-                'material_cd': material_cd,
-                'actual_material_cd': material_cd,
-                'planned_qty': round(planned_total, 4),
-                'actual_qty': round(actual_total, 4),
-                'unit': unit,
-                'is_alternative': 'N',
-                'consumption_date': order['finish_date']
-            })
-            consumption_id += 1
+def generate_material_consumption(production_orders_df, bom_df, materials_df, rng, start_id=1):
+    """자재 투입 실적 생성 (오더 x BOM)"""
+    rows = production_orders_df[['order_no', 'product_cd', 'planned_qty', 'scrap_qty', 'finish_date']].merge(
+        bom_df[['product_cd', 'material_cd', 'quantity', 'unit']], on='product_cd', how='inner'
+    )
+    n = len(rows)
+    planned_qty = rows['planned_qty'].to_numpy()
     
-    df = pd.DataFrame(consumptions)
-    print(f"[OK] 자재 투입 실적 생성: {len(df)}개")
-    return df
+    # 계획 소요량
+    planned_total = rows['quantity'].to_numpy() * planned_qty
+    
+    # 시나리오 1: 불량 발생시 추가 투입 필요
+    loss_factor = 1.0 + (rows['scrap_qty'].to_numpy() / planned_qty) * 0.8
+    
+    # 시나리오 2: 재료 품질 문제로 과다 사용 (10% 확률)
+    quality_factor = np.where(rng.random(n) < 0.10, rng.uniform(1.05, 1.15, n), 1.0)
+    
+    # 시나리오 3: 작업자 숙련도에 따른 차이 (±3%)
+    skill_factor = rng.uniform(0.97, 1.03, n)
+    
+    actual_total = planned_total * loss_factor * quality_factor * skill_factor
+    
+    return pd.DataFrame({
+        'consumption_id': np.arange(start_id, start_id + n),
+        'order_no': rows['order_no'].to_numpy(),
+        'material_cd': rows['material_cd'].to_numpy(),
+        'actual_material_cd': rows['material_cd'].to_numpy(),
+        'planned_qty': np.round(planned_total, 4),
+        'actual_qty': np.round(actual_total, 4),
+        'unit': rows['unit'].to_numpy(),
+        'is_alternative': 'N',
+        'consumption_date': rows['finish_date'].to_numpy()
+    })
 
-def generate_operation_actual(production_orders_df, routing_df, work_centers_df):
+def generate_operation_actual(production_orders_df, routing_df, work_centers_df, rng, start_id=1):
     """작업 실적 생성 (효율, 설비 고장 시나리오 포함)"""
-    actuals = []
-    actual_id = 1
-    
-    for idx, order in production_orders_df.iterrows():
-        order_no = order['order_no']
-        product_cd = order['product_cd']
-        planned_qty = order['planned_qty']
-        actual_qty = order['actual_qty']
-        order_date = order['order_date']
-        
-        # 해당 제품의 라우팅 조회
-        product_routing = routing_df[routing_df['product_cd'] == product_cd].sort_values('operation_seq')
-        
-        current_date = datetime.strptime(order_date, '%Y-%m-%d')
-        
-        for _, routing_item in product_routing.iterrows():
-            workcenter_cd = routing_item['workcenter_cd']
-            operation_seq = routing_item['operation_seq']
-            standard_time_sec = routing_item['standard_time_sec']
-            
-            # 시나리오 1: 작업자 숙련도 (80% ~ 105%)
-            worker_efficiency = random.uniform(0.80, 1.05)
-            
-            # 시나리오 2: 설비 상태 (5% 확률로 고장/노후화로 효율 저하)
-            if random.random() < 0.05:
-                equipment_efficiency = random.uniform(0.70, 0.85)
-            else:
-                equipment_efficiency = random.uniform(0.95, 1.02)
-            
-            # 실제 작업시간 계산
-            total_efficiency = worker_efficiency * equipment_efficiency
-            actual_time_per_unit = standard_time_sec / total_efficiency
-            total_time_min = (actual_time_per_unit * actual_qty) / 60.0
-            
-            # 작업자 수 (공정에 따라 다름)
-            process_type = routing_item['workcenter_cd'].split('-')[1]
-            if 'FORMATION' in process_type or 'AGING' in process_type:
-                worker_count = 1  # 자동화 공정
-            else:
-                worker_count = random.choice([2, 3, 4])
-            
-            actuals.append({
-                'actual_id': actual_id,
-                'order_no': order_no,
-                'workcenter_cd': workcenter_cd,
-                'operation_seq': operation_seq,
-                'standard_time_min': round((standard_time_sec * actual_qty) / 60.0, 2),
-                'actual_time_min': round(total_time_min, 2),
-                'actual_qty': actual_qty,
-                'efficiency_rate': round(total_efficiency * 100, 2),
-                'work_date': current_date.strftime('%Y-%m-%d'),
-                'worker_count': worker_count
-            })
-            actual_id += 1
-            
-            # 다음 공정으로 (화성, 에이징은 시간이 오래 걸림)
-            if 'FORMATION' in workcenter_cd:
-                current_date += timedelta(hours=12)
-            elif 'AGING' in workcenter_cd:
-                current_date += timedelta(hours=24)
-            else:
-                current_date += timedelta(hours=2)
+    routing = routing_df.sort_values(['product_cd', 'operation_seq'], kind='stable')[
+        ['product_cd', 'workcenter_cd', 'operation_seq', 'standard_time_sec']
+    ].copy()
     
-    df = pd.DataFrame(actuals)
-    print(f"[OK] 작업 실적 생성: {len(df)}개")
-    return df
+    # 다음 공정까지 걸리는 시간 (화성, 에이징은 시간이 오래 걸림)
+    step_hours = np.select(
+        [routing['workcenter_cd'].str.contains('FORMATION'), routing['workcenter_cd'].str.contains('AGING')],
+        [12, 24], default=2
+    )
+    routing['hours_before'] = pd.Series(step_hours, index=routing.index).groupby(
+        routing['product_cd']).cumsum() - step_hours
+    
+    # 자동화 공정은 작업자 1명
+    process_type = routing['workcenter_cd'].str.split('-').str[1]
+    routing['automated'] = process_type.str.contains('FORMATION|AGING')
+    
+    rows = production_orders_df[['order_no', 'product_cd', 'actual_qty', 'order_date']].merge(
+        routing, on='product_cd', how='inner'
+    )
+    n = len(rows)
+    actual_qty = rows['actual_qty'].to_numpy()
+    standard_time_sec = rows['standard_time_sec'].to_numpy()
+    
+    # 시나리오 1: 작업자 숙련도 (80% ~ 105%)
+    worker_efficiency = rng.uniform(0.80, 1.05, n)
+    
+    # 시나리오 2: 설비 상태 (5% 확률로 고장/노후화로 효율 저하)
+    equipment_efficiency = np.where(rng.random(n) < 0.05,
+                                    rng.uniform(0.70, 0.85, n),
+                                    rng.uniform(0.95, 1.02, n))
+    
+    # 실제 작업시간 계산
+    total_efficiency = worker_efficiency * equipment_efficiency
+    total_time_min = (standard_time_sec / total_efficiency * actual_qty) / 60.0
+    
+    worker_count = np.where(rows['automated'].to_numpy(), 1, rng.choice([2, 3, 4], n))
+    work_date = (rows['order_date'].to_numpy().astype('datetime64[D]')
+                 + (rows['hours_before'].to_numpy() // 24).astype('timedelta64[D]'))
+    
+    return pd.DataFrame({
+        'actual_id': np.arange(start_id, start_id + n),
+        'order_no': rows['order_no'].to_numpy(),
+        'workcenter_cd': rows['workcenter_cd'].to_numpy(),
+        'operation_seq': rows['operation_seq'].to_numpy(),
+        'standard_time_min': np.round((standard_time_sec * actual_qty) / 60.0, 2),
+        'actual_time_min': np.round(total_time_min, 2),
+        'actual_qty': actual_qty,
+        'efficiency_rate': np.round(total_efficiency * 100, 2),
+        'work_date': np.datetime_as_string(work_date, unit='D'),
+        'worker_count': worker_count
+    })
 
 def calculate_cost_accumulation(production_orders_df, material_consumption_df, materials_df, 
-                                operation_actual_df, work_centers_df, bom_df, routing_df):
-    """원가 집계 계산 (재료비, 노무비, 경비)"""
-    costs = []
-    cost_id = 1
-    
-    for idx, order in production_orders_df.iterrows():
-        order_no = order['order_no']
-        product_cd = order['product_cd']
-        planned_qty = order['planned_qty']
-        actual_qty = order['actual_qty']
-        
-        # === 재료비 계산 ===
-        # 계획 재료비
-        product_bom = bom_df[bom_df['product_cd'] == product_cd]
-        planned_material_cost = 0
-        for _, bom_item in product_bom.iterrows():
-            material_cd = bom_item['material_cd']
-            material_price = materials_df[materials_df['material_cd'] == material_cd]['standard_price'].values[0]
-            planned_material_cost += bom_item['quantity'] * material_price * planned_qty
-        
-        # 실적 재료비
-        order_consumption = material_consumption_df[material_consumption_df['order_no'] == order_no]
-        actual_material_cost = 0
-        for _, cons in order_consumption.iterrows():
-            # 실제 사용한 자재의 가격
-            actual_mat_cd = cons['actual_material_cd']
-            material_price = materials_df[materials_df['material_cd'] == actual_mat_cd]['standard_price'].values[0]
-            
-            # 가격 변동 시뮬레이션 (±8%)
-            price_variance = random.uniform(0.92, 1.08)
-            actual_price = material_price * price_variance
-            
-            actual_material_cost += cons['actual_qty'] * actual_price
-        
-        costs.append({
-            'cost_id': cost_id,
-            'order_no': order_no,
-            'cost_element': 'MATERIAL',
-            'cost_type': None,
-            'planned_cost': round(planned_material_cost, 2),
-            'actual_cost': round(actual_material_cost, 2),
-            'variance': round(actual_material_cost - planned_material_cost, 2),
-            'calculation_date': order['finish_date']
-        })
-        cost_id += 1
-        
-        # === 노무비 계산 ===
-        # 계획 노무비
-        product_routing = routing_df[routing_df['product_cd'] == product_cd]
-        planned_labor_cost = 0
-        for _, routing_item in product_routing.iterrows():
-            wc_cd = routing_item['workcenter_cd']
-            labor_rate = work_centers_df[work_centers_df['workcenter_cd'] == wc_cd]['labor_rate_per_hour'].values[0]
-            std_time_hour = routing_item['standard_time_sec'] / 3600.0
-            planned_labor_cost += std_time_hour * labor_rate * planned_qty
-        
-        # 실적 노무비
-        order_actual = operation_actual_df[operation_actual_df['order_no'] == order_no]
-        actual_labor_cost = 0
-        for _, oper in order_actual.iterrows():
-            wc_cd = oper['workcenter_cd']
-            labor_rate = work_centers_df[work_centers_df['workcenter_cd'] == wc_cd]['labor_rate_per_hour'].values[0]
-            actual_time_hour = oper['actual_time_min'] / 60.0
-            actual_labor_cost += actual_time_hour * labor_rate * oper['worker_count']
-        
-        costs.append({
-            'cost_id': cost_id,
-            'order_no': order_no,
-            'cost_element': 'LABOR',
-            'cost_type': None,
-            'planned_cost': round(planned_labor_cost, 2),
-            'actual_cost': round(actual_labor_cost, 2),
-            'variance': round(actual_labor_cost - planned_labor_cost, 2),
-            'calculation_date': order['finish_date']
-        })
-        cost_id += 1
-        
-        # === 경비 계산 ===
-        # 계획 경비
-        planned_overhead_cost = 0
-        for _, routing_item in product_routing.iterrows():
-            wc_cd = routing_item['workcenter_cd']
-            overhead_rate = work_centers_df[work_centers_df['workcenter_cd'] == wc_cd]['overhead_rate_per_hour'].values[0]
-            std_time_hour = routing_item['standard_time_sec'] / 3600.0
-            planned_overhead_cost += std_time_hour * overhead_rate * planned_qty
-        
-        # 실적 경비
-        actual_overhead_cost = 0
-        for _, oper in order_actual.iterrows():
-            wc_cd = oper['workcenter_cd']
-            overhead_rate = work_centers_df[work_centers_df['workcenter_cd'] == wc_cd]['overhead_rate_per_hour'].values[0]
-            actual_time_hour = oper['actual_time_min'] / 60.0
-            actual_overhead_cost += actual_time_hour * overhead_rate
-        
-        costs.append({
-            'cost_id': cost_id,
-            'order_no': order_no,
-            'cost_element': 'OVERHEAD',
-            'cost_type': None,
-            'planned_cost': round(planned_overhead_cost, 2),
-            'actual_cost': round(actual_overhead_cost, 2),
-            'variance': round(actual_overhead_cost - planned_overhead_cost, 2),
-            'calculation_date': order['finish_date']
-        })
-        cost_id += 1
+                                operation_actual_df, work_centers_df, bom_df, routing_df, rng=None,
+                                start_id=1):
+    """원가 집계 계산 (재료비, 노무비, 경비)
+
+    단가/임률은 한 번만 조인하고, 제품별 계획 원가는 groupby, 오더별 실적 원가는 bincount로 합산한다.
+    실적 재료비의 가격 변동(±8%)은 rng(시드 고정 np.random.Generator)로 한 번에 뽑는다.
+    """
+    if rng is None:
+        rng = np.random.default_rng(42)
+    orders = production_orders_df[['order_no', 'product_cd', 'planned_qty', 'finish_date']]
+    prices = materials_df.set_index('material_cd')['standard_price']
+    rates = work_centers_df.set_index('workcenter_cd')[['labor_rate_per_hour', 'overhead_rate_per_hour']]
+    
+    order_index = pd.Index(orders['order_no'])
     
-    df = pd.DataFrame(costs)
-    print(f"[OK] 원가 집계 생성: {len(df)}개")
+    def per_product(values, product_cds):
+        """제품별 합계를 오더 순서로 펼침 (BOM/라우팅이 없으면 0)"""
+        sums = pd.Series(values).groupby(np.asarray(product_cds)).sum()
+        return orders['product_cd'].map(sums).fillna(0).to_numpy()
+    
+    def per_order(values, order_nos):
+        """오더별 합계 (실적이 없으면 0)"""
+        positions = order_index.get_indexer(order_nos)
+        found = positions >= 0
+        return np.bincount(positions[found], weights=np.asarray(values)[found],
+                           minlength=len(order_index))
+    
+    # === 재료비 계산 ===
+    # 계획 재료비: 제품별 단위 재료비 x 계획 수량
+    bom_cost = bom_df['quantity'] * bom_df['material_cd'].map(prices)
+    planned_material = per_product(bom_cost, bom_df['product_cd']) * orders['planned_qty'].to_numpy()
+    
+    # 실적 재료비: 실제 사용한 자재의 가격 x 가격 변동 시뮬레이션 (±8%)
+    price_variance = rng.uniform(0.92, 1.08, len(material_consumption_df))
+    consumption_cost = (material_consumption_df['actual_qty']
+                        * material_consumption_df['actual_material_cd'].map(prices)
+                        * price_variance)
+    actual_material = per_order(consumption_cost, material_consumption_df['order_no'])
+    
+    # === 노무비/경비 계산 ===
+    # 계획: 제품별 (표준시간 x 임률) 합계 x 계획 수량
+    routing_rates = rates.reindex(routing_df['workcenter_cd']).to_numpy()
+    std_time_hour = (routing_df['standard_time_sec'] / 3600.0).to_numpy()
+    planned_qty = orders['planned_qty'].to_numpy()
+    planned_labor = per_product(std_time_hour * routing_rates[:, 0], routing_df['product_cd']) * planned_qty
+    planned_overhead = per_product(std_time_hour * routing_rates[:, 1], routing_df['product_cd']) * planned_qty
+    
+    # 실적: 실제 작업시간 x 임률 (노무비는 작업자 수 반영)
+    oper_rates = rates.reindex(operation_actual_df['workcenter_cd']).to_numpy()
+    actual_time_hour = (operation_actual_df['actual_time_min'] / 60.0).to_numpy()
+    worker_count = operation_actual_df['worker_count'].to_numpy()
+    actual_labor = per_order(actual_time_hour * oper_rates[:, 0] * worker_count,
+                             operation_actual_df['order_no'])
+    actual_overhead = per_order(actual_time_hour * oper_rates[:, 1], operation_actual_df['order_no'])
+    
+    # 오더별로 재료비, 노무비, 경비 순서의 행 구성
+    elements = [
+        ('MATERIAL', planned_material, actual_material),
+        ('LABOR', planned_labor, actual_labor),
+        ('OVERHEAD', planned_overhead, actual_overhead),
+    ]
+    n_orders = len(orders)
+    planned = np.column_stack([e[1] for e in elements]).ravel()
+    actual = np.column_stack([e[2] for e in elements]).ravel()
+    df = pd.DataFrame({
+        'cost_id': np.arange(start_id, start_id + n_orders * len(elements)),
+        'order_no': np.repeat(orders['order_no'].to_numpy(), len(elements)),
+        'cost_element': np.tile([e[0] for e in elements], n_orders),
+        'cost_type': None,
+        'planned_cost': np.round(planned, 2),
+        'actual_cost': np.round(actual, 2),
+        'variance': np.round(actual - planned, 2),
+        'calculation_date': np.repeat(orders['finish_date'].to_numpy(), len(elements))
+    })
     return df
 
 def generate_variance_analysis(cost_accumulation_df, production_orders_df, 
-                                material_consumption_df, operation_actual_df):
-    """원가차이 분석 생성 (Production Order당 3개: 재료비차이, 노무비차이, 경비차이)"""
-    variances = []
-    variance_id = 1
-    
-    # 새로운 원인 코드 (단순화)
-    material_causes = ['품질_불량', '대체자재_사용']
-    labor_causes = ['인력_숙련도', '외주_사용']
-    overhead_causes = ['설비_고장', '자재_사용_증가']
-    
-    # Production Order별로 정확히 3개의 variance 생성
-    for order_no in production_orders_df['order_no']:
-        # 해당 오더의 원가 데이터 조회
-        order_costs = cost_accumulation_df[cost_accumulation_df['order_no'] == order_no]
-        
-        for _, cost in order_costs.iterrows():
-            variance_amount = cost['variance']
-            cost_element = cost['cost_element']
-            
-            # 차이 유형 및 원인 결정
-            if cost_element == 'MATERIAL':
-                variance_name = '재료비차이'
-                variance_type = 'DIFF'
-                # 수량 차이 비율 확인
-                order_consumption = material_consumption_df[
-                    material_consumption_df['order_no'] == order_no
-                ]
-                total_planned = order_consumption['planned_qty'].sum()
-                total_actual = order_consumption['actual_qty'].sum()
-                qty_diff_pct = ((total_actual - total_planned) / total_planned * 100) if total_planned > 0 else 0
-                
-                # 품질 불량이 더 자주 발생하도록
-                if abs(qty_diff_pct) > 5:
-                    cause_code = '품질_불량'
-                else:
-                    cause_code = random.choice(material_causes)
-                
-            elif cost_element == 'LABOR':
-                variance_name = '노무비차이'
-                variance_type = 'DIFF'
-                # 작업 효율 확인
-                order_operations = operation_actual_df[
-                    operation_actual_df['order_no'] == order_no
-                ]
-                avg_efficiency = order_operations['efficiency_rate'].mean()
-                
-                # 효율이 낮으면 인력 숙련도 문제
-                if avg_efficiency < 85:
-                    cause_code = '인력_숙련도'
-                else:
-                    cause_code = random.choice(labor_causes)
-                
-            else:  # OVERHEAD
-                variance_name = '경비차이'
-                variance_type = 'DIFF'
-                cause_code = random.choice(overhead_causes)
-            
-            # 차이율 계산
-            if cost['planned_cost'] != 0:
-                variance_percent = (variance_amount / cost['planned_cost']) * 100
-            else:
-                variance_percent = 0
-            
-            # 심각도 (차이 금액 기준)
-            abs_amount = abs(variance_amount)
-            if abs_amount > 10000000:  # 1천만원 이상
-                severity = 'HIGH'
-            elif abs_amount > 5000000:  # 5백만원 이상
-                severity = 'MEDIUM'
-            else:
-                severity = 'LOW'
-            
-            variances.append({
-                'variance_id': variance_id,
-                'order_no': order_no,
-                'variance_name': variance_name,  # 추가: 한글 이름
-                'cost_element': cost_element,
-                'variance_type': variance_type,
-                'variance_amount': round(variance_amount, 2),
-                'variance_percent': round(variance_percent, 4),
-                'cause_code': cause_code,
-                'severity': severity,
-                'analysis_date': cost['calculation_date']
-            })
-            variance_id += 1
+                                material_consumption_df, operation_actual_df,
+                                cause_code_df, rng, start_id=1):
+    """원가차이 분석 생성 (Production Order당 3개: 재료비차이, 노무비차이, 경비차이)
+
+    원인은 원가요소별 원인 코드에서 고르며, 각 원가요소의 첫 원인 코드는
+    규칙(재료 수량 차이 5% 초과, 평균 작업 효율 85% 미만)에 해당할 때 사용한다.
+    """
+    causes = {
+        category: cause_code_df.loc[cause_code_df['cause_category'] == category, 'cause_code'].to_numpy()
+        for category in CAUSE_CATEGORY_NAMES
+    }
+    costs = cost_accumulation_df
+    n = len(costs)
+    element = costs['cost_element'].to_numpy()
+    order_index = pd.Index(production_orders_df['order_no'])
+    positions = order_index.get_indexer(costs['order_no'])
     
-    df = pd.DataFrame(variances)
-    print(f"[OK] 원가차이 분석 생성: {len(df)}개 (재료비/노무비/경비차이)")
-    return df
+    # 재료비: 오더별 수량 차이 비율
+    planned = material_consumption_df.groupby('order_no')['planned_qty'].sum().reindex(order_index)
+    actual = material_consumption_df.groupby('order_no')['actual_qty'].sum().reindex(order_index)
+    qty_diff_pct = ((actual - planned) / planned * 100).where(planned > 0, 0).fillna(0).to_numpy()
+    
+    # 노무비: 오더별 평균 작업 효율
+    avg_efficiency = operation_actual_df.groupby('order_no')['efficiency_rate'].mean().reindex(
+        order_index).to_numpy()
+    
+    # 원인 코드: 원가요소별 무작위 선택 후 규칙 적용
+    cause_code = np.empty(n, dtype=object)
+    for category, codes in causes.items():
+        mask = element == category
+        cause_code[mask] = rng.choice(codes, mask.sum())
+    # 품질 불량이 더 자주 발생하도록
+    cause_code[(element == 'MATERIAL') & (np.abs(qty_diff_pct[positions]) > 5)] = causes['MATERIAL'][0]
+    # 효율이 낮으면 인력 숙련도 문제
+    cause_code[(element == 'LABOR') & (avg_efficiency[positions] < 85)] = causes['LABOR'][0]
+    
+    # 차이율 계산
+    variance_amount = costs['variance'].to_numpy()
+    planned_cost = costs['planned_cost'].to_numpy()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        variance_percent = np.where(planned_cost != 0, variance_amount / planned_cost * 100, 0)
+    
+    # 심각도 (차이 금액 기준: 1천만원, 5백만원 초과)
+    abs_amount = np.abs(variance_amount)
+    severity = np.select([abs_amount > 10000000, abs_amount > 5000000], ['HIGH', 'MEDIUM'], default='LOW')
+    
+    variance_names = {'MATERIAL': '재료비차이', 'LABOR': '노무비차이', 'OVERHEAD': '경비차이'}
+    return pd.DataFrame({
+        'variance_id': np.arange(start_id, start_id + n),
+        'order_no': costs['order_no'].to_numpy(),
+        'variance_name': costs['cost_element'].map(variance_names).to_numpy(),
+        'cost_element': element,
+        'variance_type': 'DIFF',
+        'variance_amount': np.round(variance_amount, 2),
+        'variance_percent': np.round(variance_percent, 4),
+        'cause_code': cause_code,
+        'severity': severity,
+        'analysis_date': costs['calculation_date'].to_numpy()
+    })
+
+# 원가요소별 원인 코드 추가 시 이름
+CAUSE_CATEGORY_NAMES = {'MATERIAL': '재료비', 'LABOR': '노무비', 'OVERHEAD': '경비'}
 
-def generate_cause_code():
-    """원인 코드 마스터 생성 (단순화 - 6개)"""
+def generate_cause_code(n_causes=6):
+    """원인 코드 마스터 생성 (기본 6개, 원가요소별 2개)
+
+    원가요소(재료비/노무비/경비)마다 최소 1개가 남도록 번갈아 고르며,
+    6개보다 많으면 '재료비_기타_01' 같은 추가 원인을 만든다.
+    각 원가요소의 첫 원인은 차이 분석 규칙(품질 불량, 인력 숙련도)에 쓰인다.
+    """
+    if n_causes < len(CAUSE_CATEGORY_NAMES):
+        raise ValueError(f"원인 코드는 최소 {len(CAUSE_CATEGORY_NAMES)}개가 필요합니다.")
     causes = [
         # 재료비차이 원인 (2개)
         ('품질_불량', 'MATERIAL', 'DIFF', '자재 품질 불량 (QUALITY_DEFECT)', '품질팀',
@@ -674,6 +587,26 @@ def generate_cause_code():
          '생산량 증가 또는 비효율로 인한 간접 자재 사용 증가'),
     ]
     
+    # 원가요소별로 번갈아 선택 (부족하면 추가 원인 생성)
+    by_category = {c: [cause for cause in causes if cause[1] == c] for c in CAUSE_CATEGORY_NAMES}
+    selected = []
+    rank = 0
+    while len(selected) < n_causes:
+        for category, name in CAUSE_CATEGORY_NAMES.items():
+            if len(selected) == n_causes:
+                break
+            if rank < len(by_category[category]):
+                selected.append(by_category[category][rank])
+            else:
+                extra = rank - len(by_category[category]) + 1
+                selected.append((f'{name}_기타_{extra:02d}', category, 'DIFF',
+                                 f'{name} 기타 원인 {extra}', '원가팀',
+                                 '규모 테스트용 추가 원인 코드'))
+        rank += 1
+    # 원가요소 순서, 원가요소 내 순서대로 정렬
+    order = list(CAUSE_CATEGORY_NAMES)
+    causes = sorted(selected, key=lambda c: (order.index(c[1]), selected.index(c) // len(order)))
+    
     cause_list = []
     for code, category, var_type, short_desc, dept, detail_desc in causes:
         cause_list.append({
@@ -686,7 +619,7 @@ def generate_cause_code():
         })
     
     df = pd.DataFrame(cause_list)
-    print(f"[OK] 원인 코드 생성: {len(df)}개 (단순화)")
+    print(f"[OK] 원인 코드 생성: {len(df)}개")
     return df
 
 def generate_quality_defects():
@@ -821,236 +754,349 @@ def generate_material_market_prices():
     return df
 
 # ============================================================
-# 3. 메인 실행
+# 3. Neo4j 임포트 형식 변환
 # ============================================================
 
-def main():
-    print("=" * 70)
-    print("LG에너지솔루션 배터리 원가 데이터 생성 (개선버전)")
-    print("=" * 70)
-    
-    # 마스터 데이터 생성
-    print("\n[1단계] 마스터 데이터 생성")
-    products_df = generate_products()
-    materials_df = generate_materials()
-    bom_df = generate_bom(products_df, materials_df)
-    work_centers_df = generate_work_centers()
-    routing_df = generate_routing(products_df, work_centers_df)
-    cause_code_df = generate_cause_code()
-    
-    # 새로운 마스터 데이터
-    quality_defects_df = generate_quality_defects()
-    equipment_failures_df = generate_equipment_failures()
-    material_market_df = generate_material_market_prices()
-    
-    # 트랜잭션 데이터 생성
-    print("\n[2단계] 트랜잭션 데이터 생성")
-    production_orders_df = generate_production_orders(products_df)
-    material_consumption_df = generate_material_consumption(
-        production_orders_df, bom_df, materials_df
-    )
-    operation_actual_df = generate_operation_actual(
-        production_orders_df, routing_df, work_centers_df
-    )
-    
-    # 원가 데이터 생성
-    print("\n[3단계] 원가 데이터 생성")
-    cost_accumulation_df = calculate_cost_accumulation(
-        production_orders_df, material_consumption_df, materials_df,
-        operation_actual_df, work_centers_df, bom_df, routing_df
-    )
-    variance_analysis_df = generate_variance_analysis(
-        cost_accumulation_df, production_orders_df, 
-        material_consumption_df, operation_actual_df
-    )
-    
-    # RDB 테이블 형식으로 저장
-    print("\n[4단계] RDB 테이블 CSV 저장")
-    products_df.to_csv(f'{RDB_DIR}/product_master.csv', index=False, encoding='utf-8-sig')
-    materials_df.to_csv(f'{RDB_DIR}/material_master.csv', index=False, encoding='utf-8-sig')
-    bom_df.to_csv(f'{RDB_DIR}/bom.csv', index=False, encoding='utf-8-sig')
-    work_centers_df.to_csv(f'{RDB_DIR}/work_center.csv', index=False, encoding='utf-8-sig')
-    routing_df.to_csv(f'{RDB_DIR}/routing.csv', index=False, encoding='utf-8-sig')
-    production_orders_df.to_csv(f'{RDB_DIR}/production_order.csv', index=False, encoding='utf-8-sig')
-    material_consumption_df.to_csv(f'{RDB_DIR}/material_consumption.csv', index=False, encoding='utf-8-sig')
-    operation_actual_df.to_csv(f'{RDB_DIR}/operation_actual.csv', index=False, encoding='utf-8-sig')
-    cost_accumulation_df.to_csv(f'{RDB_DIR}/cost_accumulation.csv', index=False, encoding='utf-8-sig')
-    variance_analysis_df.to_csv(f'{RDB_DIR}/variance_analysis.csv', index=False, encoding='utf-8-sig')
-    cause_code_df.to_csv(f'{RDB_DIR}/cause_code.csv', index=False, encoding='utf-8-sig')
-    quality_defects_df.to_csv(f'{RDB_DIR}/quality_defects.csv', index=False, encoding='utf-8-sig')
-    equipment_failures_df.to_csv(f'{RDB_DIR}/equipment_failures.csv', index=False, encoding='utf-8-sig')
-    material_market_df.to_csv(f'{RDB_DIR}/material_market_prices.csv', index=False, encoding='utf-8-sig')
-    
-    print(f"[OK] RDB 테이블 저장 완료: {RDB_DIR}/")
-    
-    # Neo4j 임포트용 데이터 저장
-    print("\n[5단계] Neo4j 임포트 CSV 저장")
-    
-    # Product 노드
-    products_neo = products_df.copy()
-    products_neo.rename(columns={
+def products_to_neo4j(products_df):
+    """Product 노드"""
+    products_neo = products_df.rename(columns={
         'product_cd': 'id', 
         'product_name': 'name', 
         'product_type': 'type',
         'battery_chemistry': 'chemistry',
         'capacity_kwh': 'capacity'
-    }, inplace=True)
+    })
     products_neo['active'] = products_neo['active_flag'] == 'Y'
-    products_neo = products_neo[['id', 'name', 'type', 'chemistry', 'capacity', 'standard_cost', 'active']]
-    products_neo.to_csv(f'{NEO4J_DIR}/products.csv', index=False)
-    
-    # Material 노드
-    materials_neo = materials_df.copy()
-    materials_neo.rename(columns={
+    return products_neo[['id', 'name', 'type', 'chemistry', 'capacity', 'standard_cost', 'active']]
+
+def materials_to_neo4j(materials_df):
+    """Material 노드"""
+    materials_neo = materials_df.rename(columns={
         'material_cd': 'id', 
         'material_name': 'name',
         'material_type': 'type',
         'origin_country': 'origin'
-    }, inplace=True)
+    })
     materials_neo['active'] = materials_neo['active_flag'] == 'Y'
-    materials_neo = materials_neo[['id', 'name', 'type', 'unit', 'standard_price', 
-                                     'supplier_cd', 'origin', 'active']]
-    materials_neo.to_csv(f'{NEO4J_DIR}/materials.csv', index=False)
-    
-    # WorkCenter 노드
-    work_centers_neo = work_centers_df.copy()
-    work_centers_neo.rename(columns={
+    return materials_neo[['id', 'name', 'type', 'unit', 'standard_price', 
+                          'supplier_cd', 'origin', 'active']]
+
+def work_centers_to_neo4j(work_centers_df):
+    """WorkCenter 노드"""
+    work_centers_neo = work_centers_df.rename(columns={
         'workcenter_cd': 'id', 
         'workcenter_name': 'name'
-    }, inplace=True)
+    })
     work_centers_neo['active'] = work_centers_neo['active_flag'] == 'Y'
-    work_centers_neo = work_centers_neo[[
+    return work_centers_neo[[
         'id', 'name', 'process_type', 'labor_rate_per_hour', 
         'overhead_rate_per_hour', 'capacity_per_hour', 'location', 'active'
     ]]
-    work_centers_neo.to_csv(f'{NEO4J_DIR}/work_centers.csv', index=False)
-    
+
+def master_to_neo4j(cause_code_df, quality_defects_df, equipment_failures_df,
+                    material_market_df, bom_df):
+    """나머지 마스터 노드/관계 (파일명 -> DataFrame)"""
+    return {
+        # Cause 노드
+        'causes.csv': cause_code_df.rename(columns={
+            'cause_code': 'code', 
+            'cause_category': 'category',
+            'cause_description': 'description',
+            'detail_description': 'detail'
+        }),
+        # QualityDefect / EquipmentFailure / MaterialMarket 노드
+        'quality_defects.csv': quality_defects_df.rename(columns={'defect_id': 'id'}),
+        'equipment_failures.csv': equipment_failures_df.rename(columns={'failure_id': 'id'}),
+        'material_markets.csv': material_market_df.rename(columns={'market_id': 'id'}),
+        # USES_MATERIAL 관계 (Product -> Material)
+        'rel_uses_material.csv': bom_df[['product_cd', 'material_cd', 'quantity', 'unit']].rename(
+            columns={'product_cd': 'from', 'material_cd': 'to'}),
+        # HAS_DEFECT 관계 (Cause -> QualityDefect)
+        'rel_has_defect.csv': quality_defects_df[['cause_code', 'defect_id']].rename(
+            columns={'cause_code': 'from', 'defect_id': 'to'}),
+        # HAS_FAILURE 관계 (Cause -> EquipmentFailure)
+        'rel_has_failure.csv': equipment_failures_df[['cause_code', 'failure_id']].rename(
+            columns={'cause_code': 'from', 'failure_id': 'to'}),
+        # MARKET_PRICE 관계 (Material -> MaterialMarket)
+        'rel_market_price.csv': material_market_df[['material_cd', 'market_id']].rename(
+            columns={'material_cd': 'from', 'market_id': 'to'}),
+    }
+
+def transactions_to_neo4j(production_orders_df, variance_analysis_df,
+                          material_consumption_df, operation_actual_df):
+    """트랜잭션 노드/관계 (파일명 -> DataFrame), 청크마다 호출"""
     # ProductionOrder 노드
-    po_neo = production_orders_df.copy()
-    po_neo.rename(columns={'order_no': 'id'}, inplace=True)
+    po_neo = production_orders_df.rename(columns={'order_no': 'id'})
     po_neo['yield_rate'] = (po_neo['good_qty'] / po_neo['actual_qty'] * 100).round(2)
-    po_neo.to_csv(f'{NEO4J_DIR}/production_orders.csv', index=False)
     
     # Variance 노드 (이미 variance_name 포함)
-    var_neo = variance_analysis_df.copy()
-    var_neo['id'] = var_neo['variance_id'].apply(lambda x: f'VAR-{x:05d}')
-    
-    var_neo = var_neo[[
+    variance_ids = variance_analysis_df['variance_id'].map(lambda x: f'VAR-{x:05d}')
+    var_neo = variance_analysis_df.assign(id=variance_ids)[[
         'id', 'variance_name', 'order_no', 'cost_element', 'variance_type', 'variance_amount', 
         'variance_percent', 'severity', 'cause_code', 'analysis_date'
     ]]
-    var_neo.to_csv(f'{NEO4J_DIR}/variances.csv', index=False)
-    
-    # Cause 노드
-    cause_neo = cause_code_df.copy()
-    cause_neo.rename(columns={
-        'cause_code': 'code', 
-        'cause_category': 'category',
-        'cause_description': 'description',
-        'detail_description': 'detail'
-    }, inplace=True)
-    cause_neo.to_csv(f'{NEO4J_DIR}/causes.csv', index=False)
-    
-    # QualityDefect 노드
-    defect_neo = quality_defects_df.copy()
-    defect_neo.rename(columns={'defect_id': 'id'}, inplace=True)
-    defect_neo.to_csv(f'{NEO4J_DIR}/quality_defects.csv', index=False)
-    
-    # EquipmentFailure 노드
-    failure_neo = equipment_failures_df.copy()
-    failure_neo.rename(columns={'failure_id': 'id'}, inplace=True)
-    failure_neo.to_csv(f'{NEO4J_DIR}/equipment_failures.csv', index=False)
-    
-    # MaterialMarket 노드
-    market_neo = material_market_df.copy()
-    market_neo.rename(columns={'market_id': 'id'}, inplace=True)
-    market_neo.to_csv(f'{NEO4J_DIR}/material_markets.csv', index=False)
-    
-    # 관계 데이터
-    # USES_MATERIAL 관계 (Product -> Material)
-    uses_material = bom_df[['product_cd', 'material_cd', 'quantity', 'unit']].copy()
-    uses_material.rename(columns={'product_cd': 'from', 'material_cd': 'to'}, inplace=True)
-    uses_material.to_csv(f'{NEO4J_DIR}/rel_uses_material.csv', index=False)
-    
-    # PRODUCES 관계 (ProductionOrder -> Product)
-    produces = production_orders_df[['order_no', 'product_cd']].copy()
-    produces.rename(columns={'order_no': 'from', 'product_cd': 'to'}, inplace=True)
-    produces.to_csv(f'{NEO4J_DIR}/rel_produces.csv', index=False)
-    
-    # HAS_VARIANCE 관계 (ProductionOrder -> Variance)
-    has_variance = variance_analysis_df[['order_no', 'variance_id']].copy()
-    has_variance['variance_id'] = has_variance['variance_id'].apply(lambda x: f'VAR-{x:05d}')
-    has_variance.rename(columns={'order_no': 'from', 'variance_id': 'to'}, inplace=True)
-    has_variance.to_csv(f'{NEO4J_DIR}/rel_has_variance.csv', index=False)
     
     # CAUSED_BY 관계 (Variance -> Cause)
-    caused_by = variance_analysis_df[['variance_id', 'cause_code']].dropna().copy()
-    caused_by['variance_id'] = caused_by['variance_id'].apply(lambda x: f'VAR-{x:05d}')
-    caused_by.rename(columns={'variance_id': 'from', 'cause_code': 'to'}, inplace=True)
-    caused_by.to_csv(f'{NEO4J_DIR}/rel_caused_by.csv', index=False)
-    
-    # CONSUMES 관계 (ProductionOrder -> Material, 실제 소비)
-    consumes = material_consumption_df[[
-        'order_no', 'actual_material_cd', 'planned_qty', 'actual_qty', 'unit', 'is_alternative'
-    ]].copy()
-    consumes.rename(columns={'order_no': 'from', 'actual_material_cd': 'to'}, inplace=True)
-    consumes.to_csv(f'{NEO4J_DIR}/rel_consumes.csv', index=False)
-    
-    # WORKS_AT 관계 (ProductionOrder -> WorkCenter)
-    works_at = operation_actual_df[[
-        'order_no', 'workcenter_cd', 'standard_time_min', 'actual_time_min', 
-        'efficiency_rate', 'worker_count'
-    ]].copy()
-    works_at.rename(columns={'order_no': 'from', 'workcenter_cd': 'to'}, inplace=True)
-    works_at.to_csv(f'{NEO4J_DIR}/rel_works_at.csv', index=False)
-    
-    # HAS_DEFECT 관계 (Cause -> QualityDefect)
-    has_defect = quality_defects_df[['cause_code', 'defect_id']].copy()
-    has_defect.rename(columns={'cause_code': 'from', 'defect_id': 'to'}, inplace=True)
-    has_defect.to_csv(f'{NEO4J_DIR}/rel_has_defect.csv', index=False)
-    
-    # HAS_FAILURE 관계 (Cause -> EquipmentFailure)
-    has_failure = equipment_failures_df[['cause_code', 'failure_id']].copy()
-    has_failure.rename(columns={'cause_code': 'from', 'failure_id': 'to'}, inplace=True)
-    has_failure.to_csv(f'{NEO4J_DIR}/rel_has_failure.csv', index=False)
-    
-    # MARKET_PRICE 관계 (Material -> MaterialMarket)
-    market_price = material_market_df[['material_cd', 'market_id']].copy()
-    market_price.rename(columns={'material_cd': 'from', 'market_id': 'to'}, inplace=True)
-    market_price.to_csv(f'{NEO4J_DIR}/rel_market_price.csv', index=False)
+    caused_by = pd.DataFrame({'from': variance_ids, 'to': variance_analysis_df['cause_code']}).dropna()
+    
+    return {
+        'production_orders.csv': po_neo,
+        'variances.csv': var_neo,
+        # PRODUCES 관계 (ProductionOrder -> Product)
+        'rel_produces.csv': production_orders_df[['order_no', 'product_cd']].rename(
+            columns={'order_no': 'from', 'product_cd': 'to'}),
+        # HAS_VARIANCE 관계 (ProductionOrder -> Variance)
+        'rel_has_variance.csv': pd.DataFrame({'from': variance_analysis_df['order_no'], 'to': variance_ids}),
+        'rel_caused_by.csv': caused_by,
+        # CONSUMES 관계 (ProductionOrder -> Material, 실제 소비)
+        'rel_consumes.csv': material_consumption_df[[
+            'order_no', 'actual_material_cd', 'planned_qty', 'actual_qty', 'unit', 'is_alternative'
+        ]].rename(columns={'order_no': 'from', 'actual_material_cd': 'to'}),
+        # WORKS_AT 관계 (ProductionOrder -> WorkCenter)
+        'rel_works_at.csv': operation_actual_df[[
+            'order_no', 'workcenter_cd', 'standard_time_min', 'actual_time_min', 
+            'efficiency_rate', 'worker_count'
+        ]].rename(columns={'order_no': 'from', 'workcenter_cd': 'to'}),
+    }
+
+# ============================================================
+# 4. 스트리밍 CSV 저장
+# ============================================================
+
+class ChunkedCsvWriter:
+    """청크 단위 CSV 스트리밍 저장
+    
+    파일별 핸들을 열어 둔 채 청크가 생성될 때마다 이어 쓴다.
+    헤더는 파일의 첫 청크에서만 쓰고, compress=True이면 .csv.gz로 저장한다.
+    같은 이름의 다른 형식 파일(.csv <-> .csv.gz)은 지워서 이전 데이터가 대신 읽히지 않게 한다.
+    """
+    
+    def __init__(self, directory, encoding='utf-8', compress=False, compresslevel=DEFAULT_GZIP_LEVEL):
+        self.directory = directory
+        self.encoding = encoding
+        self.compress = compress
+        self.compresslevel = compresslevel
+        self.handles = {}
+        self.rows = {}
+    
+    def path(self, name):
+        return os.path.join(self.directory, name + ('.gz' if self.compress else ''))
+    
+    def write(self, name, df):
+        handle = self.handles.get(name)
+        header = handle is None
+        if header:
+            stale = os.path.join(self.directory, name + ('' if self.compress else '.gz'))
+            if os.path.exists(stale):
+                os.remove(stale)
+            if self.compress:
+                handle = gzip.open(self.path(name), 'wt', compresslevel=self.compresslevel,
+                                   encoding=self.encoding, newline='')
+            else:
+                handle = open(self.path(name), 'w', encoding=self.encoding, newline='')
+            self.handles[name] = handle
+            self.rows[name] = 0
+        df.to_csv(handle, header=header, index=False)
+        self.rows[name] += len(df)
+    
+    def write_all(self, frames):
+        """{파일명: DataFrame} 한 번에 쓰기"""
+        for name, df in frames.items():
+            self.write(name, df)
+    
+    def close(self):
+        for handle in self.handles.values():
+            handle.close()
+        self.handles = {}
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+def peak_rss_mb():
+    """프로세스 최대 메모리 사용량(MB), 측정할 수 없으면 None"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS는 바이트, Linux는 KB 단위
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+# ============================================================
+# 5. 메인 실행
+# ============================================================
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='배터리 원가 데이터 생성')
+    parser.add_argument('--products', type=int, default=11, help='제품 수 (기본 11)')
+    parser.add_argument('--orders-per-month', type=int, default=1,
+                        help='제품당 월 생산오더 수 (기본 1)')
+    parser.add_argument('--months', type=int, default=3, help='생산 기간 개월 수 (기본 3)')
+    parser.add_argument('--materials-per-bom', type=int, default=5,
+                        help='제품당 BOM 자재 수 (기본 5)')
+    parser.add_argument('--work-centers-per-process', type=int, default=1,
+                        help='공정당 작업장 수 (기본 1, 공정 3개)')
+    parser.add_argument('--causes', type=int, default=6, help='원가차이 원인 코드 수 (기본 6, 최소 3)')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help=f'청크당 생산오더 수 (기본 {DEFAULT_CHUNK_SIZE:,})')
+    parser.add_argument('--seed', type=int, default=42, help='난수 시드 (기본 42)')
+    parser.add_argument('--gzip', action='store_true', help='CSV를 .csv.gz로 압축 저장')
+    parser.add_argument('--gzip-level', type=int, choices=range(1, 7), default=DEFAULT_GZIP_LEVEL,
+                        help=f'--gzip 압축 수준 1~6 (기본 {DEFAULT_GZIP_LEVEL}, 클수록 느림)')
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    random.seed(args.seed)
+    np.random.seed(args.seed)
+    rng = np.random.default_rng(args.seed)
     
+    print("=" * 70)
+    print("LG에너지솔루션 배터리 원가 데이터 생성 (개선버전)")
+    print("=" * 70)
+    
+    # 마스터 데이터 생성
+    print("\n[1단계] 마스터 데이터 생성")
+    products_df = generate_products(args.products)
+    materials_df = generate_materials(args.materials_per_bom)
+    bom_df = generate_bom(products_df, materials_df)
+    work_centers_df = generate_work_centers(args.work_centers_per_process)
+    routing_df = generate_routing(products_df, work_centers_df)
+    cause_code_df = generate_cause_code(args.causes)
+    
+    # 새로운 마스터 데이터
+    quality_defects_df = generate_quality_defects()
+    equipment_failures_df = generate_equipment_failures()
+    material_market_df = generate_material_market_prices()
+    
+    # 파일 핸들을 열어 둔 채 청크마다 RDB/Neo4j 양쪽에 이어 쓴다
+    rdb_writer = ChunkedCsvWriter(RDB_DIR, encoding='utf-8-sig', compress=args.gzip,
+                                  compresslevel=args.gzip_level)
+    neo4j_writer = ChunkedCsvWriter(NEO4J_DIR, compress=args.gzip, compresslevel=args.gzip_level)
+    with rdb_writer, neo4j_writer:
+        # 마스터는 작으므로 한 번에 저장
+        print("\n[2단계] 마스터 CSV 저장")
+        rdb_masters = {
+            'product_master.csv': products_df,
+            'material_master.csv': materials_df,
+            'bom.csv': bom_df,
+            'work_center.csv': work_centers_df,
+            'routing.csv': routing_df,
+            'cause_code.csv': cause_code_df,
+            'quality_defects.csv': quality_defects_df,
+            'equipment_failures.csv': equipment_failures_df,
+            'material_market_prices.csv': material_market_df,
+        }
+        rdb_writer.write_all(rdb_masters)
+        neo4j_masters = {
+            'products.csv': products_to_neo4j(products_df),
+            'materials.csv': materials_to_neo4j(materials_df),
+            'work_centers.csv': work_centers_to_neo4j(work_centers_df),
+        }
+        neo4j_masters.update(master_to_neo4j(cause_code_df, quality_defects_df, equipment_failures_df,
+                                             material_market_df, bom_df))
+        neo4j_writer.write_all(neo4j_masters)
+        print(f"[OK] 마스터 저장 완료: {RDB_DIR}/, {NEO4J_DIR}/")
+    
+        # 트랜잭션/원가 데이터는 오더 청크 단위로 생성해 바로 이어 쓴다 (메모리 일정)
+        total_orders = len(products_df) * args.orders_per_month * args.months
+        n_chunks = max(1, -(-total_orders // args.chunk_size))
+        print(f"\n[3단계] 트랜잭션/원가 데이터 생성 및 저장 "
+              f"(생산오더 {total_orders:,}개, 청크 {n_chunks}개)")
+    
+        counts = {'production_order': 0, 'material_consumption': 0, 'operation_actual': 0,
+                  'cost_accumulation': 0, 'variance_analysis': 0}
+        element_variance = {'MATERIAL': 0.0, 'LABOR': 0.0, 'OVERHEAD': 0.0}
+        severity_counts = {'HIGH': 0, 'MEDIUM': 0, 'LOW': 0}
+        total_variance = 0.0
+        abs_percent_sum = 0.0
+    
+        for chunk_no, start in enumerate(range(0, total_orders, args.chunk_size)):
+            production_orders_df = generate_production_orders(
+                products_df, rng, args.orders_per_month, args.months, start, args.chunk_size
+            )
+            material_consumption_df = generate_material_consumption(
+                production_orders_df, bom_df, materials_df, rng, counts['material_consumption'] + 1
+            )
+            operation_actual_df = generate_operation_actual(
+                production_orders_df, routing_df, work_centers_df, rng, counts['operation_actual'] + 1
+            )
+            cost_accumulation_df = calculate_cost_accumulation(
+                production_orders_df, material_consumption_df, materials_df,
+                operation_actual_df, work_centers_df, bom_df, routing_df,
+                rng, counts['cost_accumulation'] + 1
+            )
+            variance_analysis_df = generate_variance_analysis(
+                cost_accumulation_df, production_orders_df, 
+                material_consumption_df, operation_actual_df,
+                cause_code_df, rng, counts['variance_analysis'] + 1
+            )
+        
+            # RDB 테이블 형식으로 저장
+            rdb_tables = {
+                'production_order': production_orders_df,
+                'material_consumption': material_consumption_df,
+                'operation_actual': operation_actual_df,
+                'cost_accumulation': cost_accumulation_df,
+                'variance_analysis': variance_analysis_df,
+            }
+            for name, df in rdb_tables.items():
+                rdb_writer.write(f'{name}.csv', df)
+                counts[name] += len(df)
+        
+            # Neo4j 임포트용 데이터 저장
+            neo4j_writer.write_all(transactions_to_neo4j(
+                production_orders_df, variance_analysis_df,
+                material_consumption_df, operation_actual_df
+            ))
+        
+            # 요약 통계 누적
+            for element, total in cost_accumulation_df.groupby('cost_element')['variance'].sum().items():
+                element_variance[element] += total
+            for severity, count in variance_analysis_df['severity'].value_counts().items():
+                severity_counts[severity] += count
+            total_variance += variance_analysis_df['variance_amount'].sum()
+            abs_percent_sum += variance_analysis_df['variance_percent'].abs().sum()
+        
+            print(f"  [OK] 청크 {chunk_no + 1}/{n_chunks}: 생산오더 {counts['production_order']:,}개 저장")
+    
+    print(f"[OK] RDB 테이블 저장 완료: {RDB_DIR}/")
     print(f"[OK] Neo4j 임포트 파일 저장 완료: {NEO4J_DIR}/")
     
     # 요약 통계
     print("\n" + "=" * 70)
     print("데이터 생성 완료 - 요약")
     print("=" * 70)
-    print(f"제품: {len(products_df)}개 (EV: {len(products_df[products_df['product_type']=='EV'])}, "
-          f"ESS: {len(products_df[products_df['product_type']=='ESS'])})")
-    print(f"자재: {len(materials_df)}개 (단순화: 양극재, 음극재, 전해질, 분리막, 케이스)")
-    print(f"BOM: {len(bom_df)}개 (제품당 5개 자재)")
+    print(f"제품: {len(products_df)}개 (EV: {(products_df['product_type'] == 'EV').sum()}, "
+          f"ESS: {(products_df['product_type'] == 'ESS').sum()})")
+    print(f"자재: {len(materials_df)}개")
+    print(f"BOM: {len(bom_df)}개 (제품당 {len(materials_df)}개 자재)")
     print(f"작업장: {len(work_centers_df)}개")
     print(f"라우팅: {len(routing_df)}개")
-    print(f"생산오더: {len(production_orders_df)}개 (제품당 3개)")
-    print(f"자재 투입: {len(material_consumption_df)}개")
-    print(f"작업 실적: {len(operation_actual_df)}개")
-    print(f"원가 집계: {len(cost_accumulation_df)}개")
-    print(f"원가차이: {len(variance_analysis_df)}개 (PO당 3개: 재료비, 노무비, 경비)")
+    print(f"생산오더: {counts['production_order']:,}개 "
+          f"(제품당 월 {args.orders_per_month}개 x {args.months}개월)")
+    print(f"자재 투입: {counts['material_consumption']:,}개")
+    print(f"작업 실적: {counts['operation_actual']:,}개")
+    print(f"원가 집계: {counts['cost_accumulation']:,}개")
+    print(f"원가차이: {counts['variance_analysis']:,}개 (PO당 3개: 재료비, 노무비, 경비)")
     print(f"\n[추가 데이터]")
+    print(f"원인 코드: {len(cause_code_df)}개")
     print(f"품질 불량: {len(quality_defects_df)}개")
     print(f"설비 고장: {len(equipment_failures_df)}개")
     print(f"자재 시황: {len(material_market_df)}개")
     print(f"\n[원가차이 분석]")
-    print(f"  - 총 차이 금액: {variance_analysis_df['variance_amount'].sum():,.0f} 원")
-    print(f"  - 평균 차이율: {variance_analysis_df['variance_percent'].abs().mean():.2f}%")
-    print(f"  - HIGH 심각도: {len(variance_analysis_df[variance_analysis_df['severity']=='HIGH'])}건")
-    print(f"  - MEDIUM 심각도: {len(variance_analysis_df[variance_analysis_df['severity']=='MEDIUM'])}건")
-    print(f"  - LOW 심각도: {len(variance_analysis_df[variance_analysis_df['severity']=='LOW'])}건")
+    print(f"  - 총 차이 금액: {total_variance:,.0f} 원")
+    print(f"  - 평균 차이율: {abs_percent_sum / max(counts['variance_analysis'], 1):.2f}%")
+    print(f"  - HIGH 심각도: {severity_counts['HIGH']:,}건")
+    print(f"  - MEDIUM 심각도: {severity_counts['MEDIUM']:,}건")
+    print(f"  - LOW 심각도: {severity_counts['LOW']:,}건")
     print("\n[원가요소별 차이]")
     for element in ['MATERIAL', 'LABOR', 'OVERHEAD']:
-        element_data = cost_accumulation_df[cost_accumulation_df['cost_element'] == element]
-        total_var = element_data['variance'].sum()
-        print(f"  - {element}: {total_var:,.0f} 원")
+        print(f"  - {element}: {element_variance[element]:,.0f} 원")
+    peak = peak_rss_mb()
+    if peak is not None:
+        print(f"\n최대 메모리 사용량(RSS): {peak:,.0f} MB (청크 {args.chunk_size:,}개 기준)")
     print("=" * 70)
 
 if __name__ == "__main__":
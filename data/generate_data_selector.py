@@ -28,7 +28,7 @@ def main():
         print("\n🔋 배터리 시나리오 선택됨")
         print("=" * 70)
         import generate_data_battery
-        generate_data_battery.main()
+        generate_data_battery.main(sys.argv[2:])
         
     elif scenario == 'semiconductor':
         print("\n🔌 반도체 시나리오 선택됨")
@@ -0,0 +1,214 @@
+"""
+월 필터 방식 벤치마크 (PROFILE)
+
+기존 방식(substring(toString(po.finish_date), 0, 7) 계산)과
+적재 시 저장한 finish_month/order_month 속성 + 범위 인덱스 방식을
+같은 쿼리로 PROFILE 실행해 비교합니다.
+- db hits, 결과 행 수, 평균 소요 시간, 인덱스 탐색(NodeIndexSeek 등) 사용 여부
+- --plans: 실행 계획 연산자 트리 출력, --output: 계획을 JSON으로 저장
+
+먼저 `python neo4j/data_loader.py --mode incremental` 등으로 한 번 적재해
+월 속성과 po_finish_month/po_order_month 인덱스를 만들어 두어야 합니다.
+
+사용법:
+  python neo4j/benchmark_month_filter.py
+  python neo4j/benchmark_month_filter.py --month 2024-06 --repeat 10 --plans
+  python neo4j/benchmark_month_filter.py --output month_filter_profile.json
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from data_loader import Neo4jDataLoader
+
+# 이름 -> (기존 쿼리, 월 속성 쿼리)
+CASES = {
+    '월 필터 오더 수': (
+        """
+        MATCH (po:ProductionOrder)
+        WHERE substring(toString(po.finish_date), 0, 7) = $month
+        RETURN count(po) AS value
+        """,
+        """
+        MATCH (po:ProductionOrder)
+        WHERE po.finish_month = $month
+        RETURN count(po) AS value
+        """,
+    ),
+    '월 필터 차이 요약': (
+        """
+        MATCH (po:ProductionOrder)-[:HAS_VARIANCE]->(v:Variance)
+        WHERE substring(toString(po.finish_date), 0, 7) = $month
+        RETURN v.cost_element AS cost_element, v.variance_type AS variance_type,
+               sum(v.variance_amount) AS total, count(v) AS count
+        ORDER BY cost_element, variance_type
+        """,
+        """
+        MATCH (po:ProductionOrder)-[:HAS_VARIANCE]->(v:Variance)
+        WHERE po.finish_month = $month
+        RETURN v.cost_element AS cost_element, v.variance_type AS variance_type,
+               sum(v.variance_amount) AS total, count(v) AS count
+        ORDER BY cost_element, variance_type
+        """,
+    ),
+    '월별 트렌드 (완료월)': (
+        """
+        MATCH (po:ProductionOrder)-[:HAS_VARIANCE]->(v:Variance)
+        WITH substring(toString(po.finish_date), 0, 7) AS month, sum(v.variance_amount) AS total
+        RETURN month, total
+        ORDER BY month
+        """,
+        """
+        MATCH (po:ProductionOrder)-[:HAS_VARIANCE]->(v:Variance)
+        WITH po.finish_month AS month, sum(v.variance_amount) AS total
+        RETURN month, total
+        ORDER BY month
+        """,
+    ),
+    '월별 트렌드 (주문월)': (
+        """
+        MATCH (po:ProductionOrder)-[:HAS_VARIANCE]->(v:Variance)
+        WITH toString(date.truncate('month', po.order_date)) AS month, sum(v.variance_amount) AS total
+        RETURN month, total
+        ORDER BY month
+        """,
+        """
+        MATCH (po:ProductionOrder)-[:HAS_VARIANCE]->(v:Variance)
+        WITH po.order_month AS month, sum(v.variance_amount) AS total
+        RETURN month, total
+        ORDER BY month
+        """,
+    ),
+    '필터용 월 목록': (
+        """
+        MATCH (po:ProductionOrder)
+        WHERE po.finish_date IS NOT NULL
+        RETURN DISTINCT substring(toString(po.finish_date), 0, 7) AS month
+        ORDER BY month DESC
+        """,
+        """
+        MATCH (po:ProductionOrder)
+        WHERE po.finish_month IS NOT NULL
+        RETURN DISTINCT po.finish_month AS month
+        ORDER BY month DESC
+        """,
+    ),
+}
+
+# 인덱스를 사용했다고 볼 연산자 이름 접두어
+INDEX_OPERATORS = ('NodeIndexSeek', 'NodeUniqueIndexSeek', 'NodeIndexScan',
+                   'NodeIndexSeekByRange', 'NodeIndexContainsScan', 'NodeIndexEndsWithScan')
+
+
+def _plan_dict(plan):
+    """드라이버 ProfiledPlan(dict 또는 객체)을 JSON 저장 가능한 dict로 변환"""
+    if isinstance(plan, dict):
+        get = plan.get
+    else:
+        get = lambda key, default=None: getattr(plan, key, default)
+    return {
+        'operator': get('operatorType') or get('operator_type') or '',
+        'db_hits': get('dbHits') or get('db_hits') or 0,
+        'rows': get('rows') or 0,
+        'details': (get('args') or get('arguments') or {}).get('Details', ''),
+        'children': [_plan_dict(child) for child in get('children') or []],
+    }
+
+
+def _walk(plan):
+    yield plan
+    for child in plan['children']:
+        yield from _walk(child)
+
+
+def print_plan(plan, indent=4):
+    details = f"  {plan['details']}" if plan['details'] else ''
+    print(f"{' ' * indent}+{plan['operator']}  (rows {plan['rows']:,}, db hits {plan['db_hits']:,}){details}")
+    for child in plan['children']:
+        print_plan(child, indent + 2)
+
+
+def profile_query(session, query, params, repeat):
+    """PROFILE 1회 + 일반 실행 repeat회 평균"""
+    summary = session.run('PROFILE ' + query, **params).consume()
+    plan = _plan_dict(summary.profile)
+    session.run(query, **params).consume()  # 워밍업
+    started = time.perf_counter()
+    for _ in range(repeat):
+        rows = len(session.run(query, **params).data())
+    elapsed = (time.perf_counter() - started) / repeat * 1000
+    operators = [node['operator'] for node in _walk(plan)]
+    return {
+        'db_hits': sum(node['db_hits'] for node in _walk(plan)),
+        'rows': rows,
+        'ms': elapsed,
+        'index': any(op.startswith(INDEX_OPERATORS) for op in operators),
+        'plan': plan,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='월 필터 방식 PROFILE 벤치마크')
+    parser.add_argument('--month', default='', help="필터할 월 YYYY-MM (기본: 데이터의 가장 최근 월)")
+    parser.add_argument('--repeat', type=int, default=5, help='쿼리 반복 횟수')
+    parser.add_argument('--plans', action='store_true', help='실행 계획 연산자 트리 출력')
+    parser.add_argument('--output', help='PROFILE 결과를 저장할 JSON 파일')
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("월 필터 방식 PROFILE 벤치마크 (기존 substring vs 저장된 월 속성)")
+    print("=" * 70)
+
+    loader = Neo4jDataLoader()
+    if not loader.connect():
+        sys.exit(1)
+    results = {}
+    try:
+        with loader.driver.session(database=loader.database) as session:
+            missing = session.run(
+                "MATCH (po:ProductionOrder) WHERE po.finish_month IS NULL AND po.finish_date IS NOT NULL "
+                "RETURN count(po) AS missing"
+            ).single()['missing']
+            if missing:
+                print(f"[X] finish_month가 없는 생산오더 {missing:,}개 - data_loader.py로 한 번 적재해 채우세요")
+                sys.exit(1)
+            month = args.month
+            if not month:
+                record = session.run(
+                    "MATCH (po:ProductionOrder) WHERE po.finish_month IS NOT NULL "
+                    "RETURN max(po.finish_month) AS month"
+                ).single()
+                month = record['month'] if record and record['month'] else ''
+            print(f"  필터 월: {month or '(없음)'}, 반복 {args.repeat}회")
+
+            print(f"\n  {'쿼리':<20}{'방식':>8}{'db hits':>14}{'행':>8}{'평균(ms)':>12}{'인덱스':>8}")
+            for name, (old_query, new_query) in CASES.items():
+                results[name] = {}
+                for variant, query in (('기존', old_query), ('월 속성', new_query)):
+                    result = profile_query(session, query, {'month': month}, args.repeat)
+                    results[name][variant] = result
+                    print(f"  {name:<20}{variant:>8}{result['db_hits']:>14,}{result['rows']:>8,}"
+                          f"{result['ms']:>12.1f}{'O' if result['index'] else '-':>8}")
+                old, new = results[name]['기존'], results[name]['월 속성']
+                if old['rows'] != new['rows']:
+                    print(f"  [X] {name}: 결과 행 수가 다름 ({old['rows']} / {new['rows']})")
+                if args.plans:
+                    for variant in ('기존', '월 속성'):
+                        print(f"    [{variant}]")
+                        print_plan(results[name][variant]['plan'], indent=6)
+    finally:
+        loader.close()
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'month': month, 'repeat': args.repeat, 'results': results},
+                      f, ensure_ascii=False, indent=2)
+        print(f"\n[OK] PROFILE 결과 저장: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
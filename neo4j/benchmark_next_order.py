@@ -0,0 +1,179 @@
+"""
+NEXT_ORDER 생성 벤치마크
+
+기존 Cypher(오더 쌍 전체 비교, O(n²))와 정렬 후 다음 오더만 연결하는
+next_order_pairs()(O(n))를 비교합니다.
+1. 샘플 데이터에서 두 방식의 관계(from -> to)가 같은지 확인
+2. 오더 수를 늘려가며 소요 시간 측정
+3. --neo4j: 실제 DB에서 기존 쿼리(읽기 전용)와 새 방식 비교
+
+사용법:
+  python neo4j/benchmark_next_order.py
+  python neo4j/benchmark_next_order.py --sizes 1000,5000,20000 --neo4j
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+from datetime import date, timedelta
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from data_loader import Neo4jDataLoader, next_order_pairs, NEXT_ORDER_MAX_DAYS
+
+# 기존 방식을 실행할 최대 오더 수 (그 이상은 너무 오래 걸림)
+LEGACY_LIMIT = 2000
+
+# 기존 create_additional_relationships()의 NEXT_ORDER 쿼리 (CREATE 대신 RETURN)
+LEGACY_QUERY = """
+    MATCH (po1:ProductionOrder), (po2:ProductionOrder)
+    WHERE po1.order_date < po2.order_date
+    WITH po1, po2, duration.between(po1.order_date, po2.order_date).days as days
+    WHERE days <= 7
+    ORDER BY po1.order_date, po2.order_date
+    WITH po1, MIN(days) as min_days, COLLECT(po2)[0] as next_po
+    RETURN po1.id AS from_id, next_po.id AS to_id, min_days
+"""
+
+
+def duration_days(start, end):
+    """Cypher duration.between(start, end).days (개월을 뺀 나머지 일수)"""
+    months = (end.year - start.year) * 12 + end.month - start.month
+    if end.day < start.day:
+        months -= 1
+    year, month = divmod(start.month - 1 + months, 12)
+    anchor_month = date(start.year + year, month + 1, 1)
+    last_day = ((anchor_month.replace(day=28) + timedelta(days=4)).replace(day=1)
+                - timedelta(days=1)).day
+    anchor = anchor_month.replace(day=min(start.day, last_day))
+    return (end - anchor).days
+
+
+def legacy_pairs(orders, max_days=NEXT_ORDER_MAX_DAYS):
+    """기존 Cypher 쿼리와 같은 규칙의 O(n²) 계산 (비교 기준)"""
+    rows = []
+    for order_id, order_date in orders:
+        candidates = [
+            (other_date, other_id, duration_days(order_date, other_date))
+            for other_id, other_date in orders
+            if other_date > order_date
+        ]
+        candidates = [c for c in candidates if c[2] <= max_days]
+        if candidates:
+            next_date, next_id, _ = min(candidates)
+            rows.append({'from': order_id, 'to': next_id,
+                         'props': {'days_diff': min(c[2] for c in candidates)}})
+    return rows
+
+
+def load_sample_orders(path='data/neo4j_import/production_orders.csv'):
+    df = pd.read_csv(path, usecols=['id', 'order_date'])
+    df['order_date'] = pd.to_datetime(df['order_date']).dt.date
+    df = df.sort_values(['order_date', 'id'])
+    return list(zip(df['id'], df['order_date']))
+
+
+def synthetic_orders(n, days=730, seed=42):
+    """n개 오더를 days일에 무작위 분포 (정렬된 목록)"""
+    rng = random.Random(seed)
+    start = date(2024, 1, 1)
+    orders = [(f'PO-{i:07d}', start + timedelta(days=rng.randrange(days))) for i in range(n)]
+    orders.sort(key=lambda o: (o[1], o[0]))
+    return orders
+
+
+def compare_sample():
+    print("\n[1] 샘플 데이터 결과 비교")
+    orders = load_sample_orders()
+    legacy = legacy_pairs(orders)
+    linear = next_order_pairs(orders)
+    legacy_edges = {(r['from'], r['to']) for r in legacy}
+    linear_edges = {(r['from'], r['to']) for r in linear}
+    print(f"  오더 {len(orders)}개, 기존 {len(legacy_edges)}개 / 새 방식 {len(linear_edges)}개")
+    if legacy_edges == linear_edges:
+        print("  [OK] 관계(from -> to)가 동일합니다.")
+    else:
+        print(f"  [X] 불일치: 기존에만 {sorted(legacy_edges - linear_edges)}, "
+              f"새 방식에만 {sorted(linear_edges - legacy_edges)}")
+    # days_diff: 기존은 개월을 뺀 일수의 최소값, 새 방식은 실제 간격 일수
+    legacy_days = {(r['from'], r['to']): r['props']['days_diff'] for r in legacy}
+    changed = [(k, legacy_days[k], r['props']['days_diff']) for r in linear
+               for k in [(r['from'], r['to'])]
+               if k in legacy_days and legacy_days[k] != r['props']['days_diff']]
+    if changed:
+        print(f"  - days_diff가 실제 간격으로 바뀐 관계 {len(changed)}개 (예: "
+              + ', '.join(f"{f} -> {t}: {old} -> {new}" for (f, t), old, new in changed[:3])
+              + ")")
+    return legacy_edges == linear_edges
+
+
+def benchmark_scaling(sizes):
+    print("\n[2] 오더 수별 소요 시간 (초)")
+    print(f"  {'오더 수':>10}{'기존 O(n²)':>14}{'새 방식 O(n)':>14}{'관계 수':>10}")
+    for n in sizes:
+        orders = synthetic_orders(n)
+        started = time.perf_counter()
+        rows = next_order_pairs(orders)
+        linear_sec = time.perf_counter() - started
+
+        if n <= LEGACY_LIMIT:
+            started = time.perf_counter()
+            legacy = legacy_pairs(orders)
+            legacy_text = f"{time.perf_counter() - started:.3f}"
+            legacy_edges = {(r['from'], r['to']) for r in legacy}
+            linear_edges = {(r['from'], r['to']) for r in rows}
+            if linear_edges - legacy_edges:
+                legacy_text += ' (X)'
+            elif legacy_edges - linear_edges:
+                legacy_text += f' (+{len(legacy_edges - linear_edges)})'
+        else:
+            legacy_text = '-'
+        print(f"  {n:>10,}{legacy_text:>14}{linear_sec:>14.3f}{len(rows):>10,}")
+    print("  (+N: 기존 쿼리가 duration.between().days의 개월 부분을 무시해 "
+          "7일보다 긴 간격(예: 1개월 4일)까지 연결한 관계 수)")
+
+
+def benchmark_neo4j():
+    print("\n[3] Neo4j 비교 (쓰기 없음)")
+    loader = Neo4jDataLoader()
+    if not loader.connect():
+        return
+    try:
+        with loader.driver.session(database=loader.database) as session:
+            started = time.perf_counter()
+            legacy = {(r['from_id'], r['to_id']) for r in session.run(LEGACY_QUERY)}
+            legacy_sec = time.perf_counter() - started
+
+            started = time.perf_counter()
+            rows = next_order_pairs(loader.fetch_orders_by_date(session))
+            linear_sec = time.perf_counter() - started
+        linear = {(r['from'], r['to']) for r in rows}
+        print(f"  기존 쿼리: {len(legacy)}개, {legacy_sec:.3f}초")
+        print(f"  새 방식 (정렬 조회 + 계산): {len(linear)}개, {linear_sec:.3f}초")
+        print("  [OK] 관계 동일" if legacy == linear else "  [X] 관계 불일치")
+    finally:
+        loader.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='NEXT_ORDER 생성 벤치마크')
+    parser.add_argument('--sizes', default='500,1000,2000,10000,100000,1000000',
+                        help='측정할 오더 수 (쉼표 구분)')
+    parser.add_argument('--neo4j', action='store_true', help='실제 DB에서도 비교')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("NEXT_ORDER 생성 벤치마크")
+    print("=" * 60)
+    ok = compare_sample()
+    benchmark_scaling([int(n) for n in args.sizes.split(',') if n.strip()])
+    if args.neo4j:
+        benchmark_neo4j()
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
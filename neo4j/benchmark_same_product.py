@@ -0,0 +1,128 @@
+"""
+동일 제품 오더 연결 방식 벤치마크
+
+pairs(오더 쌍마다 SAME_PRODUCT), chain(인접 오더만 NEXT_SAME_PRODUCT),
+bucket(Product 노드 사용, 추가 관계 없음) 세 방식을 비교합니다.
+1. 제품당 오더 수를 늘려가며 방식별 관계 수와 chain 계산 시간 측정 (DB 불필요)
+2. --neo4j: 현재 DB의 관계 수와 유사 차이 패턴 쿼리 시간 측정
+   (각 방식으로 `python neo4j/data_loader.py --same-product <방식>` 적재 후 실행)
+
+사용법:
+  python neo4j/benchmark_same_product.py
+  python neo4j/benchmark_same_product.py --products 11 --orders 10,100,1000,10000 --neo4j
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from data_loader import Neo4jDataLoader, same_product_chain_pairs
+
+# 유사 차이 패턴 쿼리에서 비교할 오더 쌍 (방식별)
+PAIR_MATCHES = {
+    'pairs': """
+        MATCH (po1:ProductionOrder)-[:SAME_PRODUCT]->(po2:ProductionOrder)
+        MATCH (po1)-[:PRODUCES]->(p:Product)""",
+    'chain': """
+        MATCH (po1:ProductionOrder)-[:NEXT_SAME_PRODUCT*1..5]->(po2:ProductionOrder)
+        MATCH (po1)-[:PRODUCES]->(p:Product)""",
+    'bucket': """
+        MATCH (po1:ProductionOrder)-[:PRODUCES]->(p:Product)<-[:PRODUCES]-(po2:ProductionOrder)
+        WHERE po1.id < po2.id""",
+}
+
+SIMILAR_RETURN = """
+        MATCH (po1)-[:HAS_VARIANCE]->(v1:Variance)
+        MATCH (po2)-[:HAS_VARIANCE]->(v2:Variance)
+        WHERE v1.variance_type = v2.variance_type
+          AND v1.cost_element = v2.cost_element
+          AND ABS(v1.variance_amount - v2.variance_amount) < $threshold
+        RETURN count(*) AS pairs
+"""
+
+
+def synthetic_orders(products, orders_per_product, seed=42):
+    """(order_id, product_cd, order_date) 목록, 제품/주문일/id 순 정렬"""
+    rng = random.Random(seed)
+    start = date(2024, 1, 1)
+    orders = [
+        (f'PO-{p:03d}-{i:06d}', f'PRD-{p:03d}', start + timedelta(days=rng.randrange(730)))
+        for p in range(products) for i in range(orders_per_product)
+    ]
+    orders.sort(key=lambda o: (o[1], o[2], o[0]))
+    return orders
+
+
+def benchmark_edge_counts(products, sizes):
+    print(f"\n[1] 방식별 추가 관계 수 (제품 {products}개)")
+    print(f"  {'제품당 오더':>10}{'pairs':>16}{'chain':>12}{'bucket':>8}{'chain 계산(초)':>16}")
+    for k in sizes:
+        orders = synthetic_orders(products, k)
+        started = time.perf_counter()
+        rows = same_product_chain_pairs(orders)
+        chain_sec = time.perf_counter() - started
+        pairs = products * k * (k - 1) // 2
+        print(f"  {k:>10,}{pairs:>16,}{len(rows):>12,}{0:>8}{chain_sec:>16.3f}")
+    print("  (bucket은 이미 있는 PRODUCES 관계를 그대로 사용)")
+
+
+def benchmark_neo4j(threshold, repeat):
+    print("\n[2] Neo4j 유사 차이 패턴 쿼리 시간")
+    loader = Neo4jDataLoader()
+    if not loader.connect():
+        return
+    try:
+        with loader.driver.session(database=loader.database) as session:
+            counts = {
+                rel_type: session.run(
+                    f"MATCH ()-[r:{rel_type}]->() RETURN count(r) AS total"
+                ).single()['total']
+                for rel_type in ('SAME_PRODUCT', 'NEXT_SAME_PRODUCT', 'PRODUCES')
+            }
+            for rel_type, total in counts.items():
+                print(f"  {rel_type}: {total:,}개")
+
+            available = {'pairs': counts['SAME_PRODUCT'] > 0,
+                         'chain': counts['NEXT_SAME_PRODUCT'] > 0,
+                         'bucket': counts['PRODUCES'] > 0}
+            print(f"\n  {'방식':<8}{'비교 쌍':>12}{'평균(ms)':>12}")
+            for strategy, pair_match in PAIR_MATCHES.items():
+                if not available[strategy]:
+                    print(f"  {strategy:<8}{'-':>12}{'-':>12}  (관계 없음)")
+                    continue
+                query = pair_match + SIMILAR_RETURN
+                session.run(query, threshold=threshold).consume()  # 워밍업
+                started = time.perf_counter()
+                for _ in range(repeat):
+                    pairs = session.run(query, threshold=threshold).single()['pairs']
+                elapsed = (time.perf_counter() - started) / repeat * 1000
+                print(f"  {strategy:<8}{pairs:>12,}{elapsed:>12.1f}")
+            print("  (chain은 제품별로 주문일 순 5개 이내 오더만 비교)")
+    finally:
+        loader.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='동일 제품 오더 연결 방식 벤치마크')
+    parser.add_argument('--products', type=int, default=11, help='제품 수 (기본 11)')
+    parser.add_argument('--orders', default='3,100,1000,10000,100000',
+                        help='제품당 오더 수 (쉼표 구분)')
+    parser.add_argument('--neo4j', action='store_true', help='실제 DB 쿼리 시간도 측정')
+    parser.add_argument('--threshold', type=float, default=500, help='유사 차이 기준 금액')
+    parser.add_argument('--repeat', type=int, default=5, help='쿼리 반복 횟수')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("동일 제품 오더 연결 방식 벤치마크")
+    print("=" * 60)
+    benchmark_edge_counts(args.products, [int(k) for k in args.orders.split(',') if k.strip()])
+    if args.neo4j:
+        benchmark_neo4j(args.threshold, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,10 +5,12 @@ Neo4j Aura 인스턴스와의 연결을 확인하고 기본 정보를 출력합
 """
 
 import os
-import ssl
-from neo4j import GraphDatabase
+import sys
 from dotenv import load_dotenv
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from neo4j_connection import create_driver, rewrite_uri
+
 # 환경 변수 로드
 load_dotenv()
 
@@ -23,20 +25,9 @@ class Neo4jConnection:
     def connect(self):
         """Neo4j 데이터베이스에 연결 (SSL 검증 비활성화)"""
         try:
-            # neo4j+s:// 를 bolt:// 로 변경 (SSL 컨텍스트 적용을 위해)
-            uri = self.uri.replace('neo4j+s://', 'bolt://')
-            uri = uri.replace('neo4j+ssc://', 'bolt://')
-            
-            # SSL 컨텍스트 생성 (인증서 검증 비활성화)
-            ssl_context = ssl.create_default_context()
-            ssl_context.check_hostname = False
-            ssl_context.verify_mode = ssl.CERT_NONE
-            
-            self.driver = GraphDatabase.driver(
-                uri,
-                auth=(self.username, self.password),
-                ssl_context=ssl_context
-            )
+            # neo4j+s:// 를 bolt:// + SSL 컨텍스트로 변경 (공통 모듈)
+            uri, _ = rewrite_uri(self.uri, ssl_rewrite=True)
+            self.driver = create_driver('connection-test', self.uri, self.username, self.password, ssl_rewrite=True)
             print(f"✓ Neo4j 연결 성공! (SSL 검증 비활성화)")
             print(f"  URI: {uri}")
             print(f"  Database: {self.database}")
@@ -5,42 +5,518 @@ Neo4j 데이터 로더
 """
 
 import os
-import ssl
+import sys
+import argparse
 import pandas as pd
-from neo4j import GraphDatabase
 from dotenv import load_dotenv
 from tqdm import tqdm
 import time
+import gzip
+import json
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from neo4j_connection import create_driver, rewrite_uri
 
 # 환경 변수 로드
 load_dotenv()
 
+# 배치 모드 기본 배치 크기 (UNWIND 한 번에 보내는 행 수)
+DEFAULT_BATCH_SIZE = int(os.getenv('NEO4J_BATCH_SIZE', '5000'))
+# 관계 병렬 적재 워커 수 (1이면 순차 적재)
+DEFAULT_WORKERS = int(os.getenv('NEO4J_LOAD_WORKERS', '4'))
+# 증분 적재 매니페스트 (이미 적재한 행의 키 -> 해시)
+MANIFEST_FILE = os.getenv('NEO4J_LOAD_MANIFEST', 'data/neo4j_import/load_manifest.json')
+# 데이터 버전 토큰 (적재할 때마다 갱신, API 서버 캐시 무효화에 사용)
+DATA_VERSION_QUERY = """
+    MERGE (d:DataVersion {id: 'current'})
+    SET d.token = $token, d.updated_at = datetime()
+"""
+
+
+def new_data_version_token():
+    return f"{time.strftime('%Y%m%dT%H%M%S')}-{os.urandom(4).hex()}"
+
+
+# ============================================================
+# 행 -> 파라미터 변환 (배치 모드)
+# ============================================================
+
+def _clean(value):
+    """pandas 결측값/넘파이 스칼라를 드라이버 전송 가능한 값으로 변환"""
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return None
+    if hasattr(value, 'item'):
+        return value.item()
+    return value
+
+
+def _record_params(row):
+    """CSV 행을 그대로 속성 맵으로 변환 (결측값 제외)"""
+    params = {k: _clean(v) for k, v in row.items()}
+    return {k: v for k, v in params.items() if v is not None}
+
+
+def _optional(params, row, key, cast=None):
+    """선택적 필드가 있으면 params에 추가"""
+    if key in row and pd.notna(row[key]):
+        value = _clean(row[key])
+        params[key] = cast(value) if cast else value
+
+
+def _product_params(row):
+    params = {
+        'id': row['id'],
+        'name': row['name'],
+        'type': row['type'],
+        'standard_cost': float(row['standard_cost']),
+        'active': bool(row['active'])
+    }
+    _optional(params, row, 'chemistry')
+    _optional(params, row, 'capacity', float)
+    return params
+
+
+def _material_params(row):
+    params = {
+        'id': row['id'],
+        'name': row['name'],
+        'type': row['type'],
+        'unit': row['unit'],
+        'standard_price': float(row['standard_price']),
+        'supplier_cd': row['supplier_cd'],
+        'active': bool(row['active'])
+    }
+    _optional(params, row, 'origin')
+    return params
+
+
+def _work_center_params(row):
+    params = {
+        'id': row['id'],
+        'name': row['name'],
+        'process_type': row['process_type'],
+        'labor_rate_per_hour': float(row['labor_rate_per_hour']),
+        'overhead_rate_per_hour': float(row['overhead_rate_per_hour']),
+        'capacity_per_hour': int(row['capacity_per_hour']),
+        'active': bool(row['active'])
+    }
+    _optional(params, row, 'location')
+    return params
+
+
+def _production_order_params(row):
+    return {
+        key: _clean(row[key]) for key in (
+            'id', 'product_cd', 'order_type', 'planned_qty', 'actual_qty',
+            'good_qty', 'scrap_qty', 'order_date', 'start_date', 'finish_date',
+            'status', 'yield_rate'
+        )
+    }
+
+
+def _variance_params(row):
+    params = {
+        'id': row['id'],
+        'order_no': row['order_no'],
+        'cost_element': row['cost_element'],
+        'variance_type': row['variance_type'],
+        'variance_amount': float(row['variance_amount']),
+        'variance_percent': float(row['variance_percent']),
+        'severity': row['severity'],
+        'cause_code': row['cause_code'],
+        'analysis_date': row['analysis_date']
+    }
+    _optional(params, row, 'variance_name')
+    return params
+
+
+def _cause_params(row):
+    params = {
+        'code': row['code'],
+        'category': row['category'],
+        'description': row['description'],
+        'responsible_dept': row['responsible_dept']
+    }
+    _optional(params, row, 'variance_type')
+    _optional(params, row, 'detail')
+    return params
+
+
+def _rel_params(row, props=None):
+    """관계 행 -> {'from', 'to', 'props'}"""
+    return {'from': _clean(row['from']), 'to': _clean(row['to']), 'props': props or {}}
+
+
+def _uses_material_params(row):
+    return _rel_params(row, {'quantity': _clean(row['quantity']), 'unit': row['unit']})
+
+
+def _consumes_params(row):
+    props = {
+        'planned_qty': float(row['planned_qty']),
+        'actual_qty': float(row['actual_qty']),
+        'unit': row['unit']
+    }
+    _optional(props, row, 'is_alternative')
+    return _rel_params(row, props)
+
+
+def _works_at_params(row):
+    props = {}
+    _optional(props, row, 'standard_time_min', float)
+    _optional(props, row, 'actual_time_min', float)
+    _optional(props, row, 'efficiency_rate', float)
+    _optional(props, row, 'worker_count', int)
+    _optional(props, row, 'actual_qty', int)
+    return _rel_params(row, props)
+
+
+# 노드 파일 정의 (로드 순서대로)
+#   date_fields: 문자열을 Neo4j date()로 변환할 속성
+#   month_fields: 날짜 문자열에서 'YYYY-MM'을 잘라 저장할 속성 (월 필터/트렌드 인덱스용)
+NODE_SPECS = [
+    {'file': 'products.csv', 'label': 'Product', 'key': 'id', 'params': _product_params},
+    {'file': 'materials.csv', 'label': 'Material', 'key': 'id', 'params': _material_params},
+    {'file': 'work_centers.csv', 'label': 'WorkCenter', 'key': 'id', 'params': _work_center_params},
+    {'file': 'production_orders.csv', 'label': 'ProductionOrder', 'key': 'id',
+     'params': _production_order_params,
+     'date_fields': ('order_date', 'start_date', 'finish_date'),
+     'month_fields': {'order_month': 'order_date', 'finish_month': 'finish_date'}},
+    {'file': 'variances.csv', 'label': 'Variance', 'key': 'id', 'params': _variance_params},
+    {'file': 'causes.csv', 'label': 'Cause', 'key': 'code', 'params': _cause_params},
+    {'file': 'quality_defects.csv', 'label': 'QualityDefect', 'key': 'id', 'params': _record_params},
+    {'file': 'equipment_failures.csv', 'label': 'EquipmentFailure', 'key': 'id', 'params': _record_params},
+    {'file': 'material_markets.csv', 'label': 'MaterialMarket', 'key': 'id', 'params': _record_params},
+]
+
+# create_additional_relationships()가 만드는 파생 관계
+DERIVED_REL_TYPES = ('RELATED_TO_MATERIAL', 'NEXT_ORDER', 'SAME_PRODUCT', 'NEXT_SAME_PRODUCT')
+
+# 동일 제품 오더 연결 방식
+#   pairs:  같은 제품 오더 쌍마다 SAME_PRODUCT (기존 방식, 제품당 오더 수의 제곱)
+#   chain:  제품별 주문일 순으로 인접 오더만 NEXT_SAME_PRODUCT (오더 수에 비례)
+#   bucket: 관계를 만들지 않고 Product 노드(PRODUCES)를 제품별 묶음으로 사용
+SAME_PRODUCT_STRATEGIES = ('pairs', 'chain', 'bucket')
+DEFAULT_SAME_PRODUCT = os.getenv('NEO4J_SAME_PRODUCT', 'pairs')
+SAME_PRODUCT_CHAIN_SPEC = {'type': 'NEXT_SAME_PRODUCT',
+                           'from': ('ProductionOrder', 'id'), 'to': ('ProductionOrder', 'id')}
+
+# NEXT_ORDER: 다음 주문일의 오더가 이 일수 이내일 때만 연결
+NEXT_ORDER_MAX_DAYS = 7
+NEXT_ORDER_SPEC = {'type': 'NEXT_ORDER',
+                   'from': ('ProductionOrder', 'id'), 'to': ('ProductionOrder', 'id')}
+
+# 원가차이 집계 큐브 (VarianceCube): 제품 × 작업장 × 완료월 × 원가요소 × 차이유형 셀
+#   work_center = '' 셀: 작업장 구분 없이 오더 단위로 합산
+#   work_center = 작업장 ID 셀: 해당 작업장에서 작업한(WORKS_AT) 오더만 합산
+# $slices가 null이면 전체, 아니면 [product_cd, month] 목록에 해당하는 셀만 다시 만든다
+VARIANCE_CUBE_DELETE = """
+    MATCH (c:VarianceCube)
+    WHERE $slices IS NULL OR [c.product_cd, c.month] IN $slices
+    DELETE c
+    RETURN count(*) AS deleted
+"""
+VARIANCE_CUBE_ORDER_CELLS = """
+    MATCH (po:ProductionOrder)-[:HAS_VARIANCE]->(v:Variance)
+    WITH po, v, po.finish_month AS month
+    WHERE $slices IS NULL OR [po.product_cd, month] IN $slices
+    WITH po.product_cd AS product_cd, month, v.cost_element AS cost_element,
+         v.variance_type AS variance_type,
+         sum(v.variance_amount) AS amount, count(v) AS count
+    CREATE (:VarianceCube {product_cd: product_cd, work_center: '', month: month,
+                           cost_element: cost_element, variance_type: variance_type,
+                           amount: amount, count: count})
+    RETURN count(*) AS cells
+"""
+VARIANCE_CUBE_WORK_CENTER_CELLS = """
+    MATCH (po:ProductionOrder)-[:WORKS_AT]->(wc:WorkCenter)
+    WITH DISTINCT po, wc, po.finish_month AS month
+    WHERE $slices IS NULL OR [po.product_cd, month] IN $slices
+    MATCH (po)-[:HAS_VARIANCE]->(v:Variance)
+    WITH po.product_cd AS product_cd, wc.id AS work_center, month,
+         v.cost_element AS cost_element, v.variance_type AS variance_type,
+         sum(v.variance_amount) AS amount, count(v) AS count
+    CREATE (:VarianceCube {product_cd: product_cd, work_center: work_center, month: month,
+                           cost_element: cost_element, variance_type: variance_type,
+                           amount: amount, count: count})
+    RETURN count(*) AS cells
+"""
+# 오더별 차이 합계 (상위 오더 조회용), 큰 트랜잭션을 피하려고 나눠서 커밋
+VARIANCE_CUBE_ORDER_TOTALS = """
+    MATCH (po:ProductionOrder)
+    WITH po, po.finish_month AS month
+    WHERE $slices IS NULL OR [po.product_cd, month] IN $slices
+    CALL {{
+        WITH po
+        OPTIONAL MATCH (po)-[:HAS_VARIANCE]->(v:Variance)
+        WITH po, sum(v.variance_amount) AS total, count(v) AS n
+        SET po.variance_total = CASE WHEN n > 0 THEN total END
+    }} IN TRANSACTIONS OF {batch_size} ROWS
+"""
+# 월 속성이 없는 기존 오더(이전 버전으로 적재, neo4j-admin 임포트) 채우기
+MONTH_BACKFILL_QUERY = """
+    MATCH (po:ProductionOrder)
+    WHERE (po.finish_month IS NULL AND po.finish_date IS NOT NULL)
+       OR (po.order_month IS NULL AND po.order_date IS NOT NULL)
+    CALL {{
+        WITH po
+        SET po.finish_month = substring(toString(po.finish_date), 0, 7),
+            po.order_month = substring(toString(po.order_date), 0, 7)
+    }} IN TRANSACTIONS OF {batch_size} ROWS
+    RETURN count(*) AS updated
+"""
+# /api/filters 옵션 카탈로그 (FilterCatalog): 적재가 끝날 때마다 데이터 버전 토큰과 함께 다시 씀
+#   API 서버는 카탈로그 token이 현재 DataVersion과 같을 때만 사용 (다르면 필터 쿼리 4개로 계산)
+FILTER_CATALOG_QUERY = """
+    CALL {
+        MATCH (po:ProductionOrder)
+        WHERE po.product_cd IS NOT NULL
+        WITH DISTINCT po.product_cd AS product
+        ORDER BY product
+        RETURN collect(product) AS products
+    }
+    CALL {
+        MATCH (:ProductionOrder)-[:WORKS_AT]->(wc:WorkCenter)
+        WITH DISTINCT wc.id AS work_center
+        ORDER BY work_center
+        RETURN collect(work_center) AS work_centers
+    }
+    CALL {
+        MATCH (m:Material)
+        WITH DISTINCT m.id AS material_id, m.name AS material_name
+        ORDER BY material_id
+        LIMIT 100
+        RETURN collect(material_id) AS material_ids,
+               collect(coalesce(material_name, material_id)) AS material_names
+    }
+    CALL {
+        MATCH (po:ProductionOrder)
+        WHERE po.finish_month IS NOT NULL
+        WITH DISTINCT po.finish_month AS month
+        ORDER BY month DESC
+        RETURN collect(month) AS months
+    }
+    MERGE (f:FilterCatalog {id: 'current'})
+    SET f.products = products, f.work_centers = work_centers,
+        f.material_ids = material_ids, f.material_names = material_names,
+        f.months = months, f.token = $token, f.updated_at = datetime()
+    RETURN size(products) AS products, size(work_centers) AS work_centers,
+           size(material_ids) AS materials, size(months) AS months
+"""
+CUBE_SLICES_QUERY = """
+    MATCH (po:ProductionOrder)
+    WHERE po.id IN $order_ids
+    RETURN DISTINCT po.product_cd AS product_cd,
+           po.finish_month AS month
+"""
+
+# 관계 파일 정의 (from/to 컬럼이 가리키는 노드 라벨과 키)
+REL_SPECS = [
+    {'file': 'rel_uses_material.csv', 'type': 'USES_MATERIAL',
+     'from': ('Product', 'id'), 'to': ('Material', 'id'), 'params': _uses_material_params},
+    {'file': 'rel_produces.csv', 'type': 'PRODUCES',
+     'from': ('ProductionOrder', 'id'), 'to': ('Product', 'id'), 'params': _rel_params},
+    {'file': 'rel_has_variance.csv', 'type': 'HAS_VARIANCE',
+     'from': ('ProductionOrder', 'id'), 'to': ('Variance', 'id'), 'params': _rel_params},
+    {'file': 'rel_caused_by.csv', 'type': 'CAUSED_BY',
+     'from': ('Variance', 'id'), 'to': ('Cause', 'code'), 'params': _rel_params},
+    {'file': 'rel_consumes.csv', 'type': 'CONSUMES',
+     'from': ('ProductionOrder', 'id'), 'to': ('Material', 'id'), 'params': _consumes_params},
+    {'file': 'rel_works_at.csv', 'type': 'WORKS_AT',
+     'from': ('ProductionOrder', 'id'), 'to': ('WorkCenter', 'id'), 'params': _works_at_params},
+    {'file': 'rel_has_defect.csv', 'type': 'HAS_DEFECT',
+     'from': ('Cause', 'code'), 'to': ('QualityDefect', 'id'), 'params': _rel_params},
+    {'file': 'rel_has_failure.csv', 'type': 'HAS_FAILURE',
+     'from': ('Cause', 'code'), 'to': ('EquipmentFailure', 'id'), 'params': _rel_params},
+    {'file': 'rel_market_price.csv', 'type': 'MARKET_PRICE',
+     'from': ('Material', 'id'), 'to': ('MaterialMarket', 'id'), 'params': _rel_params},
+]
+
+
+def node_create_query(spec):
+    """노드 배치 생성 쿼리 (UNWIND)"""
+    query = f"UNWIND $rows AS row CREATE (n:{spec['label']}) SET n = row"
+    for field in spec.get('date_fields', ()):
+        query += f", n.{field} = date(row.{field})"
+    for field, source in spec.get('month_fields', {}).items():
+        query += f", n.{field} = substring(row.{source}, 0, 7)"
+    return query
+
+
+def rel_create_query(spec):
+    """관계 배치 생성 쿼리 (UNWIND)"""
+    from_label, from_key = spec['from']
+    to_label, to_key = spec['to']
+    return (
+        f"UNWIND $rows AS row "
+        f"MATCH (a:{from_label} {{{from_key}: row.from}}) "
+        f"MATCH (b:{to_label} {{{to_key}: row.to}}) "
+        f"CREATE (a)-[r:{spec['type']}]->(b) SET r = row.props"
+    )
+
+
+def rel_lock_labels(spec):
+    """관계 생성 시 잠금이 걸리는 노드 라벨 (양 끝 노드)
+
+    같은 라벨을 끝점으로 갖는 관계 파일을 동시에 적재하면 같은 노드에 대한
+    잠금 경합/데드락이 생기므로, 병렬 적재 시 라벨이 겹치는 파일은 함께 실행하지 않는다.
+    """
+    return {spec['from'][0], spec['to'][0]}
+
+
+def specs_for_labels(labels):
+    """라벨 일부만 다시 적재할 때 필요한 노드/관계 파일 정의
+
+    labels가 없으면 전체, 있으면 해당 라벨 노드 파일과 그 라벨이 끝점인 관계 파일
+    """
+    if not labels:
+        return NODE_SPECS, REL_SPECS
+    labels = set(labels)
+    unknown = labels - {spec['label'] for spec in NODE_SPECS}
+    if unknown:
+        raise ValueError(f"알 수 없는 라벨: {', '.join(sorted(unknown))}")
+    nodes = [spec for spec in NODE_SPECS if spec['label'] in labels]
+    rels = [spec for spec in REL_SPECS if rel_lock_labels(spec) & labels]
+    return nodes, rels
+
+
+def row_key(spec, params):
+    """행의 자연 키 (노드: id/code, 관계: from + to)"""
+    if 'key' in spec:
+        return str(params[spec['key']])
+    return f"{params['from']}\t{params['to']}"
+
+
+def row_hash(params):
+    """행 내용 해시 (변경 감지용)"""
+    payload = json.dumps(params, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:16]
+
+
+def node_merge_query(spec):
+    """노드 배치 upsert 쿼리 (증분 적재)"""
+    label, key = spec['label'], spec['key']
+    query = f"UNWIND $rows AS row MERGE (n:{label} {{{key}: row.{key}}}) SET n = row"
+    for field in spec.get('date_fields', ()):
+        query += f", n.{field} = date(row.{field})"
+    for field, source in spec.get('month_fields', {}).items():
+        query += f", n.{field} = substring(row.{source}, 0, 7)"
+    return query
+
+
+def node_delete_query(spec):
+    """사라진 노드 배치 삭제 쿼리 (증분 적재)"""
+    label, key = spec['label'], spec['key']
+    return f"UNWIND $rows AS row MATCH (n:{label} {{{key}: row.key}}) DETACH DELETE n"
+
+
+def rel_merge_query(spec):
+    """관계 배치 upsert 쿼리 (증분 적재, from/to 쌍 기준)"""
+    from_label, from_key = spec['from']
+    to_label, to_key = spec['to']
+    return (
+        f"UNWIND $rows AS row "
+        f"MATCH (a:{from_label} {{{from_key}: row.from}}) "
+        f"MATCH (b:{to_label} {{{to_key}: row.to}}) "
+        f"MERGE (a)-[r:{spec['type']}]->(b) SET r = row.props"
+    )
+
+
+def rel_delete_query(spec):
+    """사라진 관계 배치 삭제 쿼리 (증분 적재)"""
+    from_label, from_key = spec['from']
+    to_label, to_key = spec['to']
+    return (
+        f"UNWIND $rows AS row "
+        f"MATCH (a:{from_label} {{{from_key}: row.from}})"
+        f"-[r:{spec['type']}]->(b:{to_label} {{{to_key}: row.to}}) "
+        f"DELETE r"
+    )
+
+
+def next_order_pairs(orders, max_days=NEXT_ORDER_MAX_DAYS):
+    """NEXT_ORDER 관계 행 계산 (선형 시간)
+
+    orders: (order_id, order_date) 목록, (order_date, order_id) 순으로 정렬되어 있어야 함
+    각 오더를 주문일이 더 늦은 첫 오더(같은 날짜가 여럿이면 id가 가장 작은 오더)와
+    연결하되, 간격이 max_days일 이내인 경우만 만든다.
+    """
+    rows = []
+    n = len(orders)
+    j = 0
+    for i, (order_id, order_date) in enumerate(orders):
+        # j는 되돌아가지 않으므로 전체 O(n)
+        j = max(j, i + 1)
+        while j < n and orders[j][1] <= order_date:
+            j += 1
+        if j == n:
+            break
+        next_id, next_date = orders[j]
+        days = (next_date - order_date).days
+        if days <= max_days:
+            rows.append({'from': order_id, 'to': next_id, 'props': {'days_diff': days}})
+    return rows
+
+
+def same_product_chain_pairs(orders):
+    """NEXT_SAME_PRODUCT 관계 행 계산 (제품별 인접 오더만 연결)
+
+    orders: (order_id, product_cd, order_date) 목록, (product_cd, order_date, order_id) 순 정렬
+    """
+    rows = []
+    for (order_id, product_cd, order_date), (next_id, next_product, next_date) in zip(orders, orders[1:]):
+        if product_cd != next_product:
+            continue
+        props = {}
+        if order_date and next_date:
+            props['days_diff'] = (next_date - order_date).days
+        rows.append({'from': order_id, 'to': next_id, 'props': props})
+    return rows
+
+
+def count_csv_rows(csv_file):
+    """헤더를 제외한 CSV 행 수 (진행률 표시용, .csv.gz도 지원)"""
+    opener = gzip.open if csv_file.endswith('.gz') else open
+    with opener(csv_file, 'rb') as f:
+        return max(sum(1 for _ in f) - 1, 0)
+
+
 class Neo4jDataLoader:
-    def __init__(self):
+    def __init__(self, batch_size=DEFAULT_BATCH_SIZE, workers=DEFAULT_WORKERS,
+                 same_product=DEFAULT_SAME_PRODUCT):
+        if same_product not in SAME_PRODUCT_STRATEGIES:
+            raise ValueError(f"알 수 없는 SAME_PRODUCT 방식: {same_product}")
         self.uri = os.getenv('NEO4J_URI')
         self.username = os.getenv('NEO4J_USERNAME')
         self.password = os.getenv('NEO4J_PASSWORD')
         self.database = os.getenv('NEO4J_DATABASE', 'neo4j')
         self.driver = None
         self.data_dir = 'data/neo4j_import'
-        
+        self.batch_size = batch_size
+        self.workers = workers
+        self.same_product = same_product
+        # 파일별 적재 통계 (rows/sec)
+        self.load_stats = []
+        self._stats_lock = threading.Lock()
+        # 이번 실행에서 그래프에 쓴 것이 있는지 (없으면 데이터 버전을 올리지 않아 API 캐시 유지)
+        self.graph_changed = False
+
+    def csv_path(self, file_name):
+        """적재할 CSV 경로 (생성기 --gzip 출력이면 .csv.gz, pandas가 그대로 읽음)"""
+        path = os.path.join(self.data_dir, file_name)
+        if not os.path.exists(path) and os.path.exists(path + '.gz'):
+            return path + '.gz'
+        return path
+
     def connect(self):
         """Neo4j 데이터베이스에 연결"""
         try:
-            # URI 변환 (API 서버와 동일)
-            uri = self.uri.replace('neo4j+s://', 'bolt://')
-            uri = uri.replace('neo4j+ssc://', 'bolt://')
-            
-            # SSL 설정 (인증서 검증 비활성화)
-            ssl_context = ssl.create_default_context()
-            ssl_context.check_hostname = False
-            ssl_context.verify_mode = ssl.CERT_NONE
-            
-            self.driver = GraphDatabase.driver(
-                uri,
-                auth=(self.username, self.password),
-                ssl_context=ssl_context
-            )
+            # URI/SSL 변환과 연결 풀 설정은 공통 모듈 (API 서버와 동일)
+            uri, _ = rewrite_uri(self.uri, ssl_rewrite=True)
+            self.driver = create_driver('loader', self.uri, self.username, self.password, ssl_rewrite=True)
             # 연결 테스트
             self.driver.verify_connectivity()
             print(f"[OK] Neo4j 연결 성공: {uri}")
@@ -55,12 +531,73 @@ class Neo4jDataLoader:
             self.driver.close()
             print("[OK] 연결 종료")
     
-    def clear_database(self):
-        """데이터베이스 초기화 (주의!)"""
-        print("\n[!]  데이터베이스 초기화 중...")
+    @staticmethod
+    def _delete_batch(tx, query, limit):
+        """쓰기 트랜잭션 내에서 삭제 배치 1건 실행, 삭제 건수 반환"""
+        return tx.run(query, limit=limit).single()['deleted']
+
+    def _delete_in_batches(self, session, count_query, delete_query, desc, batch_size):
+        """삭제 대상이 없어질 때까지 batch_size 단위 트랜잭션으로 반복 삭제"""
+        total = session.run(count_query).single()['total']
+        deleted_total = 0
+        with tqdm(total=total, desc=f"  {desc}") as bar:
+            while True:
+                deleted = session.execute_write(self._delete_batch, delete_query, batch_size)
+                deleted_total += deleted
+                if deleted:
+                    self.graph_changed = True
+                bar.update(deleted)
+                if deleted < batch_size:
+                    break
+        return deleted_total
+
+    def clear_database(self, labels=None, batch_size=None):
+        """데이터베이스 초기화 (주의!)
+
+        한 트랜잭션이 커지지 않도록 관계 -> 노드 순서로 batch_size 단위로 나눠 삭제한다.
+        labels가 주어지면 해당 라벨의 노드와 그 노드에 연결된 관계만 삭제한다.
+        """
+        batch_size = batch_size or self.batch_size
+        scope = ', '.join(labels) if labels else '전체'
+        print(f"\n[!]  데이터베이스 초기화 중... (대상: {scope}, 배치 {batch_size:,})")
         with self.driver.session(database=self.database) as session:
-            # 모든 노드와 관계 삭제
-            session.run("MATCH (n) DETACH DELETE n")
+            if not labels:
+                self._delete_in_batches(
+                    session,
+                    "MATCH ()-[r]->() RETURN count(r) AS total",
+                    "MATCH ()-[r]->() WITH r LIMIT $limit DELETE r RETURN count(*) AS deleted",
+                    "관계 삭제", batch_size
+                )
+                self._delete_in_batches(
+                    session,
+                    "MATCH (n) RETURN count(n) AS total",
+                    "MATCH (n) WITH n LIMIT $limit DELETE n RETURN count(*) AS deleted",
+                    "노드 삭제", batch_size
+                )
+            else:
+                for label in labels:
+                    self._delete_in_batches(
+                        session,
+                        f"MATCH (n:{label})-[r]-() RETURN count(DISTINCT r) AS total",
+                        f"MATCH (n:{label})-[r]-() WITH DISTINCT r LIMIT $limit "
+                        f"DELETE r RETURN count(*) AS deleted",
+                        f"{label} 관계 삭제", batch_size
+                    )
+                    self._delete_in_batches(
+                        session,
+                        f"MATCH (n:{label}) RETURN count(n) AS total",
+                        f"MATCH (n:{label}) WITH n LIMIT $limit DELETE n RETURN count(*) AS deleted",
+                        f"{label} 노드 삭제", batch_size
+                    )
+                # 추가 관계는 다른 라벨 간에도 걸쳐 있으므로 다시 만들기 위해 모두 삭제
+                self._delete_in_batches(
+                    session,
+                    f"MATCH ()-[r:{'|'.join(DERIVED_REL_TYPES)}]->() RETURN count(r) AS total",
+                    f"MATCH ()-[r:{'|'.join(DERIVED_REL_TYPES)}]->() WITH r LIMIT $limit "
+                    f"DELETE r RETURN count(*) AS deleted",
+                    "추가 관계 삭제", batch_size
+                )
+        self._forget_manifest(labels)
         print("[OK] 데이터베이스 초기화 완료")
     
     def create_schema(self):
@@ -95,8 +632,12 @@ class Neo4jDataLoader:
                 "CREATE INDEX material_type IF NOT EXISTS FOR (m:Material) ON (m.type)",
                 "CREATE INDEX workcenter_process IF NOT EXISTS FOR (wc:WorkCenter) ON (wc.process_type)",
                 "CREATE INDEX po_order_date IF NOT EXISTS FOR (po:ProductionOrder) ON (po.order_date)",
+                "CREATE INDEX po_order_month IF NOT EXISTS FOR (po:ProductionOrder) ON (po.order_month)",
+                "CREATE INDEX po_finish_month IF NOT EXISTS FOR (po:ProductionOrder) ON (po.finish_month)",
                 "CREATE INDEX variance_element IF NOT EXISTS FOR (v:Variance) ON (v.cost_element)",
-                "CREATE INDEX variance_severity IF NOT EXISTS FOR (v:Variance) ON (v.severity)"
+                "CREATE INDEX variance_severity IF NOT EXISTS FOR (v:Variance) ON (v.severity)",
+                "CREATE INDEX variance_cube_cell IF NOT EXISTS "
+                "FOR (c:VarianceCube) ON (c.work_center, c.product_cd, c.month)"
             ]
             
             for index in indexes:
@@ -113,7 +654,7 @@ class Neo4jDataLoader:
     
     def load_products(self):
         """Product 노드 로드"""
-        csv_file = f'{self.data_dir}/products.csv'
+        csv_file = self.csv_path('products.csv')
         if not os.path.exists(csv_file):
             print(f"  [X] 파일 없음: {csv_file}")
             return
@@ -145,7 +686,7 @@ class Neo4jDataLoader:
     
     def load_materials(self):
         """Material 노드 로드"""
-        csv_file = f'{self.data_dir}/materials.csv'
+        csv_file = self.csv_path('materials.csv')
         if not os.path.exists(csv_file):
             print(f"  [X] 파일 없음: {csv_file}")
             return
@@ -176,7 +717,7 @@ class Neo4jDataLoader:
     
     def load_work_centers(self):
         """WorkCenter 노드 로드"""
-        csv_file = f'{self.data_dir}/work_centers.csv'
+        csv_file = self.csv_path('work_centers.csv')
         if not os.path.exists(csv_file):
             print(f"  [X] 파일 없음: {csv_file}")
             return
@@ -207,7 +748,7 @@ class Neo4jDataLoader:
     
     def load_production_orders(self):
         """ProductionOrder 노드 로드"""
-        csv_file = f'{self.data_dir}/production_orders.csv'
+        csv_file = self.csv_path('production_orders.csv')
         if not os.path.exists(csv_file):
             print(f"  [X] 파일 없음: {csv_file}")
             return
@@ -228,6 +769,8 @@ class Neo4jDataLoader:
                         order_date: date($order_date),
                         start_date: date($start_date),
                         finish_date: date($finish_date),
+                        order_month: substring($order_date, 0, 7),
+                        finish_month: substring($finish_date, 0, 7),
                         status: $status,
                         yield_rate: $yield_rate
                     })
@@ -237,7 +780,7 @@ class Neo4jDataLoader:
     
     def load_variances(self):
         """Variance 노드 로드"""
-        csv_file = f'{self.data_dir}/variances.csv'
+        csv_file = self.csv_path('variances.csv')
         if not os.path.exists(csv_file):
             print(f"  [X] 파일 없음: {csv_file}")
             return
@@ -270,7 +813,7 @@ class Neo4jDataLoader:
     
     def load_causes(self):
         """Cause 노드 로드"""
-        csv_file = f'{self.data_dir}/causes.csv'
+        csv_file = self.csv_path('causes.csv')
         if not os.path.exists(csv_file):
             print(f"  [X] 파일 없음: {csv_file}")
             return
@@ -300,7 +843,7 @@ class Neo4jDataLoader:
     
     def load_quality_defects(self):
         """QualityDefect 노드 로드"""
-        csv_file = f'{self.data_dir}/quality_defects.csv'
+        csv_file = self.csv_path('quality_defects.csv')
         if not os.path.exists(csv_file):
             print(f"  [X] 파일 없음: {csv_file}")
             return
@@ -319,7 +862,7 @@ class Neo4jDataLoader:
     
     def load_equipment_failures(self):
         """EquipmentFailure 노드 로드"""
-        csv_file = f'{self.data_dir}/equipment_failures.csv'
+        csv_file = self.csv_path('equipment_failures.csv')
         if not os.path.exists(csv_file):
             print(f"  [X] 파일 없음: {csv_file}")
             return
@@ -338,7 +881,7 @@ class Neo4jDataLoader:
     
     def load_material_markets(self):
         """MaterialMarket 노드 로드"""
-        csv_file = f'{self.data_dir}/material_markets.csv'
+        csv_file = self.csv_path('material_markets.csv')
         if not os.path.exists(csv_file):
             print(f"  [X] 파일 없음: {csv_file}")
             return
@@ -360,7 +903,7 @@ class Neo4jDataLoader:
         print("\n[3단계] 관계 생성")
         
         # USES_MATERIAL 관계
-        csv_file = f'{self.data_dir}/rel_uses_material.csv'
+        csv_file = self.csv_path('rel_uses_material.csv')
         if os.path.exists(csv_file):
             df = pd.read_csv(csv_file)
             with self.driver.session(database=self.database) as session:
@@ -376,7 +919,7 @@ class Neo4jDataLoader:
             print(f"  [OK] USES_MATERIAL: {len(df)}개")
         
         # PRODUCES 관계
-        csv_file = f'{self.data_dir}/rel_produces.csv'
+        csv_file = self.csv_path('rel_produces.csv')
         if os.path.exists(csv_file):
             df = pd.read_csv(csv_file)
             with self.driver.session(database=self.database) as session:
@@ -389,7 +932,7 @@ class Neo4jDataLoader:
             print(f"  [OK] PRODUCES: {len(df)}개")
         
         # HAS_VARIANCE 관계
-        csv_file = f'{self.data_dir}/rel_has_variance.csv'
+        csv_file = self.csv_path('rel_has_variance.csv')
         if os.path.exists(csv_file):
             df = pd.read_csv(csv_file)
             with self.driver.session(database=self.database) as session:
@@ -402,7 +945,7 @@ class Neo4jDataLoader:
             print(f"  [OK] HAS_VARIANCE: {len(df)}개")
         
         # CAUSED_BY 관계
-        csv_file = f'{self.data_dir}/rel_caused_by.csv'
+        csv_file = self.csv_path('rel_caused_by.csv')
         if os.path.exists(csv_file):
             df = pd.read_csv(csv_file)
             with self.driver.session(database=self.database) as session:
@@ -415,7 +958,7 @@ class Neo4jDataLoader:
             print(f"  [OK] CAUSED_BY: {len(df)}개")
         
         # CONSUMES 관계
-        csv_file = f'{self.data_dir}/rel_consumes.csv'
+        csv_file = self.csv_path('rel_consumes.csv')
         if os.path.exists(csv_file):
             df = pd.read_csv(csv_file)
             with self.driver.session(database=self.database) as session:
@@ -444,7 +987,7 @@ class Neo4jDataLoader:
             print(f"  [OK] CONSUMES: {len(df)}개")
         
         # WORKS_AT 관계
-        csv_file = f'{self.data_dir}/rel_works_at.csv'
+        csv_file = self.csv_path('rel_works_at.csv')
         if os.path.exists(csv_file):
             df = pd.read_csv(csv_file)
             with self.driver.session(database=self.database) as session:
@@ -481,7 +1024,7 @@ class Neo4jDataLoader:
             print(f"  [OK] WORKS_AT: {len(df)}개")
         
         # HAS_DEFECT 관계
-        csv_file = f'{self.data_dir}/rel_has_defect.csv'
+        csv_file = self.csv_path('rel_has_defect.csv')
         if os.path.exists(csv_file):
             df = pd.read_csv(csv_file)
             with self.driver.session(database=self.database) as session:
@@ -494,7 +1037,7 @@ class Neo4jDataLoader:
             print(f"  [OK] HAS_DEFECT: {len(df)}개")
         
         # HAS_FAILURE 관계
-        csv_file = f'{self.data_dir}/rel_has_failure.csv'
+        csv_file = self.csv_path('rel_has_failure.csv')
         if os.path.exists(csv_file):
             df = pd.read_csv(csv_file)
             with self.driver.session(database=self.database) as session:
@@ -507,7 +1050,7 @@ class Neo4jDataLoader:
             print(f"  [OK] HAS_FAILURE: {len(df)}개")
         
         # MARKET_PRICE 관계
-        csv_file = f'{self.data_dir}/rel_market_price.csv'
+        csv_file = self.csv_path('rel_market_price.csv')
         if os.path.exists(csv_file):
             df = pd.read_csv(csv_file)
             with self.driver.session(database=self.database) as session:
@@ -518,51 +1061,522 @@ class Neo4jDataLoader:
                         CREATE (m)-[:MARKET_PRICE]->(mm)
                     """, dict(row))
             print(f"  [OK] MARKET_PRICE: {len(df)}개")
-    
-    def create_additional_relationships(self):
-        """추가 관계 생성 (분석 최적화용)"""
-        print("\n[4단계] 추가 관계 생성")
+
+    # ============================================================
+    # 배치(UNWIND) 적재
+    # ============================================================
+
+    @staticmethod
+    def _run_batch(tx, query, rows):
+        """쓰기 트랜잭션 내에서 배치 1건 실행"""
+        tx.run(query, rows=rows).consume()
+
+    def _load_file_batched(self, session, csv_file, query, to_params, desc, position=None):
+        """CSV 파일을 batch_size 단위로 읽어 UNWIND 쿼리로 적재, 적재 행 수 반환"""
+        total = count_csv_rows(csv_file)
+        loaded = 0
+        started = time.perf_counter()
+        with tqdm(total=total, desc=f"  {desc}", position=position, leave=position is None) as bar:
+            for chunk in pd.read_csv(csv_file, chunksize=self.batch_size):
+                rows = [to_params(row) for row in chunk.to_dict('records')]
+                session.execute_write(self._run_batch, query, rows)
+                self.graph_changed = True
+                loaded += len(rows)
+                bar.update(len(rows))
+        self._record_stats(desc, loaded, time.perf_counter() - started)
+        return loaded
+
+    def _record_stats(self, name, rows, seconds):
+        """파일별 적재 통계 기록"""
+        with self._stats_lock:
+            self.load_stats.append({
+                'name': name,
+                'rows': rows,
+                'seconds': seconds,
+                'rows_per_sec': rows / seconds if seconds > 0 else 0.0
+            })
+
+    def load_nodes_batched(self, specs=None):
+        """모든 노드 파일을 배치 모드로 로드"""
+        with self.driver.session(database=self.database) as session:
+            for spec in specs or NODE_SPECS:
+                csv_file = self.csv_path(spec['file'])
+                if not os.path.exists(csv_file):
+                    print(f"  [X] 파일 없음: {csv_file}")
+                    continue
+                count = self._load_file_batched(
+                    session, csv_file, node_create_query(spec), spec['params'], spec['label']
+                )
+                print(f"  [OK] {spec['label']} 노드: {count}개")
+
+    def load_relationships_batched(self, specs=None):
+        """모든 관계 파일을 배치 모드로 로드"""
+        print("\n[3단계] 관계 생성")
+
+        with self.driver.session(database=self.database) as session:
+            for spec in specs or REL_SPECS:
+                csv_file = self.csv_path(spec['file'])
+                if not os.path.exists(csv_file):
+                    continue
+                count = self._load_file_batched(
+                    session, csv_file, rel_create_query(spec), spec['params'], spec['type']
+                )
+                print(f"  [OK] {spec['type']}: {count}개")
+
+    def _load_relationship_file(self, spec, position):
+        """워커 스레드: 자체 세션으로 관계 파일 1개 적재"""
+        csv_file = self.csv_path(spec['file'])
+        with self.driver.session(database=self.database) as session:
+            return self._load_file_batched(
+                session, csv_file, rel_create_query(spec), spec['params'], spec['type'],
+                position=position
+            )
+
+    def load_relationships_parallel(self, workers=None, specs=None):
+        """관계 파일을 스레드 풀로 병렬 적재
+
+        끝점 라벨이 겹치는 파일(예: ProductionOrder 기준 PRODUCES/HAS_VARIANCE/
+        CONSUMES/WORKS_AT)은 동시에 실행하지 않고, 행 수가 많은 파일부터 배정한다.
+        """
+        workers = workers or self.workers
+        print(f"\n[3단계] 관계 생성 (병렬, workers={workers})")
+
+        pending = []
+        for spec in specs or REL_SPECS:
+            csv_file = self.csv_path(spec['file'])
+            if os.path.exists(csv_file):
+                pending.append((count_csv_rows(csv_file), spec))
+        # 큰 파일부터 시작해야 전체 소요 시간이 짧아짐
+        pending.sort(key=lambda item: item[0], reverse=True)
+
+        busy_labels = set()
+        free_slots = list(range(workers))
+        running = {}
+        timings = []
+        stage_started = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='rel-loader') as pool:
+            while pending or running:
+                for item in list(pending):
+                    if not free_slots:
+                        break
+                    rows, spec = item
+                    labels = rel_lock_labels(spec)
+                    if labels & busy_labels:
+                        continue
+                    pending.remove(item)
+                    busy_labels |= labels
+                    slot = free_slots.pop(0)
+                    future = pool.submit(self._load_relationship_file, spec, slot)
+                    running[future] = (spec, labels, slot, time.perf_counter())
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    spec, labels, slot, started = running.pop(future)
+                    busy_labels -= labels
+                    free_slots.append(slot)
+                    count = future.result()
+                    finished = time.perf_counter()
+                    timings.append({
+                        'type': spec['type'],
+                        'rows': count,
+                        'start': started - stage_started,
+                        'seconds': finished - started
+                    })
+
+        wall = time.perf_counter() - stage_started
+        print("\n관계 병렬 적재 요약:")
+        print(f"  {'관계':<16}{'행 수':>10}{'시작(초)':>10}{'소요(초)':>10}{'rows/sec':>12}")
+        for t in sorted(timings, key=lambda t: t['start']):
+            rate = t['rows'] / t['seconds'] if t['seconds'] > 0 else 0
+            print(f"  {t['type']:<16}{t['rows']:>10,}{t['start']:>10.2f}{t['seconds']:>10.2f}{rate:>12,.0f}")
+        serial = sum(t['seconds'] for t in timings)
+        print(f"  전체 {wall:.2f}초 (파일별 합계 {serial:.2f}초, "
+              f"{(serial / wall if wall > 0 else 1):.1f}배 병렬화)")
+
+    def load_nodes_row_by_row(self):
+        """모든 노드를 행 단위로 로드 (기존 방식, 비교용)"""
+        for name, load in [
+            ('Product', self.load_products),
+            ('Material', self.load_materials),
+            ('WorkCenter', self.load_work_centers),
+            ('ProductionOrder', self.load_production_orders),
+            ('Variance', self.load_variances),
+            ('Cause', self.load_causes),
+            ('QualityDefect', self.load_quality_defects),
+            ('EquipmentFailure', self.load_equipment_failures),
+            ('MaterialMarket', self.load_material_markets),
+        ]:
+            spec = next(s for s in NODE_SPECS if s['label'] == name)
+            csv_file = self.csv_path(spec['file'])
+            started = time.perf_counter()
+            self.graph_changed = True
+            load()
+            if os.path.exists(csv_file):
+                self._record_stats(name, count_csv_rows(csv_file), time.perf_counter() - started)
+
+    def load_relationships_row_by_row(self):
+        """모든 관계를 행 단위로 로드 (기존 방식, 비교용)"""
+        started = time.perf_counter()
+        self.graph_changed = True
+        self.load_relationships()
+        rows = sum(
+            count_csv_rows(self.csv_path(spec['file']))
+            for spec in REL_SPECS
+            if os.path.exists(self.csv_path(spec['file']))
+        )
+        self._record_stats('relationships (all)', rows, time.perf_counter() - started)
+
+    def print_load_stats(self):
+        """파일별 적재 속도 요약 출력"""
+        if not self.load_stats:
+            return
+        print("\n적재 속도:")
+        print(f"  {'대상':<22}{'행 수':>10}{'소요(초)':>12}{'rows/sec':>12}")
+        for stat in self.load_stats:
+            print(f"  {stat['name']:<22}{stat['rows']:>10,}{stat['seconds']:>12.2f}"
+                  f"{stat['rows_per_sec']:>12,.0f}")
+        total_rows = sum(s['rows'] for s in self.load_stats)
+        total_sec = sum(s['seconds'] for s in self.load_stats)
+        print(f"  {'합계':<22}{total_rows:>10,}{total_sec:>12.2f}"
+              f"{(total_rows / total_sec if total_sec > 0 else 0):>12,.0f}")
+
+    # ============================================================
+    # 증분(delta) 적재
+    # ============================================================
+
+    def load_manifest(self):
+        """매니페스트 읽기 (대상 DB가 다르면 빈 매니페스트)"""
+        if not os.path.exists(MANIFEST_FILE):
+            return {}
+        with open(MANIFEST_FILE, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get('target') != self._manifest_target():
+            print(f"  [!] 매니페스트 대상 DB가 달라 무시합니다: {manifest.get('target')}")
+            return {}
+        return manifest.get('files', {})
+
+    def save_manifest(self, files):
+        """매니페스트 저장"""
+        manifest = {
+            'target': self._manifest_target(),
+            'saved_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'files': files
+        }
+        tmp_file = MANIFEST_FILE + '.tmp'
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False)
+        os.replace(tmp_file, MANIFEST_FILE)
+
+    def _forget_manifest(self, labels=None):
+        """삭제한 데이터에 해당하는 매니페스트 항목 제거"""
+        if not os.path.exists(MANIFEST_FILE):
+            return
+        if not labels:
+            os.remove(MANIFEST_FILE)
+            return
+        node_specs, rel_specs = specs_for_labels(labels)
+        files = self.load_manifest()
+        for spec in node_specs + rel_specs:
+            files.pop(spec['file'], None)
+        self.save_manifest(files)
+
+    def _manifest_target(self):
+        return f"{self.uri}/{self.database}"
+
+    def _diff_file(self, spec, previous):
+        """CSV와 매니페스트 비교 -> (신규/변경 행, 사라진 키, 현재 키->해시)"""
+        csv_file = self.csv_path(spec['file'])
+        upserts = []
+        current = {}
+        for chunk in pd.read_csv(csv_file, chunksize=self.batch_size):
+            for record in chunk.to_dict('records'):
+                params = spec['params'](record)
+                key = row_key(spec, params)
+                digest = row_hash(params)
+                current[key] = digest
+                if previous.get(key) != digest:
+                    upserts.append(params)
+        removed = [key for key in previous if key not in current]
+        return upserts, removed, current
+
+    def build_manifest(self, specs=None):
+        """현재 CSV 전체를 매니페스트로 계산 (전체 적재 직후 저장용)"""
+        files = {}
+        for spec in specs or NODE_SPECS + REL_SPECS:
+            if os.path.exists(self.csv_path(spec['file'])):
+                files[spec['file']] = self._diff_file(spec, {})[2]
+        return files
+
+    def _affected_orders(self, session, diffs):
+        """변경으로 추가 관계를 다시 만들어야 하는 생산오더 ID"""
+        order_ids = set()
+        removed_variances = []
+        for spec, upserts, removed, _ in diffs:
+            if spec.get('label') == 'ProductionOrder':
+                order_ids.update(row['id'] for row in upserts)
+                order_ids.update(removed)
+            elif spec.get('label') == 'Variance':
+                order_ids.update(row['order_no'] for row in upserts)
+                removed_variances.extend(removed)
+            elif spec.get('from', (None,))[0] == 'ProductionOrder':
+                order_ids.update(row['from'] for row in upserts)
+                order_ids.update(key.split('\t')[0] for key in removed)
+        if removed_variances:
+            result = session.run("""
+                MATCH (po:ProductionOrder)-[:HAS_VARIANCE]->(v:Variance)
+                WHERE v.id IN $ids
+                RETURN DISTINCT po.id as order_no
+            """, ids=removed_variances)
+            order_ids.update(record['order_no'] for record in result)
+        return sorted(order_ids)
+
+    def _write_rows(self, session, query, rows, desc):
+        """이미 준비된 행 목록을 배치로 쓰기"""
+        started = time.perf_counter()
+        with tqdm(total=len(rows), desc=f"  {desc}") as bar:
+            for start in range(0, len(rows), self.batch_size):
+                batch = rows[start:start + self.batch_size]
+                session.execute_write(self._run_batch, query, batch)
+                self.graph_changed = True
+                bar.update(len(batch))
+        self._record_stats(desc, len(rows), time.perf_counter() - started)
+
+    def load_incremental(self):
+        """증분 적재: 매니페스트 대비 신규/변경 행만 MERGE, 사라진 행만 삭제
+
+        노드는 id/code, 관계는 (from, to) 쌍을 자연 키로 사용한다.
+        변경이 없으면 그래프에 쓰지 않는다.
+        """
+        print("\n[2단계] 증분 비교 (매니페스트: " + MANIFEST_FILE + ")")
+        previous = self.load_manifest()
+        
+        node_diffs = []
+        rel_diffs = []
+        for spec in NODE_SPECS + REL_SPECS:
+            csv_file = self.csv_path(spec['file'])
+            if not os.path.exists(csv_file):
+                # 파일이 없으면 삭제로 보지 않고 건너뜀
+                continue
+            upserts, removed, current = self._diff_file(spec, previous.get(spec['file'], {}))
+            diff = (spec, upserts, removed, current)
+            (node_diffs if 'label' in spec else rel_diffs).append(diff)
+            name = spec.get('label') or spec['type']
+            print(f"  {name:<18} 신규/변경 {len(upserts):>8,}  삭제 {len(removed):>8,}  "
+                  f"유지 {len(current) - len(upserts):>8,}")
+        
+        diffs = node_diffs + rel_diffs
+        if not any(upserts or removed for _, upserts, removed, _ in diffs):
+            print("[OK] 변경 없음")
+            return []
         
+        print("\n[3단계] 변경분 반영")
         with self.driver.session(database=self.database) as session:
+            order_ids = self._affected_orders(session, diffs)
+            # 오더의 제품/완료월이 바뀔 수 있으므로 변경 전 큐브 조각도 다시 집계
+            cube_slices = self.fetch_cube_slices(session, order_ids)
+            
+            # 노드 upsert -> 관계 upsert -> 관계 삭제 -> 노드 삭제
+            for spec, upserts, _, _ in node_diffs:
+                if upserts:
+                    self._write_rows(session, node_merge_query(spec), upserts, spec['label'])
+            for spec, upserts, _, _ in rel_diffs:
+                if upserts:
+                    self._write_rows(session, rel_merge_query(spec), upserts, spec['type'])
+            for spec, _, removed, _ in rel_diffs:
+                if removed:
+                    rows = [dict(zip(('from', 'to'), key.split('\t'))) for key in removed]
+                    self._write_rows(session, rel_delete_query(spec), rows, f"{spec['type']} (삭제)")
+            for spec, _, removed, _ in node_diffs:
+                if removed:
+                    rows = [{'key': key} for key in removed]
+                    self._write_rows(session, node_delete_query(spec), rows, f"{spec['label']} (삭제)")
+            cube_slices |= self.fetch_cube_slices(session, order_ids)
+        
+        self.build_variance_cube(slices=[list(key) for key in sorted(cube_slices, key=str)])
+        
+        files = dict(previous)
+        files.update({spec['file']: current for spec, _, _, current in diffs})
+        self.save_manifest(files)
+        print(f"[OK] 매니페스트 갱신: {MANIFEST_FILE}")
+        return order_ids
+
+    def create_additional_relationships(self, order_ids=None):
+        """추가 관계 생성 (분석 최적화용)
+
+        order_ids가 주어지면 해당 오더와 관련된 추가 관계만 지우고 다시 만든다 (증분 적재).
+        NEXT_ORDER, NEXT_SAME_PRODUCT는 오더 간 순서에 따라 결정되므로 이 경우에도 전체를 다시 만든다.
+        동일 제품 연결은 self.same_product 방식을 따르며, 다른 방식으로 만들어 둔 관계는 지운다.
+        """
+        print(f"\n[4단계] 추가 관계 생성 (SAME_PRODUCT 방식: {self.same_product})")
+        
+        with self.driver.session(database=self.database) as session:
+            stale = {'pairs': ('NEXT_SAME_PRODUCT',), 'chain': ('SAME_PRODUCT',),
+                     'bucket': ('SAME_PRODUCT', 'NEXT_SAME_PRODUCT')}[self.same_product]
+            for rel_type in stale:
+                self._delete_rel_type(session, rel_type)
+            if order_ids is not None:
+                session.run("""
+                    MATCH (po:ProductionOrder)-[:HAS_VARIANCE]->(:Variance)-[r:RELATED_TO_MATERIAL]->()
+                    WHERE po.id IN $order_ids
+                    DELETE r
+                """, order_ids=order_ids)
+                session.run("""
+                    MATCH (po:ProductionOrder)-[r:SAME_PRODUCT]-()
+                    WHERE po.id IN $order_ids
+                    DELETE r
+                """, order_ids=order_ids)
+                self._delete_rel_type(session, 'NEXT_ORDER')
+                if self.same_product == 'chain':
+                    self._delete_rel_type(session, 'NEXT_SAME_PRODUCT')
+            
             # RELATED_TO_MATERIAL: Variance -> Material 관계
             # (Variance가 어떤 자재와 관련있는지 직접 연결)
             print("  - RELATED_TO_MATERIAL 관계 생성 중...")
             result = session.run("""
                 MATCH (v:Variance)<-[:HAS_VARIANCE]-(po:ProductionOrder)-[:CONSUMES]->(m:Material)
                 WHERE v.cost_element = 'MATERIAL'
+                  AND ($order_ids IS NULL OR po.id IN $order_ids)
                 WITH v, m, COUNT(*) as strength
                 CREATE (v)-[:RELATED_TO_MATERIAL {strength: strength}]->(m)
                 RETURN COUNT(*) as count
-            """)
+            """, order_ids=order_ids)
             count = result.single()['count']
+            self.graph_changed = self.graph_changed or count > 0
             print(f"  [OK] RELATED_TO_MATERIAL: {count}개")
             
             # NEXT_ORDER: 시계열 순서 관계
+            # (오더 쌍 전체를 비교하지 않고 주문일 순으로 한 번 정렬한 뒤 다음 오더만 연결)
             print("  - NEXT_ORDER 관계 생성 중...")
-            result = session.run("""
-                MATCH (po1:ProductionOrder), (po2:ProductionOrder)
-                WHERE po1.order_date < po2.order_date
-                WITH po1, po2, duration.between(po1.order_date, po2.order_date).days as days
-                WHERE days <= 7
-                ORDER BY po1.order_date, po2.order_date
-                WITH po1, MIN(days) as min_days, COLLECT(po2)[0] as next_po
-                CREATE (po1)-[:NEXT_ORDER {days_diff: min_days}]->(next_po)
-                RETURN COUNT(*) as count
-            """)
-            count = result.single()['count']
-            print(f"  [OK] NEXT_ORDER: {count}개")
+            rows = next_order_pairs(self.fetch_orders_by_date(session))
+            self._write_rows(session, rel_create_query(NEXT_ORDER_SPEC), rows, 'NEXT_ORDER')
+            print(f"  [OK] NEXT_ORDER: {len(rows)}개")
             
-            # SAME_PRODUCT: 동일 제품 생산 오더 연결
-            print("  - SAME_PRODUCT 관계 생성 중...")
-            result = session.run("""
-                MATCH (po1:ProductionOrder)-[:PRODUCES]->(p:Product)<-[:PRODUCES]-(po2:ProductionOrder)
-                WHERE po1.id < po2.id
-                CREATE (po1)-[:SAME_PRODUCT]->(po2)
-                RETURN COUNT(*) as count
-            """)
-            count = result.single()['count']
-            print(f"  [OK] SAME_PRODUCT: {count}개")
+            # 동일 제품 생산 오더 연결
+            if self.same_product == 'chain':
+                print("  - NEXT_SAME_PRODUCT 관계 생성 중...")
+                rows = same_product_chain_pairs(self.fetch_orders_by_product(session))
+                self._write_rows(session, rel_create_query(SAME_PRODUCT_CHAIN_SPEC), rows,
+                                 'NEXT_SAME_PRODUCT')
+                print(f"  [OK] NEXT_SAME_PRODUCT: {len(rows)}개")
+            elif self.same_product == 'bucket':
+                print("  - SAME_PRODUCT: bucket 방식 (Product 노드로 묶음, 관계 생성 생략)")
+            else:
+                print("  - SAME_PRODUCT 관계 생성 중...")
+                result = session.run("""
+                    MATCH (po1:ProductionOrder)-[:PRODUCES]->(p:Product)<-[:PRODUCES]-(po2:ProductionOrder)
+                    WHERE po1.id < po2.id
+                      AND ($order_ids IS NULL OR po1.id IN $order_ids OR po2.id IN $order_ids)
+                    CREATE (po1)-[:SAME_PRODUCT]->(po2)
+                    RETURN COUNT(*) as count
+                """, order_ids=order_ids)
+                count = result.single()['count']
+                self.graph_changed = self.graph_changed or count > 0
+                print(f"  [OK] SAME_PRODUCT: {count}개")
     
+    def backfill_month_properties(self):
+        """finish_month/order_month 속성이 없는 생산오더에 채워 넣기 (있으면 건너뜀)"""
+        with self.driver.session(database=self.database) as session:
+            query = MONTH_BACKFILL_QUERY.format(batch_size=self.batch_size)
+            updated = session.run(query).single()['updated']
+        if updated:
+            self.graph_changed = True
+            print(f"[OK] 월 속성(finish_month, order_month) 채움: 생산오더 {updated:,}개")
+
+    def build_variance_cube(self, slices=None):
+        """원가차이 집계 큐브(VarianceCube) 생성
+
+        slices가 주어지면 해당 (제품, 완료월) 셀만 지우고 다시 집계한다 (증분 적재).
+        대시보드/비교/필터 요약 API는 Variance 전체 대신 이 셀을 합산한다.
+        """
+        scope = '전체' if slices is None else f'{len(slices)}개 제품/월'
+        print(f"\n[집계] 원가차이 큐브 갱신 (대상: {scope})")
+        if slices is not None and not slices:
+            print("[OK] 갱신할 셀 없음")
+            return
+        with self.driver.session(database=self.database) as session:
+            deleted = session.run(VARIANCE_CUBE_DELETE, slices=slices).single()['deleted']
+            order_cells = session.run(VARIANCE_CUBE_ORDER_CELLS, slices=slices).single()['cells']
+            wc_cells = session.run(VARIANCE_CUBE_WORK_CENTER_CELLS, slices=slices).single()['cells']
+            session.run(VARIANCE_CUBE_ORDER_TOTALS.format(batch_size=self.batch_size),
+                        slices=slices).consume()
+        self.graph_changed = True
+        print(f"[OK] VarianceCube: 삭제 {deleted:,}개, 생성 {order_cells + wc_cells:,}개 "
+              f"(오더 단위 {order_cells:,} + 작업장별 {wc_cells:,})")
+
+    @staticmethod
+    def fetch_cube_slices(session, order_ids):
+        """오더들이 속한 (제품, 완료월) 큐브 조각 목록"""
+        result = session.run(CUBE_SLICES_QUERY, order_ids=order_ids)
+        return {(record['product_cd'], record['month']) for record in result}
+
+    @staticmethod
+    def fetch_orders_by_date(session):
+        """주문일, id 순으로 정렬된 (order_id, order_date) 목록"""
+        result = session.run("""
+            MATCH (po:ProductionOrder)
+            WHERE po.order_date IS NOT NULL
+            RETURN po.id AS id, po.order_date AS order_date
+            ORDER BY order_date, id
+        """)
+        return [(record['id'], record['order_date'].to_native()) for record in result]
+
+    @staticmethod
+    def fetch_orders_by_product(session):
+        """제품, 주문일, id 순으로 정렬된 (order_id, product_cd, order_date) 목록"""
+        result = session.run("""
+            MATCH (po:ProductionOrder)-[:PRODUCES]->(p:Product)
+            RETURN po.id AS id, p.id AS product_cd, po.order_date AS order_date
+            ORDER BY product_cd, order_date, id
+        """)
+        return [
+            (record['id'], record['product_cd'],
+             record['order_date'].to_native() if record['order_date'] else None)
+            for record in result
+        ]
+
+    def _delete_rel_type(self, session, rel_type):
+        """특정 타입 관계를 배치로 모두 삭제 (없으면 건너뜀)"""
+        count_query = f"MATCH ()-[r:{rel_type}]->() RETURN count(r) AS total"
+        if not session.run(count_query).single()['total']:
+            return
+        self._delete_in_batches(
+            session, count_query,
+            f"MATCH ()-[r:{rel_type}]->() WITH r LIMIT $limit DELETE r RETURN count(*) AS deleted",
+            f"{rel_type} 삭제", self.batch_size
+        )
+
+    def build_filter_catalog(self, token):
+        """필터 옵션 카탈로그(FilterCatalog) 갱신 (token: 이어서 쓸 데이터 버전)"""
+        with self.driver.session(database=self.database) as session:
+            counts = session.run(FILTER_CATALOG_QUERY, token=token).single()
+        print(f"[OK] FilterCatalog: 제품 {counts['products']:,}, 공정 {counts['work_centers']:,}, "
+              f"원자재 {counts['materials']:,}, 기간 {counts['months']:,}")
+
+    def bump_data_version(self, token=None):
+        """데이터 버전 토큰 갱신 (그래프 API 서버가 보고 캐시를 비움)"""
+        token = token or new_data_version_token()
+        with self.driver.session(database=self.database) as session:
+            session.run(DATA_VERSION_QUERY, token=token).consume()
+        print(f"[OK] 데이터 버전 갱신: {token}")
+        return token
+
+    def publish_data_version(self):
+        """필터 카탈로그를 새 토큰으로 쓰고 데이터 버전 갱신 (실패해도 예외를 올리지 않음)
+
+        카탈로그를 먼저 써야 서버가 새 버전을 보자마자 카탈로그를 사용한다.
+        load_all과 WORKS_AT 단독 적재(load_works_at.py)가 그래프에 쓴 것이 있을 때(graph_changed) 호출한다.
+        """
+        token = new_data_version_token()
+        try:
+            self.build_filter_catalog(token)
+        except Exception as e:
+            print(f"[X] 필터 카탈로그 갱신 실패: {str(e)}")
+        try:
+            self.bump_data_version(token)
+        except Exception as e:
+            print(f"[X] 데이터 버전 갱신 실패: {str(e)}")
+
     def verify_data(self):
         """데이터 로드 검증"""
         print("\n[5단계] 데이터 검증")
@@ -602,42 +1616,80 @@ class Neo4jDataLoader:
             for record in result:
                 print(f"  {record['po.id']}: {record['v.variance_amount']:,.0f}원")
     
-    def load_all(self, clear_first=False):
-        """전체 데이터 로드"""
+    def load_all(self, clear_first=False, mode='batch', labels=None):
+        """전체 데이터 로드
+
+        mode: 'batch' (UNWIND 배치, 기본), 'row' (행 단위, 기존 방식),
+              'incremental' (매니페스트 기준 변경분만 반영, clear_first 무시),
+              'post-import' (neo4j-admin 임포트 직후: 스키마/추가 관계만 생성)
+        labels: batch 모드에서 지정한 라벨만 지우고 다시 적재 (예: ['Variance'])
+        """
+        if labels and mode != 'batch':
+            print("[X] 라벨 단위 재적재는 batch 모드에서만 지원합니다.")
+            return False
+        try:
+            node_specs, rel_specs = specs_for_labels(labels)
+        except ValueError as e:
+            print(f"[X] {e}")
+            return False
+
         print("=" * 60)
-        print("Neo4j 데이터 로드 시작")
+        print(f"Neo4j 데이터 로드 시작 (mode={mode}, batch_size={self.batch_size}, "
+              f"workers={self.workers})")
         print("=" * 60)
+        self.load_stats = []
+        self.graph_changed = False
         
         if not self.connect():
             return False
         
         try:
-            if clear_first:
-                self.clear_database()
+            if clear_first and mode in ('batch', 'row'):
+                self.clear_database(labels=labels)
             
             # 스키마 생성
             self.create_schema()
+            self.backfill_month_properties()
             
-            # 노드 로드
-            print("\n[2단계] 노드 생성")
-            self.load_products()
-            self.load_materials()
-            self.load_work_centers()
-            self.load_production_orders()
-            self.load_variances()
-            self.load_causes()
-            self.load_quality_defects()
-            self.load_equipment_failures()
-            self.load_material_markets()
-            
-            # 관계 로드
-            self.load_relationships()
-            
-            # 추가 관계 생성
-            self.create_additional_relationships()
+            if mode == 'incremental':
+                # 변경분 반영 후 영향받은 오더의 추가 관계만 재생성
+                order_ids = self.load_incremental()
+                if order_ids:
+                    self.create_additional_relationships(order_ids=order_ids)
+            elif mode == 'post-import':
+                # 노드/관계는 neo4j-admin이 이미 적재 (data/export_neo4j_admin_import.py)
+                self.create_additional_relationships()
+                self.build_variance_cube()
+                self.save_manifest(self.build_manifest())
+            else:
+                # 노드 로드
+                print("\n[2단계] 노드 생성")
+                if mode == 'row':
+                    self.load_nodes_row_by_row()
+                else:
+                    self.load_nodes_batched(node_specs)
+                
+                # 관계 로드
+                if mode == 'row':
+                    self.load_relationships_row_by_row()
+                elif self.workers > 1:
+                    self.load_relationships_parallel(specs=rel_specs)
+                else:
+                    self.load_relationships_batched(rel_specs)
+                
+                # 추가 관계 생성
+                self.create_additional_relationships()
+                self.build_variance_cube()
+                
+                if clear_first:
+                    # 그래프가 CSV와 일치하므로 다음 증분 적재의 기준으로 저장
+                    files = self.load_manifest() if labels else {}
+                    files.update(self.build_manifest(node_specs + rel_specs))
+                    self.save_manifest(files)
             
             # 검증
             self.verify_data()
+            self.print_load_stats()
             
             print("\n" + "=" * 60)
             print("데이터 로드 완료!")
@@ -652,9 +1704,38 @@ class Neo4jDataLoader:
             return False
         
         finally:
+            # 일부만 적재되고 실패한 경우에도 쓴 것이 있으면 버전 갱신
+            # (변경 없는 증분 적재, 쓰기 전 실패는 버전을 유지해 서버 캐시/ETag를 버리지 않음)
+            if self.graph_changed:
+                self.publish_data_version()
+            else:
+                print("[OK] 그래프 변경 없음: 데이터 버전 유지")
             self.close()
 
 def main():
+    parser = argparse.ArgumentParser(description='Neo4j 데이터 로더')
+    parser.add_argument('--mode', choices=['batch', 'row', 'incremental', 'post-import'],
+                        default='batch',
+                        help='batch: UNWIND 배치 적재 (기본), row: 행 단위 적재 (비교용), '
+                             'incremental: 변경분만 반영, '
+                             'post-import: neo4j-admin 임포트 후 스키마/추가 관계 생성')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f'배치당 행 수 (기본 {DEFAULT_BATCH_SIZE})')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help=f'관계 병렬 적재 워커 수, 1이면 순차 (기본 {DEFAULT_WORKERS})')
+    parser.add_argument('--same-product', choices=SAME_PRODUCT_STRATEGIES,
+                        default=DEFAULT_SAME_PRODUCT,
+                        help='동일 제품 오더 연결 방식: pairs (오더 쌍마다, 기존), '
+                             'chain (인접 오더만), bucket (Product 노드 사용)')
+    parser.add_argument('--labels', default='',
+                        help='지정한 라벨만 지우고 다시 적재 (쉼표 구분, 예: Variance)')
+    args = parser.parse_args()
+    labels = [label.strip() for label in args.labels.split(',') if label.strip()]
+    unknown = sorted(set(labels) - {spec['label'] for spec in NODE_SPECS})
+    if unknown:
+        parser.error(f"[X] 알 수 없는 라벨: {', '.join(unknown)} "
+                     f"(가능: {', '.join(spec['label'] for spec in NODE_SPECS)})")
+    
     # 데이터 파일 존재 확인
     data_dir = 'data/neo4j_import'
     if not os.path.exists(data_dir):
@@ -662,15 +1743,22 @@ def main():
         print("먼저 'python data/generate_data.py'를 실행하세요.")
         return
     
-    loader = Neo4jDataLoader()
+    loader = Neo4jDataLoader(batch_size=args.batch_size, workers=args.workers,
+                             same_product=args.same_product)
+    
+    if args.mode in ('incremental', 'post-import'):
+        # 기존 데이터를 지우지 않으므로 확인 없이 실행
+        loader.load_all(mode=args.mode)
+        return
     
     # 데이터베이스 초기화 여부 확인
-    print("\n[!]  기존 데이터를 삭제하고 새로 로드하시겠습니까?")
+    target = ', '.join(labels) + ' ' if labels else ''
+    print(f"\n[!]  기존 {target}데이터를 삭제하고 새로 로드하시겠습니까?")
     print("   이 작업은 되돌릴 수 없습니다!")
     response = input("   계속하려면 'yes'를 입력하세요: ")
     
     if response.lower() == 'yes':
-        loader.load_all(clear_first=True)
+        loader.load_all(clear_first=True, mode=args.mode, labels=labels or None)
     else:
         print("작업이 취소되었습니다.")
 
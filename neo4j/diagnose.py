@@ -2,9 +2,11 @@
 Neo4j 데이터 진단 스크립트 (SSL 검증 비활성화)
 """
 import os
-import ssl
+import sys
 from dotenv import load_dotenv
-from neo4j import GraphDatabase
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from neo4j_connection import create_driver, rewrite_uri
 
 # .env 파일 로드
 load_dotenv()
@@ -19,21 +21,9 @@ print("Neo4j 데이터 진단 시작")
 print("=" * 60)
 
 try:
-    # neo4j+s:// 를 bolt:// 로 변경 (SSL 컨텍스트 적용을 위해)
-    uri = uri.replace('neo4j+s://', 'bolt://')
-    uri = uri.replace('neo4j+ssc://', 'bolt://')
-    
-    # SSL 컨텍스트 생성 (인증서 검증 비활성화)
-    ssl_context = ssl.create_default_context()
-    ssl_context.check_hostname = False
-    ssl_context.verify_mode = ssl.CERT_NONE
-    
-    # Neo4j 드라이버 생성
-    driver = GraphDatabase.driver(
-        uri, 
-        auth=(username, password),
-        ssl_context=ssl_context
-    )
+    # Neo4j 드라이버 생성 (neo4j+s:// -> bolt:// + SSL 컨텍스트, 공통 모듈)
+    driver = create_driver('diagnose', uri, username, password, ssl_rewrite=True)
+    uri, _ = rewrite_uri(uri, ssl_rewrite=True)
     
     print(f"✓ 연결 성공! (SSL 검증 비활성화)")
     print(f"  URI: {uri}")
@@ -1,11 +1,20 @@
 """
 Load WORKS_AT relationships from rel_works_at.csv.
+
+After loading, rebuilds the VarianceCube (work-center cells come from WORKS_AT).
+If anything was written, rewrites the FilterCatalog and bumps DataVersion, the same
+as data_loader.py, so the API server drops its caches and ETags.
 """
 import csv
+import gzip
 import os
-from neo4j import GraphDatabase
+import sys
 from dotenv import load_dotenv
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from neo4j_connection import create_driver
+from data_loader import Neo4jDataLoader
+
 
 def _to_float(value):
     try:
@@ -29,13 +38,18 @@ def main():
     if not uri or not user or not pwd:
         raise RuntimeError("NEO4J env not set")
 
-    csv_path = os.path.join("data", "neo4j_import", "rel_works_at.csv")
+    loader = Neo4jDataLoader()
+    # rel_works_at.csv, or rel_works_at.csv.gz from the generator's --gzip
+    csv_path = loader.csv_path("rel_works_at.csv")
     if not os.path.exists(csv_path):
         raise FileNotFoundError(csv_path)
+    opener = gzip.open if csv_path.endswith(".gz") else open
 
-    driver = GraphDatabase.driver(uri, auth=(user, pwd))
+    driver = create_driver("load-works-at", uri, user, pwd)
+    loader.driver = driver
     try:
-        with driver.session() as session, open(csv_path, newline="", encoding="utf-8") as f:
+        with driver.session(database=loader.database) as session, \
+                opener(csv_path, "rt", newline="", encoding="utf-8") as f:
             reader = csv.DictReader(f)
             for row in reader:
                 params = {
@@ -58,11 +72,15 @@ def main():
                     """,
                     params,
                 )
-        count = driver.session().run("MATCH ()-[r:WORKS_AT]->() RETURN count(r) as c").single()[
-            "c"
-        ]
+                loader.graph_changed = True
+        with driver.session(database=loader.database) as session:
+            count = session.run("MATCH ()-[r:WORKS_AT]->() RETURN count(r) as c").single()["c"]
         print(f"WORKS_AT rels: {count}")
+        loader.build_variance_cube()
     finally:
+        # a partial load still changes the graph; publish unless nothing was written
+        if loader.graph_changed:
+            loader.publish_data_version()
         driver.close()
 
 
@@ -0,0 +1,255 @@
+"""
+Neo4j 드라이버 공통 생성 모듈
+
+API 서버, 분석기, 대시보드/HTML 생성기, 적재/진단 스크립트가 모두 이 모듈로 드라이버를 만듭니다.
+- URI/SSL 변환: neo4j+s://, neo4j+ssc:// -> bolt:// + 인증서 검증을 끈 SSL 컨텍스트
+  기본은 URI 그대로(인증서 검증, 라우팅 유지). 원래 replace('neo4j+s://', 'bolt://')로 연결하던
+  분석/적재/진단/HTML 생성 스크립트만 ssl_rewrite=True로 호출하며, NEO4J_SSL_REWRITE=0이면 이 스크립트들도 URI 그대로 사용
+- 연결 풀 설정을 환경 변수로 조정 (아래 POOL_SETTINGS)
+- 연결 풀 지표: 사용 중/유휴 연결 수, 연결 획득 횟수/대기 시간/실패 (pool_metrics)
+
+드라이버는 프로세스당 하나를 만들어 재사용하고, 세션은 요청/작업마다 짧게 엽니다
+(세션 생성은 가볍고 연결은 풀에서 재사용됨).
+
+환경 변수 (.env):
+  NEO4J_URI, NEO4J_USERNAME, NEO4J_PASSWORD, NEO4J_DATABASE
+  NEO4J_SSL_REWRITE                     0이면 ssl_rewrite=True로 호출한 스크립트도 URI/SSL 변환 안 함 (기본 1)
+  NEO4J_MAX_POOL_SIZE                   주소당 최대 연결 수 (기본 100)
+  NEO4J_MAX_CONNECTION_LIFETIME         연결 최대 수명 초 (기본 3600)
+  NEO4J_CONNECTION_ACQUISITION_TIMEOUT  풀에서 연결을 얻을 때까지 최대 대기 초 (기본 60)
+  NEO4J_CONNECTION_TIMEOUT              새 연결 TCP 타임아웃 초 (기본 30)
+  NEO4J_LIVENESS_CHECK_TIMEOUT          이 시간(초) 이상 쉰 연결은 쓰기 전에 확인 (기본 확인 안 함)
+  NEO4J_FETCH_SIZE                      결과를 한 번에 받아오는 레코드 수 (기본 1000)
+  NEO4J_KEEP_ALIVE                      TCP keep-alive (기본 1)
+"""
+
+import os
+import ssl
+import time
+import inspect
+import threading
+
+from dotenv import load_dotenv
+from neo4j import AsyncGraphDatabase, GraphDatabase
+
+load_dotenv()
+
+# bolt:// + SSL 컨텍스트로 바꿔 연결하는 URI 스킴
+SSL_REWRITE_SCHEMES = ('neo4j+s://', 'neo4j+ssc://')
+
+
+def _env_bool(value):
+    return value.strip().lower() not in ('0', 'false', 'no', 'off', '')
+
+
+# 환경 변수 -> (드라이버 설정 이름, 변환 함수, 기본값), 기본값 None이면 드라이버 기본값 사용
+POOL_SETTINGS = {
+    'NEO4J_MAX_POOL_SIZE': ('max_connection_pool_size', int, 100),
+    'NEO4J_MAX_CONNECTION_LIFETIME': ('max_connection_lifetime', float, 3600),
+    'NEO4J_CONNECTION_ACQUISITION_TIMEOUT': ('connection_acquisition_timeout', float, 60),
+    'NEO4J_CONNECTION_TIMEOUT': ('connection_timeout', float, 30),
+    'NEO4J_LIVENESS_CHECK_TIMEOUT': ('liveness_check_timeout', float, None),
+    'NEO4J_FETCH_SIZE': ('fetch_size', int, 1000),
+    'NEO4J_KEEP_ALIVE': ('keep_alive', _env_bool, True),
+}
+
+# 연결 획득 대기 시간 구간 (초, 누적 아님)
+ACQUIRE_BUCKETS = (0.001, 0.005, 0.025, 0.1, 0.5, 2.5)
+
+
+def connection_settings():
+    """.env의 연결 정보 (uri, username, password, database)"""
+    return {
+        'uri': os.getenv('NEO4J_URI'),
+        'username': os.getenv('NEO4J_USERNAME', 'neo4j'),
+        'password': os.getenv('NEO4J_PASSWORD'),
+        'database': os.getenv('NEO4J_DATABASE', 'neo4j'),
+    }
+
+
+def rewrite_uri(uri, ssl_rewrite=False):
+    """ssl_rewrite=True면 neo4j+s:// / neo4j+ssc:// URI를 bolt:// + 인증서 검증 없는 SSL 컨텍스트로 변환
+
+    NEO4J_SSL_REWRITE=0이면 ssl_rewrite=True여도 변환하지 않음 (환경 변수로 켜지는 않음)
+    반환: (연결할 URI, ssl_context 또는 None)
+    """
+    if ssl_rewrite and not _env_bool(os.getenv('NEO4J_SSL_REWRITE', '1')):
+        ssl_rewrite = False
+    if not ssl_rewrite or not uri or not uri.startswith(SSL_REWRITE_SCHEMES):
+        return uri, None
+    for scheme in SSL_REWRITE_SCHEMES:
+        uri = uri.replace(scheme, 'bolt://')
+    ssl_context = ssl.create_default_context()
+    ssl_context.check_hostname = False
+    ssl_context.verify_mode = ssl.CERT_NONE
+    return uri, ssl_context
+
+
+def pool_config(**overrides):
+    """환경 변수로 정한 연결 풀 설정 (overrides가 우선, 값이 None인 항목은 드라이버 기본값)"""
+    config = {}
+    for env_name, (option, convert, default) in POOL_SETTINGS.items():
+        raw = os.getenv(env_name)
+        value = convert(raw) if raw not in (None, '') else default
+        if value is not None:
+            config[option] = value
+    for option, value in overrides.items():
+        if value is None:
+            config.pop(option, None)
+        else:
+            config[option] = value
+    return config
+
+
+class PoolMetrics:
+    """연결 획득 횟수/대기 시간/실패 집계 (드라이버 내부 풀의 acquire를 감싸 측정)"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.acquisitions = 0
+        self.failures = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.buckets = [0] * (len(ACQUIRE_BUCKETS) + 1)
+
+    def record(self, seconds, ok=True):
+        with self.lock:
+            if not ok:
+                self.failures += 1
+                return
+            self.acquisitions += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+            index = next((i for i, bound in enumerate(ACQUIRE_BUCKETS) if seconds <= bound),
+                         len(ACQUIRE_BUCKETS))
+            self.buckets[index] += 1
+
+    def snapshot(self):
+        with self.lock:
+            labels = [f'<={bound}s' for bound in ACQUIRE_BUCKETS] + [f'>{ACQUIRE_BUCKETS[-1]}s']
+            return {
+                'acquisitions': self.acquisitions,
+                'acquire_failures': self.failures,
+                'acquire_wait_avg_ms': round(self.wait_total / self.acquisitions * 1000, 3)
+                if self.acquisitions else 0,
+                'acquire_wait_max_ms': round(self.wait_max * 1000, 3),
+                'acquire_wait_histogram': dict(zip(labels, self.buckets)),
+            }
+
+
+# 이름 -> (드라이버, PoolMetrics), pool_metrics()로 한 번에 조회
+_drivers = {}
+_drivers_lock = threading.Lock()
+
+
+def _instrument_pool(driver, metrics):
+    """드라이버 내부 풀의 acquire를 시간 측정 래퍼로 교체 (내부 구조가 다르면 False)"""
+    pool = getattr(driver, '_pool', None)
+    acquire = getattr(pool, 'acquire', None)
+    if acquire is None:
+        return False
+
+    if inspect.iscoroutinefunction(acquire):
+        async def timed_acquire(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                connection = await acquire(*args, **kwargs)
+            except Exception:
+                metrics.record(time.perf_counter() - started, ok=False)
+                raise
+            metrics.record(time.perf_counter() - started)
+            return connection
+    else:
+        def timed_acquire(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                connection = acquire(*args, **kwargs)
+            except Exception:
+                metrics.record(time.perf_counter() - started, ok=False)
+                raise
+            metrics.record(time.perf_counter() - started)
+            return connection
+
+    pool.acquire = timed_acquire
+    return True
+
+
+def _register(name, driver):
+    metrics = PoolMetrics()
+    if not _instrument_pool(driver, metrics):
+        metrics = None
+    with _drivers_lock:
+        _drivers[name] = (driver, metrics)
+    return driver
+
+
+def create_driver(name='default', uri=None, username=None, password=None, ssl_rewrite=False, **overrides):
+    """공통 설정으로 동기 드라이버 생성 (name으로 풀 지표 등록)
+
+    uri/username/password를 생략하면 .env 값 사용, ssl_rewrite는 rewrite_uri 참고 (기본 URI 그대로),
+    overrides는 드라이버 설정 직접 지정
+    (예: max_connection_pool_size=workers + 2)
+    """
+    settings = connection_settings()
+    uri, ssl_context = rewrite_uri(uri or settings['uri'], ssl_rewrite)
+    config = pool_config(**overrides)
+    if ssl_context is not None:
+        config['ssl_context'] = ssl_context
+    driver = GraphDatabase.driver(
+        uri, auth=(username or settings['username'], password or settings['password']), **config
+    )
+    return _register(name, driver)
+
+
+def create_async_driver(name='default-async', uri=None, username=None, password=None, ssl_rewrite=False,
+                        **overrides):
+    """create_driver의 비동기 드라이버 버전 (이벤트 루프 안에서 호출)"""
+    settings = connection_settings()
+    uri, ssl_context = rewrite_uri(uri or settings['uri'], ssl_rewrite)
+    config = pool_config(**overrides)
+    if ssl_context is not None:
+        config['ssl_context'] = ssl_context
+    driver = AsyncGraphDatabase.driver(
+        uri, auth=(username or settings['username'], password or settings['password']), **config
+    )
+    return _register(name, driver)
+
+
+def _pool_connections(driver):
+    """주소별 사용 중/유휴 연결 수 (풀 내부 구조를 읽을 수 없으면 None)"""
+    pool = getattr(driver, '_pool', None)
+    connections = getattr(pool, 'connections', None)
+    if connections is None:
+        return None
+    addresses = {}
+    for address, pooled in list(connections.items()):
+        pooled = list(pooled)
+        in_use = sum(1 for connection in pooled if getattr(connection, 'in_use', False))
+        addresses[str(address)] = {'in_use': in_use, 'idle': len(pooled) - in_use}
+    return addresses
+
+
+def pool_metrics():
+    """등록된 드라이버별 연결 풀 지표"""
+    with _drivers_lock:
+        drivers = dict(_drivers)
+    result = {}
+    for name, (driver, metrics) in drivers.items():
+        config = getattr(getattr(driver, '_pool', None), 'pool_config', None)
+        addresses = _pool_connections(driver)
+        entry = {
+            'max_pool_size': getattr(config, 'max_connection_pool_size', None),
+            'in_use': sum(a['in_use'] for a in addresses.values()) if addresses is not None else None,
+            'idle': sum(a['idle'] for a in addresses.values()) if addresses is not None else None,
+            'addresses': addresses,
+        }
+        if metrics is not None:
+            entry.update(metrics.snapshot())
+        result[name] = entry
+    return result
+
+
+def unregister_driver(name):
+    """close한 드라이버를 지표 목록에서 제거"""
+    with _drivers_lock:
+        _drivers.pop(name, None)
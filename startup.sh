@@ -6,6 +6,7 @@ echo "Starting LG Battery Cost Analysis System..."
 # Python 패키지 설치
 pip install -r requirements.txt
 
-# Flask 서버 시작
+# API 서버 시작 (gunicorn 멀티 워커, 워커별 warm-up/종료 처리는 visualization/gunicorn.conf.py)
+# 워커/스레드 수: API_WORKERS, API_THREADS 환경 변수
 cd visualization
-gunicorn --bind=0.0.0.0:8000 --timeout 600 graph_api_server:app
+exec gunicorn -c gunicorn.conf.py graph_api_server:app
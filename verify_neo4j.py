@@ -1,22 +1,9 @@
 """
 Neo4j 데이터 검증 스크립트
 """
-from neo4j import GraphDatabase
-from dotenv import load_dotenv
-import os
-import ssl
+from neo4j_connection import create_driver
 
-load_dotenv()
-
-uri = os.getenv('NEO4J_URI').replace('neo4j+s://', 'bolt://')
-username = os.getenv('NEO4J_USERNAME')
-password = os.getenv('NEO4J_PASSWORD')
-
-ssl_context = ssl.create_default_context()
-ssl_context.check_hostname = False
-ssl_context.verify_mode = ssl.CERT_NONE
-
-driver = GraphDatabase.driver(uri, auth=(username, password), ssl_context=ssl_context)
+driver = create_driver('verify', ssl_rewrite=True)
 
 print("\n[Neo4j 데이터 검증]")
 print("=" * 70)
@@ -0,0 +1,366 @@
+"""
+API 요청 지표 / Cypher PROFILE 수집
+
+graph_api_server.py(Flask)와 graph_api_async.py(ASGI)가 같은 레지스트리를 씁니다.
+- 경로(라우트 템플릿)별 요청 수, 처리 시간 히스토그램
+- 요청 안에서 Neo4j에 쓴 시간(쿼리 실행 + 결과 수신)과 JSON 직렬화 시간, 쿼리 수, 결과 행 수
+- 라우트가 예외를 잡고 빈 데이터로 응답한 횟수 (report_exception)
+- GET /api/_metrics: Prometheus 텍스트 형식 (연결 풀 지표 포함)
+- ?profile=1: 요청이 실행한 Cypher 문마다 PROFILE 계획 요약 (연산자별 rows, db hits)
+
+요청 상태는 contextvars로 관리하므로 스레드(Flask)와 코루틴(ASGI) 모두에서 동작합니다.
+"""
+
+import time
+import threading
+import traceback
+import contextvars
+
+# 처리 시간 히스토그램 구간 (초)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# PROFILE 응답에 넣는 쿼리 문자열 최대 길이
+PROFILE_QUERY_CHARS = 400
+
+_current = contextvars.ContextVar('api_request_metrics', default=None)
+
+
+class RequestContext:
+    """요청 1건의 측정값"""
+
+    def __init__(self, profile=False):
+        self.started = time.perf_counter()
+        self.profile = profile
+        self.neo4j_seconds = 0.0
+        self.serialize_seconds = 0.0
+        self.queries = 0
+        self.rows = 0
+        self.errors = 0
+        self.statements = []
+
+    def profile_payload(self):
+        total = time.perf_counter() - self.started
+        return {
+            'total_ms': round(total * 1000, 3),
+            'neo4j_ms': round(self.neo4j_seconds * 1000, 3),
+            'serialize_ms': round(self.serialize_seconds * 1000, 3),
+            'queries': self.queries,
+            'rows': self.rows,
+            'db_hits': sum(statement['db_hits'] for statement in self.statements),
+            'statements': self.statements,
+        }
+
+
+def current():
+    """현재 요청의 RequestContext (요청 밖이면 None)"""
+    return _current.get()
+
+
+def profiling():
+    """현재 요청이 ?profile=1인지 (캐시를 건너뛰고 쿼리를 실제로 실행해야 함)"""
+    ctx = _current.get()
+    return ctx is not None and ctx.profile
+
+
+def start_request(profile=False):
+    ctx = RequestContext(profile)
+    _current.set(ctx)
+    return ctx
+
+
+def end_request():
+    _current.set(None)
+
+
+def add_serialize_time(seconds):
+    ctx = _current.get()
+    if ctx is not None:
+        ctx.serialize_seconds += seconds
+
+
+def report_exception():
+    """잡은 예외를 출력하고 현재 요청의 오류 수에 더함 (빈 데이터로 응답하는 라우트용)"""
+    traceback.print_exc()
+    ctx = _current.get()
+    if ctx is not None:
+        ctx.errors += 1
+
+
+def _flatten_plan(plan, depth=0):
+    """드라이버 PROFILE 계획(dict) -> 연산자 목록 [{operator, depth, rows, db_hits, details}]"""
+    if not plan:
+        return []
+    get = plan.get if isinstance(plan, dict) else (lambda key, default=None: getattr(plan, key, default))
+    args = get('args') or get('arguments') or {}
+    operators = [{
+        'operator': get('operatorType') or get('operator_type') or '',
+        'depth': depth,
+        'rows': get('rows') or 0,
+        'db_hits': get('dbHits') or get('db_hits') or 0,
+        'details': args.get('Details', '') if isinstance(args, dict) else '',
+    }]
+    for child in get('children') or []:
+        operators.extend(_flatten_plan(child, depth + 1))
+    return operators
+
+
+def record_statement(ctx, query, seconds, rows, plan=None):
+    """Cypher 문 1개 실행 결과를 요청에 기록 (plan: PROFILE 결과)"""
+    ctx.queries += 1
+    ctx.rows += rows
+    if ctx.profile:
+        operators = _flatten_plan(plan)
+        ctx.statements.append({
+            'query': ' '.join(query.split())[:PROFILE_QUERY_CHARS],
+            'ms': round(seconds * 1000, 3),
+            'rows': rows,
+            'db_hits': sum(op['db_hits'] for op in operators),
+            'operators': operators,
+        })
+
+
+def profile_query(ctx, query):
+    """PROFILE을 붙여 실행할 쿼리 (profile 요청이 아니거나 이미 PROFILE/EXPLAIN이면 그대로)"""
+    if ctx is None or not ctx.profile or query.lstrip().upper().startswith(('PROFILE', 'EXPLAIN')):
+        return query, False
+    return 'PROFILE ' + query, True
+
+
+# ============================================================
+# 동기 드라이버 계측 (세션/결과를 감싸 Neo4j 시간과 행 수 측정)
+# ============================================================
+
+class InstrumentedResult:
+    """Result 래퍼: 결과를 받아오는 시간과 행 수를 요청에 더하고, 다 읽으면 PROFILE 계획 기록"""
+
+    def __init__(self, result, ctx, query, profiled, seconds):
+        self._result = result
+        self._ctx = ctx
+        self._query = query
+        self._profiled = profiled
+        self._seconds = seconds
+        self._rows = 0
+        self._done = False
+
+    def _timed(self, fn, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - started
+            self._seconds += elapsed
+            self._ctx.neo4j_seconds += elapsed
+
+    def _finish(self, summary=None):
+        if self._done:
+            return summary
+        self._done = True
+        plan = None
+        if self._profiled:
+            if summary is None:
+                summary = self._timed(self._result.consume)
+            plan = summary.profile
+        record_statement(self._ctx, self._query, self._seconds, self._rows, plan)
+        return summary
+
+    def data(self, *keys):
+        rows = self._timed(self._result.data, *keys)
+        self._rows += len(rows)
+        self._finish()
+        return rows
+
+    def single(self, strict=False):
+        record = self._timed(self._result.single, strict)
+        self._rows += record is not None
+        self._finish()
+        return record
+
+    def peek(self):
+        return self._timed(self._result.peek)
+
+    def consume(self):
+        return self._finish(self._timed(self._result.consume))
+
+    def __iter__(self):
+        iterator = iter(self._result)
+        while True:
+            try:
+                record = self._timed(next, iterator)
+            except StopIteration:
+                self._finish()
+                return
+            self._rows += 1
+            yield record
+
+    def __getattr__(self, name):
+        return getattr(self._result, name)
+
+
+class InstrumentedSession:
+    def __init__(self, session):
+        self._session = session
+
+    def __enter__(self):
+        self._session.__enter__()
+        return self
+
+    def __exit__(self, *exc_info):
+        return self._session.__exit__(*exc_info)
+
+    def run(self, query, parameters=None, **kwargs):
+        ctx = _current.get()
+        if ctx is None:
+            return self._session.run(query, parameters, **kwargs)
+        text, profiled = profile_query(ctx, query)
+        started = time.perf_counter()
+        result = self._session.run(text, parameters, **kwargs)
+        elapsed = time.perf_counter() - started
+        ctx.neo4j_seconds += elapsed
+        return InstrumentedResult(result, ctx, query, profiled, elapsed)
+
+    def __getattr__(self, name):
+        return getattr(self._session, name)
+
+
+class InstrumentedDriver:
+    """동기 드라이버 래퍼 (session()만 계측, 나머지는 그대로 위임)"""
+
+    def __init__(self, driver):
+        self._driver = driver
+
+    def session(self, *args, **kwargs):
+        return InstrumentedSession(self._driver.session(*args, **kwargs))
+
+    def __getattr__(self, name):
+        return getattr(self._driver, name)
+
+
+async def run_async_query(session, query, params):
+    """비동기 세션에서 쿼리 실행 -> 결과 행(dict) 목록 (현재 요청에 시간/행 수/PROFILE 기록)"""
+    ctx = _current.get()
+    if ctx is None:
+        result = await session.run(query, **params)
+        return await result.data()
+    text, profiled = profile_query(ctx, query)
+    started = time.perf_counter()
+    result = await session.run(text, **params)
+    rows = await result.data()
+    plan = (await result.consume()).profile if profiled else None
+    elapsed = time.perf_counter() - started
+    ctx.neo4j_seconds += elapsed
+    record_statement(ctx, query, elapsed, len(rows), plan)
+    return rows
+
+
+# ============================================================
+# 지표 레지스트리 / Prometheus 텍스트
+# ============================================================
+
+class Histogram:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.total += value
+        self.count += 1
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+
+
+class ApiMetrics:
+    """프로세스 전체 요청 지표 (요청이 끝날 때 RequestContext를 합산)"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = {}        # (route, method, status) -> 횟수
+        self.latency = {}         # (route, method) -> Histogram
+        self.neo4j = {}           # route -> Histogram
+        self.serialize = {}       # route -> Histogram
+        self.queries = {}         # route -> 쿼리 수
+        self.rows = {}            # route -> 결과 행 수
+        self.errors = {}          # route -> report_exception 횟수
+
+    def observe(self, ctx, route, method, status):
+        elapsed = time.perf_counter() - ctx.started
+        with self.lock:
+            key = (route, method, str(status))
+            self.requests[key] = self.requests.get(key, 0) + 1
+            self.latency.setdefault((route, method), Histogram()).observe(elapsed)
+            self.neo4j.setdefault(route, Histogram()).observe(ctx.neo4j_seconds)
+            self.serialize.setdefault(route, Histogram()).observe(ctx.serialize_seconds)
+            self.queries[route] = self.queries.get(route, 0) + ctx.queries
+            self.rows[route] = self.rows.get(route, 0) + ctx.rows
+            if ctx.errors:
+                self.errors[route] = self.errors.get(route, 0) + ctx.errors
+
+    def prometheus(self, pools=None):
+        """Prometheus 텍스트 노출 형식 (pools: neo4j_connection.pool_metrics() 결과)"""
+        lines = []
+        with self.lock:
+            _counter(lines, 'api_requests_total', 'API 요청 수',
+                     {(('route', r), ('method', m), ('status', s)): v for (r, m, s), v in self.requests.items()})
+            _histogram(lines, 'api_request_duration_seconds', '요청 처리 시간 (초)',
+                       {(('route', r), ('method', m)): h for (r, m), h in self.latency.items()})
+            _histogram(lines, 'api_neo4j_duration_seconds', '요청당 Neo4j 쿼리 실행/결과 수신 시간 (초)',
+                       {(('route', r),): h for r, h in self.neo4j.items()})
+            _histogram(lines, 'api_serialize_duration_seconds', '요청당 JSON 직렬화 시간 (초)',
+                       {(('route', r),): h for r, h in self.serialize.items()})
+            _counter(lines, 'api_neo4j_queries_total', '실행한 Cypher 문 수',
+                     {(('route', r),): v for r, v in self.queries.items()})
+            _counter(lines, 'api_neo4j_rows_total', 'Neo4j에서 받은 결과 행 수',
+                     {(('route', r),): v for r, v in self.rows.items()})
+            _counter(lines, 'api_handled_errors_total', '예외를 잡고 빈 데이터로 응답한 횟수',
+                     {(('route', r),): v for r, v in self.errors.items()})
+        if pools:
+            for name, help_text, key in (
+                    ('neo4j_pool_in_use', '사용 중인 연결 수', 'in_use'),
+                    ('neo4j_pool_idle', '유휴 연결 수', 'idle'),
+                    ('neo4j_pool_max_size', '주소당 최대 연결 수', 'max_pool_size')):
+                _gauge(lines, name, help_text,
+                       {(('driver', d),): p[key] for d, p in pools.items() if p.get(key) is not None})
+            _counter(lines, 'neo4j_pool_acquisitions_total', '연결 획득 횟수',
+                     {(('driver', d),): p['acquisitions'] for d, p in pools.items() if 'acquisitions' in p})
+            _counter(lines, 'neo4j_pool_acquire_failures_total', '연결 획득 실패 횟수',
+                     {(('driver', d),): p['acquire_failures'] for d, p in pools.items() if 'acquire_failures' in p})
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(pairs):
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}' if pairs else ''
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _counter(lines, name, help_text, values, kind='counter'):
+    lines.append(f'# HELP {name} {help_text}')
+    lines.append(f'# TYPE {name} {kind}')
+    for labels, value in sorted(values.items()):
+        lines.append(f'{name}{_labels(labels)} {_number(value)}')
+
+
+def _gauge(lines, name, help_text, values):
+    _counter(lines, name, help_text, values, kind='gauge')
+
+
+def _histogram(lines, name, help_text, histograms):
+    lines.append(f'# HELP {name} {help_text}')
+    lines.append(f'# TYPE {name} histogram')
+    for labels, hist in sorted(histograms.items()):
+        for bound, count in zip(hist.buckets, hist.counts):
+            lines.append(f'{name}_bucket{_labels(labels + (("le", repr(bound)),))} {count}')
+        lines.append(f'{name}_bucket{_labels(labels + (("le", "+Inf"),))} {hist.count}')
+        lines.append(f'{name}_sum{_labels(labels)} {_number(hist.total)}')
+        lines.append(f'{name}_count{_labels(labels)} {hist.count}')
+
+
+# 프로세스 전체 레지스트리 (동기/비동기 서버 공용)
+metrics = ApiMetrics()
@@ -0,0 +1,88 @@
+"""
+/api/dashboard-data 집계 방식 벤치마크
+
+기존 개별 쿼리 6회(queries), 오더/차이 1회 스캔 후 Python 집계(single-pass),
+VarianceCube 셀 합산(cube)을 여러 필터 조합에서 실행해
+1. 응답 JSON이 기존 방식과 바이트 단위로 같은지 확인
+   (cube는 합산 순서가 달라 소수점 끝자리가 다를 수 있음)
+2. 평균 소요 시간 비교
+
+사용법:
+  python visualization/benchmark_dashboard_data.py
+  python visualization/benchmark_dashboard_data.py --repeat 20
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from graph_api_server import app, neo4j_conn, build_dashboard_data
+
+BACKENDS = ('queries', 'single-pass', 'cube')
+
+
+def filter_cases(session):
+    """필터 없음 / 제품 / 작업장 / 기간 / 전체 조합"""
+    product = session.run(
+        "MATCH (po:ProductionOrder) RETURN po.product_cd as v ORDER BY v LIMIT 1"
+    ).single()
+    work_center = session.run(
+        "MATCH (:ProductionOrder)-[:WORKS_AT]->(wc:WorkCenter) RETURN wc.id as v ORDER BY v LIMIT 1"
+    ).single()
+    month = session.run(
+        "MATCH (po:ProductionOrder) WHERE po.finish_month IS NOT NULL "
+        "RETURN po.finish_month as v ORDER BY v LIMIT 1"
+    ).single()
+    p = product['v'] if product else ''
+    w = work_center['v'] if work_center else ''
+    m = month['v'] if month else ''
+    return [('', '', ''), (p, '', ''), ('', w, ''), ('', '', m), (p, w, m)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='대시보드 집계 방식 벤치마크')
+    parser.add_argument('--repeat', type=int, default=10, help='필터 조합별 반복 횟수')
+    args = parser.parse_args()
+
+    if not neo4j_conn.driver:
+        print("[X] Neo4j 연결 정보가 없습니다 (.env의 NEO4J_URI, NEO4J_PASSWORD)")
+        sys.exit(1)
+
+    print("=" * 70)
+    print("/api/dashboard-data 집계 방식 벤치마크")
+    print("=" * 70)
+    all_same = True
+    try:
+        with app.app_context(), neo4j_conn.driver.session() as session:
+            print(f"\n  {'제품/작업장/기간':<36}" + ''.join(f"{b + '(ms)':>16}" for b in BACKENDS)
+                  + "  응답(single-pass / cube)")
+            for case in filter_cases(session):
+                payloads, elapsed = {}, {}
+                for backend in BACKENDS:
+                    build_dashboard_data(session, *case, backend=backend)  # 워밍업
+                    started = time.perf_counter()
+                    for _ in range(args.repeat):
+                        data = build_dashboard_data(session, *case, backend=backend)
+                    elapsed[backend] = (time.perf_counter() - started) / args.repeat * 1000
+                    payloads[backend] = app.json.dumps(data)
+                same = {b: payloads[b] == payloads['queries'] for b in BACKENDS[1:]}
+                all_same = all_same and same['single-pass']
+                label = '/'.join(v or '-' for v in case)
+                print(f"  {label:<36}" + ''.join(f"{elapsed[b]:>16.1f}" for b in BACKENDS)
+                      + "  " + ' / '.join('[OK] 동일' if same[b] else '[X] 다름' for b in BACKENDS[1:]))
+                for backend in BACKENDS[1:]:
+                    if not same[backend]:
+                        old, new = json.loads(payloads['queries']), json.loads(payloads[backend])
+                        diff_keys = [k for k in old if old[k] != new[k]]
+                        print(f"      {backend} 다른 항목: {', '.join(diff_keys)}")
+    finally:
+        neo4j_conn.close()
+    if not all_same:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
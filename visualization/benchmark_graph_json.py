@@ -0,0 +1,132 @@
+"""
+그래프 응답 직렬화 벤치마크 (Neo4j 없이 합성 그래프로 측정)
+
+graph_node가 만드는 것과 같은 모양의 노드 N개(속성에 Neo4j Date/DateTime 포함)와 엣지로
+1. 노드 속성 변환: 기존 serialize_neo4j_types(dict(node)) 재귀 변환 vs node_properties 1단계 변환
+2. 인코딩: 기존 Flask 기본 jsonify(표준 json, ASCII 이스케이프) vs json_codec (orjson 또는 표준 json)
+3. 응답 크기: 기존 행 형식 vs 열 형식(?format=columnar)
+을 비교합니다.
+
+사용법:
+  python visualization/benchmark_graph_json.py
+  python visualization/benchmark_graph_json.py --nodes 10000 --repeat 5
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+
+from flask.json.provider import DefaultJSONProvider
+from neo4j.time import Date, DateTime
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import json_codec
+from graph_api_server import GRAPH_EDGE_COLORS, GRAPH_NODE_STYLES, columnar_graph, serialize_neo4j_types
+
+NODE_TYPES = list(GRAPH_NODE_STYLES)
+EDGE_LABELS = list(GRAPH_EDGE_COLORS)
+
+
+def synthetic_properties(count, seed=42):
+    """생산오더/차이와 비슷한 속성 dict 목록"""
+    rng = random.Random(seed)
+    rows = []
+    for i in range(count):
+        day = Date(2024, rng.randint(1, 12), rng.randint(1, 28))
+        rows.append({
+            'id': f'PO{i:07d}',
+            'product_cd': f'P{rng.randint(1, 300):04d}',
+            'description': f'생산오더 {i} 원가차이 분석 대상',
+            'order_date': day,
+            'finish_date': DateTime(day.year, day.month, day.day, rng.randint(0, 23), rng.randint(0, 59), 0),
+            'planned_qty': rng.randint(100, 5000),
+            'variance_amount': round(rng.uniform(-50000, 50000), 2),
+            'tags': ['MATERIAL', 'LABOR'],
+        })
+    return rows
+
+
+def build_payload(properties, convert, seed=42):
+    rng = random.Random(seed)
+    nodes = []
+    for i, props in enumerate(properties):
+        node_type = NODE_TYPES[i % len(NODE_TYPES)]
+        label_keys, color, size = GRAPH_NODE_STYLES[node_type]
+        nodes.append({
+            'id': f'4:graph:{i}',
+            'label': props['id'],
+            'type': node_type,
+            'color': color or '#98D8C8',
+            'size': size,
+            'properties': convert(props),
+        })
+    edges = []
+    for i in range(len(nodes) * 3 // 2):
+        label = rng.choice(EDGE_LABELS)
+        edges.append({
+            'from': nodes[rng.randrange(len(nodes))]['id'],
+            'to': nodes[rng.randrange(len(nodes))]['id'],
+            'label': label,
+            'color': GRAPH_EDGE_COLORS[label],
+        })
+    return {'nodes': nodes, 'edges': edges, 'center': 'PO0000000'}
+
+
+def timed(repeat, func):
+    func()  # 워밍업
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return (time.perf_counter() - started) / repeat * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='그래프 응답 직렬화 벤치마크')
+    parser.add_argument('--nodes', type=int, default=10000, help='노드 수 (엣지는 1.5배)')
+    parser.add_argument('--repeat', type=int, default=5, help='반복 횟수')
+    args = parser.parse_args()
+
+    properties = synthetic_properties(args.nodes)
+
+    print("=" * 70)
+    print(f"그래프 응답 직렬화 벤치마크: 노드 {args.nodes:,}개, 엣지 {args.nodes * 3 // 2:,}개 "
+          f"(인코더: {json_codec.ENGINE})")
+    print("=" * 70)
+
+    old_ms, _ = timed(args.repeat, lambda: [serialize_neo4j_types(dict(p)) for p in properties])
+    new_ms, _ = timed(args.repeat, lambda: [json_codec.node_properties(p) for p in properties])
+    print(f"\n  노드 속성 변환   serialize_neo4j_types {old_ms:>9.1f} ms   node_properties {new_ms:>9.1f} ms")
+
+    payload = build_payload(properties, json_codec.node_properties)
+    flask_json = DefaultJSONProvider.default
+
+    def flask_dumps(obj):
+        return json.dumps(obj, default=flask_json, ensure_ascii=True, sort_keys=True,
+                          separators=(',', ':')).encode('utf-8')
+
+    cases = [
+        ('기존 jsonify (행 형식)', lambda: flask_dumps(payload)),
+        ('json_codec (행 형식)', lambda: json_codec.dumps_bytes(payload)),
+        ('json_codec (열 형식, 변환 포함)', lambda: json_codec.dumps_bytes(columnar_graph(payload))),
+    ]
+    print(f"\n  {'인코딩':<34}{'시간(ms)':>12}{'크기(KB)':>12}")
+    baseline = None
+    for name, func in cases:
+        ms, body = timed(args.repeat, func)
+        baseline = baseline or (ms, len(body))
+        print(f"  {name:<34}{ms:>12.1f}{len(body) / 1024:>12.1f}"
+              f"   (x{baseline[0] / ms:.1f} 속도, 크기 {len(body) / baseline[1] * 100:.0f}%)")
+
+    rows = json.loads(json_codec.dumps_bytes(payload))
+    if json.loads(flask_dumps(payload)) == rows:
+        print("\n  [OK] json_codec 결과가 기존 jsonify와 같은 값")
+    else:
+        print("\n  [X] json_codec 결과가 기존 jsonify와 다름")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
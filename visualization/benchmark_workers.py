@@ -0,0 +1,129 @@
+"""
+워커 수별 API 처리량 벤치마크 (gunicorn 멀티 워커)
+
+워커 수마다 serve_api.py와 같은 설정으로 gunicorn을 띄우고, 모든 워커의 warm-up이 끝난 뒤
+loadtest_api.py와 같은 요청 묶음(필터, 요약, 필터 요약, 대시보드 집계, 비교 분석)을
+동시 클라이언트 N개로 보내 처리량(req/s)과 p50/p99 지연을 비교합니다. 끝나면 SIGTERM으로 정상 종료합니다.
+
+기본은 집계 캐시를 켠 상태(응답 직렬화 위주, 프로세스 수에 따른 CPU 확장 확인)이고,
+--no-cache면 API_CACHE=0으로 매 요청 Neo4j를 조회합니다.
+
+사용법:
+  python visualization/benchmark_workers.py
+  python visualization/benchmark_workers.py --workers 1,2,4,8 --threads 4 --clients 64
+  python visualization/benchmark_workers.py --no-cache
+"""
+
+import os
+import sys
+import time
+import signal
+import argparse
+import threading
+import subprocess
+import http.client
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from loadtest_api import _connect, load_test, percentile
+from serve_api import gunicorn_available, gunicorn_command
+
+
+def start_server(workers, threads, port, cache, timeout):
+    """gunicorn 기동 후 워커 workers개의 warm-up 완료(또는 생략) 로그를 기다림"""
+    env = dict(os.environ, API_CACHE='1' if cache else '0', API_WARM_UP='1', PYTHONUNBUFFERED='1')
+    process = subprocess.Popen(gunicorn_command(workers, threads, port), env=env,
+                               stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    ready = threading.Semaphore(0)
+
+    def read_output():
+        for line in process.stdout:
+            if 'warm-up' in line:
+                ready.release()
+                if line.startswith('[X]'):
+                    print(f"    {line.rstrip()}")
+
+    threading.Thread(target=read_output, daemon=True).start()
+    deadline = time.monotonic() + timeout
+    for _ in range(workers):
+        if not ready.acquire(timeout=max(0, deadline - time.monotonic())):
+            stop_server(process)
+            raise RuntimeError(f'워커 {workers}개 warm-up이 {timeout}초 안에 끝나지 않음')
+    return process
+
+
+def stop_server(process, timeout=60):
+    """SIGTERM으로 정상 종료 (처리 중 요청 마무리, 워커별 드라이버 close)"""
+    process.send_signal(signal.SIGTERM)
+    try:
+        return process.wait(timeout)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        return process.wait()
+
+
+def server_responds(base_url):
+    try:
+        conn = _connect(base_url, timeout=10)
+        conn.request('GET', '/test')
+        ok = conn.getresponse().status == 200
+        conn.close()
+        return ok
+    except (OSError, http.client.HTTPException):
+        return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description='워커 수별 API 처리량 벤치마크 (gunicorn)')
+    parser.add_argument('--workers', default='1,2,4', help='비교할 워커 수 목록 (쉼표 구분)')
+    parser.add_argument('--threads', type=int, default=4, help='워커당 스레드 수')
+    parser.add_argument('--clients', type=int, default=32, help='동시 클라이언트 수')
+    parser.add_argument('--requests', type=int, default=50, help='클라이언트당 요청 수')
+    parser.add_argument('--port', type=int, default=8100, help='벤치마크용 포트')
+    parser.add_argument('--no-cache', action='store_true', help='집계 캐시 끔 (API_CACHE=0)')
+    parser.add_argument('--startup-timeout', type=int, default=180, help='워커 warm-up 대기 최대 초')
+    args = parser.parse_args()
+
+    if not gunicorn_available():
+        print("[X] gunicorn이 설치되어 있지 않습니다: pip install gunicorn (Windows는 미지원)")
+        sys.exit(1)
+
+    worker_counts = [int(value) for value in args.workers.split(',') if value.strip()]
+    base_url = f'http://127.0.0.1:{args.port}'
+    print("=" * 78)
+    print(f"워커 수별 처리량: 스레드 {args.threads}개/워커, 동시 클라이언트 {args.clients}개 x 요청 {args.requests}회, "
+          f"캐시 {'끔' if args.no_cache else '켬'}")
+    print("=" * 78)
+
+    results = {}
+    for workers in worker_counts:
+        print(f"\n  워커 {workers}개 기동 중...")
+        try:
+            process = start_server(workers, args.threads, args.port, not args.no_cache, args.startup_timeout)
+        except RuntimeError as e:
+            print(f"  [X] {e}")
+            continue
+        try:
+            if not server_responds(base_url):
+                print(f"  [X] 워커 {workers}개: 서버 응답 없음")
+                continue
+            latencies, errors, wall = load_test(base_url, args.clients, args.requests)
+        finally:
+            code = stop_server(process)
+            print(f"  [OK] 워커 {workers}개 종료 (exit {code})")
+        results[workers] = (latencies, errors, wall)
+
+    if not results:
+        sys.exit(1)
+
+    base = None
+    print(f"\n  {'워커':>6}{'처리량(req/s)':>16}{'배율':>8}{'p50(ms)':>10}{'p99(ms)':>10}{'오류':>6}")
+    for workers, (latencies, errors, wall) in results.items():
+        values = [ms for _, ms in latencies]
+        throughput = len(values) / wall if wall else 0
+        base = base or throughput
+        print(f"  {workers:>6}{throughput:>16.1f}{throughput / base if base else 0:>8.2f}"
+              f"{percentile(values, 50):>10.1f}{percentile(values, 99):>10.1f}{errors:>6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -11,29 +11,20 @@ GraphDB를 활용한 원가차이 드릴다운 분석
 """
 
 import os
-import ssl
+import sys
 import json
 from datetime import datetime
-from neo4j import GraphDatabase
 from dotenv import load_dotenv
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from neo4j_connection import create_driver
+
 load_dotenv()
 
 
 class InteractiveGraphDashboard:
     def __init__(self):
-        uri = os.getenv('NEO4J_URI')
-        username = os.getenv('NEO4J_USERNAME')
-        password = os.getenv('NEO4J_PASSWORD')
-        
-        uri = uri.replace('neo4j+s://', 'bolt://')
-        uri = uri.replace('neo4j+ssc://', 'bolt://')
-        
-        ssl_context = ssl.create_default_context()
-        ssl_context.check_hostname = False
-        ssl_context.verify_mode = ssl.CERT_NONE
-        
-        self.driver = GraphDatabase.driver(uri, auth=(username, password), ssl_context=ssl_context)
+        self.driver = create_driver('interactive-dashboard', ssl_rewrite=True)
     
     def close(self):
         self.driver.close()
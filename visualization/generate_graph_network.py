@@ -10,28 +10,18 @@ Neo4j 그래프 네트워크 시각화 - 자동 실행 버전
   - material: Material 소비 그래프
 """
 import os
-import ssl
 import sys
 from dotenv import load_dotenv
-from neo4j import GraphDatabase
 from pyvis.network import Network
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from neo4j_connection import create_driver
+
 load_dotenv()
 
 class Neo4jGraphVisualizer:
     def __init__(self):
-        uri = os.getenv('NEO4J_URI')
-        username = os.getenv('NEO4J_USERNAME')
-        password = os.getenv('NEO4J_PASSWORD')
-        
-        uri = uri.replace('neo4j+s://', 'bolt://')
-        uri = uri.replace('neo4j+ssc://', 'bolt://')
-        
-        ssl_context = ssl.create_default_context()
-        ssl_context.check_hostname = False
-        ssl_context.verify_mode = ssl.CERT_NONE
-        
-        self.driver = GraphDatabase.driver(uri, auth=(username, password), ssl_context=ssl_context)
+        self.driver = create_driver('graph-network', ssl_rewrite=True)
     
     def close(self):
         self.driver.close()
@@ -5,37 +5,23 @@ Neo4j 원가차이 분석 - 인터랙티브 HTML 리포트 생성
 결과: variance_analysis_report.html 파일 생성 (브라우저로 열기!)
 """
 import os
-import ssl
+import sys
 from dotenv import load_dotenv
-from neo4j import GraphDatabase
 import plotly.graph_objects as go
 import plotly.express as px
 from plotly.subplots import make_subplots
 import pandas as pd
 from datetime import datetime
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from neo4j_connection import create_driver
+
 # .env 파일 로드
 load_dotenv()
 
 class VarianceVisualizer:
     def __init__(self):
-        uri = os.getenv('NEO4J_URI')
-        username = os.getenv('NEO4J_USERNAME')
-        password = os.getenv('NEO4J_PASSWORD')
-        
-        # URI 변경 및 SSL 설정
-        uri = uri.replace('neo4j+s://', 'bolt://')
-        uri = uri.replace('neo4j+ssc://', 'bolt://')
-        
-        ssl_context = ssl.create_default_context()
-        ssl_context.check_hostname = False
-        ssl_context.verify_mode = ssl.CERT_NONE
-        
-        self.driver = GraphDatabase.driver(
-            uri,
-            auth=(username, password),
-            ssl_context=ssl_context
-        )
+        self.driver = create_driver('html-report', ssl_rewrite=True)
     
     def close(self):
         self.driver.close()
@@ -0,0 +1,360 @@
+"""
+원가차이 그래프 탐색 API 서버 (비동기 ASGI 버전)
+
+graph_api_server.py와 같은 경로, 같은 JSON 응답을 제공합니다.
+- neo4j AsyncGraphDatabase 드라이버 + Starlette(ASGI), uvicorn으로 실행
+- 집계 API(/api/summary, /api/filters, /api/filtered_summary, /api/dashboard-data,
+  /api/comparison-data, /api/cache/stats)는 이벤트 루프에서 비동기로 처리하고
+  서로 독립적인 쿼리(대시보드 집계 6개, 필터 목록 4개, 비교 대상 유형별 쿼리)는
+  asyncio.gather로 각자 세션에서 동시에 실행
+- 그 밖의 경로(그래프 탐색, 노드 확장, HTML 페이지, /api/_metrics)는 기존 Flask 앱을
+  스레드 풀(ASYNC_API_WSGI_THREADS)에서 그대로 실행
+- 요청 지표/PROFILE은 api_metrics 레지스트리를 Flask 앱과 함께 사용 (GET /api/_metrics, ?profile=1)
+쿼리/집계 코드는 graph_api_server.py와 공유하므로 응답은 바이트 단위로 같습니다.
+
+실행:
+  python visualization/graph_api_async.py                       (기본 포트 8001)
+  cd visualization && uvicorn graph_api_async:app --port 8001 --workers 4
+부하 비교: python visualization/loadtest_api.py --clients 50
+"""
+
+import os
+import sys
+import json
+import asyncio
+from contextlib import asynccontextmanager
+
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import Response
+from starlette.routing import Mount, Route
+from a2wsgi import WSGIMiddleware
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import api_metrics
+import http_cache
+import graph_api_server as sync_api
+from api_metrics import metrics, profiling, report_exception, run_async_query
+from neo4j_connection import connection_settings, create_async_driver, unregister_driver
+from graph_api_server import (
+    CACHE_ENABLED, CACHE_MISS, CACHE_TTL, CUBE_CELLS_QUERY, CUBE_READY_QUERY,
+    DASHBOARD_SCAN_QUERY, DATA_VERSION_QUERY, ETAG_EXCLUDED_ROUTES, FILTER_CATALOG_QUERY, FILTER_QUERIES,
+    SUMMARY_QUERY,
+    ResultCache, _dashboard_result, _default_summary, _filter_params,
+    comparison_query_groups, cube_top_orders_query, dashboard_payload,
+    dashboard_queries, dashboard_queries_result, filter_catalog_result, filter_options_result,
+    filtered_summary_query, filtered_summary_result, fold_comparison,
+    fold_cube_cells, fold_dashboard_rows,
+)
+
+ASYNC_API_PORT = int(os.getenv('ASYNC_API_PORT', '8001'))
+# Flask로 처리하는 동기 경로용 스레드 수
+WSGI_THREADS = int(os.getenv('ASYNC_API_WSGI_THREADS', '10'))
+
+EMPTY_FILTERS = {'products': [], 'work_centers': [], 'materials': [], 'months': []}
+EMPTY_FILTERED_SUMMARY = {'total_variance': 0, 'total_count': 0, 'by_type': []}
+
+
+def empty_dashboard():
+    return {
+        'summary': _default_summary(),
+        'monthly_trend': [], 'by_type': [], 'by_product': [], 'by_process': [], 'top_orders': []
+    }
+
+
+class AsyncNeo4jConnection:
+    """비동기 드라이버 연결 (이벤트 루프 안에서 connect/close)"""
+    # 연결 풀 지표 이름 (GET /api/pool/stats)
+    name = 'api-async'
+
+    def __init__(self):
+        self.driver = None
+
+    def connect(self):
+        settings = connection_settings()
+        if not settings['uri'] or not settings['password']:
+            print("Warning: NEO4J_URI or NEO4J_PASSWORD not set. API will return empty data.")
+            return
+        try:
+            self.driver = create_async_driver(self.name)
+        except Exception as e:
+            print(f"Warning: Neo4j async driver init failed: {e}. API will return empty data.")
+            self.driver = None
+
+    async def close(self):
+        if self.driver:
+            try:
+                await self.driver.close()
+            except Exception:
+                pass
+            unregister_driver(self.name)
+            self.driver = None
+
+    async def data(self, query, **params):
+        """쿼리 1개를 자체 세션에서 실행해 결과 행(dict) 목록 반환 (동시 실행용, 요청 지표에 기록)"""
+        async with self.driver.session() as session:
+            return await run_async_query(session, query, params)
+
+    async def gather(self, queries):
+        """{이름: (쿼리, 파라미터)}를 동시에 실행 -> {이름: 결과 행}"""
+        rows = await asyncio.gather(*(self.data(query, **params) for query, params in queries.values()))
+        return dict(zip(queries, rows))
+
+
+neo4j_conn = AsyncNeo4jConnection()
+# 데이터 버전 조회는 요청 처리 중 비동기로 하므로 version_fetcher 없이 생성
+api_cache = ResultCache(CACHE_TTL)
+
+
+async def sync_data_version():
+    """ResultCache.sync_version의 비동기 버전 (확인 주기 이내면 생략, 바뀌었으면 캐시 전체 무효화)"""
+    if not api_cache.version_check_due():
+        return
+    try:
+        rows = await neo4j_conn.data(DATA_VERSION_QUERY)
+        api_cache.apply_version(rows[0]['token'] if rows else None)
+    except Exception as e:
+        # 확인에 실패하면 기존 캐시를 유지하고 TTL에 맡김
+        print(f"Warning: data version check failed: {e}")
+
+
+async def cached_result(endpoint, params, compute):
+    """graph_api_server.cached_result의 비동기 버전 (compute는 코루틴 함수)"""
+    if not CACHE_ENABLED or profiling():
+        return await compute()
+    await sync_data_version()
+    key, value, version = api_cache.lookup(endpoint, params)
+    if value is CACHE_MISS:
+        value = await compute()
+        api_cache.store(key, version, value)
+    return value
+
+
+def json_response(data):
+    """Flask jsonify와 같은 직렬화 (json_codec, 키 정렬, 공백 없는 구분자, 끝 줄바꿈)"""
+    body = sync_api.app.json.dumps_bytes(data) + b'\n'
+    return Response(body, media_type='application/json')
+
+
+def encode_response(response, etag, encoding):
+    """graph_api_server._encode_response와 같은 처리 (ETag 헤더, gzip/br 압축)"""
+    if response.status_code != 200:
+        return response
+    ctx = api_metrics.current()
+    # 예외를 잡고 빈 데이터로 응답했으면 ETag를 붙이지 않음 (304로 빈 응답이 고정되지 않도록)
+    if ctx is not None and ctx.errors:
+        etag = None
+    if etag:
+        response.headers['ETag'] = etag
+        response.headers['Cache-Control'] = 'no-cache'
+    if not http_cache.compressible(response.media_type):
+        return response
+    response.headers.add_vary_header('Accept-Encoding')
+    if encoding and len(response.body) >= http_cache.COMPRESS_MIN_BYTES:
+        response.body = http_cache.compress(response.body, encoding)
+        response.headers['Content-Encoding'] = encoding
+        response.headers['Content-Length'] = str(len(response.body))
+    return response
+
+
+def instrumented(path, endpoint):
+    """네이티브 라우트의 요청 지표, ETag/304, 압축, ?profile=1 응답 (Flask로 넘기는 경로는 Flask 앱이 처리)"""
+    async def handler(request):
+        ctx = api_metrics.start_request(profile=request.query_params.get('profile') == '1')
+        status = 500
+        try:
+            encoding = http_cache.negotiate_encoding(request.headers.get('accept-encoding'))
+            etag = None
+            if (request.method == 'GET' and path not in ETAG_EXCLUDED_ROUTES
+                    and not ctx.profile and neo4j_conn.driver):
+                await sync_data_version()
+                etag = http_cache.api_etag(api_cache.data_version, request.method, request.url.path,
+                                           request.query_params.multi_items(), encoding)
+                if http_cache.etag_matches(request.headers.get('if-none-match'), etag):
+                    status = 304
+                    return Response(status_code=304, headers={
+                        'ETag': etag, 'Cache-Control': 'no-cache', 'Vary': 'Accept-Encoding'
+                    })
+            response = await endpoint(request)
+            if ctx.profile and response.media_type == 'application/json':
+                response = json_response({'response': json.loads(response.body), 'profile': ctx.profile_payload()})
+            response = encode_response(response, etag, encoding)
+            status = response.status_code
+            return response
+        finally:
+            metrics.observe(ctx, path, request.method, status)
+            api_metrics.end_request()
+    return handler
+
+
+async def json_body(request):
+    try:
+        return await request.json() or {}
+    except ValueError:
+        return {}
+
+
+async def variance_cube_ready():
+    rows = await neo4j_conn.data(CUBE_READY_QUERY)
+    return rows[0]['ready']
+
+
+# ============================================================
+# 집계 API
+# ============================================================
+
+async def get_summary(request):
+    """요약 통계"""
+    if not neo4j_conn.driver:
+        return json_response([])
+
+    async def compute():
+        return await neo4j_conn.data(SUMMARY_QUERY)
+
+    return json_response(await cached_result('summary', {}, compute))
+
+
+async def _filter_options():
+    catalog = filter_catalog_result(await neo4j_conn.data(FILTER_CATALOG_QUERY))
+    if catalog is not None:
+        return catalog
+    results = await neo4j_conn.gather({name: (query, {}) for name, query in FILTER_QUERIES.items()})
+    return filter_options_result(results)
+
+
+async def get_filters(request):
+    """필터 옵션 - 제품, 공정, 기간, 원자재 (카탈로그가 없으면 목록 쿼리 4개 동시 실행)"""
+    if not neo4j_conn.driver:
+        return json_response(EMPTY_FILTERS)
+    try:
+        return json_response(await cached_result('filters', {}, _filter_options))
+    except Exception:
+        report_exception()
+        return json_response(EMPTY_FILTERS)
+
+
+async def get_filtered_summary(request):
+    """필터 적용된 요약 통계"""
+    params = _filter_params(await json_body(request))
+    if not neo4j_conn.driver:
+        return json_response(EMPTY_FILTERED_SUMMARY)
+
+    async def compute():
+        type_query = filtered_summary_query(await variance_cube_ready(),
+                                            params['work_center'], params['month'])
+        return filtered_summary_result(await neo4j_conn.data(type_query, **params))
+
+    try:
+        return json_response(await cached_result('filtered_summary', params, compute))
+    except Exception:
+        report_exception()
+        return json_response(EMPTY_FILTERED_SUMMARY)
+
+
+async def build_dashboard_data(product, work_center, month, backend=None):
+    """graph_api_server.build_dashboard_data의 비동기 버전
+
+    queries: 개별 쿼리 6개 동시 실행, cube: 셀 조회와 상위 오더 조회 동시 실행,
+    single-pass: 스캔 1회 후 집계는 스레드에서 (이벤트 루프를 막지 않도록)
+    """
+    backend = backend or sync_api.DASHBOARD_BACKEND
+    if backend == 'cube' and not await variance_cube_ready():
+        backend = 'single-pass'
+    filters = {'product': product, 'work_center': work_center, 'month': month}
+    if backend == 'queries':
+        data = dashboard_queries_result(await neo4j_conn.gather(dashboard_queries(product, work_center, month)))
+    elif backend == 'cube':
+        results = await neo4j_conn.gather({
+            'cells': (CUBE_CELLS_QUERY, {}),
+            'top_orders': (cube_top_orders_query(work_center), filters),
+        })
+        folded = fold_cube_cells(results['cells'], product, work_center, month)
+        data = _dashboard_result(*folded, results['top_orders'])
+    else:
+        rows = await neo4j_conn.data(DASHBOARD_SCAN_QUERY, **filters)
+        data = await asyncio.to_thread(fold_dashboard_rows, rows, product, work_center, month)
+    return dashboard_payload(data)
+
+
+async def get_dashboard_data(request):
+    """대시보드 데이터 제공"""
+    params = _filter_params(await json_body(request))
+    if not neo4j_conn.driver:
+        return json_response(empty_dashboard())
+
+    async def compute():
+        return await build_dashboard_data(params['product'], params['work_center'], params['month'])
+
+    try:
+        return json_response(await cached_result('dashboard_data', params, compute))
+    except Exception:
+        report_exception()
+        return json_response(empty_dashboard())
+
+
+async def get_comparison_data(request):
+    """비교 분석 데이터 제공 (대상 유형별 쿼리 동시 실행, 요청 순서 유지)"""
+    targets = (await json_body(request)).get('targets', [])
+    if not neo4j_conn.driver:
+        return json_response({'summaries': [], 'trends': []})
+    source = 'cube' if await variance_cube_ready() else 'variance'
+    params, groups = comparison_query_groups(targets, source)
+    results = await asyncio.gather(*(neo4j_conn.data(query, targets=group) for query, group in groups))
+    summaries, trends = fold_comparison(params, [record for rows in results for record in rows])
+    return json_response({
+        'summaries': summaries,
+        'trends': trends if trends else []
+    })
+
+
+async def get_cache_stats(request):
+    """집계 캐시 적중/미적중 통계"""
+    return json_response(api_cache.stats())
+
+
+@asynccontextmanager
+async def lifespan(app):
+    neo4j_conn.connect()
+    try:
+        yield
+    finally:
+        await neo4j_conn.close()
+        sync_api.neo4j_conn.close()
+
+
+routes = [
+    Route(path, instrumented(path, endpoint), methods=methods)
+    for path, endpoint, methods in (
+        ('/api/summary', get_summary, ['GET']),
+        ('/api/filters', get_filters, ['GET']),
+        ('/api/filtered_summary', get_filtered_summary, ['POST']),
+        ('/api/dashboard-data', get_dashboard_data, ['POST']),
+        ('/api/comparison-data', get_comparison_data, ['POST']),
+        ('/api/cache/stats', get_cache_stats, ['GET']),
+    )
+] + [
+    # 나머지 경로는 기존 Flask 앱 (동기 드라이버, 스레드 풀)
+    Mount('/', app=WSGIMiddleware(sync_api.app, workers=WSGI_THREADS)),
+]
+
+app = Starlette(
+    routes=routes,
+    middleware=[Middleware(CORSMiddleware, allow_origins=['*'], allow_methods=['*'], allow_headers=['*'])],
+    lifespan=lifespan,
+)
+
+
+if __name__ == '__main__':
+    import uvicorn
+
+    print("=" * 80)
+    print("  Variance Graph API Server (async)")
+    print("=" * 80)
+    print(f"\nAddress: http://localhost:{ASYNC_API_PORT}")
+    print("\nAsync APIs:")
+    for route in routes[:-1]:
+        print(f"  {'/'.join(sorted(route.methods - {'HEAD'}))} {route.path}")
+    print(f"\nOther routes: Flask app (threads: {WSGI_THREADS})")
+    print("=" * 80 + "\n")
+    uvicorn.run(app, host='0.0.0.0', port=ASYNC_API_PORT)
@@ -8,23 +8,164 @@ Flask 기반 REST API로 Neo4j 그래프 데이터를 동적으로 제공
 """
 
 import os
-import ssl
+import sys
 import json
+import base64
+import binascii
+import time
+import threading
+from collections import OrderedDict
 from datetime import datetime
-from flask import Flask, jsonify, request, send_file
+from flask import Flask, Response, g, jsonify, request, stream_with_context
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
-from neo4j import GraphDatabase
 from neo4j.time import DateTime, Date
 from dotenv import load_dotenv
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from neo4j_connection import connection_settings, create_driver, pool_metrics, unregister_driver
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import api_metrics
+import http_cache
+import json_codec
+from api_metrics import InstrumentedDriver, metrics, profiling, report_exception
+from json_codec import node_properties
+
 load_dotenv()
 
+
+class ApiJSONProvider(DefaultJSONProvider):
+    """jsonify를 json_codec(orjson 우선)으로 인코딩하고 직렬화 시간을 요청 지표에 기록"""
+
+    ensure_ascii = False
+
+    def dumps_bytes(self, obj, indent=None):
+        started = time.perf_counter()
+        try:
+            return json_codec.dumps_bytes(obj, sort_keys=self.sort_keys, indent=indent)
+        finally:
+            api_metrics.add_serialize_time(time.perf_counter() - started)
+
+    def dumps(self, obj, **kwargs):
+        """separators/indent 외의 json.dumps 인자를 주면 표준 json으로"""
+        if set(kwargs) - {'separators', 'indent'}:
+            started = time.perf_counter()
+            try:
+                return super().dumps(obj, **kwargs)
+            finally:
+                api_metrics.add_serialize_time(time.perf_counter() - started)
+        return self.dumps_bytes(obj, kwargs.get('indent')).decode('utf-8')
+
+    def response(self, *args, **kwargs):
+        """jsonify: str로 되돌리지 않고 인코딩한 bytes로 바로 응답"""
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = 2 if (self.compact is None and self._app.debug) or self.compact is False else None
+        return self._app.response_class(self.dumps_bytes(obj, indent) + b'\n', mimetype=self.mimetype)
+
+
 app = Flask(__name__)
+app.json = ApiJSONProvider(app)
 CORS(app)  # CORS 활성화
 
 
+# 데이터와 무관하게 매번 새로 계산하는 GET 경로 (ETag/304 제외)
+ETAG_EXCLUDED_ROUTES = ('/api/_metrics', '/api/cache/stats', '/api/pool/stats')
+
+
+@app.before_request
+def _start_request_metrics():
+    api_metrics.start_request(profile=request.args.get('profile') == '1')
+    g.content_encoding = http_cache.negotiate_encoding(request.headers.get('Accept-Encoding'))
+    g.api_etag = None
+
+
+@app.before_request
+def _check_not_modified():
+    """API GET: 데이터 버전 + 요청 파라미터로 ETag를 만들고, If-None-Match와 같으면 핸들러 없이 304"""
+    if (request.method != 'GET' or not request.path.startswith('/api/') or request.url_rule is None
+            or request.url_rule.rule in ETAG_EXCLUDED_ROUTES or profiling() or not neo4j_conn.driver):
+        return None
+    # 데이터 버전은 DATA_VERSION_CHECK_SECONDS마다 한 번만 조회 (그 사이 요청은 Neo4j를 거치지 않음)
+    api_cache.sync_version()
+    g.api_etag = http_cache.api_etag(api_cache.data_version, request.method, request.path,
+                                     request.args.items(multi=True), g.content_encoding)
+    if http_cache.etag_matches(request.headers.get('If-None-Match'), g.api_etag):
+        response = Response(status=304)
+        response.headers['ETag'] = g.api_etag
+        response.headers['Cache-Control'] = 'no-cache'
+        response.vary.add('Accept-Encoding')
+        return response
+    return None
+
+
+# after_request는 등록 역순으로 실행: PROFILE 감싸기 -> ETag/압축 -> 지표 기록
+
+@app.after_request
+def _finish_request_metrics(response):
+    """경로별 지표 기록 (스트림 응답은 결과 커서를 다 읽고 응답을 닫을 때 기록)"""
+    ctx = api_metrics.current()
+    if ctx is None:
+        return response
+    route = request.url_rule.rule if request.url_rule else 'unmatched'
+    method, status = request.method, response.status_code
+    if response.is_streamed:
+        # after_request 시점에는 NDJSON 생성기가 아직 결과를 읽지 않았으므로 Neo4j 시간/행 수가 빠짐
+        response.call_on_close(lambda: metrics.observe(ctx, route, method, status))
+    else:
+        metrics.observe(ctx, route, method, status)
+    return response
+
+
+@app.after_request
+def _encode_response(response):
+    """API ETag 헤더와 Accept-Encoding에 따른 gzip/br 압축 (스트림은 청크 단위 압축)"""
+    if response.status_code != 200:
+        return response
+    etag = g.get('api_etag')
+    ctx = api_metrics.current()
+    # 예외를 잡고 빈 데이터로 응답했으면 ETag를 붙이지 않음 (304로 빈 응답이 고정되지 않도록)
+    if ctx is not None and ctx.errors:
+        etag = None
+    if etag and 'ETag' not in response.headers:
+        response.headers['ETag'] = etag
+        # 브라우저가 저장해 두되 매번 ETag로 재검증
+        response.headers['Cache-Control'] = 'no-cache'
+    if (response.direct_passthrough or 'Content-Encoding' in response.headers
+            or not http_cache.compressible(response.mimetype)):
+        return response
+    response.vary.add('Accept-Encoding')
+    encoding = g.get('content_encoding')
+    if encoding is None:
+        return response
+    if response.is_streamed:
+        response.response = http_cache.compress_stream(response.response, encoding)
+        response.headers.pop('Content-Length', None)
+    else:
+        body = response.get_data()
+        if len(body) < http_cache.COMPRESS_MIN_BYTES:
+            return response
+        response.set_data(http_cache.compress(body, encoding))
+    response.headers['Content-Encoding'] = encoding
+    return response
+
+
+@app.after_request
+def _wrap_profile_response(response):
+    """?profile=1이면 JSON 응답을 {'response', 'profile'}로 감쌈 (스트림 제외)"""
+    ctx = api_metrics.current()
+    if ctx is not None and ctx.profile and response.is_json and not response.is_streamed:
+        body = {'response': response.get_json(), 'profile': ctx.profile_payload()}
+        response.set_data(app.json.dumps_bytes(body) + b'\n')
+    return response
+
+
+@app.teardown_request
+def _clear_request_metrics(exc):
+    api_metrics.end_request()
+
+
 def serialize_neo4j_types(obj):
-    """Neo4j 타입을 JSON 직렬화 가능한 형태로 변환"""
+    """Neo4j 타입을 JSON 직렬화 가능한 형태로 변환 (중첩 구조용, 노드 속성은 node_properties)"""
     if isinstance(obj, (DateTime, Date)):
         return obj.isoformat()
     elif isinstance(obj, dict):
@@ -62,18 +203,20 @@ def get_node_color(node_type):
 
 
 class Neo4jConnection:
+    # 연결 풀 지표 이름 (GET /api/pool/stats)
+    name = 'api'
+
     def __init__(self):
         self.driver = None
-        uri = os.getenv('NEO4J_URI')
-        username = os.getenv('NEO4J_USERNAME')
-        password = os.getenv('NEO4J_PASSWORD')
-        if not uri or not password:
+        settings = connection_settings()
+        if not settings['uri'] or not settings['password']:
             print("Warning: NEO4J_URI or NEO4J_PASSWORD not set. API will return empty data.")
             return
         try:
-            print(f"Connecting to Neo4j: {uri}")
-            print(f"Username: {username}")
-            self.driver = GraphDatabase.driver(uri, auth=(username, password))
+            print(f"Connecting to Neo4j: {settings['uri']}")
+            print(f"Username: {settings['username']}")
+            # 세션/결과를 감싸 요청별 Neo4j 시간, 행 수, PROFILE 기록 (api_metrics)
+            self.driver = InstrumentedDriver(create_driver(self.name))
         except Exception as e:
             print(f"Warning: Neo4j driver init failed: {e}. API will return empty data.")
             self.driver = None
@@ -84,6 +227,7 @@ class Neo4jConnection:
                 self.driver.close()
             except Exception:
                 pass
+            unregister_driver(self.name)
             self.driver = None
 
 
@@ -91,28 +235,692 @@ class Neo4jConnection:
 neo4j_conn = Neo4jConnection()
 
 
+# ============================================================
+# 집계 결과 캐시 (TTL + LRU, 데이터 버전 변경 시 전체 무효화)
+# ============================================================
+
+# 엔드포인트별 캐시 유지 시간 (초)
+CACHE_TTL = {
+    'summary': 300,
+    # 필터 카탈로그는 적재할 때만 바뀌고 데이터 버전이 바뀌면 캐시가 비워지므로 길게
+    'filters': 3600,
+    'overview': 300,
+    'filtered_summary': 120,
+    'dashboard_data': 120,
+}
+CACHE_ENABLED = os.getenv('API_CACHE', '1') != '0'
+CACHE_MAX_ENTRIES = int(os.getenv('API_CACHE_MAX_ENTRIES', '256'))
+# 데이터 버전 토큰 확인 주기 (초, 0이면 요청마다 확인)
+DATA_VERSION_CHECK_SECONDS = float(os.getenv('DATA_VERSION_CHECK_SECONDS', '1'))
+# neo4j/data_loader.py가 적재할 때마다 갱신하는 토큰
+DATA_VERSION_QUERY = "MATCH (d:DataVersion {id: 'current'}) RETURN d.token as token"
+
+
+def fetch_data_version():
+    """현재 데이터 버전 토큰 (로더가 아직 기록하지 않았으면 None)"""
+    with neo4j_conn.driver.session() as session:
+        record = session.run(DATA_VERSION_QUERY).single()
+        return record['token'] if record else None
+
+
+# 캐시에 없음을 나타내는 값 (None도 캐시할 수 있도록 별도 객체)
+CACHE_MISS = object()
+
+
+class ResultCache:
+    """엔드포인트 + 필터 파라미터 단위 결과 캐시
+
+    - 항목 수가 max_entries를 넘으면 가장 오래 쓰지 않은 항목부터 제거 (LRU)
+    - 항목은 엔드포인트별 TTL이 지나면 만료
+    - 데이터 버전 토큰이 바뀌면 전체 무효화
+    """
+
+    def __init__(self, ttls, max_entries=CACHE_MAX_ENTRIES, version_fetcher=None,
+                 version_check_seconds=DATA_VERSION_CHECK_SECONDS):
+        self.ttls = ttls
+        self.max_entries = max_entries
+        self.version_fetcher = version_fetcher
+        self.version_check_seconds = version_check_seconds
+        self.entries = OrderedDict()  # key -> (만료 시각, 값)
+        self.lock = threading.Lock()
+        self.data_version = None
+        self.version_checked_at = None
+        self.hits = {name: 0 for name in ttls}
+        self.misses = {name: 0 for name in ttls}
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def version_check_due(self):
+        """데이터 버전을 확인할 차례인지 (확인 주기 이내면 False, True면 확인 시각 기록)"""
+        now = time.monotonic()
+        if (self.version_checked_at is not None
+                and now - self.version_checked_at < self.version_check_seconds):
+            return False
+        self.version_checked_at = now
+        return True
+
+    def apply_version(self, version):
+        """조회한 데이터 버전 반영, 바뀌었으면 전체 무효화"""
+        with self.lock:
+            if version != self.data_version:
+                if self.entries:
+                    self.invalidations += 1
+                self.entries.clear()
+                self.data_version = version
+
+    def sync_version(self):
+        """데이터 버전 확인 (확인 주기 이내면 생략), 바뀌었으면 전체 무효화"""
+        if self.version_fetcher is None or not self.version_check_due():
+            return
+        try:
+            version = self.version_fetcher()
+        except Exception as e:
+            # 확인에 실패하면 기존 캐시를 유지하고 TTL에 맡김
+            print(f"Warning: data version check failed: {e}")
+            return
+        self.apply_version(version)
+
+    def lookup(self, endpoint, params):
+        """캐시 조회 -> (키, 값 또는 CACHE_MISS, 조회 시점 데이터 버전)"""
+        key = (endpoint, tuple(sorted(params.items())))
+        now = time.monotonic()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self.entries.move_to_end(key)
+                    self.hits[endpoint] += 1
+                    return key, entry[1], self.data_version
+                del self.entries[key]
+                self.expirations += 1
+            self.misses[endpoint] += 1
+            return key, CACHE_MISS, self.data_version
+
+    def store(self, key, version, value):
+        """lookup 이후 계산한 값 저장"""
+        with self.lock:
+            # 계산 중 데이터 버전이 바뀌었으면 이전 데이터 결과이므로 저장하지 않음
+            if version == self.data_version:
+                self.entries[key] = (time.monotonic() + self.ttls[key[0]], value)
+                self.entries.move_to_end(key)
+                while len(self.entries) > self.max_entries:
+                    self.entries.popitem(last=False)
+                    self.evictions += 1
+
+    def fetch(self, endpoint, params, compute):
+        """캐시된 값 반환, 없거나 만료됐으면 compute() 결과를 저장 후 반환
+
+        compute()가 예외를 내면 저장하지 않고 그대로 전파한다.
+        """
+        self.sync_version()
+        key, value, version = self.lookup(endpoint, params)
+        if value is CACHE_MISS:
+            value = compute()
+            self.store(key, version, value)
+        return value
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self):
+        with self.lock:
+            hits = sum(self.hits.values())
+            misses = sum(self.misses.values())
+            return {
+                'enabled': CACHE_ENABLED,
+                'size': len(self.entries),
+                'max_entries': self.max_entries,
+                'data_version': self.data_version,
+                'hits': hits,
+                'misses': misses,
+                'hit_rate': round(hits / (hits + misses), 4) if hits + misses else 0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations,
+                'endpoints': {
+                    name: {'hits': self.hits[name], 'misses': self.misses[name], 'ttl': ttl}
+                    for name, ttl in self.ttls.items()
+                }
+            }
+
+
+api_cache = ResultCache(CACHE_TTL, version_fetcher=fetch_data_version)
+
+
+def cached_result(endpoint, params, compute):
+    """캐시 사용 설정에 따라 api_cache를 거쳐 compute() 결과 반환 (?profile=1이면 캐시를 거치지 않음)"""
+    if not CACHE_ENABLED or profiling():
+        return compute()
+    return api_cache.fetch(endpoint, params, compute)
+
+
+def _filter_params(data):
+    """제품/작업장/기간 필터 정규화 (null과 빈 값은 필터 없음)"""
+    return {key: data.get(key) or '' for key in ('product', 'work_center', 'month')}
+
+
+# ============================================================
+# 오더 단위 그래프 (엔티티 그래프 공통)
+#   중심 노드 -> 연결된 오더 1건씩 (오더, 차이, 원인, 원자재, 공정, 제품 노드와 실제 관계)
+#   기본 응답: 중심 노드와 오더별 이웃을 쿼리 1번으로 (차이-원인 쌍도 같은 쿼리에서)
+#   ?stream=1: 결과 커서를 한 행씩 NDJSON으로 보내므로 오더 수와 무관하게 서버 메모리가 일정
+#   페이지: (order_date, 오더 id) 순으로 limit건씩, 다음 페이지는 next_cursor로 요청
+# ============================================================
+
+# 노드 유형별 표시 (라벨 속성 후보, 색상, 크기)
+GRAPH_NODE_STYLES = {
+    'Product': (('name', 'id'), '#FF6B6B', 30),
+    'ProductionOrder': (('id',), '#45B7D1', 35),
+    'Variance': (('variance_name', 'id'), None, 25),
+    'Material': (('name', 'id'), '#4ECDC4', 25),
+    'WorkCenter': (('name', 'id'), '#FFA07A', 28),
+    'Cause': (('description', 'code'), '#F7DC6F', 25),
+}
+
+# 관계 유형별 엣지 색상 (HAS_VARIANCE는 차이 금액에 따라)
+GRAPH_EDGE_COLORS = {
+    'PRODUCES': '#FF6B6B',
+    'HAS_VARIANCE': '#98D8C8',
+    'CONSUMES': '#4ECDC4',
+    'WORKS_AT': '#FFA07A',
+    'CAUSED_BY': '#F7DC6F',
+    'NEXT_SAME_PRODUCT': '#45B7D1',
+}
+
+# 중심 유형 -> (노드 라벨, 중심 노드 패턴 n, n과 연결된 오더 po를 찾는 절, 중심 노드 크기)
+GRAPH_CENTERS = {
+    'product': ('Product', "(n:Product {id: $key})",
+                "MATCH (n)<-[:PRODUCES]-(po:ProductionOrder)", 45),
+    # Product 노드 없이 오더의 product_cd로만 찾는 경우 (가상 중심 노드)
+    'product_cd': ('Product', None,
+                   "MATCH (po:ProductionOrder) WHERE po.product_cd = $key", 45),
+    'material': ('Material', "(n:Material {id: $key})",
+                 "MATCH (n)<-[:CONSUMES]-(po:ProductionOrder)", 45),
+    'workcenter': ('WorkCenter', "(n:WorkCenter {id: $key})",
+                   "MATCH (n)<-[:WORKS_AT]-(po:ProductionOrder)", 45),
+    'variance': ('Variance', "(n:Variance {id: $key})",
+                 "MATCH (n)<-[:HAS_VARIANCE]-(po:ProductionOrder)", 30),
+    'cause': ('Cause', "(n:Cause {code: $key})",
+              "MATCH (n)<-[:CAUSED_BY]-(:Variance)<-[:HAS_VARIANCE]-(po:ProductionOrder)", 35),
+    'production_order': ('ProductionOrder', "(n:ProductionOrder {id: $key})", "WITH n, n as po", 40),
+}
+
+# 오더 -> 중심 노드 관계와 그 관계가 들어 있는 이웃 목록
+# (이웃 목록을 가져오면 거기서 연결, cause는 차이를 거쳐 links로, production_order는 오더가 중심)
+GRAPH_CENTER_LINKS = {
+    'product': ('PRODUCES', 'products'),
+    'product_cd': ('PRODUCES', None),
+    'material': ('CONSUMES', 'materials'),
+    'workcenter': ('WORKS_AT', 'workcenters'),
+    'variance': ('HAS_VARIANCE', 'variances'),
+}
+
+# 오더 이웃 목록 -> Cypher 식 ({cut}: fanout 자르기, {causes}: 차이별 원인 목록)
+ORDER_NEIGHBOUR_FIELDS = {
+    'variances': "[(po)-[:HAS_VARIANCE]->(v:Variance) | [v, {causes}]]{cut}",
+    'materials': "[(po)-[:CONSUMES]->(m:Material) | m]{cut}",
+    'workcenters': "[(po)-[:WORKS_AT]->(wc:WorkCenter) | wc]{cut}",
+    'products': "[(po)-[:PRODUCES]->(p:Product) | p]{cut}",
+    # 같은 제품의 직전/다음 생산오더 (production_order 중심에서만)
+    'prev_orders': "[(prev:ProductionOrder)-[:NEXT_SAME_PRODUCT]->(po) | prev]{cut}",
+    'next_orders': "[(po)-[:NEXT_SAME_PRODUCT]->(next:ProductionOrder) | next]{cut}",
+}
+
+# depth -> 가져올 이웃 (1: 오더와 중심 연결, 2: 오더의 차이/원자재/공정/제품/전후 오더, 3: 차이의 원인)
+GRAPH_DEPTH_NEIGHBOURS = {
+    1: (),
+    2: ('variances', 'materials', 'workcenters', 'products', 'chain'),
+    3: ('variances', 'causes', 'materials', 'workcenters', 'products', 'chain'),
+}
+GRAPH_MAX_DEPTH = 3
+
+# 기본(페이지 없는) 응답 범위: 중심 유형 -> (이웃, 차이 합계 절댓값 상위 오더 수, None이면 전체)
+GRAPH_VIEWS = {
+    'product': (GRAPH_DEPTH_NEIGHBOURS[3], None),
+    # 원자재/공정 화면은 상위 5개 오더와 차이/제품만 간단하게
+    'material': (('variances', 'products'), 5),
+    'workcenter': (('variances', 'products'), 5),
+    'cause': (GRAPH_DEPTH_NEIGHBOURS[1], None),
+    'production_order': (GRAPH_DEPTH_NEIGHBOURS[3], None),
+}
+
+# 페이지 조건: (order_key, 오더 id) 커서 이후, order_key는 order_date 문자열 (없으면 '')
+GRAPH_PAGE_CLAUSE = """
+WITH n, po, coalesce(toString(po.order_date), '') as order_key
+WHERE $after_id IS NULL OR order_key > $after_key OR (order_key = $after_key AND po.id > $after_id)
+WITH n, po, order_key
+ORDER BY order_key, po.id
+LIMIT $limit
+"""
+
+# 차이 합계 절댓값 상위 오더 (GRAPH_VIEWS의 상위 오더 수)
+GRAPH_TOP_ORDERS_CLAUSE = """
+OPTIONAL MATCH (po)-[:HAS_VARIANCE]->(tv:Variance)
+WITH n, po, sum(coalesce(tv.variance_amount, 0)) as total_variance
+ORDER BY abs(total_variance) DESC
+LIMIT {top}
+"""
+
+# 페이지 기본값/상한 (limit: 페이지당 오더 수, fanout: 오더 1건의 관계 유형별 최대 노드 수)
+GRAPH_PAGE_SIZE = int(os.getenv('GRAPH_PAGE_SIZE', '50'))
+GRAPH_MAX_PAGE_SIZE = int(os.getenv('GRAPH_MAX_PAGE_SIZE', '500'))
+GRAPH_FANOUT = int(os.getenv('GRAPH_FANOUT', '20'))
+GRAPH_MAX_FANOUT = int(os.getenv('GRAPH_MAX_FANOUT', '200'))
+# 페이지 모드로 응답하는 쿼리 파라미터
+GRAPH_PAGE_ARGS = ('limit', 'cursor', 'depth', 'fanout')
+
+# 스트리밍 응답에서 한 번에 내보내는 줄 수
+GRAPH_STREAM_FLUSH_LINES = 200
+# 열 형식 응답(?format=columnar)에서 값 목록 + 인덱스로 보내는 반복 문자열 열
+GRAPH_COLUMNAR_DICTIONARIES = {
+    'nodes': ('type', 'color'),
+    'edges': ('label', 'color', 'arrows'),
+}
+
+
+def order_neighbour_fields(kind, neighbours, fanout=False):
+    """오더 이웃 목록 [(이름, Cypher 식)] (fanout: 목록을 $fanout개로 자름)"""
+    cut = '[..$fanout]' if fanout else ''
+    causes = f"[(v)-[:CAUSED_BY]->(c:Cause) | c]{cut}" if 'causes' in neighbours else "[]"
+    names = [name for name in ('variances', 'materials', 'workcenters', 'products') if name in neighbours]
+    if kind == 'production_order' and 'chain' in neighbours:
+        names += ['prev_orders', 'next_orders']
+    fields = [(name, ORDER_NEIGHBOUR_FIELDS[name].format(cut=cut, causes=causes)) for name in names]
+    if kind == 'cause':
+        fields.append(('links', f"[(po)-[:HAS_VARIANCE]->(v:Variance)-[:CAUSED_BY]->(n) | v]{cut}"))
+    return fields
+
+
+def _order_match(kind, optional=False):
+    """중심 노드 n과 연결된 오더 po까지의 MATCH 절 목록"""
+    _, center, orders, _ = GRAPH_CENTERS[kind]
+    if optional and center and orders.startswith('MATCH'):
+        orders = 'OPTIONAL ' + orders
+    return ([f"MATCH {center}"] if center else []) + [orders]
+
+
+def order_graph_query(kind, neighbours=GRAPH_DEPTH_NEIGHBOURS[GRAPH_MAX_DEPTH], fanout=False, paged=False):
+    """중심 노드에 연결된 오더별 이웃 쿼리 (오더당 1행, 스트리밍/페이지용)
+
+    paged: GRAPH_PAGE_CLAUSE로 $limit건씩
+    """
+    lines = _order_match(kind)
+    lines.append("WITH DISTINCT n, po" if GRAPH_CENTERS[kind][1] else "WITH DISTINCT null as n, po")
+    lines.append(GRAPH_PAGE_CLAUSE.strip() if paged else "WITH n, po, null as order_key")
+    returns = ['po', 'order_key'] + [f"{expr} as {name}" for name, expr in order_neighbour_fields(kind, neighbours, fanout)]
+    return '\n'.join(lines) + '\nRETURN ' + ',\n       '.join(returns)
+
+
+def entity_graph_query(kind, neighbours, top=None):
+    """중심 노드 + 오더별 이웃을 한 행으로 (RETURN n, orders)
+
+    orders: [{po, variances: [[v, [원인]]], materials, ...}], 중심에 오더가 없으면 빈 목록
+    """
+    lines = _order_match(kind, optional=True)
+    if not GRAPH_CENTERS[kind][1]:
+        lines.append("WITH null as n, po")
+    if top:
+        lines.append(GRAPH_TOP_ORDERS_CLAUSE.strip().format(top=int(top)))
+    else:
+        lines.append("WITH DISTINCT n, po")
+    fields = ', '.join(f"{name}: {expr}" for name, expr in order_neighbour_fields(kind, neighbours))
+    order_map = f"{{po: po{', ' + fields if fields else ''}}}"
+    lines.append(f"RETURN n, collect(CASE WHEN po IS NULL THEN null ELSE {order_map} END) as orders")
+    return '\n'.join(lines)
+
+
+def graph_node(node, node_type, size=None, fallback=None):
+    """Neo4j 노드 -> 그래프 노드 dict"""
+    label_keys, color, default_size = GRAPH_NODE_STYLES[node_type]
+    label = next((node.get(key) for key in label_keys if node.get(key) is not None), fallback or node_type)
+    if color is None:
+        color = variance_color(node.get('variance_amount'))
+    return {
+        'id': node.element_id,
+        'label': label,
+        'type': node_type,
+        'color': color,
+        'size': size or default_size,
+        'properties': node_properties(node)
+    }
+
+
+def virtual_product_node(product_cd, size=45, note='Virtual node - Product not in Neo4j'):
+    """Product 노드가 없을 때 product_cd로 만드는 가상 노드"""
+    return {
+        'id': f"product_{product_cd}",
+        'label': product_cd,
+        'type': 'Product',
+        'color': '#FF6B6B',
+        'size': size,
+        'properties': {'id': product_cd, 'name': product_cd, 'note': note}
+    }
+
+
+def graph_edge(from_id, to_id, label, color=None):
+    return {'from': from_id, 'to': to_id, 'label': label, 'color': color or GRAPH_EDGE_COLORS[label]}
+
+
+def graph_payload(items, center, **extra):
+    """GraphEmitter 항목 -> {'nodes', 'edges', 'center', ...} 응답"""
+    nodes = []
+    edges = []
+    for item in items:
+        if item:
+            (nodes if item[0] == 'node' else edges).append(item[1])
+    return {'nodes': nodes, 'edges': edges, 'center': center, **extra}
+
+
+def columnar_graph(payload):
+    """{'nodes': [dict], 'edges': [dict], ...} -> 열 형식 그래프 (?format=columnar)
+
+    nodes/edges를 같은 길이의 열 배열({'id': [...], 'label': [...], 'type': [...], ...})로 바꾸고,
+    type/color처럼 반복되는 문자열 열은 dictionaries의 값 목록에 대한 인덱스 배열로 보낸다.
+    행에 없는 키는 null, 그 밖의 키(center, next_cursor, page 등)는 그대로 둔다.
+    """
+    result = {**payload, 'format': 'columnar', 'dictionaries': {}}
+    for section, dictionary_columns in GRAPH_COLUMNAR_DICTIONARIES.items():
+        rows = payload.get(section) or []
+        keys = {}
+        for row in rows:
+            for key in row:
+                keys.setdefault(key, None)
+        columns = {key: [row.get(key) for row in rows] for key in keys}
+        dictionaries = {}
+        for key in dictionary_columns:
+            if key in columns:
+                values = {}
+                columns[key] = [values.setdefault(value, len(values)) for value in columns[key]]
+                dictionaries[key] = list(values)
+        result[section] = columns
+        result['dictionaries'][section] = dictionaries
+    return result
+
+
+def graph_response(payload):
+    """그래프 응답 (?format=columnar면 열 형식, 대시보드 HTML이 선택적으로 사용)"""
+    if request.args.get('format') == 'columnar':
+        payload = columnar_graph(payload)
+    return jsonify(payload)
+
+
+def _ndjson(kind, data):
+    return json_codec.dumps_bytes({'kind': kind, **data}, sort_keys=False) + b'\n'
+
+
+class GraphEmitter:
+    """오더 행을 ('node' | 'edge', dict) 항목으로 변환 (엔티티 그래프 공통 직렬화)
+
+    오더/차이는 행마다 한 번만 나오므로 그대로 내보내고, 여러 오더가 공유하는
+    원자재/공정/제품/원인 노드만 id 집합으로 중복 제거 (집합 크기는 공유 노드 수에 비례)
+    fanout: 쿼리가 fanout + 1개까지 가져온 이웃 목록을 fanout개로 자르고 잘린 오더 수를 관계별로 기록
+    """
+
+    def __init__(self, fanout=None):
+        self.fanout = fanout
+        self.center = None
+        self.center_id = None
+        self.shared_ids = set()
+        self.node_count = 0
+        self.edge_count = 0
+        self.truncated = {}
+
+    def node(self, node, node_type, size=None, fallback=None):
+        self.node_count += 1
+        return 'node', graph_node(node, node_type, size, fallback)
+
+    def raw_node(self, data):
+        self.node_count += 1
+        return 'node', data
+
+    def shared_node(self, node, node_type, size=None):
+        if node.element_id in self.shared_ids:
+            return None
+        self.shared_ids.add(node.element_id)
+        return self.node(node, node_type, size)
+
+    def edge(self, from_id, to_id, label, color=None):
+        self.edge_count += 1
+        return 'edge', graph_edge(from_id, to_id, label, color)
+
+    def center_node(self, center, node_type, size, key):
+        """중심 노드 (center가 None이면 product_cd 가상 노드)"""
+        if center is None:
+            self.center_id = f"product_{key}"
+            return self.raw_node(virtual_product_node(key, size))
+        self.center = center
+        self.center_id = center.element_id
+        self.shared_ids.add(center.element_id)
+        return self.node(center, node_type, size=size, fallback=key)
+
+    def _cut(self, items, label):
+        if self.fanout and len(items) > self.fanout:
+            self.truncated[label] = self.truncated.get(label, 0) + 1
+            return items[:self.fanout]
+        return items
+
+    def order_items(self, record, kind, neighbours=GRAPH_DEPTH_NEIGHBOURS[GRAPH_MAX_DEPTH]):
+        """오더 1건(쿼리 행 또는 orders 목록의 map)의 노드/엣지 항목 (None 포함)"""
+        po = record['po']
+        po_id = po.element_id
+        if kind != 'production_order':
+            yield self.node(po, 'ProductionOrder')
+
+        # 중심 연결: 해당 이웃 목록을 가져왔으면 그 목록에서 연결되므로 따로 연결하지 않음
+        link, link_field = GRAPH_CENTER_LINKS.get(kind, (None, None))
+        if link and link_field not in neighbours:
+            color = variance_color(self.center.get('variance_amount')) if kind == 'variance' else None
+            yield self.edge(po_id, self.center_id, link, color)
+        for v in self._cut(record.get('links') or [], 'CAUSED_BY'):
+            if 'variances' not in neighbours:
+                yield self.node(v, 'Variance')
+                yield self.edge(po_id, v.element_id, 'HAS_VARIANCE', variance_color(v.get('variance_amount')))
+            if 'causes' not in neighbours:
+                yield self.edge(v.element_id, self.center_id, 'CAUSED_BY')
+
+        for v, causes in self._cut(record.get('variances') or [], 'HAS_VARIANCE'):
+            if v.element_id != self.center_id:
+                yield self.node(v, 'Variance')
+            yield self.edge(po_id, v.element_id, 'HAS_VARIANCE', variance_color(v.get('variance_amount')))
+            # 차이 -> 원인 실제 관계 (쿼리가 차이별 원인 목록으로 돌려줌)
+            for c in self._cut(causes, 'CAUSED_BY'):
+                yield self.shared_node(c, 'Cause')
+                yield self.edge(v.element_id, c.element_id, 'CAUSED_BY')
+        for key, node_type, rel_type in (('materials', 'Material', 'CONSUMES'),
+                                         ('workcenters', 'WorkCenter', 'WORKS_AT'),
+                                         ('products', 'Product', 'PRODUCES')):
+            for node in self._cut(record.get(key) or [], rel_type):
+                yield self.shared_node(node, node_type)
+                yield self.edge(po_id, node.element_id, rel_type)
+
+        if kind == 'production_order' and 'products' in neighbours:
+            # Product 노드가 없으면 product_cd로 가상 노드 생성
+            if po.get('product_cd') and not record['products']:
+                product = virtual_product_node(po['product_cd'], 30, 'Virtual node - Product not loaded in Neo4j')
+                yield self.raw_node(product)
+                yield self.edge(po_id, product['id'], 'PRODUCES')
+        # 같은 제품의 직전/다음 생산오더 (chain 방식으로 적재한 경우에만 존재)
+        for other in self._cut(record.get('prev_orders') or [], 'NEXT_SAME_PRODUCT'):
+            yield self.shared_node(other, 'ProductionOrder', 25)
+            yield self.edge(other.element_id, po_id, 'NEXT_SAME_PRODUCT')
+        for other in self._cut(record.get('next_orders') or [], 'NEXT_SAME_PRODUCT'):
+            yield self.shared_node(other, 'ProductionOrder', 25)
+            yield self.edge(po_id, other.element_id, 'NEXT_SAME_PRODUCT')
+
+
+def entity_graph(kind, key):
+    """기본 엔티티 그래프: 중심 노드 + 오더별 이웃을 쿼리 1번으로 조회해 한 응답으로 (GRAPH_VIEWS 범위)"""
+    node_type, _, _, center_size = GRAPH_CENTERS[kind]
+    neighbours, top = GRAPH_VIEWS[kind]
+    order_kind = kind
+    with neo4j_conn.driver.session() as session:
+        record = session.run(entity_graph_query(kind, neighbours, top), key=key).single()
+        if not record and kind == 'product':
+            # Product 노드가 없으면 product_cd로 검색
+            order_kind = 'product_cd'
+            record = session.run(entity_graph_query(order_kind, neighbours, top), key=key).single()
+            if record and not record['orders']:
+                record = None
+    if not record:
+        return jsonify({'error': f'{node_type} not found'}), 404
+
+    emitter = GraphEmitter()
+    items = [emitter.center_node(record['n'], node_type, center_size, key)]
+    for order in record['orders']:
+        items.extend(emitter.order_items(order, order_kind, neighbours))
+    return graph_response(graph_payload(items, key))
+
+
+def _find_center(session, kind, key):
+    """중심 노드 조회 -> (중심 노드 또는 None, 오더 조회에 쓸 유형)
+
+    제품은 Product 노드가 없으면 product_cd 가상 중심으로 대체, 그 밖의 유형은 (None, None)
+    """
+    record = session.run(f"MATCH {GRAPH_CENTERS[kind][1]} RETURN n", key=key).single()
+    if record:
+        return record['n'], kind
+    return None, ('product_cd' if kind == 'product' else None)
+
+
+def stream_order_graph(kind, key):
+    """중심 노드 + 연결된 오더 이웃을 NDJSON으로 스트리밍 (?stream=1)
+
+    첫 줄은 중심 노드, 이후 오더별 노드/엣지, 마지막 줄은 {"kind": "end", 개수}.
+    세션은 응답을 다 보낼 때까지 열어 두고 결과 커서를 fetch_size 단위로 소비한다.
+    """
+    node_type, _, _, center_size = GRAPH_CENTERS[kind]
+    session = neo4j_conn.driver.session()
+    try:
+        center, order_kind = _find_center(session, kind, key)
+        if order_kind is None:
+            session.close()
+            return jsonify({'error': f'{node_type} not found'}), 404
+        result = session.run(order_graph_query(order_kind), key=key)
+        if center is None and result.peek() is None:
+            session.close()
+            return jsonify({'error': f'{node_type} not found'}), 404
+    except Exception:
+        session.close()
+        raise
+
+    def generate():
+        emitter = GraphEmitter()
+        try:
+            yield _ndjson(*emitter.center_node(center, node_type, center_size, key))
+            buffer = []
+            for record in result:
+                buffer.extend(_ndjson(*item) for item in emitter.order_items(record, order_kind) if item)
+                if len(buffer) >= GRAPH_STREAM_FLUSH_LINES:
+                    yield b''.join(buffer)
+                    buffer = []
+            if buffer:
+                yield b''.join(buffer)
+            yield _ndjson('end', {'center': key, 'nodes': emitter.node_count, 'edges': emitter.edge_count})
+        finally:
+            session.close()
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+
+def encode_cursor(values):
+    """페이지 커서 값 목록 -> 불투명 토큰 (URL-safe base64 JSON)"""
+    raw = json.dumps(values, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token, size):
+    """encode_cursor 토큰 -> 값 목록 (없으면 [None] * size, 형식이 틀리면 ValueError)"""
+    if not token:
+        return [None] * size
+    try:
+        values = json.loads(base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)))
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ValueError(f'invalid cursor: {e}')
+    if not isinstance(values, list) or len(values) != size or not all(isinstance(v, str) for v in values):
+        raise ValueError('invalid cursor')
+    return values
+
+
+def _bounded_arg(name, default, maximum):
+    return max(1, min(request.args.get(name, default, type=int), maximum))
+
+
+def graph_page_requested():
+    return any(name in request.args for name in GRAPH_PAGE_ARGS)
+
+
+def paged_order_graph(kind, key):
+    """중심 노드 + 연결된 오더 이웃 1페이지 (limit/cursor/depth/fanout)
+
+    첫 페이지에만 중심 노드를 넣고, 다음 페이지가 있으면 next_cursor를 돌려준다.
+    여러 오더가 공유하는 노드(원자재/공정/제품/원인)는 페이지마다 다시 나올 수 있으므로 id로 병합한다.
+    """
+    limit = _bounded_arg('limit', GRAPH_PAGE_SIZE, GRAPH_MAX_PAGE_SIZE)
+    depth = _bounded_arg('depth', GRAPH_MAX_DEPTH, GRAPH_MAX_DEPTH)
+    fanout = _bounded_arg('fanout', GRAPH_FANOUT, GRAPH_MAX_FANOUT)
+    neighbours = GRAPH_DEPTH_NEIGHBOURS[depth]
+    cursor = request.args.get('cursor')
+    try:
+        after_key, after_id = decode_cursor(cursor, 2)
+    except ValueError:
+        return jsonify({'error': 'Invalid cursor'}), 400
+
+    node_type, _, _, center_size = GRAPH_CENTERS[kind]
+    with neo4j_conn.driver.session() as session:
+        center, order_kind = _find_center(session, kind, key)
+        if order_kind is None:
+            return jsonify({'error': f'{node_type} not found'}), 404
+        # 한 건 더 가져와 다음 페이지 유무 확인, 이웃도 fanout + 1개로 잘림 여부 확인
+        rows = list(session.run(order_graph_query(order_kind, neighbours, fanout=True, paged=True),
+                                key=key, after_key=after_key, after_id=after_id,
+                                limit=limit + 1, fanout=fanout + 1))
+    if center is None and not rows and not cursor:
+        return jsonify({'error': f'{node_type} not found'}), 404
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    emitter = GraphEmitter(fanout)
+    first = emitter.center_node(center, node_type, center_size, key)
+    items = [] if cursor else [first]
+    for record in rows:
+        items.extend(emitter.order_items(record, order_kind, neighbours))
+
+    last = rows[-1] if rows else None
+    return graph_response(graph_payload(
+        items, key,
+        next_cursor=encode_cursor([last['order_key'], last['po']['id']]) if has_more else None,
+        page={
+            'limit': limit,
+            'depth': depth,
+            'fanout': fanout,
+            'orders': len(rows),
+            'truncated': emitter.truncated,
+        }
+    ))
+
+
 @app.route('/api/variance/<variance_id>/graph', methods=['GET'])
 def get_variance_graph(variance_id):
-    """특정 Variance 중심 그래프 데이터"""
-    depth = request.args.get('depth', 2, type=int)
+    """특정 Variance 중심 그래프 데이터
+
+    ?limit=&cursor=&depth=&fanout=: 연결된 오더를 페이지 단위로 (next_cursor로 이어서 요청)
+    """
+    if graph_page_requested():
+        return paged_order_graph('variance', variance_id)
     
     with neo4j_conn.driver.session() as session:
         query = """
         MATCH (v:Variance {id: $variance_id})
-        OPTIONAL MATCH path1 = (v)<-[:HAS_VARIANCE]-(po:ProductionOrder)
-        OPTIONAL MATCH path2 = (po)-[:CONSUMES]->(m:Material)
-        OPTIONAL MATCH path3 = (po)-[:WORKS_AT]->(wc:WorkCenter)
-        OPTIONAL MATCH path4 = (v)-[:CAUSED_BY]->(c:Cause)
-        OPTIONAL MATCH path5 = (po)-[:PRODUCES]->(p:Product)
-        
-        WITH v, 
-             collect(DISTINCT po) as orders,
-             collect(DISTINCT m) as materials,
-             collect(DISTINCT wc) as workcenters,
-             collect(DISTINCT c) as causes,
-             collect(DISTINCT p) as products
-        
-        RETURN v, orders, materials, workcenters, causes, products
+        RETURN v,
+               [(v)<-[:HAS_VARIANCE]-(po:ProductionOrder) | {
+                   po: po,
+                   materials: [(po)-[:CONSUMES]->(m:Material) | m],
+                   workcenters: [(po)-[:WORKS_AT]->(wc:WorkCenter) | wc],
+                   products: [(po)-[:PRODUCES]->(p:Product) | p]
+               }] as orders,
+               [(v)-[:CAUSED_BY]->(c:Cause) | c] as causes
         """
         
         result = session.run(query, variance_id=variance_id).single()
@@ -120,206 +928,28 @@ def get_variance_graph(variance_id):
         if not result:
             return jsonify({'error': 'Variance not found'}), 404
         
-        nodes = []
-        edges = []
-        
-        # Variance 노드
+        # 오더 -> Variance 연결과 오더의 원자재/공정/제품은 공통 직렬화로
         v = result['v']
-        nodes.append({
-            'id': v.element_id,
-            'label': v.get('variance_name', v['id']),
-            'type': 'Variance',
-            'color': variance_color(v.get('variance_amount')),
-            'size': 30,
-            'properties': serialize_neo4j_types(dict(v))
-        })
-        
-        # ProductionOrder 노드들
-        for po in result['orders']:
-            if po:
-                nodes.append({
-                    'id': po.element_id,
-                    'label': po['id'],
-                    'type': 'ProductionOrder',
-                    'color': '#45B7D1',
-                    'size': 35,
-                    'properties': serialize_neo4j_types(dict(po))
-                })
-                edges.append({
-                    'from': po.element_id,
-                    'to': v.element_id,
-                    'label': 'HAS_VARIANCE',
-                    'color': variance_color(v.get('variance_amount'))
-                })
-        
-        # Material 노드들
-        for m in result['materials']:
-            if m:
-                nodes.append({
-                    'id': m.element_id,
-                    'label': m['id'],
-                    'type': 'Material',
-                    'color': '#4ECDC4',
-                    'size': 25,
-                    'properties': serialize_neo4j_types(dict(m))
-                })
-                # 연결은 PO를 통해
-                for po in result['orders']:
-                    if po:
-                        edges.append({
-                            'from': po.element_id,
-                            'to': m.element_id,
-                            'label': 'CONSUMES',
-                            'color': '#45B7D1'
-                        })
-        
-        # WorkCenter 노드들
-        for wc in result['workcenters']:
-            if wc:
-                nodes.append({
-                    'id': wc.element_id,
-                    'label': wc['id'],
-                    'type': 'WorkCenter',
-                    'color': '#FFA07A',
-                    'size': 28,
-                    'properties': serialize_neo4j_types(dict(wc))
-                })
-                for po in result['orders']:
-                    if po:
-                        edges.append({
-                            'from': po.element_id,
-                            'to': wc.element_id,
-                            'label': 'WORKS_AT',
-                            'color': '#FFA07A'
-                        })
-        
-        # Cause 노드들
+        emitter = GraphEmitter()
+        items = [emitter.center_node(v, 'Variance', GRAPH_CENTERS['variance'][3], variance_id)]
+        for order in result['orders']:
+            items.extend(emitter.order_items(order, 'variance', ('materials', 'workcenters', 'products')))
         for c in result['causes']:
-            if c:
-                nodes.append({
-                    'id': c.element_id,
-                    'label': c['description'],
-                    'type': 'Cause',
-                    'color': '#F7DC6F',
-                    'size': 25,
-                    'properties': serialize_neo4j_types(dict(c))
-                })
-                edges.append({
-                    'from': v.element_id,
-                    'to': c.element_id,
-                    'label': 'CAUSED_BY',
-                    'color': '#F7DC6F'
-                })
-        
-        # Product 노드들
-        for p in result['products']:
-            if p:
-                nodes.append({
-                    'id': p.element_id,
-                    'label': p['name'],
-                    'type': 'Product',
-                    'color': '#FF6B6B',
-                    'size': 30,
-                    'properties': serialize_neo4j_types(dict(p))
-                })
-                for po in result['orders']:
-                    if po:
-                        edges.append({
-                            'from': po.element_id,
-                            'to': p.element_id,
-                            'label': 'PRODUCES',
-                            'color': '#FF6B6B'
-                        })
+            items.append(emitter.shared_node(c, 'Cause'))
+            items.append(emitter.edge(v.element_id, c.element_id, 'CAUSED_BY'))
         
-        return jsonify({
-            'nodes': nodes,
-            'edges': edges,
-            'center': v['id']
-        })
+        return graph_response(graph_payload(items, v['id']))
 
 
 @app.route('/api/cause/<cause_code>/graph', methods=['GET'])
 def get_cause_graph(cause_code):
-    """특정 Cause 중심 그래프 데이터"""
-    
-    with neo4j_conn.driver.session() as session:
-        query = """
-        MATCH (c:Cause {code: $cause_code})
-        MATCH (v:Variance)-[:CAUSED_BY]->(c)
-        OPTIONAL MATCH (po:ProductionOrder)-[:HAS_VARIANCE]->(v)
-        
-        RETURN c, 
-               collect(DISTINCT v) as variances,
-               collect(DISTINCT po) as orders
-        LIMIT 50
-        """
-        
-        result = session.run(query, cause_code=cause_code).single()
-        
-        if not result:
-            return jsonify({'error': 'Cause not found'}), 404
-        
-        nodes = []
-        edges = []
-        
-        # Cause 노드
-        c = result['c']
-        nodes.append({
-            'id': c.element_id,
-            'label': c['description'],
-            'type': 'Cause',
-            'color': '#F7DC6F',
-            'size': 35,
-            'properties': serialize_neo4j_types(dict(c))
-        })
-        
-        # Variance 노드들
-        for v in result['variances']:
-            if v:
-                nodes.append({
-                    'id': v.element_id,
-                    'label': v.get('variance_name', v['id']),
-                    'type': 'Variance',
-                    'color': variance_color(v.get('variance_amount')),
-                    'size': 20,
-                    'properties': serialize_neo4j_types(dict(v))
-                })
-                edges.append({
-                    'from': v.element_id,
-                    'to': c.element_id,
-                    'label': 'CAUSED_BY',
-                    'color': '#F7DC6F'
-                })
-        
-        # ProductionOrder 노드들
-        for po in result['orders']:
-            if po:
-                # 중복 체크
-                if not any(n['id'] == po.element_id for n in nodes):
-                    nodes.append({
-                        'id': po.element_id,
-                        'label': po['id'],
-                        'type': 'ProductionOrder',
-                        'color': '#45B7D1',
-                        'size': 30,
-                        'properties': serialize_neo4j_types(dict(po))
-                    })
-                
-                # PO -> Variance 연결
-                for v in result['variances']:
-                    if v:
-                        edges.append({
-                            'from': po.element_id,
-                            'to': v.element_id,
-                            'label': 'HAS_VARIANCE',
-                            'color': variance_color(v.get('variance_amount'))
-                        })
-        
-        return jsonify({
-            'nodes': nodes,
-            'edges': edges,
-            'center': cause_code
-        })
+    """특정 Cause 중심 그래프 데이터 (원인 -> 차이 -> 생산오더)
+
+    ?limit=&cursor=&depth=&fanout=: 연결된 오더를 페이지 단위로 (next_cursor로 이어서 요청)
+    """
+    if graph_page_requested():
+        return paged_order_graph('cause', cause_code)
+    return entity_graph('cause', cause_code)
 
 
 @app.route('/api/variances/by-type', methods=['GET'])
@@ -380,802 +1010,245 @@ def get_variances_by_element():
             """
             results = session.run(query, cost_element=cost_element).data()
             return jsonify(results or [])
-    except Exception as e:
-        import traceback
-        traceback.print_exc()
+    except Exception:
+        report_exception()
         return jsonify([])
 
 
 @app.route('/api/product/<product_cd>/graph', methods=['GET'])
 def get_product_graph(product_cd):
-    """제품 중심 그래프"""
-    
-    with neo4j_conn.driver.session() as session:
-        query = """
-        MATCH (p:Product {id: $product_cd})
-        OPTIONAL MATCH (po:ProductionOrder)-[:PRODUCES]->(p)
-        OPTIONAL MATCH (po)-[:HAS_VARIANCE]->(v:Variance)
-        OPTIONAL MATCH (po)-[:CONSUMES]->(m:Material)
-        OPTIONAL MATCH (po)-[:WORKS_AT]->(wc:WorkCenter)
-        OPTIONAL MATCH (v)-[:CAUSED_BY]->(c:Cause)
-        
-        WITH p, 
-             collect(DISTINCT po) as orders,
-             collect(DISTINCT v) as variances,
-             collect(DISTINCT m) as materials,
-             collect(DISTINCT wc) as workcenters,
-             collect(DISTINCT c) as causes
-        
-        RETURN p, orders, variances, materials, workcenters, causes
-        LIMIT 1
-        """
-        
-        result = session.run(query, product_cd=product_cd).single()
-        
-        if not result:
-            # Product 노드가 없으면 product_cd로 검색
-            query_by_cd = """
-            MATCH (po:ProductionOrder {product_cd: $product_cd})
-            OPTIONAL MATCH (po)-[:HAS_VARIANCE]->(v:Variance)
-            OPTIONAL MATCH (po)-[:CONSUMES]->(m:Material)
-            OPTIONAL MATCH (po)-[:WORKS_AT]->(wc:WorkCenter)
-            OPTIONAL MATCH (v)-[:CAUSED_BY]->(c:Cause)
-            
-            WITH collect(DISTINCT po) as orders,
-                 collect(DISTINCT v) as variances,
-                 collect(DISTINCT m) as materials,
-                 collect(DISTINCT wc) as workcenters,
-                 collect(DISTINCT c) as causes
-            
-            RETURN null as p, orders, variances, materials, workcenters, causes
-            LIMIT 1
-            """
-            result = session.run(query_by_cd, product_cd=product_cd).single()
-            
-            if not result or not result['orders']:
-                return jsonify({'error': 'Product not found'}), 404
-        
-        nodes = []
-        edges = []
-        order_ids = [po['id'] for po in (result['orders'] or []) if po and po.get('id')]
-        cause_pairs = session.run("""
-            MATCH (po:ProductionOrder)-[:HAS_VARIANCE]->(v)-[:CAUSED_BY]->(c)
-            WHERE po.id IN $order_ids
-            RETURN DISTINCT elementId(v) as v_id, elementId(c) as c_id
-        """, order_ids=order_ids).data() if order_ids else []
-        
-        # Product 노드 (중심)
-        if result['p']:
-            p = result['p']
-            nodes.append({
-                'id': p.element_id,
-                'label': p.get('name', p.get('id', product_cd)),
-                'type': 'Product',
-                'color': '#FF6B6B',
-                'size': 45,
-                'properties': serialize_neo4j_types(dict(p))
-            })
-            product_id = p.element_id
-        else:
-            # Product 노드가 없으면 가상 노드 생성
-            product_id = f"product_{product_cd}"
-            nodes.append({
-                'id': product_id,
-                'label': product_cd,
-                'type': 'Product',
-                'color': '#FF6B6B',
-                'size': 45,
-                'properties': {
-                    'id': product_cd,
-                    'name': product_cd,
-                    'note': 'Virtual node - Product not in Neo4j'
-                }
-            })
-        
-        # ProductionOrder 노드들
-        for po in result['orders']:
-            if po:
-                nodes.append({
-                    'id': po.element_id,
-                    'label': po['id'],
-                    'type': 'ProductionOrder',
-                    'color': '#45B7D1',
-                    'size': 35,
-                    'properties': serialize_neo4j_types(dict(po))
-                })
-                edges.append({
-                    'from': po.element_id,
-                    'to': product_id,
-                    'label': 'PRODUCES',
-                    'color': '#FF6B6B'
-                })
-        
-        # Variance 노드들 (각 Variance는 자신의 PO에만 연결)
-        for v in result['variances']:
-            if v:
-                nodes.append({
-                    'id': v.element_id,
-                    'label': v.get('variance_name', v['id']),
-                    'type': 'Variance',
-                    'color': variance_color(v.get('variance_amount')),
-                    'size': 25,
-                    'properties': serialize_neo4j_types(dict(v))
-                })
-                v_order_no = v.get('order_no')
-                for po in result['orders']:
-                    if po and v_order_no == po.get('id'):
-                        edges.append({
-                            'from': po.element_id,
-                            'to': v.element_id,
-                            'label': 'HAS_VARIANCE',
-                            'color': variance_color(v.get('variance_amount'))
-                        })
-        
-        # Material 노드들
-        for m in result['materials']:
-            if m:
-                nodes.append({
-                    'id': m.element_id,
-                    'label': m.get('name', m.get('id', 'Material')),
-                    'type': 'Material',
-                    'color': '#4ECDC4',
-                    'size': 25,
-                    'properties': serialize_neo4j_types(dict(m))
-                })
-                for po in result['orders']:
-                    if po:
-                        edges.append({
-                            'from': po.element_id,
-                            'to': m.element_id,
-                            'label': 'CONSUMES',
-                            'color': '#45B7D1'
-                        })
-        
-        # WorkCenter 노드들
-        for wc in result['workcenters']:
-            if wc:
-                nodes.append({
-                    'id': wc.element_id,
-                    'label': wc.get('name', wc.get('id', 'WorkCenter')),
-                    'type': 'WorkCenter',
-                    'color': '#FFA07A',
-                    'size': 28,
-                    'properties': serialize_neo4j_types(dict(wc))
-                })
-                for po in result['orders']:
-                    if po:
-                        edges.append({
-                            'from': po.element_id,
-                            'to': wc.element_id,
-                            'label': 'WORKS_AT',
-                            'color': '#FFA07A'
-                        })
-        
-        # Cause 노드들
-        for c in result['causes']:
-            if c and not any(n['id'] == c.element_id for n in nodes):
-                nodes.append({
-                    'id': c.element_id,
-                    'label': c.get('description', c.get('code', 'Cause')),
-                    'type': 'Cause',
-                    'color': '#F7DC6F',
-                    'size': 25,
-                    'properties': serialize_neo4j_types(dict(c))
-                })
-        # Variance -> Cause 실제 관계만 연결
-        for pair in cause_pairs:
-            v_id = pair.get('v_id')
-            c_id = pair.get('c_id')
-            if v_id and c_id:
-                edges.append({
-                    'from': v_id,
-                    'to': c_id,
-                    'label': 'CAUSED_BY',
-                    'color': '#F7DC6F'
-                })
-        
-        return jsonify({
-            'nodes': nodes,
-            'edges': edges,
-            'center': product_cd
-        })
+    """제품 중심 그래프
+
+    ?stream=1: 연결된 전체 오더를 NDJSON으로 스트리밍
+    ?limit=&cursor=&depth=&fanout=: 연결된 오더를 페이지 단위로 (next_cursor로 이어서 요청)
+    """
+    if request.args.get('stream') == '1':
+        return stream_order_graph('product', product_cd)
+    if graph_page_requested():
+        return paged_order_graph('product', product_cd)
+    return entity_graph('product', product_cd)
 
 
 @app.route('/api/material/<material_id>/graph', methods=['GET'])
 def get_material_graph(material_id):
-    """원자재 중심 그래프 - 차이가 큰 상위 5개만 간단하게 표시"""
-    
-    with neo4j_conn.driver.session() as session:
-        # 차이가 큰 상위 5개 생산오더만 선택하고, WorkCenter/Cause는 제외
-        query = """
-        MATCH (m:Material {id: $material_id})
-        MATCH (po:ProductionOrder)-[:CONSUMES]->(m)
-        OPTIONAL MATCH (po)-[:HAS_VARIANCE]->(v:Variance)
-        WITH m, po, SUM(COALESCE(v.variance_amount, 0)) as total_variance
-        ORDER BY ABS(total_variance) DESC
-        LIMIT 5
-        
-        WITH m, collect(po) as top_orders
-        
-        UNWIND top_orders as po
-        OPTIONAL MATCH (po)-[:HAS_VARIANCE]->(v:Variance)
-        OPTIONAL MATCH (po)-[:PRODUCES]->(p:Product)
-        
-        WITH m,
-             collect(DISTINCT po) as orders,
-             collect(DISTINCT v) as variances,
-             collect(DISTINCT p) as products
-        
-        RETURN m, orders, variances, [] as workcenters, products, [] as causes
-        """
-        
-        result = session.run(query, material_id=material_id).single()
-        
-        if not result or not result['m']:
-            return jsonify({'error': 'Material not found'}), 404
-        
-        nodes = []
-        edges = []
-        order_ids = [po['id'] for po in (result['orders'] or []) if po and po.get('id')]
-        cause_pairs = session.run("""
-            MATCH (po:ProductionOrder)-[:HAS_VARIANCE]->(v)-[:CAUSED_BY]->(c)
-            WHERE po.id IN $order_ids
-            RETURN DISTINCT elementId(v) as v_id, elementId(c) as c_id
-        """, order_ids=order_ids).data() if order_ids else []
-        
-        # Material 노드 (중심)
-        m = result['m']
-        nodes.append({
-            'id': m.element_id,
-            'label': m.get('name', m.get('id', material_id)),
-            'type': 'Material',
-            'color': '#4ECDC4',
-            'size': 45,
-            'properties': serialize_neo4j_types(dict(m))
-        })
-        
-        # ProductionOrder 노드들
-        for po in result['orders']:
-            if po:
-                nodes.append({
-                    'id': po.element_id,
-                    'label': po['id'],
-                    'type': 'ProductionOrder',
-                    'color': '#45B7D1',
-                    'size': 35,
-                    'properties': serialize_neo4j_types(dict(po))
-                })
-                edges.append({
-                    'from': po.element_id,
-                    'to': m.element_id,
-                    'label': 'CONSUMES',
-                    'color': '#4ECDC4'
-                })
-        
-        # Variance 노드들 (각 Variance는 자신의 PO에만 연결)
-        for v in result['variances']:
-            if v:
-                nodes.append({
-                    'id': v.element_id,
-                    'label': v.get('variance_name', v['id']),
-                    'type': 'Variance',
-                    'color': variance_color(v.get('variance_amount')),
-                    'size': 25,
-                    'properties': serialize_neo4j_types(dict(v))
-                })
-                v_order_no = v.get('order_no')
-                for po in result['orders']:
-                    if po and v_order_no == po.get('id'):
-                        edges.append({
-                            'from': po.element_id,
-                            'to': v.element_id,
-                            'label': 'HAS_VARIANCE',
-                            'color': variance_color(v.get('variance_amount'))
-                        })
-        
-        # WorkCenter 노드들
-        for wc in result['workcenters']:
-            if wc:
-                nodes.append({
-                    'id': wc.element_id,
-                    'label': wc.get('name', wc.get('id', 'WorkCenter')),
-                    'type': 'WorkCenter',
-                    'color': '#FFA07A',
-                    'size': 28,
-                    'properties': serialize_neo4j_types(dict(wc))
-                })
-                for po in result['orders']:
-                    if po:
-                        edges.append({
-                            'from': po.element_id,
-                            'to': wc.element_id,
-                            'label': 'WORKS_AT',
-                            'color': '#FFA07A'
-                        })
-        
-        # Product 노드들
-        for p in result['products']:
-            if p:
-                nodes.append({
-                    'id': p.element_id,
-                    'label': p.get('name', p.get('id', 'Product')),
-                    'type': 'Product',
-                    'color': '#FF6B6B',
-                    'size': 30,
-                    'properties': serialize_neo4j_types(dict(p))
-                })
-                for po in result['orders']:
-                    if po:
-                        edges.append({
-                            'from': po.element_id,
-                            'to': p.element_id,
-                            'label': 'PRODUCES',
-                            'color': '#FF6B6B'
-                        })
-        
-        # Cause 노드들
-        for c in result['causes']:
-            if c and not any(n['id'] == c.element_id for n in nodes):
-                nodes.append({
-                    'id': c.element_id,
-                    'label': c.get('description', c.get('code', 'Cause')),
-                    'type': 'Cause',
-                    'color': '#F7DC6F',
-                    'size': 25,
-                    'properties': serialize_neo4j_types(dict(c))
-                })
-        # Variance -> Cause 실제 관계만 연결
-        for pair in cause_pairs:
-            v_id = pair.get('v_id')
-            c_id = pair.get('c_id')
-            if v_id and c_id:
-                edges.append({
-                    'from': v_id,
-                    'to': c_id,
-                    'label': 'CAUSED_BY',
-                    'color': '#F7DC6F'
-                })
-        
-        return jsonify({
-            'nodes': nodes,
-            'edges': edges,
-            'center': material_id
-        })
+    """원자재 중심 그래프 - 차이가 큰 상위 5개만 간단하게 표시 (공정/원인 제외)
+
+    ?stream=1: 상위 5개 제한 없이 연결된 전체 오더를 NDJSON으로 스트리밍
+    ?limit=&cursor=&depth=&fanout=: 연결된 오더를 페이지 단위로 (next_cursor로 이어서 요청)
+    """
+    if request.args.get('stream') == '1':
+        return stream_order_graph('material', material_id)
+    if graph_page_requested():
+        return paged_order_graph('material', material_id)
+    return entity_graph('material', material_id)
 
 
 @app.route('/api/workcenter/<workcenter_id>/graph', methods=['GET'])
 def get_workcenter_graph(workcenter_id):
-    """공정(WorkCenter) 중심 그래프 - 차이가 큰 상위 5개만 간단하게 표시"""
-    
-    with neo4j_conn.driver.session() as session:
-        # 차이가 큰 상위 5개 생산오더만 선택하고, Material은 제외
-        query = """
-        MATCH (wc:WorkCenter {id: $workcenter_id})
-        MATCH (po:ProductionOrder)-[:WORKS_AT]->(wc)
-        OPTIONAL MATCH (po)-[:HAS_VARIANCE]->(v:Variance)
-        WITH wc, po, SUM(COALESCE(v.variance_amount, 0)) as total_variance
-        ORDER BY ABS(total_variance) DESC
-        LIMIT 5
-        
-        WITH wc, collect(po) as top_orders
-        
-        UNWIND top_orders as po
-        OPTIONAL MATCH (po)-[:HAS_VARIANCE]->(v:Variance)
-        OPTIONAL MATCH (po)-[:PRODUCES]->(p:Product)
-        
-        WITH wc,
-             collect(DISTINCT po) as orders,
-             collect(DISTINCT v) as variances,
-             collect(DISTINCT p) as products
-        
-        RETURN wc, orders, variances, [] as materials, products, [] as causes
-        """
-        
-        result = session.run(query, workcenter_id=workcenter_id).single()
-        
-        if not result or not result['wc']:
-            return jsonify({'error': 'WorkCenter not found'}), 404
-        
+    """공정(WorkCenter) 중심 그래프 - 차이가 큰 상위 5개만 간단하게 표시 (원자재/원인 제외)
+
+    ?stream=1: 상위 5개 제한 없이 연결된 전체 오더를 NDJSON으로 스트리밍
+    ?limit=&cursor=&depth=&fanout=: 연결된 오더를 페이지 단위로 (next_cursor로 이어서 요청)
+    """
+    if request.args.get('stream') == '1':
+        return stream_order_graph('workcenter', workcenter_id)
+    if graph_page_requested():
+        return paged_order_graph('workcenter', workcenter_id)
+    return entity_graph('workcenter', workcenter_id)
+
+
+@app.route('/api/production-order/<order_no>/graph', methods=['GET'])
+def get_production_order_graph(order_no):
+    """생산오더 중심 그래프
+
+    ?depth=&fanout=: 이웃 깊이와 관계별 노드 수 제한 (limit/cursor도 받지만 오더가 1건이므로 한 페이지)
+    """
+    if graph_page_requested():
+        return paged_order_graph('production_order', order_no)
+    return entity_graph('production_order', order_no)
+
+
+# 노드 확장 페이지 기본값 (limit: 페이지당 이웃 수, fanout: depth 2에서 이웃 1개당 다음 이웃 수)
+EXPAND_PAGE_SIZE = 50
+EXPAND_FANOUT = 10
+EXPAND_MAX_DEPTH = 2
+
+# 이웃을 (관계 유형, 이웃 elementId) 순으로 커서 이후 $limit개
+EXPAND_QUERY = """
+MATCH (n)
+WHERE elementId(n) = $node_id
+MATCH (n)-[r]-(connected)
+WITH n, r, connected, type(r) as rel_type, elementId(connected) as connected_id
+WHERE $after_id IS NULL OR rel_type > $after_type OR (rel_type = $after_type AND connected_id > $after_id)
+WITH n, r, connected, rel_type, connected_id
+ORDER BY rel_type, connected_id
+LIMIT $limit
+RETURN n,
+       connected,
+       rel_type,
+       connected_id,
+       CASE 
+           WHEN startNode(r) = n THEN 'out'
+           ELSE 'in'
+       END as direction{second_hop}
+"""
+# depth 2: 이웃마다 다음 이웃 (확장한 노드 제외)
+EXPAND_SECOND_HOP = """,
+       [(connected)-[r2]-(x) WHERE x <> n | [x, type(r2), startNode(r2) = connected]][..$fanout] as second_hop"""
+
+
+def _expand_node(node, size):
+    node_type = list(node.labels)[0]
+    if node_type == 'Variance':
+        label = node.get('variance_name', node.get('id'))
+        color = variance_color(node.get('variance_amount'))
+    else:
+        label = node.get('id') or node.get('name') or node.get('description')
+        color = get_node_color(node_type)
+    return {
+        'id': node.element_id,
+        'label': label,
+        'type': node_type,
+        'color': color,
+        'size': size,
+        'properties': node_properties(node)
+    }
+
+
+@app.route('/api/node/<node_id>/expand', methods=['GET'])
+def expand_node(node_id):
+    """노드 확장 - 연결된 노드들 가져오기
+
+    ?limit=: 페이지당 이웃 수 (기본 50), ?cursor=: 이전 응답의 next_cursor로 다음 이웃
+    ?depth=2: 이웃마다 그 다음 이웃을 ?fanout=개(기본 10)까지 함께 확장
+    ?format=columnar: 열 형식 응답
+    """
+    if not neo4j_conn.driver:
+        return jsonify({'nodes': [], 'edges': []})
+    limit = _bounded_arg('limit', EXPAND_PAGE_SIZE, GRAPH_MAX_PAGE_SIZE)
+    depth = _bounded_arg('depth', 1, EXPAND_MAX_DEPTH)
+    fanout = _bounded_arg('fanout', EXPAND_FANOUT, GRAPH_MAX_FANOUT)
+    cursor = request.args.get('cursor')
+    try:
+        after_type, after_id = decode_cursor(cursor, 2)
+    except ValueError:
+        return jsonify({'error': 'Invalid cursor'}), 400
+    try:
+        with neo4j_conn.driver.session() as session:
+            query = EXPAND_QUERY.format(second_hop=EXPAND_SECOND_HOP if depth >= 2 else '')
+            # 한 건 더 가져와 다음 페이지 유무 확인, 다음 이웃도 fanout + 1개로 잘림 여부 확인
+            records = list(session.run(query, node_id=node_id, after_type=after_type, after_id=after_id,
+                                       limit=limit + 1, fanout=fanout + 1))
+        if not records:
+            return jsonify({'nodes': [], 'edges': [], 'next_cursor': None})
+        has_more = len(records) > limit
+        records = records[:limit]
         nodes = []
         edges = []
-        order_ids = [po['id'] for po in (result['orders'] or []) if po and po.get('id')]
-        cause_pairs = session.run("""
-            MATCH (po:ProductionOrder)-[:HAS_VARIANCE]->(v)-[:CAUSED_BY]->(c)
-            WHERE po.id IN $order_ids
-            RETURN DISTINCT elementId(v) as v_id, elementId(c) as c_id
-        """, order_ids=order_ids).data() if order_ids else []
-        
-        # WorkCenter 노드 (중심)
-        wc = result['wc']
-        nodes.append({
-            'id': wc.element_id,
-            'label': wc.get('name', wc.get('id', workcenter_id)),
-            'type': 'WorkCenter',
-            'color': '#FFA07A',
-            'size': 45,
-            'properties': serialize_neo4j_types(dict(wc))
-        })
-        
-        # ProductionOrder 노드들
-        for po in result['orders']:
-            if po:
-                nodes.append({
-                    'id': po.element_id,
-                    'label': po['id'],
-                    'type': 'ProductionOrder',
-                    'color': '#45B7D1',
-                    'size': 35,
-                    'properties': serialize_neo4j_types(dict(po))
-                })
+        seen_nodes = set()
+        seen_edges = set()
+        truncated = {}
+
+        def add_node(node, size):
+            if node.element_id not in seen_nodes:
+                nodes.append(_expand_node(node, size))
+                seen_nodes.add(node.element_id)
+
+        def add_edge(a_id, b_id, rel_type, outgoing):
+            edge_id = f"{a_id}-{b_id}-{rel_type}"
+            if edge_id not in seen_edges:
                 edges.append({
-                    'from': po.element_id,
-                    'to': wc.element_id,
-                    'label': 'WORKS_AT',
-                    'color': '#FFA07A'
-                })
-        
-        # Variance 노드들 (각 Variance는 자신의 PO에만 연결)
-        for v in result['variances']:
-            if v:
-                nodes.append({
-                    'id': v.element_id,
-                    'label': v.get('variance_name', v['id']),
-                    'type': 'Variance',
-                    'color': variance_color(v.get('variance_amount')),
-                    'size': 25,
-                    'properties': serialize_neo4j_types(dict(v))
-                })
-                v_order_no = v.get('order_no')
-                for po in result['orders']:
-                    if po and v_order_no == po.get('id'):
-                        edges.append({
-                            'from': po.element_id,
-                            'to': v.element_id,
-                            'label': 'HAS_VARIANCE',
-                            'color': '#98D8C8'
-                        })
-        
-        # Material 노드들
-        for m in result['materials']:
-            if m:
-                nodes.append({
-                    'id': m.element_id,
-                    'label': m.get('name', m.get('id', 'Material')),
-                    'type': 'Material',
-                    'color': '#4ECDC4',
-                    'size': 25,
-                    'properties': serialize_neo4j_types(dict(m))
+                    'id': edge_id,
+                    'from': a_id if outgoing else b_id,
+                    'to': b_id if outgoing else a_id,
+                    'label': rel_type,
+                    'arrows': 'to'
                 })
-                for po in result['orders']:
-                    if po:
-                        edges.append({
-                            'from': po.element_id,
-                            'to': m.element_id,
-                            'label': 'CONSUMES',
-                            'color': '#4ECDC4'
-                        })
-        
-        # Product 노드들
-        for p in result['products']:
-            if p:
-                nodes.append({
-                    'id': p.element_id,
-                    'label': p.get('name', p.get('id', 'Product')),
-                    'type': 'Product',
-                    'color': '#FF6B6B',
-                    'size': 30,
-                    'properties': serialize_neo4j_types(dict(p))
-                })
-                for po in result['orders']:
-                    if po:
-                        edges.append({
-                            'from': po.element_id,
-                            'to': p.element_id,
-                            'label': 'PRODUCES',
-                            'color': '#FF6B6B'
-                        })
-        
-        # Cause 노드들
-        for c in result['causes']:
-            if c:
-                if not any(n['id'] == c.element_id for n in nodes):
-                    nodes.append({
-                        'id': c.element_id,
-                        'label': c.get('description', c.get('code', 'Cause')),
-                        'type': 'Cause',
-                        'color': '#F7DC6F',
-                        'size': 25,
-                        'properties': serialize_neo4j_types(dict(c))
-                    })
-                
-                for v in result['variances']:
-                    if v:
-                        edges.append({
-                            'from': v.element_id,
-                            'to': c.element_id,
-                            'label': 'CAUSED_BY',
-                            'color': '#F7DC6F'
-                        })
-        
-        return jsonify({
+                seen_edges.add(edge_id)
+
+        center = records[0]['n']
+        if not cursor:
+            add_node(center, 30)
+        for record in records:
+            connected = record['connected']
+            rel_type = record['rel_type']
+            add_node(connected, 25)
+            add_edge(center.element_id, connected.element_id, rel_type, record['direction'] == 'out')
+            second_hop = record.get('second_hop') or []
+            if len(second_hop) > fanout:
+                truncated[rel_type] = truncated.get(rel_type, 0) + 1
+                second_hop = second_hop[:fanout]
+            for other, other_rel, outgoing in second_hop:
+                add_node(other, 20)
+                add_edge(connected.element_id, other.element_id, other_rel, outgoing)
+        last = records[-1]
+        return graph_response({
             'nodes': nodes,
             'edges': edges,
-            'center': workcenter_id
+            'next_cursor': encode_cursor([last['rel_type'], last['connected_id']]) if has_more else None,
+            'page': {'limit': limit, 'depth': depth, 'fanout': fanout, 'truncated': truncated}
         })
+    except Exception:
+        report_exception()
+        return jsonify({'nodes': [], 'edges': []})
 
 
-@app.route('/api/production-order/<order_no>/graph', methods=['GET'])
-def get_production_order_graph(order_no):
-    """생산오더 중심 그래프"""
-    
+def _overview_graph():
+    """전체 개요 그래프 데이터"""
     with neo4j_conn.driver.session() as session:
         query = """
-        MATCH (po:ProductionOrder {id: $order_no})
-        OPTIONAL MATCH (po)-[:HAS_VARIANCE]->(v:Variance)
-        OPTIONAL MATCH (po)-[:CONSUMES]->(m:Material)
-        OPTIONAL MATCH (po)-[:WORKS_AT]->(wc:WorkCenter)
-        OPTIONAL MATCH (po)-[:PRODUCES]->(p:Product)
+        MATCH (v:Variance)
+        WITH v.cost_element as element,
+             v.variance_type as type,
+             collect(v)[..5] as sample_variances
+        UNWIND sample_variances as v
         OPTIONAL MATCH (v)-[:CAUSED_BY]->(c:Cause)
-        
-        RETURN po,
-               collect(DISTINCT v) as variances,
-               collect(DISTINCT m) as materials,
-               collect(DISTINCT wc) as workcenters,
-               collect(DISTINCT p) as products,
-               collect(DISTINCT c) as causes
+        RETURN element, type,
+               collect(DISTINCT {
+                   id: elementId(v),
+                   label: v.id,
+                   props: properties(v)
+               }) as variances,
+               collect(DISTINCT {
+                   id: elementId(c),
+                   label: c.description,
+                   props: properties(c)
+               }) as causes
         """
-        
-        result = session.run(query, order_no=order_no).single()
-        
-        if not result:
-            return jsonify({'error': 'Production order not found'}), 404
-        
+        results = session.run(query).data()
         nodes = []
         edges = []
-        cause_pairs = session.run("""
-            MATCH (po:ProductionOrder {id: $order_no})-[:HAS_VARIANCE]->(v)-[:CAUSED_BY]->(c)
-            RETURN elementId(v) as v_id, elementId(c) as c_id
-        """, order_no=order_no).data()
-        
-        # ProductionOrder 노드 (중심)
-        po = result['po']
-        nodes.append({
-            'id': po.element_id,
-            'label': po['id'],
-            'type': 'ProductionOrder',
-            'color': '#45B7D1',
-            'size': 40,
-            'properties': serialize_neo4j_types(dict(po))
-        })
-        
-        # Product 노드가 없으면 product_cd로 가상 노드 생성
-        if po.get('product_cd') and not result['products']:
-            product_id = f"product_{po['product_cd']}"
-            nodes.append({
-                'id': product_id,
-                'label': po['product_cd'],
-                'type': 'Product',
-                'color': '#FF6B6B',
-                'size': 30,
-                'properties': {
-                    'id': po['product_cd'],
-                    'name': po['product_cd'],
-                    'note': 'Virtual node - Product not loaded in Neo4j'
-                }
-            })
-            edges.append({
-                'from': po.element_id,
-                'to': product_id,
-                'label': 'PRODUCES',
-                'color': '#FF6B6B'
-            })
-        
-        # Variance 노드들
-        for v in result['variances']:
-            if v:
+        element_nodes = {}
+        added_node_ids = set()
+        for row in results:
+            element = row['element']
+            if element not in element_nodes:
+                elem_id = f"element_{element}"
+                element_nodes[element] = elem_id
                 nodes.append({
-                    'id': v.element_id,
-                    'label': v.get('variance_name', v['id']),
-                    'type': 'Variance',
-                    'color': variance_color(v.get('variance_amount')),
-                    'size': 25,
-                    'properties': serialize_neo4j_types(dict(v))
-                })
-                edges.append({
-                    'from': po.element_id,
-                    'to': v.element_id,
-                    'label': 'HAS_VARIANCE',
-                    'color': variance_color(v.get('variance_amount'))
+                    'id': elem_id, 'label': element, 'type': 'CostElement',
+                    'color': '#3498db', 'size': 40, 'properties': {'name': element}
                 })
-        
-        # Material 노드들
-        for m in result['materials']:
-            if m:
-                nodes.append({
-                    'id': m.element_id,
-                    'label': m.get('name', m.get('id', 'Material')),
-                    'type': 'Material',
-                    'color': '#4ECDC4',
-                    'size': 25,
-                    'properties': serialize_neo4j_types(dict(m))
-                })
-                edges.append({
-                    'from': po.element_id,
-                    'to': m.element_id,
-                    'label': 'CONSUMES',
-                    'color': '#45B7D1'
-                })
-        
-        # WorkCenter 노드들
-        for wc in result['workcenters']:
-            if wc:
-                nodes.append({
-                    'id': wc.element_id,
-                    'label': wc.get('name', wc.get('id', 'WorkCenter')),
-                    'type': 'WorkCenter',
-                    'color': '#FFA07A',
-                    'size': 28,
-                    'properties': serialize_neo4j_types(dict(wc))
-                })
-                edges.append({
-                    'from': po.element_id,
-                    'to': wc.element_id,
-                    'label': 'WORKS_AT',
-                    'color': '#FFA07A'
-                })
-        
-        # Product 노드들
-        for p in result['products']:
-            if p:
-                nodes.append({
-                    'id': p.element_id,
-                    'label': p.get('name', p.get('id', 'Product')),
-                    'type': 'Product',
-                    'color': '#FF6B6B',
-                    'size': 30,
-                    'properties': serialize_neo4j_types(dict(p))
-                })
-                edges.append({
-                    'from': po.element_id,
-                    'to': p.element_id,
-                    'label': 'PRODUCES',
-                    'color': '#FF6B6B'
-                })
-        
-        # Cause 노드들
-        for c in result['causes']:
-            if c and not any(n['id'] == c.element_id for n in nodes):
-                nodes.append({
-                    'id': c.element_id,
-                    'label': c.get('description', c.get('code', 'Cause')),
-                    'type': 'Cause',
-                    'color': '#F7DC6F',
-                    'size': 25,
-                    'properties': serialize_neo4j_types(dict(c))
-                })
-        # Variance -> Cause 실제 관계만 연결
-        for pair in cause_pairs:
-            v_id = pair.get('v_id')
-            c_id = pair.get('c_id')
-            if v_id and c_id:
-                edges.append({
-                    'from': v_id,
-                    'to': c_id,
-                    'label': 'CAUSED_BY',
-                    'color': '#F7DC6F'
-                })
-        
-        return jsonify({
-            'nodes': nodes,
-            'edges': edges,
-            'center': order_no
-        })
-
-
-@app.route('/api/node/<node_id>/expand', methods=['GET'])
-def expand_node(node_id):
-    """노드 확장 - 연결된 노드들 가져오기"""
-    if not neo4j_conn.driver:
-        return jsonify({'nodes': [], 'edges': []})
-    try:
-        with neo4j_conn.driver.session() as session:
-            query = """
-            MATCH (n)
-            WHERE elementId(n) = $node_id
-            MATCH (n)-[r]-(connected)
-            RETURN n, 
-                   connected,
-                   r,
-                   type(r) as rel_type,
-                   CASE 
-                       WHEN startNode(r) = n THEN 'out'
-                       ELSE 'in'
-                   END as direction
-            LIMIT 50
-            """
-            results = session.run(query, node_id=node_id)
-            nodes = []
-            edges = []
-            seen_nodes = set()
-            seen_edges = set()
-            first_result = None
-            for record in results:
-                if first_result is None:
-                    first_result = record
-                    center = record['n']
-                    center_type = list(center.labels)[0]
-                    center_id = center.element_id
-                    if center_id not in seen_nodes:
-                        if center_type == 'Variance':
-                            center_label = center.get('variance_name', center.get('id'))
-                            center_color = variance_color(center.get('variance_amount'))
-                        else:
-                            center_label = center.get('id') or center.get('name') or center.get('description')
-                            center_color = get_node_color(center_type)
-                        nodes.append({
-                            'id': center_id,
-                            'label': center_label,
-                            'type': center_type,
-                            'color': center_color,
-                            'size': 30,
-                            'properties': serialize_neo4j_types(dict(center))
-                        })
-                        seen_nodes.add(center_id)
-                connected = record['connected']
-                node_type = list(connected.labels)[0]
-                node_id = connected.element_id
-                color_map = {
-                    'Variance': '#98D8C8',
-                    'ProductionOrder': '#45B7D1',
-                    'Product': '#FF6B6B',
-                    'Material': '#4ECDC4',
-                    'WorkCenter': '#F7DC6F',
-                    'Cause': '#F8B739'
-                }
-                if node_id not in seen_nodes:
-                    if node_type == 'Variance':
-                        node_label = connected.get('variance_name', connected.get('id'))
-                        node_color = variance_color(connected.get('variance_amount'))
-                    else:
-                        node_label = connected.get('id') or connected.get('name') or connected.get('description')
-                        node_color = color_map.get(node_type, '#95A5A6')
+            for v in (row.get('variances') or []):
+                if v and v.get('id') and v['id'] not in added_node_ids:
+                    added_node_ids.add(v['id'])
                     nodes.append({
-                        'id': node_id,
-                        'label': node_label,
-                        'type': node_type,
-                        'color': node_color,
-                        'size': 25,
-                        'properties': serialize_neo4j_types(dict(connected))
+                        'id': v['id'], 'label': v.get('label', ''), 'type': 'Variance',
+                        'color': '#98D8C8', 'size': 20, 'properties': v.get('props') or {}
                     })
-                    seen_nodes.add(node_id)
-                rel_type = record['rel_type']
-                direction = record['direction']
-                edge_id = f"{center.element_id}-{node_id}-{rel_type}"
-                if edge_id not in seen_edges:
-                    if direction == 'out':
-                        edges.append({
-                            'id': edge_id,
-                            'from': center.element_id,
-                            'to': node_id,
-                            'label': rel_type,
-                            'arrows': 'to'
-                        })
-                    else:
-                        edges.append({
-                            'id': edge_id,
-                            'from': node_id,
-                            'to': center.element_id,
-                            'label': rel_type,
-                            'arrows': 'to'
-                        })
-                    seen_edges.add(edge_id)
-            if not first_result:
-                return jsonify({'nodes': [], 'edges': []})
-            return jsonify({'nodes': nodes, 'edges': edges})
-    except Exception:
-        import traceback
-        traceback.print_exc()
-        return jsonify({'nodes': [], 'edges': []})
+                    edges.append({
+                        'from': element_nodes[element], 'to': v['id'],
+                        'label': row.get('type', ''), 'color': '#98D8C8'
+                    })
+            for c in (row.get('causes') or []):
+                if c and c.get('id') and c['id'] not in added_node_ids:
+                    added_node_ids.add(c['id'])
+                    nodes.append({
+                        'id': c['id'], 'label': c.get('label', ''),
+                        'type': 'Cause', 'color': '#F7DC6F', 'size': 25,
+                        'properties': c.get('props') or {}
+                    })
+        return {'nodes': nodes, 'edges': edges}
 
 
 @app.route('/api/overview', methods=['GET'])
@@ -1184,95 +1257,119 @@ def get_overview():
     if not neo4j_conn.driver:
         return jsonify({'nodes': [], 'edges': []})
     try:
-        with neo4j_conn.driver.session() as session:
-            query = """
-            MATCH (v:Variance)
-            WITH v.cost_element as element,
-                 v.variance_type as type,
-                 collect(v)[..5] as sample_variances
-            UNWIND sample_variances as v
-            OPTIONAL MATCH (v)-[:CAUSED_BY]->(c:Cause)
-            RETURN element, type,
-                   collect(DISTINCT {
-                       id: elementId(v),
-                       label: v.id,
-                       props: properties(v)
-                   }) as variances,
-                   collect(DISTINCT {
-                       id: elementId(c),
-                       label: c.description,
-                       props: properties(c)
-                   }) as causes
-            """
-            results = session.run(query).data()
-            nodes = []
-            edges = []
-            element_nodes = {}
-            added_node_ids = set()
-            for row in results:
-                element = row['element']
-                if element not in element_nodes:
-                    elem_id = f"element_{element}"
-                    element_nodes[element] = elem_id
-                    nodes.append({
-                        'id': elem_id, 'label': element, 'type': 'CostElement',
-                        'color': '#3498db', 'size': 40, 'properties': {'name': element}
-                    })
-                for v in (row.get('variances') or []):
-                    if v and v.get('id') and v['id'] not in added_node_ids:
-                        added_node_ids.add(v['id'])
-                        nodes.append({
-                            'id': v['id'], 'label': v.get('label', ''), 'type': 'Variance',
-                            'color': '#98D8C8', 'size': 20, 'properties': v.get('props') or {}
-                        })
-                        edges.append({
-                            'from': element_nodes[element], 'to': v['id'],
-                            'label': row.get('type', ''), 'color': '#98D8C8'
-                        })
-                for c in (row.get('causes') or []):
-                    if c and c.get('id') and c['id'] not in added_node_ids:
-                        added_node_ids.add(c['id'])
-                        nodes.append({
-                            'id': c['id'], 'label': c.get('label', ''),
-                            'type': 'Cause', 'color': '#F7DC6F', 'size': 25,
-                            'properties': c.get('props') or {}
-                        })
-            return jsonify({'nodes': nodes, 'edges': edges})
-    except Exception as e:
-        import traceback
-        traceback.print_exc()
+        return graph_response(cached_result('overview', {}, _overview_graph))
+    except Exception:
+        report_exception()
         return jsonify({'nodes': [], 'edges': []})
 
 
+SUMMARY_QUERY = """
+MATCH (v:Variance)
+RETURN 
+    v.cost_element as element,
+    v.variance_type as type,
+    SUM(v.variance_amount) as total,
+    COUNT(v) as count
+ORDER BY element, type
+"""
+
+
 @app.route('/api/summary', methods=['GET'])
 def get_summary():
     """요약 통계"""
     
-    with neo4j_conn.driver.session() as session:
-        query = """
-        MATCH (v:Variance)
-        RETURN 
-            v.cost_element as element,
-            v.variance_type as type,
-            SUM(v.variance_amount) as total,
-            COUNT(v) as count
-        ORDER BY element, type
-        """
-        
-        results = session.run(query).data()
-        return jsonify(results)
+    def compute():
+        with neo4j_conn.driver.session() as session:
+            return session.run(SUMMARY_QUERY).data()
+    
+    return jsonify(cached_result('summary', {}, compute))
+
+
+def _empty_filters():
+    return jsonify({'products': [], 'work_centers': [], 'materials': [], 'months': []})
 
 
-def _safe_month(fd):
-    """날짜 값에서 YYYY-MM 추출 (Neo4j Date/문자열 모두 처리)"""
-    if fd is None:
+# 필터 옵션 쿼리 (서로 독립적이라 비동기 서버는 동시에 실행)
+FILTER_QUERIES = {
+    # 제품 목록
+    'products': """
+    MATCH (po:ProductionOrder)
+    WHERE po.product_cd IS NOT NULL
+    RETURN DISTINCT po.product_cd as product
+    ORDER BY product
+    """,
+    # 공정 목록 (관계를 통해)
+    'work_centers': """
+    MATCH (po:ProductionOrder)-[:WORKS_AT]->(wc:WorkCenter)
+    RETURN DISTINCT wc.id as work_center
+    ORDER BY work_center
+    """,
+    # 원자재 목록
+    'materials': """
+    MATCH (m:Material)
+    RETURN DISTINCT m.id as material_id, m.name as material_name
+    ORDER BY material_id
+    LIMIT 100
+    """,
+    # 기간 목록 (적재 시 저장한 finish_month, po_finish_month 인덱스에서 바로 읽음)
+    'months': """
+    MATCH (po:ProductionOrder)
+    WHERE po.finish_month IS NOT NULL
+    RETURN DISTINCT po.finish_month as month
+    ORDER BY month DESC
+    """,
+}
+
+
+def filter_options_result(results):
+    """FILTER_QUERIES 이름별 결과 행 -> /api/filters 응답"""
+    products = [row['product'] for row in results['products'] if row.get('product')]
+    work_centers = [row['work_center'] for row in results['work_centers'] if row.get('work_center')]
+    materials = [{'id': row['material_id'], 'name': row.get('material_name') or row['material_id']}
+                 for row in results['materials'] if row.get('material_id')]
+    months = [row['month'] for row in results['months'] if row.get('month')]
+    return {
+        'products': products or [],
+        'work_centers': work_centers or [],
+        'materials': materials or [],
+        'months': months or []
+    }
+
+
+# 로더가 적재 후 써 두는 필터 카탈로그 (neo4j/data_loader.py FILTER_CATALOG_QUERY)
+# 카탈로그 token이 현재 데이터 버전과 같을 때만 사용
+FILTER_CATALOG_QUERY = """
+MATCH (f:FilterCatalog {id: 'current'})
+OPTIONAL MATCH (d:DataVersion {id: 'current'})
+RETURN f.products as products, f.work_centers as work_centers,
+       f.material_ids as material_ids, f.material_names as material_names,
+       f.months as months, f.token IS NOT NULL AND f.token = d.token as fresh
+"""
+
+
+def filter_catalog_result(rows):
+    """FILTER_CATALOG_QUERY 결과 행 -> /api/filters 응답 (카탈로그가 없거나 오래됐으면 None)"""
+    if not rows or not rows[0]['fresh']:
         return None
-    s = str(fd) if not isinstance(fd, str) else fd
-    return s[:7] if len(s) >= 7 else s
+    row = rows[0]
+    return {
+        'products': row['products'] or [],
+        'work_centers': row['work_centers'] or [],
+        'materials': [{'id': material_id, 'name': name}
+                      for material_id, name in zip(row['material_ids'] or [], row['material_names'] or [])],
+        'months': row['months'] or []
+    }
 
 
-def _empty_filters():
-    return jsonify({'products': [], 'work_centers': [], 'materials': [], 'months': []})
+def _filter_options():
+    """필터 옵션 데이터 (카탈로그가 최신이면 쿼리 1번, 아니면 목록 쿼리 4개)"""
+    with neo4j_conn.driver.session() as session:
+        catalog = filter_catalog_result(session.run(FILTER_CATALOG_QUERY).data())
+        if catalog is not None:
+            return catalog
+        return filter_options_result({
+            name: session.run(query).data() for name, query in FILTER_QUERIES.items()
+        })
 
 
 @app.route('/api/filters', methods=['GET'])
@@ -1281,56 +1378,52 @@ def get_filters():
     if not neo4j_conn.driver:
         return _empty_filters()
     try:
-        with neo4j_conn.driver.session() as session:
-            # 제품 목록
-            products_query = """
-            MATCH (po:ProductionOrder)
-            WHERE po.product_cd IS NOT NULL
-            RETURN DISTINCT po.product_cd as product
-            ORDER BY product
-            """
-            products = [row['product'] for row in session.run(products_query).data() if row.get('product')]
-            
-            # 공정 목록 (관계를 통해)
-            wc_query = """
-            MATCH (po:ProductionOrder)-[:WORKS_AT]->(wc:WorkCenter)
-            RETURN DISTINCT wc.id as work_center
-            ORDER BY work_center
-            """
-            work_centers = [row['work_center'] for row in session.run(wc_query).data() if row.get('work_center')]
-            
-            # 원자재 목록
-            material_query = """
-            MATCH (m:Material)
-            RETURN DISTINCT m.id as material_id, m.name as material_name
-            ORDER BY material_id
-            LIMIT 100
-            """
-            materials = [{'id': row['material_id'], 'name': row.get('material_name') or row['material_id']} 
-                        for row in session.run(material_query).data() if row.get('material_id')]
-            
-            # 기간 목록 (월별 - finish_date 사용, 문자열/날짜 모두 처리)
-            month_query = """
-            MATCH (po:ProductionOrder)
-            WHERE po.finish_date IS NOT NULL
-            RETURN DISTINCT po.finish_date as fd
-            ORDER BY fd DESC
-            """
-            months_raw = session.run(month_query).data()
-            months = sorted({_safe_month(row.get('fd')) for row in months_raw if row.get('fd')} - {None}, reverse=True)
-            
-            return jsonify({
-                'products': products or [],
-                'work_centers': work_centers or [],
-                'materials': materials or [],
-                'months': months or []
-            })
-    except Exception as e:
-        import traceback
-        traceback.print_exc()
+        return jsonify(cached_result('filters', {}, _filter_options))
+    except Exception:
+        report_exception()
         return _empty_filters()
 
 
+def filtered_summary_query(cube_ready, work_center, month):
+    """필터 조합별 원가요소 × 차이유형 합계 쿼리 (파라미터: $product, $work_center, $month)"""
+    if cube_ready:
+        return CUBE_FILTERED_SUMMARY_QUERY
+    type_query = """
+    MATCH (po:ProductionOrder)-[:HAS_VARIANCE]->(v:Variance)
+    WHERE ($product = '' OR po.product_cd = $product)
+    """
+    if month:
+        # OR 조건 없이 비교해야 po_finish_month 인덱스 탐색 가능
+        type_query += """
+        AND po.finish_month = $month
+        """
+    if work_center:
+        type_query += """
+        AND EXISTS {
+            MATCH (po)-[:WORKS_AT]->(wc:WorkCenter {id: $work_center})
+        }
+        """
+    type_query += """
+    RETURN
+        v.cost_element as cost_element,
+        v.variance_type as variance_type,
+        SUM(v.variance_amount) as total_variance,
+        COUNT(v) as count
+    ORDER BY cost_element
+    """
+    return type_query
+
+
+def filtered_summary_result(by_type):
+    total_variance = sum([row.get('total_variance') or 0 for row in by_type])
+    total_count = sum([row.get('count') or 0 for row in by_type])
+    return {
+        'total_variance': total_variance,
+        'total_count': total_count,
+        'by_type': by_type or []
+    }
+
+
 def _empty_filtered_summary():
     return jsonify({'total_variance': 0, 'total_count': 0, 'by_type': []})
 
@@ -1338,44 +1431,21 @@ def _empty_filtered_summary():
 @app.route('/api/filtered_summary', methods=['POST'])
 def get_filtered_summary():
     """필터 적용된 요약 통계"""
-    filters = request.json or {}
-    product = filters.get('product', '')
-    work_center = filters.get('work_center', '')
-    month = filters.get('month', '')
+    params = _filter_params(request.json or {})
+    product, work_center, month = params['product'], params['work_center'], params['month']
     if not neo4j_conn.driver:
         return _empty_filtered_summary()
-    try:
+
+    def compute():
         with neo4j_conn.driver.session() as session:
-            type_query = """
-            MATCH (po:ProductionOrder)-[:HAS_VARIANCE]->(v:Variance)
-            WHERE ($product = '' OR po.product_cd = $product)
-            AND ($month = '' OR substring(toString(po.finish_date), 0, 7) = $month)
-            """
-            if work_center:
-                type_query += """
-                AND EXISTS {
-                    MATCH (po)-[:WORKS_AT]->(wc:WorkCenter {id: $work_center})
-                }
-                """
-            type_query += """
-            RETURN
-                v.cost_element as cost_element,
-                v.variance_type as variance_type,
-                SUM(v.variance_amount) as total_variance,
-                COUNT(v) as count
-            ORDER BY cost_element
-            """
+            type_query = filtered_summary_query(variance_cube_ready(session), work_center, month)
             by_type = session.run(type_query, product=product, work_center=work_center, month=month).data()
-            total_variance = sum([row.get('total_variance') or 0 for row in by_type])
-            total_count = sum([row.get('count') or 0 for row in by_type])
-            return jsonify({
-                'total_variance': total_variance,
-                'total_count': total_count,
-                'by_type': by_type or []
-            })
-    except Exception as e:
-        import traceback
-        traceback.print_exc()
+            return filtered_summary_result(by_type)
+
+    try:
+        return jsonify(cached_result('filtered_summary', params, compute))
+    except Exception:
+        report_exception()
         return _empty_filtered_summary()
 
 
@@ -1411,39 +1481,55 @@ def test_route():
     """테스트 라우트"""
     return jsonify({'status': 'ok', 'message': 'API is working!'})
 
+# 서버가 제공하는 HTML 페이지 (루트 디렉터리), 내용 해시 ETag + 압축본 캐시
+STATIC_PAGES = {
+    name: http_cache.StaticAsset(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), name))
+    for name in ('dashboard.html', 'variance_graph_dashboard_v3.html', 'comparison.html')
+}
+
+
+def static_page(name):
+    """HTML 페이지 응답: If-None-Match가 내용 해시와 같으면 304, 아니면 Accept-Encoding에 맞는 압축본
+
+    Cache-Control: no-cache로 브라우저가 저장해 두되 매번 재검증 (파일이 바뀌면 해시가 바뀜)
+    """
+    asset = STATIC_PAGES[name]
+    try:
+        etag, encoding, body = asset.variant(request.headers.get('Accept-Encoding'))
+    except FileNotFoundError:
+        return f"File not found: {asset.path}", 404
+    if http_cache.etag_matches(request.headers.get('If-None-Match'), etag):
+        response = Response(status=304)
+    else:
+        response = Response(body, mimetype=asset.mimetype)
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+    response.headers['ETag'] = etag
+    response.headers['Cache-Control'] = 'no-cache'
+    response.vary.add('Accept-Encoding')
+    return response
+
+
 @app.route('/')
+@app.route('/dashboard.html')
 def index():
     """메인 페이지 - 대시보드 홈"""
-    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    html_path = os.path.join(base_dir, 'dashboard.html')
-    if not os.path.exists(html_path):
-        return f"File not found: {html_path}", 404
-    with open(html_path, 'r', encoding='utf-8') as f:
-        content = f.read()
-    from flask import Response
-    return Response(content, mimetype='text/html')
+    return static_page('dashboard.html')
 
 @app.route('/analysis.html')
 def analysis():
     """상세 분석 페이지 - 리다이렉트"""
-    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    return send_file(os.path.join(base_dir, 'variance_graph_dashboard_v3.html'))
+    return static_page('variance_graph_dashboard_v3.html')
 
 @app.route('/variance_graph_dashboard_v3.html')
 def variance_graph_v3():
     """상세 분석 페이지 v3"""
-    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    response = send_file(os.path.join(base_dir, 'variance_graph_dashboard_v3.html'))
-    response.headers['Cache-Control'] = 'no-cache, no-store, must-revalidate'
-    response.headers['Pragma'] = 'no-cache'
-    response.headers['Expires'] = '0'
-    return response
+    return static_page('variance_graph_dashboard_v3.html')
 
 @app.route('/comparison.html')
 def comparison():
     """비교 분석 페이지"""
-    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    return send_file(os.path.join(base_dir, 'comparison.html'))
+    return static_page('comparison.html')
 
 
 def _default_summary():
@@ -1462,258 +1548,588 @@ def _empty_dashboard_response():
     })
 
 
+def dashboard_queries(product, work_center, month):
+    """대시보드 집계별 개별 쿼리 6개 {이름: (쿼리, 파라미터)} (기존 방식)
+
+    쿼리끼리 독립적이라 비동기 서버(graph_api_async.py)는 동시에 실행한다.
+    """
+    # 요약 데이터
+    if work_center:
+        summary_query = """
+    MATCH (po:ProductionOrder)-[:WORKS_AT]->(wc:WorkCenter)
+    MATCH (po)-[:HAS_VARIANCE]->(v:Variance)
+    WHERE ($product = '' OR po.product_cd = $product)
+    AND wc.id = $work_center
+    AND ($month = '' OR po.finish_month = $month)
+    RETURN 
+        sum(v.variance_amount) as total_variance,
+        count(v) as variance_count,
+        sum(CASE WHEN v.cost_element = 'MATERIAL' THEN v.variance_amount ELSE 0 END) as quantity_variance,
+        sum(CASE WHEN v.cost_element = 'MATERIAL' THEN 1 ELSE 0 END) as quantity_count,
+        sum(CASE WHEN v.cost_element = 'LABOR' THEN v.variance_amount ELSE 0 END) as price_variance,
+        sum(CASE WHEN v.cost_element = 'LABOR' THEN 1 ELSE 0 END) as price_count,
+        sum(CASE WHEN v.cost_element = 'OVERHEAD' THEN v.variance_amount ELSE 0 END) as production_variance,
+        sum(CASE WHEN v.cost_element = 'OVERHEAD' THEN 1 ELSE 0 END) as production_count
+    """
+    else:
+        summary_query = """
+    MATCH (po:ProductionOrder)-[:HAS_VARIANCE]->(v:Variance)
+    WHERE ($product = '' OR po.product_cd = $product)
+    AND ($month = '' OR po.finish_month = $month)
+    RETURN 
+        sum(v.variance_amount) as total_variance,
+        count(v) as variance_count,
+        sum(CASE WHEN v.cost_element = 'MATERIAL' THEN v.variance_amount ELSE 0 END) as quantity_variance,
+        sum(CASE WHEN v.cost_element = 'MATERIAL' THEN 1 ELSE 0 END) as quantity_count,
+        sum(CASE WHEN v.cost_element = 'LABOR' THEN v.variance_amount ELSE 0 END) as price_variance,
+        sum(CASE WHEN v.cost_element = 'LABOR' THEN 1 ELSE 0 END) as price_count,
+        sum(CASE WHEN v.cost_element = 'OVERHEAD' THEN v.variance_amount ELSE 0 END) as production_variance,
+        sum(CASE WHEN v.cost_element = 'OVERHEAD' THEN 1 ELSE 0 END) as production_count
+    """
+    
+    # 월별 트렌드
+    if work_center:
+        trend_query = """
+    MATCH (po:ProductionOrder)-[:WORKS_AT]->(wc:WorkCenter)
+    MATCH (po)-[:HAS_VARIANCE]->(v:Variance)
+    WHERE ($product = '' OR po.product_cd = $product)
+    AND wc.id = $work_center
+    WITH po.finish_month as month, sum(v.variance_amount) as total
+    RETURN month, total
+    ORDER BY month
+    """
+    else:
+        trend_query = """
+    MATCH (po:ProductionOrder)-[:HAS_VARIANCE]->(v:Variance)
+    WHERE ($product = '' OR po.product_cd = $product)
+    WITH po.finish_month as month, sum(v.variance_amount) as total
+    RETURN month, total
+    ORDER BY month
+    """
+    
+    # 차이 유형별
+    if work_center:
+        type_query = """
+    MATCH (po:ProductionOrder)-[:WORKS_AT]->(wc:WorkCenter)
+    MATCH (po)-[:HAS_VARIANCE]->(v:Variance)
+    WHERE ($product = '' OR po.product_cd = $product)
+    AND wc.id = $work_center
+    AND ($month = '' OR po.finish_month = $month)
+    WITH v.cost_element as element, sum(v.variance_amount) as amount
+    RETURN element, amount
+    """
+    else:
+        type_query = """
+    MATCH (po:ProductionOrder)-[:HAS_VARIANCE]->(v:Variance)
+    WHERE ($product = '' OR po.product_cd = $product)
+    AND ($month = '' OR po.finish_month = $month)
+    WITH v.cost_element as element, sum(v.variance_amount) as amount
+    RETURN element, amount
+    """
+    
+    # 제품별
+    if work_center:
+        product_query = """
+    MATCH (po:ProductionOrder)-[:WORKS_AT]->(wc:WorkCenter)
+    MATCH (po)-[:HAS_VARIANCE]->(v:Variance)
+    WHERE wc.id = $work_center
+    AND ($month = '' OR po.finish_month = $month)
+    WITH po.product_cd as product, sum(v.variance_amount) as amount
+    RETURN product, amount
+    ORDER BY abs(amount) DESC
+    """
+    else:
+        product_query = """
+    MATCH (po:ProductionOrder)-[:HAS_VARIANCE]->(v:Variance)
+    WHERE ($month = '' OR po.finish_month = $month)
+    WITH po.product_cd as product, sum(v.variance_amount) as amount
+    RETURN product, amount
+    ORDER BY abs(amount) DESC
+    """
+    
+    # 공정별
+    process_query = """
+MATCH (po:ProductionOrder)-[:WORKS_AT]->(wc:WorkCenter)
+MATCH (po)-[:HAS_VARIANCE]->(v:Variance)
+WHERE ($product = '' OR po.product_cd = $product)
+AND ($month = '' OR po.finish_month = $month)
+WITH wc.id as work_center, sum(v.variance_amount) as amount
+RETURN work_center, amount
+ORDER BY abs(amount) DESC
+"""
+    
+    # 상위 오더
+    if work_center:
+        top_orders_query = """
+    MATCH (po:ProductionOrder)-[:WORKS_AT]->(wc:WorkCenter)
+    MATCH (po)-[:HAS_VARIANCE]->(v:Variance)
+    WHERE ($product = '' OR po.product_cd = $product)
+    AND wc.id = $work_center
+    AND ($month = '' OR po.finish_month = $month)
+    WITH po, wc, sum(v.variance_amount) as total_variance
+    ORDER BY abs(total_variance) DESC
+    LIMIT 20
+    RETURN po.id as order_no, po.product_cd as product, wc.id as work_center, total_variance
+    """
+    else:
+        top_orders_query = """
+    MATCH (po:ProductionOrder)-[:HAS_VARIANCE]->(v:Variance)
+    OPTIONAL MATCH (po)-[:WORKS_AT]->(wc:WorkCenter)
+    WHERE ($product = '' OR po.product_cd = $product)
+    AND ($month = '' OR po.finish_month = $month)
+    WITH po, wc, sum(v.variance_amount) as total_variance
+    ORDER BY abs(total_variance) DESC
+    LIMIT 20
+    RETURN po.id as order_no, po.product_cd as product, wc.id as work_center, total_variance
+    """
+    filters = {'product': product, 'work_center': work_center, 'month': month}
+    return {
+        'summary': (summary_query, filters),
+        'monthly_trend': (trend_query, {'product': product, 'work_center': work_center}),
+        'by_type': (type_query, filters),
+        'by_product': (product_query, {'work_center': work_center, 'month': month}),
+        'by_process': (process_query, {'product': product, 'month': month}),
+        'top_orders': (top_orders_query, filters),
+    }
+
+
+def dashboard_queries_result(results):
+    """dashboard_queries 이름별 결과 행 -> 대시보드 데이터"""
+    data = dict(results)
+    data['summary'] = results['summary'][0] if results['summary'] else _default_summary()
+    return data
+
+
+def _dashboard_data_by_queries(session, product, work_center, month):
+    """대시보드 데이터 - 집계별 개별 쿼리 6회 (기존 방식)"""
+    return dashboard_queries_result({
+        name: session.run(query, **params).data()
+        for name, (query, params) in dashboard_queries(product, work_center, month).items()
+    })
+
+
+# 대시보드 집계 대상 오더를 한 번만 스캔 (오더당 1행: 작업장 목록 + 차이 목록)
+# 공정별(by_process)은 작업장 필터를 쓰지 않으므로 작업장 필터가 있어도
+# 제품/기간 조건을 만족하는 오더는 함께 가져온다
+DASHBOARD_SCAN_QUERY = """
+MATCH (po:ProductionOrder)
+WHERE EXISTS { MATCH (po)-[:HAS_VARIANCE]->(:Variance) }
+OPTIONAL MATCH (po)-[:WORKS_AT]->(wc:WorkCenter)
+WITH po, collect(wc.id) as work_centers,
+     po.finish_month as month
+WHERE $work_center = ''
+   OR $work_center IN work_centers
+   OR (($product = '' OR po.product_cd = $product) AND ($month = '' OR month = $month))
+MATCH (po)-[:HAS_VARIANCE]->(v:Variance)
+RETURN po.id as order_no, po.product_cd as product, month, work_centers,
+       collect([v.cost_element, v.variance_amount]) as variances
+"""
+
+# 원가요소 -> 요약 항목 (금액, 건수)
+DASHBOARD_ELEMENT_KEYS = {
+    'MATERIAL': ('quantity_variance', 'quantity_count'),
+    'LABOR': ('price_variance', 'price_count'),
+    'OVERHEAD': ('production_variance', 'production_count'),
+}
+
+
+def _add_amount(groups, key, amount, times=1):
+    """Cypher sum()과 같은 그룹 합계 (null 제외, 정수 0에서 시작)"""
+    if key not in groups:
+        groups[key] = 0
+    if amount is not None:
+        for _ in range(times):
+            groups[key] += amount
+
+
+def _top_by_abs(groups, limit=None):
+    """ORDER BY abs(amount) DESC - 같은 값은 먼저 나온 순서 유지"""
+    items = sorted(groups.items(), key=lambda item: -abs(item[1]))
+    return items[:limit] if limit else items
+
+
+def fold_dashboard_rows(rows, product, work_center, month):
+    """오더 스캔 결과를 한 번 순회하며 대시보드 집계 6개를 계산
+
+    각 집계는 기존 개별 쿼리와 같은 필터 조합을 쓴다.
+    - summary, by_type, top_orders: 제품 + 작업장 + 기간
+    - monthly_trend: 제품 + 작업장 (기간 필터 없음)
+    - by_product: 작업장 + 기간 (제품 필터 없음)
+    - by_process: 제품 + 기간, WORKS_AT이 있는 오더만 (작업장 필터 없음)
+    작업장 필터가 있으면 기존 쿼리처럼 해당 작업장 WORKS_AT 관계 수만큼 차이가 중복 집계된다.
+    """
+    summary = {key: 0 for key in _default_summary()}
+    trend, by_type, by_product, by_process, top_orders = {}, {}, {}, {}, {}
+    for row in rows:
+        variances = row['variances'] or []
+        work_centers = [wc for wc in (row['work_centers'] or []) if wc is not None]
+        product_ok = product == '' or row['product'] == product
+        month_ok = month == '' or row['month'] == month
+        times = work_centers.count(work_center) if work_center else 1
+
+        if product_ok and month_ok and times:
+            for element, amount in variances:
+                summary['variance_count'] += times
+                _add_amount(summary, 'total_variance', amount, times)
+                if element in DASHBOARD_ELEMENT_KEYS:
+                    amount_key, count_key = DASHBOARD_ELEMENT_KEYS[element]
+                    summary[count_key] += times
+                    _add_amount(summary, amount_key, amount, times)
+                _add_amount(by_type, element, amount, times)
+        if product_ok and times:
+            for _, amount in variances:
+                _add_amount(trend, row['month'], amount, times)
+        if month_ok and times:
+            for _, amount in variances:
+                _add_amount(by_product, row['product'], amount, times)
+        if product_ok and month_ok:
+            for wc in work_centers:
+                for _, amount in variances:
+                    _add_amount(by_process, wc, amount)
+
+        # 작업장 필터가 없을 때 기존 쿼리는 필터를 OPTIONAL MATCH 조건으로만 써서
+        # 조건에 맞지 않는 오더도 작업장 없이(null) 포함된다
+        if work_center:
+            order_work_centers = [work_center] if product_ok and month_ok and times else []
+        elif product_ok and month_ok and work_centers:
+            order_work_centers = list(dict.fromkeys(work_centers))
+        else:
+            order_work_centers = [None]
+        for wc in order_work_centers:
+            key = (row['order_no'], row['product'], wc)
+            wc_times = work_centers.count(wc) if wc is not None else 1
+            for _, amount in variances:
+                _add_amount(top_orders, key, amount, wc_times)
+
+    return _dashboard_result(summary, trend, by_type, by_product, by_process, [
+        {'order_no': order_no, 'product': product_cd, 'work_center': wc, 'total_variance': total}
+        for (order_no, product_cd, wc), total in _top_by_abs(top_orders, 20)
+    ])
+
+
+def _month_trend(trend):
+    """월별 합계 -> [{month, total}] (ORDER BY month, null은 마지막)"""
+    return [
+        {'month': key, 'total': total}
+        for key, total in sorted(trend.items(), key=lambda item: (item[0] is None, item[0] or ''))
+    ]
+
+
+def _dashboard_result(summary, trend, by_type, by_product, by_process, top_orders):
+    return {
+        'summary': summary,
+        'monthly_trend': _month_trend(trend),
+        'by_type': [{'element': key, 'amount': amount} for key, amount in by_type.items()],
+        'by_product': [{'product': key, 'amount': amount} for key, amount in _top_by_abs(by_product)],
+        'by_process': [{'work_center': key, 'amount': amount} for key, amount in _top_by_abs(by_process)],
+        'top_orders': top_orders,
+    }
+
+
+def _dashboard_data_single_pass(session, product, work_center, month):
+    """대시보드 데이터 - 오더/차이를 한 번 스캔해 Python에서 집계"""
+    rows = session.run(DASHBOARD_SCAN_QUERY, product=product, work_center=work_center, month=month)
+    return fold_dashboard_rows(rows, product, work_center, month)
+
+
+# ============================================================
+# 원가차이 집계 큐브 (neo4j/data_loader.py가 만드는 VarianceCube 셀)
+#   셀: 제품 × 작업장 × 완료월 × 원가요소 × 차이유형 -> amount(합계), count(건수)
+#   work_center = ''인 셀은 작업장 구분 없는 오더 단위 합계
+# ============================================================
+
+CUBE_READY_QUERY = "MATCH (c:VarianceCube) RETURN count(c) > 0 as ready"
+
+CUBE_CELLS_QUERY = """
+MATCH (c:VarianceCube)
+RETURN c.product_cd as product, c.work_center as work_center, c.month as month,
+       c.cost_element as cost_element, c.variance_type as variance_type,
+       c.amount as amount, c.count as count
+"""
+
+# 상위 오더는 셀로 계산할 수 없으므로 적재 시 저장한 po.variance_total 사용 (Variance 스캔 없음)
+CUBE_TOP_ORDERS_QUERY = """
+MATCH (po:ProductionOrder)-[:WORKS_AT]->(wc:WorkCenter {id: $work_center})
+WHERE po.variance_total IS NOT NULL
+AND ($product = '' OR po.product_cd = $product)
+AND ($month = '' OR po.finish_month = $month)
+WITH DISTINCT po, wc
+RETURN po.id as order_no, po.product_cd as product, wc.id as work_center,
+       po.variance_total as total_variance
+ORDER BY abs(total_variance) DESC
+LIMIT 20
+"""
+
+# 작업장 필터가 없으면 기존 쿼리처럼 필터를 OPTIONAL MATCH 조건으로만 사용
+CUBE_TOP_ORDERS_ALL_QUERY = """
+MATCH (po:ProductionOrder)
+WHERE po.variance_total IS NOT NULL
+OPTIONAL MATCH (po)-[:WORKS_AT]->(wc:WorkCenter)
+WHERE ($product = '' OR po.product_cd = $product)
+AND ($month = '' OR po.finish_month = $month)
+WITH DISTINCT po, wc
+RETURN po.id as order_no, po.product_cd as product, wc.id as work_center,
+       po.variance_total as total_variance
+ORDER BY abs(total_variance) DESC
+LIMIT 20
+"""
+
+CUBE_FILTERED_SUMMARY_QUERY = """
+MATCH (c:VarianceCube)
+WHERE c.work_center = $work_center
+AND ($product = '' OR c.product_cd = $product)
+AND ($month = '' OR c.month = $month)
+RETURN
+    c.cost_element as cost_element,
+    c.variance_type as variance_type,
+    sum(c.amount) as total_variance,
+    sum(c.count) as count
+ORDER BY cost_element
+"""
+
+# 비교 대상 유형별 월 × 차이유형 합계 (같은 유형의 대상을 UNWIND로 한 번에 조회)
+# $targets: [{i: 요청 순서 번호, type, value}], 결과 행의 i로 대상별로 나눈다
+COMPARISON_QUERIES = {
+    # VarianceCube 셀 합산 (variance_cube_cell 인덱스 탐색)
+    'cube': {
+        'product': """
+UNWIND $targets as t
+MATCH (c:VarianceCube)
+WHERE c.work_center = '' AND c.product_cd = t.value
+RETURN t.i as i, c.month as month, c.variance_type as variance_type,
+       sum(c.amount) as amount, sum(c.count) as count
+""",
+        'work_center': """
+UNWIND $targets as t
+MATCH (c:VarianceCube)
+WHERE c.work_center = t.value
+RETURN t.i as i, c.month as month, c.variance_type as variance_type,
+       sum(c.amount) as amount, sum(c.count) as count
+""",
+        'month': """
+UNWIND $targets as t
+MATCH (c:VarianceCube)
+WHERE c.work_center = '' AND c.month = t.value
+RETURN t.i as i, c.month as month, c.variance_type as variance_type,
+       sum(c.amount) as amount, sum(c.count) as count
+""",
+    },
+    # 큐브가 없을 때 Variance 직접 집계
+    'variance': {
+        'product': """
+UNWIND $targets as t
+MATCH (po:ProductionOrder)-[:HAS_VARIANCE]->(v:Variance)
+WHERE po.product_cd = t.value
+RETURN t.i as i, po.finish_month as month, v.variance_type as variance_type,
+       sum(v.variance_amount) as amount, count(v) as count
+""",
+        'work_center': """
+UNWIND $targets as t
+MATCH (po:ProductionOrder)-[:WORKS_AT]->(wc:WorkCenter)
+MATCH (po)-[:HAS_VARIANCE]->(v:Variance)
+WHERE wc.id = t.value
+RETURN t.i as i, po.finish_month as month, v.variance_type as variance_type,
+       sum(v.variance_amount) as amount, count(v) as count
+""",
+        'month': """
+UNWIND $targets as t
+MATCH (po:ProductionOrder)-[:HAS_VARIANCE]->(v:Variance)
+WHERE po.finish_month = t.value
+RETURN t.i as i, po.finish_month as month, v.variance_type as variance_type,
+       sum(v.variance_amount) as amount, count(v) as count
+""",
+    },
+}
+
+
+def variance_cube_ready(session):
+    """VarianceCube가 적재되어 있는지 (라벨 카운트 스토어 조회라 비용 거의 없음)"""
+    return session.run(CUBE_READY_QUERY).single()['ready']
+
+
+def fold_cube_cells(cells, product, work_center, month):
+    """큐브 셀로 대시보드 집계 계산 (fold_dashboard_rows와 같은 필터 조합, 상위 오더 제외)
+
+    작업장 필터가 있으면 해당 작업장 셀, 없으면 오더 단위('') 셀을 합산한다.
+    공정별(by_process)은 작업장별 셀을 작업장 필터 없이 합산한다.
+    """
+    summary = {key: 0 for key in _default_summary()}
+    trend, by_type, by_product, by_process = {}, {}, {}, {}
+    for cell in cells:
+        amount = cell['amount']
+        product_ok = product == '' or cell['product'] == product
+        month_ok = month == '' or cell['month'] == month
+        if cell['work_center'] == work_center:
+            if product_ok and month_ok:
+                summary['variance_count'] += cell['count']
+                _add_amount(summary, 'total_variance', amount)
+                if cell['cost_element'] in DASHBOARD_ELEMENT_KEYS:
+                    amount_key, count_key = DASHBOARD_ELEMENT_KEYS[cell['cost_element']]
+                    summary[count_key] += cell['count']
+                    _add_amount(summary, amount_key, amount)
+                _add_amount(by_type, cell['cost_element'], amount)
+            if product_ok:
+                _add_amount(trend, cell['month'], amount)
+            if month_ok:
+                _add_amount(by_product, cell['product'], amount)
+        if cell['work_center'] != '' and product_ok and month_ok:
+            _add_amount(by_process, cell['work_center'], amount)
+    return summary, trend, by_type, by_product, by_process
+
+
+def cube_top_orders_query(work_center):
+    return CUBE_TOP_ORDERS_QUERY if work_center else CUBE_TOP_ORDERS_ALL_QUERY
+
+
+def _dashboard_data_from_cube(session, product, work_center, month):
+    """대시보드 데이터 - VarianceCube 셀 합산 (셀 수에 비례) + 오더 합계로 상위 오더"""
+    cells = session.run(CUBE_CELLS_QUERY)
+    summary, trend, by_type, by_product, by_process = fold_cube_cells(cells, product, work_center, month)
+    top_orders = session.run(cube_top_orders_query(work_center),
+                             product=product, work_center=work_center, month=month).data()
+    return _dashboard_result(summary, trend, by_type, by_product, by_process, top_orders)
+
+
+# 비교 대상 유형 (이외 유형은 결과에서 제외)
+COMPARISON_TARGET_TYPES = ('product', 'work_center', 'month')
+
+# 차이유형 -> 비교 요약 항목
+COMPARISON_TYPE_KEYS = {
+    'QUANTITY': 'quantity_variance',
+    'PRICE': 'price_variance',
+    'PRODUCTION': 'production_variance',
+}
+
+def comparison_query_groups(targets, source):
+    """비교 대상에 요청 순서 번호를 붙이고 유형별 (쿼리, 대상 묶음) 목록 생성
+
+    반환: (번호가 붙은 대상 목록, [(쿼리, 해당 유형 대상 목록)])
+    """
+    params = [{'i': i, 'type': target['type'], 'value': target.get('value')}
+              for i, target in enumerate(targets)]
+    groups = []
+    for target_type, query in COMPARISON_QUERIES[source].items():
+        group = [target for target in params if target['type'] == target_type]
+        if group:
+            groups.append((query, group))
+    return params, groups
+
+
+def fold_comparison(params, records):
+    """유형별 쿼리 결과 행(i, month, variance_type, amount, count) -> 요청 순서의 요약/트렌드"""
+    cells = {}
+    for record in records:
+        cells.setdefault(record['i'], []).append(record)
+
+    summaries, trends = [], []
+    for target in params:
+        if target['type'] not in COMPARISON_TARGET_TYPES:
+            continue
+        summary = {'total_variance': 0, 'variance_count': 0, 'quantity_variance': 0,
+                   'price_variance': 0, 'production_variance': 0}
+        trend = {}
+        for cell in cells.get(target['i'], []):
+            summary['variance_count'] += cell['count']
+            _add_amount(summary, 'total_variance', cell['amount'])
+            key = COMPARISON_TYPE_KEYS.get(cell['variance_type'])
+            if key:
+                _add_amount(summary, key, cell['amount'])
+            _add_amount(trend, cell['month'], cell['amount'])
+        summaries.append({key: value or 0 for key, value in summary.items()})
+        # 월별 트렌드 (기간 비교가 아닌 경우에만)
+        if target['type'] != 'month':
+            trends.append(_month_trend(trend))
+    return summaries, trends
+
+
+def build_comparison_data(session, targets, source=None):
+    """비교 대상별 요약/월별 트렌드 (대상 유형마다 쿼리 1회, 요청 순서 유지)
+
+    source: 'cube' | 'variance' (기본: 큐브가 있으면 cube)
+    """
+    if source is None:
+        source = 'cube' if variance_cube_ready(session) else 'variance'
+    params, groups = comparison_query_groups(targets, source)
+    records = []
+    for query, group in groups:
+        records.extend(session.run(query, targets=group))
+    return fold_comparison(params, records)
+
+
+# 대시보드 집계 방식: cube(기본, 큐브가 없으면 single-pass) | single-pass | queries(기존 개별 쿼리)
+DASHBOARD_BACKEND = os.getenv('DASHBOARD_BACKEND', 'cube')
+
+
+def build_dashboard_data(session, product, work_center, month, backend=None):
+    backend = backend or DASHBOARD_BACKEND
+    if backend == 'cube' and not variance_cube_ready(session):
+        backend = 'single-pass'
+    if backend == 'queries':
+        data = _dashboard_data_by_queries(session, product, work_center, month)
+    elif backend == 'cube':
+        data = _dashboard_data_from_cube(session, product, work_center, month)
+    else:
+        data = _dashboard_data_single_pass(session, product, work_center, month)
+    return dashboard_payload(data)
+
+
+def dashboard_payload(data):
+    """집계 방식과 무관한 /api/dashboard-data 응답 형태 (빈 값 정규화)"""
+    summary = data['summary']
+    return {
+        'summary': {key: (summary.get(key) or 0) for key in _default_summary()},
+        'monthly_trend': data['monthly_trend'] or [],
+        'by_type': data['by_type'] or [],
+        'by_product': data['by_product'] or [],
+        'by_process': data['by_process'] or [],
+        'top_orders': data['top_orders'] or []
+    }
+
+
 @app.route('/api/dashboard-data', methods=['POST'])
 def get_dashboard_data():
     """대시보드 데이터 제공"""
-    data = request.json or {}
-    product = data.get('product', '')
-    work_center = data.get('work_center', '')
-    month = data.get('month', '')
+    params = _filter_params(request.json or {})
     if not neo4j_conn.driver:
         return _empty_dashboard_response()
-    try:
+
+    def compute():
         with neo4j_conn.driver.session() as session:
-            # 요약 데이터
-            if work_center:
-                summary_query = """
-            MATCH (po:ProductionOrder)-[:WORKS_AT]->(wc:WorkCenter)
-            MATCH (po)-[:HAS_VARIANCE]->(v:Variance)
-            WHERE ($product = '' OR po.product_cd = $product)
-            AND wc.id = $work_center
-            AND ($month = '' OR substring(toString(po.finish_date), 0, 7) = $month)
-            RETURN 
-                sum(v.variance_amount) as total_variance,
-                count(v) as variance_count,
-                sum(CASE WHEN v.cost_element = 'MATERIAL' THEN v.variance_amount ELSE 0 END) as quantity_variance,
-                sum(CASE WHEN v.cost_element = 'MATERIAL' THEN 1 ELSE 0 END) as quantity_count,
-                sum(CASE WHEN v.cost_element = 'LABOR' THEN v.variance_amount ELSE 0 END) as price_variance,
-                sum(CASE WHEN v.cost_element = 'LABOR' THEN 1 ELSE 0 END) as price_count,
-                sum(CASE WHEN v.cost_element = 'OVERHEAD' THEN v.variance_amount ELSE 0 END) as production_variance,
-                sum(CASE WHEN v.cost_element = 'OVERHEAD' THEN 1 ELSE 0 END) as production_count
-            """
-            else:
-                summary_query = """
-            MATCH (po:ProductionOrder)-[:HAS_VARIANCE]->(v:Variance)
-            WHERE ($product = '' OR po.product_cd = $product)
-            AND ($month = '' OR substring(toString(po.finish_date), 0, 7) = $month)
-            RETURN 
-                sum(v.variance_amount) as total_variance,
-                count(v) as variance_count,
-                sum(CASE WHEN v.cost_element = 'MATERIAL' THEN v.variance_amount ELSE 0 END) as quantity_variance,
-                sum(CASE WHEN v.cost_element = 'MATERIAL' THEN 1 ELSE 0 END) as quantity_count,
-                sum(CASE WHEN v.cost_element = 'LABOR' THEN v.variance_amount ELSE 0 END) as price_variance,
-                sum(CASE WHEN v.cost_element = 'LABOR' THEN 1 ELSE 0 END) as price_count,
-                sum(CASE WHEN v.cost_element = 'OVERHEAD' THEN v.variance_amount ELSE 0 END) as production_variance,
-                sum(CASE WHEN v.cost_element = 'OVERHEAD' THEN 1 ELSE 0 END) as production_count
-            """
-            summary_row = session.run(summary_query, product=product, work_center=work_center, month=month).single()
-            summary = summary_row if summary_row else _default_summary()
-            
-            # 월별 트렌드
-            if work_center:
-                trend_query = """
-            MATCH (po:ProductionOrder)-[:WORKS_AT]->(wc:WorkCenter)
-            MATCH (po)-[:HAS_VARIANCE]->(v:Variance)
-            WHERE ($product = '' OR po.product_cd = $product)
-            AND wc.id = $work_center
-            WITH substring(toString(po.finish_date), 0, 7) as month, sum(v.variance_amount) as total
-            RETURN month, total
-            ORDER BY month
-            """
-            else:
-                trend_query = """
-            MATCH (po:ProductionOrder)-[:HAS_VARIANCE]->(v:Variance)
-            WHERE ($product = '' OR po.product_cd = $product)
-            WITH substring(toString(po.finish_date), 0, 7) as month, sum(v.variance_amount) as total
-            RETURN month, total
-            ORDER BY month
-            """
-            trend = session.run(trend_query, product=product, work_center=work_center).data()
-            
-            # 차이 유형별
-            if work_center:
-                type_query = """
-            MATCH (po:ProductionOrder)-[:WORKS_AT]->(wc:WorkCenter)
-            MATCH (po)-[:HAS_VARIANCE]->(v:Variance)
-            WHERE ($product = '' OR po.product_cd = $product)
-            AND wc.id = $work_center
-            AND ($month = '' OR substring(toString(po.finish_date), 0, 7) = $month)
-            WITH v.cost_element as element, sum(v.variance_amount) as amount
-            RETURN element, amount
-            """
-            else:
-                type_query = """
-            MATCH (po:ProductionOrder)-[:HAS_VARIANCE]->(v:Variance)
-            WHERE ($product = '' OR po.product_cd = $product)
-            AND ($month = '' OR substring(toString(po.finish_date), 0, 7) = $month)
-            WITH v.cost_element as element, sum(v.variance_amount) as amount
-            RETURN element, amount
-            """
-            by_type = session.run(type_query, product=product, work_center=work_center, month=month).data()
-            
-            # 제품별
-            if work_center:
-                product_query = """
-            MATCH (po:ProductionOrder)-[:WORKS_AT]->(wc:WorkCenter)
-            MATCH (po)-[:HAS_VARIANCE]->(v:Variance)
-            WHERE wc.id = $work_center
-            AND ($month = '' OR substring(toString(po.finish_date), 0, 7) = $month)
-            WITH po.product_cd as product, sum(v.variance_amount) as amount
-            RETURN product, amount
-            ORDER BY abs(amount) DESC
-            """
-            else:
-                product_query = """
-            MATCH (po:ProductionOrder)-[:HAS_VARIANCE]->(v:Variance)
-            WHERE ($month = '' OR substring(toString(po.finish_date), 0, 7) = $month)
-            WITH po.product_cd as product, sum(v.variance_amount) as amount
-            RETURN product, amount
-            ORDER BY abs(amount) DESC
-            """
-            by_product = session.run(product_query, work_center=work_center, month=month).data()
-            
-            # 공정별
-            process_query = """
-        MATCH (po:ProductionOrder)-[:WORKS_AT]->(wc:WorkCenter)
-        MATCH (po)-[:HAS_VARIANCE]->(v:Variance)
-        WHERE ($product = '' OR po.product_cd = $product)
-        AND ($month = '' OR substring(toString(po.finish_date), 0, 7) = $month)
-        WITH wc.id as work_center, sum(v.variance_amount) as amount
-        RETURN work_center, amount
-        ORDER BY abs(amount) DESC
-        """
-            by_process = session.run(process_query, product=product, month=month).data()
-            
-            # 상위 오더
-            if work_center:
-                top_orders_query = """
-            MATCH (po:ProductionOrder)-[:WORKS_AT]->(wc:WorkCenter)
-            MATCH (po)-[:HAS_VARIANCE]->(v:Variance)
-            WHERE ($product = '' OR po.product_cd = $product)
-            AND wc.id = $work_center
-            AND ($month = '' OR substring(toString(po.finish_date), 0, 7) = $month)
-            WITH po, wc, sum(v.variance_amount) as total_variance
-            ORDER BY abs(total_variance) DESC
-            LIMIT 20
-            RETURN po.id as order_no, po.product_cd as product, wc.id as work_center, total_variance
-            """
-            else:
-                top_orders_query = """
-            MATCH (po:ProductionOrder)-[:HAS_VARIANCE]->(v:Variance)
-            OPTIONAL MATCH (po)-[:WORKS_AT]->(wc:WorkCenter)
-            WHERE ($product = '' OR po.product_cd = $product)
-            AND ($month = '' OR substring(toString(po.finish_date), 0, 7) = $month)
-            WITH po, wc, sum(v.variance_amount) as total_variance
-            ORDER BY abs(total_variance) DESC
-            LIMIT 20
-            RETURN po.id as order_no, po.product_cd as product, wc.id as work_center, total_variance
-            """
-            top_orders = session.run(top_orders_query, product=product, work_center=work_center, month=month).data()
-            
-            return jsonify({
-                'summary': {
-                    'total_variance': (summary.get('total_variance') or 0),
-                    'variance_count': (summary.get('variance_count') or 0),
-                    'quantity_variance': (summary.get('quantity_variance') or 0),
-                    'quantity_count': (summary.get('quantity_count') or 0),
-                    'price_variance': (summary.get('price_variance') or 0),
-                    'price_count': (summary.get('price_count') or 0),
-                    'production_variance': (summary.get('production_variance') or 0),
-                    'production_count': (summary.get('production_count') or 0)
-                },
-                'monthly_trend': trend or [],
-                'by_type': by_type or [],
-                'by_product': by_product or [],
-                'by_process': by_process or [],
-                'top_orders': top_orders or []
-            })
-    except Exception as e:
-        import traceback
-        traceback.print_exc()
+            return build_dashboard_data(session, params['product'], params['work_center'], params['month'])
+
+    try:
+        return jsonify(cached_result('dashboard_data', params, compute))
+    except Exception:
+        report_exception()
         return _empty_dashboard_response()
 
 
+@app.route('/api/cache/stats', methods=['GET'])
+def get_cache_stats():
+    """집계 캐시 적중/미적중 통계"""
+    return jsonify(api_cache.stats())
+
+
+@app.route('/api/pool/stats', methods=['GET'])
+def get_pool_stats():
+    """Neo4j 연결 풀 지표 (사용 중/유휴 연결, 연결 획득 대기 시간)"""
+    return jsonify(pool_metrics())
+
+
+@app.route('/api/_metrics', methods=['GET'])
+def get_metrics():
+    """경로별 처리 시간/Neo4j 시간/직렬화 시간/행 수와 연결 풀 지표 (Prometheus 텍스트 형식)"""
+    return Response(metrics.prometheus(pool_metrics()), mimetype='text/plain; version=0.0.4')
+
+
 @app.route('/api/comparison-data', methods=['POST'])
 def get_comparison_data():
     """비교 분석 데이터 제공"""
     data = request.json or {}
     targets = data.get('targets', [])
     
-    summaries = []
-    trends = []
-    
     with neo4j_conn.driver.session() as session:
-        for target in targets:
-            # 요약 데이터
-            if target['type'] == 'product':
-                summary_query = """
-                MATCH (po:ProductionOrder)-[:HAS_VARIANCE]->(v:Variance)
-                WHERE po.product_cd = $value
-                RETURN 
-                    sum(v.variance_amount) as total_variance,
-                    count(v) as variance_count,
-                    sum(CASE WHEN v.variance_type = 'QUANTITY' THEN v.variance_amount ELSE 0 END) as quantity_variance,
-                    sum(CASE WHEN v.variance_type = 'PRICE' THEN v.variance_amount ELSE 0 END) as price_variance,
-                    sum(CASE WHEN v.variance_type = 'PRODUCTION' THEN v.variance_amount ELSE 0 END) as production_variance
-                """
-            elif target['type'] == 'work_center':
-                summary_query = """
-                MATCH (po:ProductionOrder)-[:WORKS_AT]->(wc:WorkCenter)
-                MATCH (po)-[:HAS_VARIANCE]->(v:Variance)
-                WHERE wc.id = $value
-                RETURN 
-                    sum(v.variance_amount) as total_variance,
-                    count(v) as variance_count,
-                    sum(CASE WHEN v.variance_type = 'QUANTITY' THEN v.variance_amount ELSE 0 END) as quantity_variance,
-                    sum(CASE WHEN v.variance_type = 'PRICE' THEN v.variance_amount ELSE 0 END) as price_variance,
-                    sum(CASE WHEN v.variance_type = 'PRODUCTION' THEN v.variance_amount ELSE 0 END) as production_variance
-                """
-            elif target['type'] == 'month':
-                summary_query = """
-                MATCH (po:ProductionOrder)-[:HAS_VARIANCE]->(v:Variance)
-                WHERE substring(toString(po.finish_date), 0, 7) = $value
-                RETURN 
-                    sum(v.variance_amount) as total_variance,
-                    count(v) as variance_count,
-                    sum(CASE WHEN v.variance_type = 'QUANTITY' THEN v.variance_amount ELSE 0 END) as quantity_variance,
-                    sum(CASE WHEN v.variance_type = 'PRICE' THEN v.variance_amount ELSE 0 END) as price_variance,
-                    sum(CASE WHEN v.variance_type = 'PRODUCTION' THEN v.variance_amount ELSE 0 END) as production_variance
-                """
-            else:
-                continue
-            
-            summary = session.run(summary_query, value=target['value']).single()
-            
-            summaries.append({
-                'total_variance': summary['total_variance'] or 0,
-                'variance_count': summary['variance_count'] or 0,
-                'quantity_variance': summary['quantity_variance'] or 0,
-                'price_variance': summary['price_variance'] or 0,
-                'production_variance': summary['production_variance'] or 0
-            })
-            
-            # 월별 트렌드 (기간 비교가 아닌 경우에만)
-            if target['type'] == 'product':
-                trend_query = """
-                MATCH (po:ProductionOrder)-[:HAS_VARIANCE]->(v:Variance)
-                WHERE po.product_cd = $value
-                WITH substring(toString(po.finish_date), 0, 7) as month, sum(v.variance_amount) as total
-                RETURN month, total
-                ORDER BY month
-                """
-                trend = session.run(trend_query, value=target['value']).data()
-                trends.append(trend)
-            elif target['type'] == 'work_center':
-                trend_query = """
-                MATCH (po:ProductionOrder)-[:WORKS_AT]->(wc:WorkCenter)
-                MATCH (po)-[:HAS_VARIANCE]->(v:Variance)
-                WHERE wc.id = $value
-                WITH substring(toString(po.finish_date), 0, 7) as month, sum(v.variance_amount) as total
-                RETURN month, total
-                ORDER BY month
-                """
-                trend = session.run(trend_query, value=target['value']).data()
-                trends.append(trend)
+        summaries, trends = build_comparison_data(session, targets)
     
     return jsonify({
         'summaries': summaries,
@@ -1721,6 +2137,74 @@ def get_comparison_data():
     })
 
 
+
+# ============================================================
+# 프로덕션 워커 warm-up (gunicorn.conf.py의 post_worker_init에서 호출)
+# ============================================================
+
+# 워커가 요청을 받기 전에 미리 채우는 집계 캐시 경로
+WARM_UP_ROUTES = ('/api/filters', '/api/summary', '/api/overview')
+
+
+def _open_pool_connections(count, timeout=30):
+    """세션 count개에서 동시에 쿼리를 실행해 연결 count개를 풀에 유휴 연결로 만들어 둠
+
+    반환: 연결을 얻지 못한 세션 수 (다른 세션이 실패해 기다림을 멈춘 세션은 연결을 얻었으므로 제외)
+    """
+    barrier = threading.Barrier(count)
+    failures = []
+
+    def hold():
+        try:
+            with neo4j_conn.driver.session() as session:
+                session.run("RETURN 1").consume()
+                # 모두 연결을 잡을 때까지 반납하지 않아야 연결이 count개 생김
+                barrier.wait(timeout)
+        except threading.BrokenBarrierError:
+            pass
+        except Exception as e:
+            barrier.abort()
+            failures.append(e)
+
+    threads = [threading.Thread(target=hold) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return len(failures)
+
+
+def warm_up(connections=1):
+    """연결 풀을 열고 필터/요약/개요 캐시를 채움 (요청 지표/ETag 훅은 거치지 않음)
+
+    connections: 미리 열어 둘 연결 수 (워커 스레드 수), 실패해도 워커는 그대로 기동
+    """
+    if not neo4j_conn.driver:
+        print(f"[X] warm-up 생략 (pid {os.getpid()}): Neo4j 연결 정보 없음")
+        return False
+    started = time.perf_counter()
+    connections = max(1, connections)
+    try:
+        neo4j_conn.driver.verify_connectivity()
+        failures = _open_pool_connections(connections)
+    except Exception as e:
+        print(f"[X] warm-up 실패 (pid {os.getpid()}): Neo4j 연결 오류: {e}")
+        return False
+    if failures:
+        print(f"[X] warm-up 실패 (pid {os.getpid()}): 연결 {connections}개 중 {failures}개를 열지 못함")
+        return False
+    for path in WARM_UP_ROUTES:
+        with app.test_request_context(path):
+            try:
+                app.dispatch_request()
+            except Exception as e:
+                print(f"[X] warm-up {path}: {e}")
+    pool = pool_metrics().get(neo4j_conn.name, {})
+    print(f"[OK] warm-up 완료 (pid {os.getpid()}): 유휴 연결 {pool.get('idle')}개, "
+          f"캐시 {len(api_cache.entries)}개, {time.perf_counter() - started:.1f}초")
+    return True
+
+
 if __name__ == '__main__':
     print("=" * 80)
     print("  Variance Graph API Server")
@@ -1740,7 +2224,11 @@ if __name__ == '__main__':
     print("  GET /api/filters")
     print("  POST /api/filtered_summary")
     print("  GET /api/variances/by-type")
+    print("  GET /api/cache/stats")
+    print("  GET /api/pool/stats")
+    print("  GET /api/_metrics (Prometheus), 모든 API에 ?profile=1 (Cypher PROFILE 요약)")
     print("\nOpen http://localhost:8000 in browser")
+    print("Production (multi-worker): python visualization/serve_api.py --workers 4 --threads 4")
     print("=" * 80 + "\n")
     
     try:
@@ -5,28 +5,19 @@ Neo4j의 노드와 엣지를 인터랙티브하게 탐색할 수 있는 도구
 실행: python visualization/graph_network_viewer.py
 """
 import os
-import ssl
+import sys
 from dotenv import load_dotenv
-from neo4j import GraphDatabase
 from pyvis.network import Network
 import networkx as nx
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from neo4j_connection import create_driver
+
 load_dotenv()
 
 class Neo4jGraphVisualizer:
     def __init__(self):
-        uri = os.getenv('NEO4J_URI')
-        username = os.getenv('NEO4J_USERNAME')
-        password = os.getenv('NEO4J_PASSWORD')
-        
-        uri = uri.replace('neo4j+s://', 'bolt://')
-        uri = uri.replace('neo4j+ssc://', 'bolt://')
-        
-        ssl_context = ssl.create_default_context()
-        ssl_context.check_hostname = False
-        ssl_context.verify_mode = ssl.CERT_NONE
-        
-        self.driver = GraphDatabase.driver(uri, auth=(username, password), ssl_context=ssl_context)
+        self.driver = create_driver('graph-network-viewer', ssl_rewrite=True)
     
     def close(self):
         self.driver.close()
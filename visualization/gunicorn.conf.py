@@ -0,0 +1,52 @@
+"""
+gunicorn 설정 (프로덕션 실행: startup.sh, serve_api.py)
+
+  cd visualization && gunicorn -c gunicorn.conf.py graph_api_server:app
+
+- 워커 프로세스 API_WORKERS개 x 워커당 스레드 API_THREADS개 (gthread)
+- 워커마다 자기 Neo4j 드라이버를 만듦 (preload_app 끔: 드라이버 연결은 fork 후 공유하면 안 됨)
+- 워커가 요청을 받기 전에 연결 풀을 열고 필터/요약/개요 캐시를 채움 (post_worker_init -> warm_up)
+- 종료(SIGTERM) 시 처리 중인 요청을 API_GRACEFUL_TIMEOUT초 안에 마치고 워커마다 neo4j_conn.close()
+
+환경 변수:
+  PORT                  바인드 포트 (기본 8000)
+  API_WORKERS           워커 프로세스 수 (기본 CPU 수 * 2 + 1, 최대 8)
+  API_THREADS           워커당 스레드 수 (기본 4)
+  API_TIMEOUT           요청 처리 제한 시간 초 (기본 600)
+  API_GRACEFUL_TIMEOUT  종료 시 처리 중인 요청을 기다리는 시간 초 (기본 30)
+  API_WARM_UP           0이면 워커 warm-up 생략 (기본 1)
+  API_MAX_REQUESTS      워커가 이만큼 요청을 처리하면 새 워커로 교체 (기본 0: 교체 안 함)
+"""
+
+import os
+import multiprocessing
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+workers = int(os.getenv('API_WORKERS', str(min(multiprocessing.cpu_count() * 2 + 1, 8))))
+threads = int(os.getenv('API_THREADS', '4'))
+worker_class = 'gthread'
+timeout = int(os.getenv('API_TIMEOUT', '600'))
+graceful_timeout = int(os.getenv('API_GRACEFUL_TIMEOUT', '30'))
+keepalive = 5
+max_requests = int(os.getenv('API_MAX_REQUESTS', '0'))
+max_requests_jitter = max_requests // 10
+preload_app = False
+
+
+def when_ready(server):
+    server.log.info(f"[OK] graph_api_server: 워커 {server.cfg.workers}개 x 스레드 {server.cfg.threads}개, "
+                    f"{', '.join(server.cfg.bind)}")
+
+
+def post_worker_init(worker):
+    """워커가 앱을 불러온 직후, 요청을 받기 전 (이 워커의 연결 풀과 캐시 준비)"""
+    if os.getenv('API_WARM_UP', '1') == '0':
+        return
+    import graph_api_server
+    graph_api_server.warm_up(connections=worker.cfg.threads)
+
+
+def worker_exit(server, worker):
+    """워커 종료 시 (graceful shutdown 포함) 이 워커의 Neo4j 드라이버 닫기"""
+    import graph_api_server
+    graph_api_server.neo4j_conn.close()
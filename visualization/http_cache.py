@@ -0,0 +1,197 @@
+"""
+HTTP 응답 압축 / ETag 조건부 요청 / 정적 페이지 캐시
+
+graph_api_server.py(Flask)와 graph_api_async.py(ASGI 네이티브 경로)가 함께 씁니다.
+- Accept-Encoding에 따라 br(brotli 패키지가 있을 때) > gzip 순으로 압축 (작은 응답은 그대로)
+  NDJSON 스트림은 청크마다 flush하며 압축하므로 줄이 바로 전달됨
+- API GET 응답의 강한 ETag: 로더가 기록한 데이터 버전 토큰 + 서버 코드 버전 + 경로/쿼리 파라미터 + 압축 방식
+  -> If-None-Match가 같으면 핸들러를 실행하지 않고 304 (데이터 버전 토큰이 없으면 ETag를 붙이지 않음)
+- 정적 HTML: 내용 해시 ETag, 압축본은 파일이 바뀔 때만 다시 만듦
+
+환경 변수:
+  API_COMPRESS            0이면 응답 압축 끔 (기본 1)
+  API_COMPRESS_MIN_BYTES  이보다 작은 응답은 압축하지 않음 (기본 1024)
+  API_GZIP_LEVEL          API 응답 gzip 압축 수준 (기본 6)
+  API_BROTLI_QUALITY      API 응답 brotli 품질 (기본 5, 정적 파일은 최대 품질)
+  API_ETAG                0이면 API ETag/304 끔 (기본 1)
+"""
+
+import os
+import gzip
+import zlib
+import hashlib
+import threading
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESS_ENABLED = os.getenv('API_COMPRESS', '1') != '0'
+COMPRESS_MIN_BYTES = int(os.getenv('API_COMPRESS_MIN_BYTES', '1024'))
+GZIP_LEVEL = int(os.getenv('API_GZIP_LEVEL', '6'))
+BROTLI_QUALITY = int(os.getenv('API_BROTLI_QUALITY', '5'))
+ETAG_ENABLED = os.getenv('API_ETAG', '1') != '0'
+
+# 압축하는 응답 mimetype
+COMPRESSIBLE_TYPES = (
+    'application/json', 'application/x-ndjson', 'text/html', 'text/plain', 'text/css', 'application/javascript',
+)
+# 같은 q 값이면 앞쪽 우선
+ENCODINGS = ('br', 'gzip') if brotli is not None else ('gzip',)
+
+# ETag에 넣는 서버 코드 버전 (응답을 만드는 모듈 내용 해시, 배포 후 이전 ETag가 맞지 않도록)
+_CODE_FILES = ('graph_api_server.py', 'graph_api_async.py', 'json_codec.py', 'http_cache.py')
+
+
+def _code_version():
+    digest = hashlib.sha256()
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    for name in _CODE_FILES:
+        try:
+            with open(os.path.join(base_dir, name), 'rb') as f:
+                digest.update(f.read())
+        except OSError:
+            digest.update(name.encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+
+CODE_VERSION = _code_version()
+
+
+def negotiate_encoding(accept_encoding):
+    """Accept-Encoding 헤더 -> 'br' | 'gzip' | None (q=0은 거부, 압축을 껐으면 None)"""
+    if not COMPRESS_ENABLED or not accept_encoding:
+        return None
+    weights = {}
+    for part in accept_encoding.split(','):
+        name, _, params = part.partition(';')
+        q = 1.0
+        for param in params.split(';'):
+            key, _, value = param.strip().partition('=')
+            if key.lower() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        weights[name.strip().lower()] = q
+    best, best_q = None, 0.0
+    for encoding in ENCODINGS:
+        q = weights.get(encoding, weights.get('*', 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def compressible(mimetype):
+    return mimetype in COMPRESSIBLE_TYPES
+
+
+def compress(body, encoding, static=False):
+    """본문 압축 (static: 한 번만 압축하는 정적 파일이므로 최대 압축)"""
+    if encoding == 'br':
+        return brotli.compress(body, quality=11 if static else BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=9 if static else GZIP_LEVEL, mtime=0)
+
+
+class StreamCompressor:
+    """청크 단위 압축 (청크마다 flush해서 받은 만큼 바로 풀 수 있게)"""
+
+    def __init__(self, encoding):
+        self.encoding = encoding
+        if encoding == 'br':
+            self.compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+        else:
+            self.compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)  # 31: gzip 헤더
+
+    def chunk(self, data):
+        if self.encoding == 'br':
+            return self.compressor.process(data) + self.compressor.flush()
+        return self.compressor.compress(data) + self.compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        if self.encoding == 'br':
+            return self.compressor.finish()
+        return self.compressor.flush()
+
+
+def compress_stream(chunks, encoding):
+    """스트리밍 응답 청크(str/bytes) -> 압축 청크 (원래 iterable의 close도 호출)"""
+    compressor = StreamCompressor(encoding)
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode('utf-8')
+            data = compressor.chunk(chunk)
+            if data:
+                yield data
+        yield compressor.finish()
+    finally:
+        close = getattr(chunks, 'close', None)
+        if close is not None:
+            close()
+
+
+def _tag(digest, encoding):
+    return f'"{digest}-{encoding}"' if encoding else f'"{digest}"'
+
+
+def api_etag(version, method, path, query_items, encoding):
+    """데이터 버전 + 요청으로 만드는 강한 ETag (버전 토큰이 없거나 ETag를 껐으면 None)"""
+    if not ETAG_ENABLED or version is None:
+        return None
+    digest = hashlib.sha256()
+    for part in (str(version), CODE_VERSION, method, path):
+        digest.update(part.encode('utf-8'))
+        digest.update(b'\0')
+    for key, value in sorted(query_items):
+        digest.update(f'{key}={value}'.encode('utf-8'))
+        digest.update(b'\0')
+    return _tag(digest.hexdigest()[:32], encoding)
+
+
+def etag_matches(if_none_match, etag):
+    """If-None-Match 헤더가 etag를 포함하는지 (약한 비교, '*'는 항상 일치)"""
+    if not if_none_match or not etag:
+        return False
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate == '*':
+            return True
+        if candidate.startswith('W/'):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+class StaticAsset:
+    """정적 파일 1개: 내용 해시 ETag + 인코딩별 본문 (수정 시각이 바뀌면 다시 읽음)"""
+
+    def __init__(self, path, mimetype='text/html'):
+        self.path = path
+        self.mimetype = mimetype
+        self.lock = threading.Lock()
+        self.mtime = None
+        self.digest = None
+        self.bodies = {}
+
+    def load(self):
+        """-> (내용 해시, {인코딩 또는 None: 본문}), 파일이 없으면 FileNotFoundError"""
+        mtime = os.stat(self.path).st_mtime_ns
+        with self.lock:
+            if mtime != self.mtime:
+                with open(self.path, 'rb') as f:
+                    body = f.read()
+                self.digest = hashlib.sha256(body).hexdigest()[:32]
+                self.bodies = {None: body}
+                for encoding in ENCODINGS:
+                    self.bodies[encoding] = compress(body, encoding, static=True)
+                self.mtime = mtime
+            return self.digest, self.bodies
+
+    def variant(self, accept_encoding):
+        """요청에 맞는 (ETag, 인코딩, 본문)"""
+        digest, bodies = self.load()
+        encoding = negotiate_encoding(accept_encoding)
+        return _tag(digest, encoding), encoding, bodies[encoding]
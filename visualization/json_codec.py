@@ -0,0 +1,68 @@
+"""
+API 응답 JSON 인코더 (orjson 우선, 없으면 표준 json)
+
+graph_api_server.py의 jsonify/NDJSON 스트림과 graph_api_async.py 응답이 모두 이 모듈로 인코딩합니다.
+- orjson이 설치돼 있으면 사용 (pip install orjson), 없으면 표준 json으로 같은 모양의 결과
+- 공백 없는 구분자, 키 정렬, 비ASCII 문자는 \\uXXXX 대신 UTF-8 그대로 (한글 응답 크기 감소)
+- Neo4j 시간 타입(Date, DateTime, Time, Duration)은 ISO 8601 문자열,
+  그 밖의 타입은 Flask 기본 규칙 (datetime -> HTTP 날짜, Decimal/UUID -> 문자열, dataclass -> dict)
+- node_properties: 노드 속성을 결과를 읽을 때 한 번에 변환 (재귀 순회 없이 속성 1단계만)
+
+환경 변수:
+  API_JSON_ENGINE   orjson(기본, 설치된 경우) 또는 json (결과/속도 비교용)
+"""
+
+import os
+import json
+
+from flask.json.provider import DefaultJSONProvider
+from neo4j.time import Date, DateTime, Duration, Time
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+NEO4J_TEMPORAL_TYPES = (Date, DateTime, Time, Duration)
+
+ENGINE = 'orjson' if orjson is not None and os.getenv('API_JSON_ENGINE', 'orjson') != 'json' else 'json'
+
+
+def default(obj):
+    """인코더가 모르는 타입 변환 (Neo4j 시간 타입 -> ISO 문자열, 나머지는 Flask 규칙)"""
+    if isinstance(obj, NEO4J_TEMPORAL_TYPES):
+        return obj.iso_format()
+    return DefaultJSONProvider.default(obj)
+
+
+def to_json_value(value):
+    """속성 값 1개 변환 (노드 속성은 기본값 또는 기본값 목록만 가질 수 있음)"""
+    if isinstance(value, NEO4J_TEMPORAL_TYPES):
+        return value.iso_format()
+    if isinstance(value, list):
+        return [item.iso_format() if isinstance(item, NEO4J_TEMPORAL_TYPES) else item for item in value]
+    return value
+
+
+def node_properties(entity):
+    """노드/관계 속성 -> JSON 값 dict"""
+    return {key: to_json_value(value) for key, value in entity.items()}
+
+
+def dumps_bytes(obj, sort_keys=True, indent=None):
+    """obj -> UTF-8 JSON bytes (indent는 None 또는 2일 때 orjson 사용)"""
+    if ENGINE == 'orjson' and indent in (None, 2):
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=default, option=option)
+    return json.dumps(
+        obj, default=default, ensure_ascii=False, sort_keys=sort_keys, indent=indent,
+        separators=(',', ':') if indent is None else None
+    ).encode('utf-8')
+
+
+def dumps(obj, sort_keys=True, indent=None):
+    return dumps_bytes(obj, sort_keys, indent).decode('utf-8')
@@ -0,0 +1,172 @@
+"""
+API 서버 부하 테스트 (동기 Flask vs 비동기 ASGI)
+
+동시 클라이언트 N개가 대시보드 화면과 같은 요청 묶음(필터 목록, 요약, 필터 요약,
+대시보드 집계, 비교 분석)을 반복해서 보내고 서버별 p50/p95/p99 지연, 처리량, 오류 수를 비교합니다.
+캐시가 켜져 있으면 첫 요청 이후 모두 캐시 적중이 되므로, 두 서버 모두 API_CACHE=0으로 띄워 비교하세요.
+
+  API_CACHE=0 python visualization/graph_api_server.py        (8000)
+  API_CACHE=0 python visualization/graph_api_async.py         (8001)
+
+사용법:
+  python visualization/loadtest_api.py
+  python visualization/loadtest_api.py --clients 50 --requests 40
+  python visualization/loadtest_api.py --servers sync=http://localhost:8000,async=http://localhost:8001
+"""
+
+import sys
+import math
+import json
+import time
+import argparse
+import threading
+import http.client
+from urllib.parse import urlsplit
+
+
+def percentile(values, p):
+    """nearest-rank 백분위수"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(p / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def build_scenario(base_url):
+    """필터 옵션을 한 번 조회해 요청 묶음 [(이름, 메서드, 경로, 본문)] 생성"""
+    conn = _connect(base_url)
+    conn.request('GET', '/api/filters')
+    filters = json.loads(conn.getresponse().read() or b'{}')
+    conn.close()
+    products = filters.get('products') or ['']
+    work_centers = filters.get('work_centers') or ['']
+    months = filters.get('months') or ['']
+
+    scenario = [
+        ('filters', 'GET', '/api/filters', None),
+        ('summary', 'GET', '/api/summary', None),
+        ('filtered_summary', 'POST', '/api/filtered_summary', {'product': products[0]}),
+        ('dashboard', 'POST', '/api/dashboard-data', {}),
+        ('dashboard', 'POST', '/api/dashboard-data', {'product': products[0], 'month': months[0]}),
+        ('dashboard', 'POST', '/api/dashboard-data', {'work_center': work_centers[0]}),
+        ('comparison', 'POST', '/api/comparison-data', {
+            'targets': [{'type': 'product', 'value': value} for value in products[:5]]
+                       + [{'type': 'month', 'value': value} for value in months[:3]]
+        }),
+    ]
+    return scenario
+
+
+def _connect(base_url, timeout=120):
+    parts = urlsplit(base_url)
+    conn_class = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+    return conn_class(parts.hostname, parts.port, timeout=timeout)
+
+
+def run_client(base_url, scenario, requests, offset, latencies, errors, lock):
+    """클라이언트 1개: keep-alive 연결 하나로 요청 묶음을 순환하며 전송"""
+    conn = _connect(base_url)
+    local = []
+    failed = 0
+    for n in range(requests):
+        name, method, path, body = scenario[(offset + n) % len(scenario)]
+        payload = json.dumps(body).encode() if body is not None else None
+        headers = {'Content-Type': 'application/json'} if payload is not None else {}
+        started = time.perf_counter()
+        try:
+            conn.request(method, path, body=payload, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            ok = response.status == 200
+        except (OSError, http.client.HTTPException):
+            ok = False
+            conn.close()
+            conn = _connect(base_url)
+        elapsed = (time.perf_counter() - started) * 1000
+        if ok:
+            local.append((name, elapsed))
+        else:
+            failed += 1
+    conn.close()
+    with lock:
+        latencies.extend(local)
+        errors[0] += failed
+
+
+def load_test(base_url, clients, requests):
+    scenario = build_scenario(base_url)
+    latencies, errors, lock = [], [0], threading.Lock()
+    threads = [
+        threading.Thread(target=run_client,
+                         args=(base_url, scenario, requests, i, latencies, errors, lock))
+        for i in range(clients)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - started
+    return latencies, errors[0], wall
+
+
+def cache_enabled(base_url):
+    try:
+        conn = _connect(base_url, timeout=10)
+        conn.request('GET', '/api/cache/stats')
+        stats = json.loads(conn.getresponse().read())
+        conn.close()
+        return bool(stats.get('enabled'))
+    except (OSError, ValueError, http.client.HTTPException):
+        return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description='API 서버 부하 테스트 (동기 vs 비동기)')
+    parser.add_argument('--servers', default='sync=http://localhost:8000,async=http://localhost:8001',
+                        help='이름=URL 목록 (쉼표 구분)')
+    parser.add_argument('--clients', type=int, default=50, help='동시 클라이언트 수 (기본 50)')
+    parser.add_argument('--requests', type=int, default=20, help='클라이언트당 요청 수')
+    args = parser.parse_args()
+
+    servers = [item.split('=', 1) for item in args.servers.split(',') if item.strip()]
+
+    print("=" * 78)
+    print(f"API 부하 테스트: 동시 클라이언트 {args.clients}개 x 요청 {args.requests}회")
+    print("=" * 78)
+    results = {}
+    for name, url in servers:
+        if cache_enabled(url):
+            print(f"  [!] {name}: 집계 캐시가 켜져 있음 (API_CACHE=0으로 띄워야 공정한 비교)")
+        try:
+            latencies, errors, wall = load_test(url, args.clients, args.requests)
+        except (OSError, http.client.HTTPException) as e:
+            print(f"  [X] {name} ({url}) 연결 실패: {e}")
+            continue
+        results[name] = (latencies, errors, wall)
+
+    if not results:
+        sys.exit(1)
+
+    print(f"\n  {'서버':<10}{'p50(ms)':>10}{'p95(ms)':>10}{'p99(ms)':>10}{'최대(ms)':>10}"
+          f"{'처리량(req/s)':>15}{'오류':>6}")
+    for name, (latencies, errors, wall) in results.items():
+        values = [ms for _, ms in latencies]
+        print(f"  {name:<10}{percentile(values, 50):>10.1f}{percentile(values, 95):>10.1f}"
+              f"{percentile(values, 99):>10.1f}{max(values, default=0):>10.1f}"
+              f"{len(values) / wall if wall else 0:>15.1f}{errors:>6}")
+
+    print("\n  요청 종류별 p50 / p99 (ms)")
+    names = sorted({n for latencies, _, _ in results.values() for n, _ in latencies})
+    print(f"  {'요청':<18}" + ''.join(f"{name:>22}" for name in results))
+    for request_name in names:
+        cells = []
+        for latencies, _, _ in results.values():
+            values = [ms for n, ms in latencies if n == request_name]
+            cells.append(f"{percentile(values, 50):>10.1f} / {percentile(values, 99):>8.1f}")
+        print(f"  {request_name:<18}" + ''.join(f"{cell:>22}" for cell in cells))
+
+
+if __name__ == "__main__":
+    main()
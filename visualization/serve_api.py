@@ -0,0 +1,59 @@
+"""
+API 서버 프로덕션 실행 (gunicorn 멀티 워커)
+
+graph_api_server.py를 직접 실행하면 프로세스 1개(Flask 개발 서버)로만 동작합니다.
+이 스크립트는 gunicorn.conf.py 설정으로 워커 프로세스 여러 개 x 워커당 스레드로 실행하고,
+워커마다 요청을 받기 전에 연결 풀/캐시를 채우며 종료 시 드라이버를 닫습니다.
+gunicorn은 Linux/macOS 전용입니다 (Windows는 python visualization/graph_api_server.py).
+
+사용법:
+  python visualization/serve_api.py
+  python visualization/serve_api.py --workers 4 --threads 8 --port 8000
+  python visualization/serve_api.py --no-warm-up
+"""
+
+import os
+import sys
+import argparse
+import importlib.util
+
+VISUALIZATION_DIR = os.path.dirname(os.path.abspath(__file__))
+GUNICORN_CONFIG = os.path.join(VISUALIZATION_DIR, 'gunicorn.conf.py')
+
+
+def gunicorn_command(workers=None, threads=None, port=None):
+    """gunicorn 실행 명령 (값을 생략하면 gunicorn.conf.py / 환경 변수 기본값)"""
+    command = [sys.executable, '-m', 'gunicorn', '-c', GUNICORN_CONFIG, '--chdir', VISUALIZATION_DIR]
+    if workers:
+        command += ['--workers', str(workers)]
+    if threads:
+        command += ['--threads', str(threads)]
+    if port:
+        command += ['--bind', f'0.0.0.0:{port}']
+    return command + ['graph_api_server:app']
+
+
+def gunicorn_available():
+    return importlib.util.find_spec('gunicorn') is not None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='API 서버 프로덕션 실행 (gunicorn 멀티 워커)')
+    parser.add_argument('--workers', type=int, help='워커 프로세스 수 (기본 API_WORKERS 또는 CPU 수 * 2 + 1)')
+    parser.add_argument('--threads', type=int, help='워커당 스레드 수 (기본 API_THREADS 또는 4)')
+    parser.add_argument('--port', type=int, help='포트 (기본 PORT 또는 8000)')
+    parser.add_argument('--no-warm-up', action='store_true', help='워커 warm-up(연결 풀/캐시 준비) 생략')
+    args = parser.parse_args()
+
+    if not gunicorn_available():
+        print("[X] gunicorn이 설치되어 있지 않습니다: pip install gunicorn (Windows는 미지원)")
+        sys.exit(1)
+    if args.no_warm_up:
+        os.environ['API_WARM_UP'] = '0'
+    command = gunicorn_command(args.workers, args.threads, args.port)
+    print(' '.join(command[1:]))
+    os.execv(sys.executable, command)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,13 +5,14 @@ Neo4j 원가차이 분석 - Streamlit 대시보드
 브라우저에서 http://localhost:8501 자동으로 열림!
 """
 import os
-import ssl
+import sys
 import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
 import plotly.express as px
-from dotenv import load_dotenv
-from neo4j import GraphDatabase
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from neo4j_connection import create_driver
 
 # 페이지 설정
 st.set_page_config(
@@ -36,22 +37,10 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# Neo4j 연결 클래스
+# Neo4j 연결 (프로세스당 드라이버 하나를 모든 세션/리런에서 재사용)
 @st.cache_resource
 def get_neo4j_connection():
-    load_dotenv()
-    uri = os.getenv('NEO4J_URI')
-    username = os.getenv('NEO4J_USERNAME')
-    password = os.getenv('NEO4J_PASSWORD')
-    
-    uri = uri.replace('neo4j+s://', 'bolt://')
-    uri = uri.replace('neo4j+ssc://', 'bolt://')
-    
-    ssl_context = ssl.create_default_context()
-    ssl_context.check_hostname = False
-    ssl_context.verify_mode = ssl.CERT_NONE
-    
-    return GraphDatabase.driver(uri, auth=(username, password), ssl_context=ssl_context)
+    return create_driver('streamlit', ssl_rewrite=True)
 
 # 데이터 로딩 함수들
 @st.cache_data(ttl=300)